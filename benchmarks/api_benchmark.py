@@ -0,0 +1,491 @@
+"""
+Latency and throughput of the API routes, served in-process.
+
+Boots the FastAPI `app` (startup and shutdown events included) behind an httpx ASGI transport,
+seeds a synthetic catalog into the configured database and measures p50/p90/p99 latency and
+throughput per scenario. Results are written as JSON, so runs of different commits can be compared:
+
+    python -m benchmarks.api_benchmark --products 20000 --sales 200000 --output results/head.json
+    python -m benchmarks.api_benchmark --reuse --compare results/head.json
+
+Search at scale, e.g. on 1M products:
+
+    python -m benchmarks.api_benchmark --products 1000000 --sales 0 --only products.search products.list
+
+Hot product contention (flash sale), against the row, ledger (STOCK_LEDGER_ENABLED=true) and sharded stock,
+with the rollup upserted by every sale or folded in the background (SALE_ROLLUP_MODE=refresher):
+
+    python -m benchmarks.api_benchmark --reuse --writes --concurrency 50 --only sales.hot_product products.get_hot
+    python -m benchmarks.api_benchmark --reuse --writes --concurrency 50 --only sales.hot_product --hot-shards 8
+
+Year-range reports, served from the daily rollup: seed a year of history, e.g. `--sales 2000000 --sales-days 365`.
+
+Batch product lookup against the same products fetched one by one (as the cart and recommendation pages did):
+
+    python -m benchmarks.api_benchmark --reuse --only products.batch products.get_sequential
+
+Memory and latency of a 10k-row listing (the sales report, served from projected columns), with the peak of the
+Python allocations of one request:
+
+    python -m benchmarks.api_benchmark --reuse --memory --only reports.sales_10k
+
+The database comes from the usual DB_* settings and has to be Postgres: the schema relies on
+partitioned tables, JSONB columns and Postgres upserts, so SQLite cannot stand in for it.
+Use a dedicated database: the catalog is only seeded when it is empty (or reused with `--reuse`),
+and write scenarios (`--writes`) create sales and reservations.
+All requests come from one client, so run it with ADMISSION_CONTROL_ENABLED=false (as `make benchmark` does)
+to measure the routes rather than the per-client rate limits.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from config import PARTITION_MONTHS_AHEAD, SALE_ROLLUP_BATCH_SIZE, SALE_ROLLUP_MODE
+from main import app, create_db
+from src.infrastructure.db.database import SessionLocal, engine
+from src.infrastructure.db.models.models import Category, Discount, Product, Sale
+from src.infrastructure.db.partitions import ensure_partitions
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+
+INSERT_BATCH_SIZE = 5000
+SEED_STOCK = 1_000_000
+# Products per `products.batch` request.
+BATCH_SIZE = 20
+# Rows per response of the large listing scenario.
+LISTING_ROWS = 10_000
+
+# Words of the synthetic product names and descriptions, so the full-text search has realistic matches.
+ADJECTIVES = [
+    "red", "blue", "green", "black", "white", "light", "heavy", "compact", "classic", "smart", "vintage", "pro",
+]
+MATERIALS = ["cotton", "leather", "steel", "wooden", "ceramic", "plastic", "glass", "wool", "bamboo", "carbon"]
+NOUNS = [
+    "shirt", "jacket", "shoes", "chair", "table", "lamp", "kettle", "backpack", "watch", "bottle",
+    "headphones", "keyboard", "blanket", "mug", "bicycle", "tent", "camera", "speaker", "wallet", "scarf",
+]
+
+
+@dataclass
+class Dataset:
+    """IDs of the seeded rows the scenarios pick from."""
+
+    category_ids: List[int]
+    root_category_ids: List[int]
+    product_ids: List[int]
+    sales: int
+    # Range of the sold_at of the seeded sales.
+    sales_from: Optional[datetime] = None
+    sales_until: Optional[datetime] = None
+
+    @property
+    def hot_product_id(self) -> int:
+        """The product every request of the hot product scenarios goes to."""
+        return self.product_ids[0]
+
+
+@dataclass
+class Scenario:
+    """One request shape, built from the dataset with a seeded random generator."""
+
+    name: str
+    method: str
+    path: Callable[[Dataset, random.Random], str]
+    body: Optional[Callable[[Dataset, random.Random], dict]] = None
+    writes: bool = False
+    # Requests (each with its own path and body) sent one after another and measured as one.
+    fan_out: int = 1
+
+
+def sample_products(data: Dataset, rnd: random.Random, count: int) -> List[int]:
+    return rnd.sample(data.product_ids, min(count, len(data.product_ids)))
+
+
+def days_ago(days: int) -> str:
+    return (datetime.utcnow() - timedelta(days=days)).isoformat(timespec="seconds")
+
+
+def sales_window(data: Dataset, rnd: random.Random, rows: int) -> str:
+    """Query string of a closed date range holding about `rows` sales, at a random place in the history."""
+    if not data.sales:
+        return f"start_date={days_ago(1)}"
+    span = data.sales_until - data.sales_from
+    window = span * min(1.0, rows / max(data.sales, 1))
+    start = data.sales_from + (span - window) * rnd.random()
+    return f"start_date={start.isoformat(timespec='seconds')}&end_date={(start + window).isoformat(timespec='seconds')}"
+
+
+SCENARIOS = [
+    Scenario("category.list", "GET", lambda data, rnd: "/category/categories/"),
+    Scenario("category.get", "GET", lambda data, rnd: f"/category/{rnd.choice(data.category_ids)}"),
+    Scenario("products.list", "GET", lambda data, rnd: "/products/?limit=50"),
+    Scenario("products.get", "GET", lambda data, rnd: f"/products/{rnd.choice(data.product_ids)}"),
+    # Concurrent reads of one product, coalesced by the single-flight group.
+    Scenario("products.get_hot", "GET", lambda data, rnd: f"/products/{data.hot_product_id}"),
+    Scenario(
+        "products.batch",
+        "GET",
+        lambda data, rnd: "/products/batch?ids=" + ",".join(map(str, sample_products(data, rnd, BATCH_SIZE))),
+    ),
+    # The products of one `products.batch` request, fetched with sequential single GETs.
+    Scenario(
+        "products.get_sequential",
+        "GET",
+        lambda data, rnd: f"/products/{rnd.choice(data.product_ids)}",
+        fan_out=BATCH_SIZE,
+    ),
+    Scenario(
+        "products.by_category",
+        "GET",
+        lambda data, rnd: f"/products/category/{rnd.choice(data.root_category_ids)}?limit=50",
+    ),
+    Scenario(
+        "products.search",
+        "GET",
+        lambda data, rnd: f"/products/search/text?q={rnd.choice(ADJECTIVES)}+{rnd.choice(NOUNS)}&limit=20",
+    ),
+    Scenario("discount.list", "GET", lambda data, rnd: "/discount/"),
+    Scenario(
+        "reservation.by_product", "GET", lambda data, rnd: f"/reservation/product/{rnd.choice(data.product_ids)}"
+    ),
+    Scenario("stock.get", "GET", lambda data, rnd: f"/stock/{rnd.choice(data.product_ids)}"),
+    Scenario(
+        "reports.sales",
+        "GET",
+        lambda data, rnd: (
+            f"/reports/sales?category_id={rnd.choice(data.root_category_ids)}&start_date={days_ago(7)}"
+        ),
+    ),
+    # 10k sales rows per response; the random window keeps the result cache out of the way.
+    Scenario("reports.sales_10k", "GET", lambda data, rnd: f"/reports/sales?{sales_window(data, rnd, LISTING_ROWS)}"),
+    Scenario("reports.rollup", "GET", lambda data, rnd: "/reports/sales/rollup?granularity=month"),
+    # A year of sales per month, from the rollup: the cost should follow the rollup rows, not the sales.
+    # Unfiltered reports return a row per product and period, so their cost is dominated by the response size.
+    Scenario(
+        "reports.rollup_year",
+        "GET",
+        lambda data, rnd: (
+            f"/reports/sales/rollup?granularity=month&product_id={rnd.choice(data.product_ids)}"
+            f"&start_date={days_ago(365)}"
+        ),
+    ),
+    Scenario(
+        "reports.rollup_year_category",
+        "GET",
+        lambda data, rnd: (
+            f"/reports/sales/rollup?granularity=month&category_id={rnd.choice(data.root_category_ids)}"
+            f"&start_date={days_ago(365)}"
+        ),
+    ),
+    Scenario(
+        "sales.create",
+        "POST",
+        lambda data, rnd: "/sales/",
+        lambda data, rnd: {"product_id": rnd.choice(data.product_ids), "quantity": 1},
+        writes=True,
+    ),
+    # Flash sale: every request buys the same product, so they contend on its stock.
+    Scenario(
+        "sales.hot_product",
+        "POST",
+        lambda data, rnd: "/sales/",
+        lambda data, rnd: {"product_id": data.hot_product_id, "quantity": 1},
+        writes=True,
+    ),
+    Scenario(
+        "sales.checkout",
+        "POST",
+        lambda data, rnd: "/sales/checkout",
+        lambda data, rnd: {
+            "lines": [{"product_id": product_id, "quantity": 1} for product_id in sample_products(data, rnd, 3)]
+        },
+        writes=True,
+    ),
+    Scenario(
+        "reservation.create",
+        "POST",
+        lambda data, rnd: "/reservation/",
+        lambda data, rnd: {"product_id": rnd.choice(data.product_ids), "quantity": 1},
+        writes=True,
+    ),
+]
+
+
+async def seed_catalog(args: argparse.Namespace, rnd: random.Random) -> Dataset:
+    """Insert categories, discounts, products and sales history into an empty catalog."""
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, PARTITION_MONTHS_AHEAD, months_behind=args.sales_days // 28 + 1)
+
+    async with SessionLocal() as session:
+        levels = [[None]]
+        for depth in range(args.category_depth):
+            level = [
+                Category(name=f"Category {depth}.{index}.{position}", parent_id=parent_id)
+                for index, parent_id in enumerate(levels[-1])
+                for position in range(args.category_breadth)
+            ]
+            session.add_all(level)
+            await session.flush()
+            levels.append([category.id for category in level])
+        category_ids = [category_id for level in levels[1:] for category_id in level]
+
+        discounts = [Discount(name=f"Discount {percentage}", percentage=percentage) for percentage in (5, 10, 20)]
+        session.add_all(discounts)
+        await session.flush()
+
+        product_ids = []
+        for start in range(0, args.products, INSERT_BATCH_SIZE):
+            rows = []
+            for index in range(start, min(start + INSERT_BATCH_SIZE, args.products)):
+                price = round(rnd.uniform(1, 500), 2)
+                rows.append(
+                    {
+                        "name": f"{rnd.choice(ADJECTIVES)} {rnd.choice(MATERIALS)} {rnd.choice(NOUNS)} {index}",
+                        "description": (
+                            f"A {rnd.choice(ADJECTIVES)} {rnd.choice(NOUNS)} made of {rnd.choice(MATERIALS)}, "
+                            f"goes well with a {rnd.choice(NOUNS)}."
+                        ),
+                        "price": price,
+                        "effective_price": price,
+                        "category_id": rnd.choice(category_ids),
+                        "discount_id": rnd.choice(discounts).id if rnd.random() < 0.2 else None,
+                        "stock": SEED_STOCK,
+                    }
+                )
+            product_ids.extend((await session.execute(insert(Product).returning(Product.id), rows)).scalars())
+
+        now = datetime.utcnow()
+        for start in range(0, args.sales, INSERT_BATCH_SIZE):
+            rows = [
+                {
+                    "product_id": rnd.choice(product_ids),
+                    "quantity": rnd.randint(1, 5),
+                    "unit_price": round(rnd.uniform(1, 500), 2),
+                    "sold_at": now - timedelta(seconds=rnd.uniform(0, args.sales_days * 86400)),
+                }
+                for _ in range(min(INSERT_BATCH_SIZE, args.sales - start))
+            ]
+            await session.execute(insert(Sale), rows)
+        await session.commit()
+
+        await ProductRepository(session).refresh_effective_prices()
+
+        # Fold the seeded history into the sales rollup, as if it had been sold through the API.
+        rollup_repo = SaleRollupRepository(session)
+        await rollup_repo.ensure_backfilled(SALE_ROLLUP_MODE)
+        while await rollup_repo.refresh_from_watermark(SALE_ROLLUP_BATCH_SIZE):
+            pass
+
+    return Dataset(category_ids, levels[1], product_ids, args.sales, now - timedelta(days=args.sales_days), now)
+
+
+async def load_dataset() -> Dataset:
+    """Read the IDs of an already seeded catalog."""
+    async with SessionLocal() as session:
+        categories = (await session.execute(select(Category.id, Category.parent_id))).all()
+        product_ids = (await session.execute(select(Product.id))).scalars().all()
+        sales, sales_from, sales_until = (
+            await session.execute(select(func.count(Sale.id), func.min(Sale.sold_at), func.max(Sale.sold_at)))
+        ).one()
+    return Dataset(
+        [category_id for category_id, _ in categories],
+        [category_id for category_id, parent_id in categories if parent_id is None],
+        list(product_ids),
+        sales,
+        sales_from,
+        sales_until,
+    )
+
+
+async def catalog_is_empty() -> bool:
+    async with SessionLocal() as session:
+        return (await session.execute(select(func.count(Product.id)))).scalar() == 0
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, data: Dataset, args: argparse.Namespace, rnd: random.Random,
+) -> dict:
+    """Send the scenario's requests from `args.concurrency` workers and summarize their latencies."""
+    requests = [
+        [
+            (scenario.path(data, rnd), scenario.body(data, rnd) if scenario.body else None)
+            for _ in range(scenario.fan_out)
+        ]
+        for _ in range(args.warmup + args.requests)
+    ]
+    warmup, measured = requests[:args.warmup], iter(requests[args.warmup:])
+    for sequence in warmup:
+        for path, body in sequence:
+            await client.request(scenario.method, path, json=body)
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for sequence in measured:
+            started = time.perf_counter()
+            for path, body in sequence:
+                response = await client.request(scenario.method, path, json=body)
+                errors += response.status_code >= 400
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "method": scenario.method,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "throughput_rps": len(latencies) / elapsed,
+    }
+    if args.memory:
+        result["peak_mib"] = await peak_memory(client, scenario, data, rnd)
+    return result
+
+
+async def peak_memory(client: httpx.AsyncClient, scenario: Scenario, data: Dataset, rnd: random.Random) -> float:
+    """Peak of the Python allocations (tracemalloc) while serving one more request of the scenario, in MiB."""
+    sequence = [
+        (scenario.path(data, rnd), scenario.body(data, rnd) if scenario.body else None)
+        for _ in range(scenario.fan_out)
+    ]
+    tracemalloc.start()
+    try:
+        for path, body in sequence:
+            await client.request(scenario.method, path, json=body)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]]) -> None:
+    memory = any("peak_mib" in result for result in results.values())
+    print(f"{'scenario':<24} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}" + (" peak MiB" if memory else ""))
+    for name, result in results.items():
+        line = (
+            f"{name:<24} {result['p50_ms']:9.2f} {result['p99_ms']:9.2f} "
+            f"{result['throughput_rps']:9.1f} {result['errors']:7d}"
+        )
+        if memory:
+            line += f" {result['peak_mib']:8.1f}"
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (
+                f"   p99 {(result['p99_ms'] / previous['p99_ms'] - 1) * 100:+6.1f}%"
+                f"  req/s {(result['throughput_rps'] / previous['throughput_rps'] - 1) * 100:+6.1f}%"
+            )
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    rnd = random.Random(args.seed)
+    await create_db()
+    if args.reuse:
+        data = await load_dataset()
+    elif await catalog_is_empty():
+        data = await seed_catalog(args, rnd)
+    else:
+        raise SystemExit("The catalog is not empty: run against an empty database or pass --reuse.")
+    if not data.product_ids:
+        raise SystemExit("The catalog has no products to benchmark.")
+
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if (args.writes or not scenario.writes) and (not args.only or scenario.name in args.only)
+    ]
+    results = {}
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            if args.hot_shards is not None:
+                response = await client.put(f"/stock/{data.hot_product_id}/shards", json={"shards": args.hot_shards})
+                response.raise_for_status()
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, data, args, rnd)
+    finally:
+        await app.router.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["scenarios"]
+    print_results(results, baseline)
+
+    report = {
+        "commit": current_commit(),
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "dataset": {
+            "categories": len(data.category_ids),
+            "products": len(data.product_ids),
+            "sales": data.sales,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API routes in-process.")
+    parser.add_argument("--category-depth", type=int, default=3, help="Levels of the category tree.")
+    parser.add_argument("--category-breadth", type=int, default=5, help="Subcategories per category.")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--sales", type=int, default=50000)
+    parser.add_argument("--sales-days", type=int, default=90, help="Days of sales history.")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--writes", action="store_true", help="Also run the scenarios creating sales and reservations.")
+    parser.add_argument("--only", nargs="+", help="Run only the named scenarios.")
+    parser.add_argument(
+        "--memory", action="store_true", help="Also record the peak Python allocations of one request per scenario."
+    )
+    parser.add_argument(
+        "--hot-shards", type=int, help="Split the stock of the hot product across this many shards (1 merges them)."
+    )
+    parser.add_argument("--reuse", action="store_true", help="Benchmark the catalog already in the database.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Results JSON of a previous run to compare with.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
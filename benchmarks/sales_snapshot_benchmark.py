@@ -0,0 +1,170 @@
+"""
+Sales aggregations over the in-process columnar snapshot (NumPy) against the same queries in Postgres.
+
+Generates synthetic sales straight into a SalesSnapshot, reports its memory per million sales and
+the median time of the /reports/sales/summary aggregations. With `--database` the same rows are
+copied into an unlogged table of the configured database (DB_* settings) and the equivalent
+GROUP BY queries are timed there too; the table is dropped afterwards.
+
+    python -m benchmarks.sales_snapshot_benchmark --rows 50000000
+    python -m benchmarks.sales_snapshot_benchmark --rows 50000000 --database
+
+Generating 50M sales takes about 1.2 GB for the snapshot plus as much again for the generator,
+and copying them into Postgres takes several minutes.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.infrastructure.analytics.sales_snapshot import BYTES_PER_SALE, SalesSnapshot, to_microseconds
+from src.services.sales_analytics_service import summarize_sales
+
+GENERATE_CHUNK = 5_000_000
+COPY_CHUNK = 100_000
+BENCHMARK_TABLE = "sales_snapshot_benchmark"
+START = datetime(2024, 1, 1)
+
+
+def generate(snapshot: SalesSnapshot, rows: int, products: int, categories: int, days: int, seed: int) -> None:
+    """Append `rows` synthetic sales spread uniformly over `days` days from START."""
+    rnd = np.random.default_rng(seed)
+    start = to_microseconds(START)
+    prices = rnd.uniform(1, 500, products + 1).round(2)
+    for offset in range(0, rows, GENERATE_CHUNK):
+        count = min(GENERATE_CHUNK, rows - offset)
+        product_id = rnd.integers(1, products + 1, count, dtype=np.int32)
+        sold_at = np.sort(rnd.integers(start, start + days * 86_400_000_000, count, dtype=np.int64))
+        snapshot.append_columns(
+            product_id,
+            rnd.integers(1, 6, count, dtype=np.int32),
+            sold_at,
+            prices[product_id],
+            last_sale_id=offset + count,
+        )
+    product_ids = np.arange(1, products + 1)
+    snapshot.set_categories(zip(product_ids.tolist(), (product_ids % categories + 1).tolist()))
+
+
+def scenarios(days: int) -> Dict[str, Tuple[dict, str]]:
+    """Aggregations by name: summarize_sales arguments and the equivalent SQL."""
+    month_start, month_end = START + timedelta(days=days // 2), START + timedelta(days=days // 2 + 30)
+    window = f"'{month_start.isoformat()}' AND '{month_end.isoformat()}'"
+    return {
+        "top10_products_by_revenue": (
+            {"group_by": "product", "order_by": "revenue", "top": 10},
+            f"SELECT product_id, sum(quantity), sum(quantity * unit_price) AS revenue FROM {BENCHMARK_TABLE} "
+            "GROUP BY product_id ORDER BY revenue DESC LIMIT 10",
+        ),
+        "categories_by_units": (
+            {"group_by": "category", "order_by": "units"},
+            f"SELECT category_id, sum(quantity) AS units, sum(quantity * unit_price) FROM {BENCHMARK_TABLE} "
+            "GROUP BY category_id ORDER BY units DESC",
+        ),
+        "days_with_7_day_moving_average": (
+            {"group_by": "day", "moving_average": 7},
+            "SELECT day, units, avg(units) OVER (ORDER BY day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) FROM "
+            f"(SELECT sold_at::date AS day, sum(quantity) AS units FROM {BENCHMARK_TABLE} GROUP BY day) AS days",
+        ),
+        "one_month_of_category_3_by_product": (
+            {"group_by": "product", "category_id": 3, "start_date": month_start, "end_date": month_end},
+            f"SELECT product_id, sum(quantity), sum(quantity * unit_price) AS revenue FROM {BENCHMARK_TABLE} "
+            f"WHERE category_id = 3 AND sold_at BETWEEN {window} GROUP BY product_id ORDER BY revenue DESC",
+        ),
+    }
+
+
+def median_seconds(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def sql_timings(snapshot: SalesSnapshot, queries: Dict[str, str], repeat: int) -> Dict[str, float]:
+    """Copy the snapshot into an unlogged table and time the queries on it."""
+    from src.infrastructure.db.database import engine
+
+    columns = snapshot.columns()
+    category_by_product = columns.category_by_product
+    async with engine.connect() as connection:
+        raw = (await connection.get_raw_connection()).driver_connection
+        await raw.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+        await raw.execute(
+            f"CREATE UNLOGGED TABLE {BENCHMARK_TABLE} "
+            "(product_id int, category_id int, quantity int, sold_at timestamp, unit_price float8)"
+        )
+        try:
+            for offset in range(0, snapshot.size, COPY_CHUNK):
+                chunk = slice(offset, offset + COPY_CHUNK)
+                product_id = columns.product_id[chunk]
+                sold_at = columns.sold_at[chunk].astype("datetime64[us]").astype(datetime)
+                records = zip(
+                    product_id.tolist(),
+                    category_by_product[product_id].tolist(),
+                    columns.quantity[chunk].tolist(),
+                    sold_at.tolist(),
+                    columns.unit_price[chunk].tolist(),
+                )
+                await raw.copy_records_to_table(BENCHMARK_TABLE, records=records)
+            await raw.execute(f"ANALYZE {BENCHMARK_TABLE}")
+
+            timings = {}
+            for name, query in queries.items():
+                await raw.fetch(query)  # warm up the buffer cache
+                runs = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await raw.fetch(query)
+                    runs.append(time.perf_counter() - started)
+                timings[name] = statistics.median(runs)
+            return timings
+        finally:
+            await raw.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database", action="store_true", help="Also time the queries in Postgres.")
+    args = parser.parse_args()
+
+    snapshot = SalesSnapshot(capacity=args.rows)
+    started = time.perf_counter()
+    generate(snapshot, args.rows, args.products, args.categories, args.days, args.seed)
+    print(f"Generated {snapshot.size:,} sales in {time.perf_counter() - started:.1f}s")
+    print(
+        f"Snapshot memory: {snapshot.memory_bytes / 2**20:,.0f} MiB, "
+        f"{BYTES_PER_SALE * 1_000_000 / 2**20:.1f} MiB per million sales"
+    )
+
+    named = scenarios(args.days)
+    columns = snapshot.columns()
+    numpy_timings = {
+        name: median_seconds(lambda kwargs=kwargs: summarize_sales(columns, **kwargs), args.repeat)
+        for name, (kwargs, _) in named.items()
+    }
+    sql = {}
+    if args.database:
+        sql = asyncio.run(sql_timings(snapshot, {name: query for name, (_, query) in named.items()}, args.repeat))
+
+    rows: List[str] = [f"{'scenario':<40}{'numpy ms':>12}{'postgres ms':>14}"]
+    for name, seconds in numpy_timings.items():
+        postgres = f"{sql[name] * 1000:>14.1f}" if name in sql else f"{'-':>14}"
+        rows.append(f"{name:<40}{seconds * 1000:>12.1f}{postgres}")
+    print("\n".join(rows))
+
+
+if __name__ == "__main__":
+    main()
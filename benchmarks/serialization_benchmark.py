@@ -0,0 +1,90 @@
+"""
+Serialization cost of listing responses per 1000 rows.
+
+Compares the previous path (services build response models, FastAPI validates them again
+against the response_model and encodes with the standard JSON encoder), the single validation
+path (FAST_JSON_RESPONSES=false) and the orjson path (FAST_JSON_RESPONSES=true).
+
+Run from the project root: `python -m benchmarks.serialization_benchmark`
+"""
+import json
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.schemes.product_schemes import ProductResponse
+from src.schemes.sale_schemes import SaleResponse
+from src.serializers.json_responses import verify_fast_json
+
+ROWS = 1000
+REPEAT = 20
+
+
+def product_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": index,
+            "name": f"Product {index}",
+            "description": "A product used to measure serialization costs.",
+            "price": 100.0 + index,
+            "final_price": 90.0 + index,
+            "category_id": index % 10,
+            "category_name": f"Category {index % 10}",
+            "discount_id": 1 if index % 2 else None,
+            "discount_name": "Sale" if index % 2 else None,
+            "stock": index % 50,
+            "reserved_quantity": index % 3,
+        }
+        for index in range(count)
+    ]
+
+
+def sale_rows(count: int) -> List[dict]:
+    sold_at = datetime(2026, 1, 1)
+    return [
+        {
+            "id": index,
+            "product_id": index % 100,
+            "product_name": f"Product {index % 100}",
+            "product_price": 90.0 + index % 100,
+            "discount_name": None,
+            "category_id": index % 10,
+            "category_name": f"Category {index % 10}",
+            "quantity": 1 + index % 5,
+            "sold_at": sold_at + timedelta(minutes=index),
+        }
+        for index in range(count)
+    ]
+
+
+def measure(name: str, rows: List[dict], model) -> None:
+    adapter = TypeAdapter(List[model])
+
+    def double_validation():
+        models = [model(**row) for row in rows]
+        return json.dumps(jsonable_encoder(adapter.validate_python(models))).encode()
+
+    def single_validation():
+        return json.dumps(jsonable_encoder(adapter.validate_python(rows))).encode()
+
+    def fast_json():
+        return orjson.dumps(rows)
+
+    assert verify_fast_json(rows, List[model])
+    print(f"{name} ({len(rows)} rows, best of {REPEAT}):")
+    for label, function in (
+        ("response models + response_model validation", double_validation),
+        ("dicts + response_model validation", single_validation),
+        ("dicts + orjson", fast_json),
+    ):
+        best = min(timeit.repeat(function, number=1, repeat=REPEAT))
+        print(f"  {label:<46} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    measure("products", product_rows(ROWS), ProductResponse)
+    measure("sales report", sale_rows(ROWS), SaleResponse)
@@ -22,4 +22,181 @@ PRODUCT_TABLE = os.getenv("PRODUCT_TABLE")
 DISCOUNT_TABLE = os.getenv("DISCOUNT_TABLE")
 PRODUCT_DISCOUNT_TABLE = os.getenv("PRODUCT_DISCOUNT_TABLE")
 RESERVATION_TABLE = os.getenv("RESERVATION_TABLE")
-SALE_TABLE = os.getenv("SALE_TABLE")
\ No newline at end of file
+SALE_TABLE = os.getenv("SALE_TABLE")
+SALE_ROLLUP_TABLE = os.getenv("SALE_ROLLUP_TABLE", "sale_daily_rollups")
+SALE_ROLLUP_WATERMARK_TABLE = os.getenv("SALE_ROLLUP_WATERMARK_TABLE", "sale_rollup_watermarks")
+SALE_ROLLUP_GAP_TABLE = os.getenv("SALE_ROLLUP_GAP_TABLE", "sale_rollup_gaps")
+STOCK_MOVEMENT_TABLE = os.getenv("STOCK_MOVEMENT_TABLE", "stock_movements")
+STOCK_BALANCE_TABLE = os.getenv("STOCK_BALANCE_TABLE", "stock_balances")
+PRODUCT_STOCK_SHARD_TABLE = os.getenv("PRODUCT_STOCK_SHARD_TABLE", "product_stock_shards")
+IDEMPOTENCY_KEY_TABLE = os.getenv("IDEMPOTENCY_KEY_TABLE", "idempotency_keys")
+CATALOG_TOMBSTONE_TABLE = os.getenv("CATALOG_TOMBSTONE_TABLE", "catalog_tombstones")
+OUTBOX_EVENT_TABLE = os.getenv("OUTBOX_EVENT_TABLE", "outbox_events")
+OUTBOX_SINK_OFFSET_TABLE = os.getenv("OUTBOX_SINK_OFFSET_TABLE", "outbox_sink_offsets")
+REPORT_JOB_TABLE = os.getenv("REPORT_JOB_TABLE", "report_jobs")
+
+
+# Maximum number of IDs accepted by the batch product endpoints (/products/batch).
+PRODUCT_BATCH_MAX_IDS = int(os.getenv("PRODUCT_BATCH_MAX_IDS", "100"))
+# Maximum number of product IDs of a bulk discount request (categories and filters are not limited).
+BULK_DISCOUNT_MAX_IDS = int(os.getenv("BULK_DISCOUNT_MAX_IDS", "50000"))
+
+# Change feed (/products/changes): every CATALOG_PUBLISH_INTERVAL seconds the committed catalog changes get their
+# version, in batches of CATALOG_PUBLISH_BATCH_SIZE rows per table.
+CATALOG_PUBLISH_INTERVAL = float(os.getenv("CATALOG_PUBLISH_INTERVAL", "1"))
+CATALOG_PUBLISH_BATCH_SIZE = int(os.getenv("CATALOG_PUBLISH_BATCH_SIZE", "5000"))
+CATALOG_CHANGES_MAX_LIMIT = int(os.getenv("CATALOG_CHANGES_MAX_LIMIT", "10000"))
+
+
+# PRODUCT SEARCH
+# Postgres text search configuration of the `products.search_vector` generated column and of the search queries.
+# The column is created by the migrations; changing the configuration needs a migration regenerating it.
+PRODUCT_SEARCH_CONFIG = os.getenv("PRODUCT_SEARCH_CONFIG", "english")
+
+# Name suggestions (/suggest) are served from an in-process prefix index of product and category names,
+# rebuilt from the database every SUGGEST_REBUILD_INTERVAL seconds. SUGGEST_MAX_ENTRIES bounds its size
+# (about 150 bytes per entry); every name gets one entry per leading word, up to SUGGEST_MAX_WORDS.
+SUGGEST_MAX_ENTRIES = int(os.getenv("SUGGEST_MAX_ENTRIES", "300000"))
+SUGGEST_MAX_WORDS = int(os.getenv("SUGGEST_MAX_WORDS", "4"))
+SUGGEST_REBUILD_INTERVAL = float(os.getenv("SUGGEST_REBUILD_INTERVAL", "600"))
+
+
+# JSON RESPONSES
+# Listing endpoints return plain dicts encoded with orjson, skipping the response_model validation.
+# FAST_JSON_VERIFY additionally checks every fast response against the response_model (slow, for rollout only).
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() == "true"
+FAST_JSON_VERIFY = os.getenv("FAST_JSON_VERIFY", "false").lower() == "true"
+
+
+# ADMISSION CONTROL
+# Requests are classified by path: `reports` (/reports), `checkout` (/sales, /reservation), `events` (/events)
+# and `catalog` (everything else); /metrics, /status and the docs are never limited. Limits are per worker.
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+# Token bucket per client and route class, as `class=rate/burst` (requests per second / bucket size); over it - 429.
+ADMISSION_RATE_LIMITS = os.getenv("ADMISSION_RATE_LIMITS", "reports=1/5,checkout=20/40,events=2/10,catalog=50/100")
+# Concurrent requests per route class, as `class=limit`; over it - 503. Keep reports well below the DB pool size.
+ADMISSION_CONCURRENCY_LIMITS = os.getenv(
+    "ADMISSION_CONCURRENCY_LIMITS", "reports=4,checkout=32,events=256,catalog=64"
+)
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "100000"))
+# Identify clients by the first X-Forwarded-For address (only behind a proxy that sets it) instead of the peer address.
+ADMISSION_TRUST_FORWARDED_FOR = os.getenv("ADMISSION_TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+# QUERY TIMEOUTS
+# Statements of the report endpoints run with `SET LOCAL statement_timeout`; a report cancelled by the timeout
+# returns 504. The report query is also cancelled when its client disconnects. 0 disables the timeout.
+REPORT_STATEMENT_TIMEOUT = float(os.getenv("REPORT_STATEMENT_TIMEOUT", "15"))
+
+# REPORT JOBS
+# POST /reports/sales/jobs runs a sales report in the background: REPORT_JOB_WORKERS workers per process poll for
+# pending jobs every REPORT_JOB_POLL_INTERVAL seconds and stream the sales in batches of REPORT_JOB_BATCH_SIZE rows
+# into a zstd compressed Parquet or Arrow IPC file in REPORT_JOB_DIR (shared by all workers serving the API).
+REPORT_JOB_DIR = os.getenv("REPORT_JOB_DIR", "/tmp/report_jobs")
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+REPORT_JOB_POLL_INTERVAL = float(os.getenv("REPORT_JOB_POLL_INTERVAL", "2"))
+REPORT_JOB_BATCH_SIZE = int(os.getenv("REPORT_JOB_BATCH_SIZE", "50000"))
+# Jobs with the same filters and format created within REPORT_JOB_TTL seconds share one result, which is deleted
+# after it. A job running longer than REPORT_JOB_TIMEOUT seconds fails.
+REPORT_JOB_TTL = float(os.getenv("REPORT_JOB_TTL", "3600"))
+REPORT_JOB_TIMEOUT = float(os.getenv("REPORT_JOB_TIMEOUT", "1800"))
+
+# REPORT CACHE
+# Results of /reports/sales are cached per worker by their normalized filters, up to REPORT_CACHE_MAX_ENTRIES results
+# and REPORT_CACHE_MAX_BYTES of JSON. Closed date ranges (ending before the current UTC day) are kept until evicted;
+# ranges reaching the current day are dropped on new sales of the worker and served for REPORT_CACHE_OPEN_TTL
+# seconds at most, which bounds how long sales made through other workers are missing.
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "1000"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REPORT_CACHE_OPEN_TTL = float(os.getenv("REPORT_CACHE_OPEN_TTL", "10"))
+
+# SALES SNAPSHOT
+# With SALES_SNAPSHOT_ENABLED every worker keeps a columnar copy of the sales table in memory (24 bytes per sale, up to
+# twice that while its arrays grow) for /reports/sales/summary. New sales are appended every
+# SALES_SNAPSHOT_REFRESH_INTERVAL seconds, SALES_SNAPSHOT_BATCH_SIZE at a time.
+SALES_SNAPSHOT_ENABLED = os.getenv("SALES_SNAPSHOT_ENABLED", "false").lower() == "true"
+SALES_SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SALES_SNAPSHOT_REFRESH_INTERVAL", "10"))
+SALES_SNAPSHOT_BATCH_SIZE = int(os.getenv("SALES_SNAPSHOT_BATCH_SIZE", "200000"))
+
+# SALES LEADERBOARD
+# With LEADERBOARD_ENABLED every worker counts units and revenue per product in LEADERBOARD_BUCKET_SECONDS buckets for
+# the last hour, day and week (/reports/top-products). Sales of the worker are counted as they happen; the whole
+# leaderboard is rebuilt from the sales table at startup and every LEADERBOARD_REBUILD_INTERVAL seconds to pick up the
+# other workers' sales.
+LEADERBOARD_ENABLED = os.getenv("LEADERBOARD_ENABLED", "false").lower() == "true"
+LEADERBOARD_BUCKET_SECONDS = int(os.getenv("LEADERBOARD_BUCKET_SECONDS", "60"))
+LEADERBOARD_REBUILD_INTERVAL = float(os.getenv("LEADERBOARD_REBUILD_INTERVAL", "300"))
+
+# SQL INSTRUMENTATION
+# Fraction of requests (0 - off, 1 - all) whose SQL statement count, DB time and rows are recorded in the
+# `sql_request_*` histograms of /metrics; SQL_STATS_HEADERS also returns them as `X-SQL-*` response headers.
+SQL_STATS_SAMPLE_RATE = float(os.getenv("SQL_STATS_SAMPLE_RATE", "0"))
+SQL_STATS_HEADERS = os.getenv("SQL_STATS_HEADERS", "false").lower() == "true"
+
+
+# SALES ROLLUP
+# "incremental" - rollup rows are upserted in the same transaction as every sale (purchases of one product
+# wait for each other on its rollup row until commit, sharded stock or not),
+# "refresher" - a background task folds new sales into the rollup by sale id watermark every
+# SALE_ROLLUP_REFRESH_INTERVAL seconds; sale IDs it skips are folded once their sales commit.
+# The watermark is re-seeded on startup when the mode changed, so switch all workers at once.
+SALE_ROLLUP_MODE = os.getenv("SALE_ROLLUP_MODE", "incremental")
+SALE_ROLLUP_REFRESH_INTERVAL = float(os.getenv("SALE_ROLLUP_REFRESH_INTERVAL", "30"))
+SALE_ROLLUP_BATCH_SIZE = int(os.getenv("SALE_ROLLUP_BATCH_SIZE", "10000"))
+
+
+# TABLE PARTITIONING
+# Sales and reservations are range partitioned by month on `sold_at` / `reserved_at`.
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "86400"))
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "24"))
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+
+
+# STOCK LEDGER
+# When enabled, stock changes are appended to the stock movement ledger instead of rewriting `products.stock`,
+# which is refreshed from the compacted balances every STOCK_LEDGER_COMPACTION_INTERVAL seconds.
+# Purchases of one product still wait for each other until commit; hot products need stock shards.
+STOCK_LEDGER_ENABLED = os.getenv("STOCK_LEDGER_ENABLED", "false").lower() == "true"
+STOCK_LEDGER_COMPACTION_INTERVAL = float(os.getenv("STOCK_LEDGER_COMPACTION_INTERVAL", "10"))
+
+# Upper bound of the per-product stock shard count (see PUT /stock/{product_id}/shards).
+MAX_STOCK_SHARDS = int(os.getenv("MAX_STOCK_SHARDS", "64"))
+
+
+# IDEMPOTENCY KEYS
+# Responses of POST /sales/ and POST /reservation/ sent with an `Idempotency-Key` header are stored
+# for IDEMPOTENCY_KEY_TTL seconds; the most recent IDEMPOTENCY_CACHE_SIZE are also kept in memory.
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "600"))
+# A request holds its key for IDEMPOTENCY_CLAIM_LEASE seconds; a retry after that (e.g. after a crashed worker)
+# takes the key over and runs again, so keep it above the longest request.
+IDEMPOTENCY_CLAIM_LEASE = float(os.getenv("IDEMPOTENCY_CLAIM_LEASE", "60"))
+
+
+# DISCOUNTS
+# Effective prices are refreshed when a discount window starts or ends, checked every
+# DISCOUNT_SCHEDULE_INTERVAL seconds.
+DISCOUNT_SCHEDULE_INTERVAL = float(os.getenv("DISCOUNT_SCHEDULE_INTERVAL", "30"))
+
+
+# OUTBOX EVENTS
+# Product, stock, sale and reservation changes are written to the outbox table in the transaction of the change.
+# Every OUTBOX_DISPATCH_INTERVAL seconds the dispatcher publishes them (numbers them in commit order) for /events
+# and delivers them in batches of OUTBOX_BATCH_SIZE to the OUTBOX_SINKS, a comma separated list of
+# `webhook:<url>`, `file:<path>` (JSON lines) and `memory` sinks.
+OUTBOX_DISPATCH_INTERVAL = float(os.getenv("OUTBOX_DISPATCH_INTERVAL", "1"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_SINKS = os.getenv("OUTBOX_SINKS", "")
+OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", "5"))
+# A worker claims a sink for OUTBOX_DELIVERY_LEASE seconds per batch; a claim left by a crashed worker expires after it.
+OUTBOX_DELIVERY_LEASE = float(os.getenv("OUTBOX_DELIVERY_LEASE", "60"))
+# Published events are kept for OUTBOX_RETENTION seconds (and until every sink received them).
+OUTBOX_RETENTION = float(os.getenv("OUTBOX_RETENTION", "604800"))
+
+# Long-polling /events waits at most EVENTS_MAX_WAIT seconds, checking for new events every EVENTS_POLL_INTERVAL
+# seconds (readers in the dispatching worker are woken up right away); /events/stream sends a keep-alive
+# comment after EVENTS_HEARTBEAT_INTERVAL seconds without events.
+EVENTS_MAX_WAIT = float(os.getenv("EVENTS_MAX_WAIT", "30"))
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "1"))
+EVENTS_HEARTBEAT_INTERVAL = float(os.getenv("EVENTS_HEARTBEAT_INTERVAL", "15"))
@@ -8,10 +8,40 @@ from src.api.v1.routers import (
     reservation_router,
     sale_router,
     report_router,
+    stock_router,
+    metrics_router,
+    suggest_router,
+    event_router,
 )
-from src.infrastructure.db.database import engine
+from config import (
+    ADMISSION_CONTROL_ENABLED,
+    LEADERBOARD_ENABLED,
+    PARTITION_MONTHS_AHEAD,
+    REPORT_JOB_WORKERS,
+    SALE_ROLLUP_MODE,
+    SALES_SNAPSHOT_ENABLED,
+    SQL_STATS_SAMPLE_RATE,
+    STOCK_LEDGER_ENABLED,
+)
+from src.infrastructure.db.database import SessionLocal, engine
 from src.infrastructure.db.models import models
+from src.infrastructure.db.partitions import ensure_partitions
+from src.infrastructure.db.sql_stats import install_sql_stats
+from src.middleware.admission_control import AdmissionControlMiddleware
 from src.middleware.exception_handling import ExceptionHandlingMiddleware
+from src.middleware.sql_stats import SQLStatsMiddleware
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.tasks.catalog_version_publisher import CatalogVersionPublisher
+from src.tasks.discount_scheduler import DiscountScheduler
+from src.tasks.idempotency_key_purger import IdempotencyKeyPurger
+from src.tasks.leaderboard_rebuilder import LeaderboardRebuilder
+from src.tasks.outbox_dispatcher import OutboxDispatcher
+from src.tasks.partition_maintainer import PartitionMaintainer
+from src.tasks.report_job_worker import ReportJobWorker
+from src.tasks.sale_rollup_refresher import SaleRollupRefresher
+from src.tasks.sales_snapshot_refresher import SalesSnapshotRefresher
+from src.tasks.stock_ledger_compactor import StockLedgerCompactor
+from src.tasks.suggestion_index_builder import SuggestionIndexBuilder
 from fastapi.responses import RedirectResponse
 
 
@@ -28,16 +58,49 @@ app.include_router(discount_router.router)
 app.include_router(reservation_router.router)
 app.include_router(sale_router.router)
 app.include_router(report_router.router)
+app.include_router(stock_router.router)
+app.include_router(metrics_router.router)
+app.include_router(suggest_router.router)
+app.include_router(event_router.router)
+
+background_tasks = [
+    PartitionMaintainer(),
+    IdempotencyKeyPurger(),
+    DiscountScheduler(),
+    SuggestionIndexBuilder(),
+    OutboxDispatcher(),
+    CatalogVersionPublisher(),
+]
+if SALE_ROLLUP_MODE == "refresher":
+    background_tasks.append(SaleRollupRefresher())
+if STOCK_LEDGER_ENABLED:
+    background_tasks.append(StockLedgerCompactor())
+if LEADERBOARD_ENABLED:
+    background_tasks.append(LeaderboardRebuilder())
+if SALES_SNAPSHOT_ENABLED:
+    background_tasks.append(SalesSnapshotRefresher())
+background_tasks.extend(ReportJobWorker(worker) for worker in range(REPORT_JOB_WORKERS))
 
 
 async def create_db():
     async with engine.begin() as conn:
         await conn.run_sync(models.Base.metadata.create_all)
+        await ensure_partitions(conn, PARTITION_MONTHS_AHEAD)
 
 
 @app.on_event("startup")
 async def startup_event():
     await create_db()
+    async with SessionLocal() as session:
+        await SaleRollupRepository(session).ensure_backfilled(SALE_ROLLUP_MODE)
+    for task in background_tasks:
+        task.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        await task.stop()
 
 
 @app.get("/status", tags=["Test"])
@@ -55,7 +118,18 @@ origins = [
     'http://localhost:8000',
 ]
 
-# Add CORS middleware
+# Per-route SQL statement stats, only hooked into the engine when sampling is on.
+if SQL_STATS_SAMPLE_RATE > 0:
+    install_sql_stats(engine)
+    app.add_middleware(SQLStatsMiddleware)
+
+app.add_middleware(ExceptionHandlingMiddleware)
+
+# Requests over their budget are rejected before the other middlewares or any DB session.
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# Add CORS middleware; outermost, so that rejections and error responses carry the CORS headers too.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -63,5 +137,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-app.add_middleware(ExceptionHandlingMiddleware)
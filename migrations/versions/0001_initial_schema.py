@@ -0,0 +1,80 @@
+"""Initial schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE, RESERVATION_TABLE, SALE_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        CATEGORY_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=True),
+    )
+    op.create_index(f"ix_{CATEGORY_TABLE}_id", CATEGORY_TABLE, ["id"])
+    op.create_index(f"ix_{CATEGORY_TABLE}_name", CATEGORY_TABLE, ["name"], unique=True)
+
+    op.create_table(
+        DISCOUNT_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("percentage", sa.Float(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_index(f"ix_{DISCOUNT_TABLE}_id", DISCOUNT_TABLE, ["id"])
+
+    op.create_table(
+        PRODUCT_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+        sa.Column("stock", sa.Integer(), nullable=True),
+        sa.Column("discount_id", sa.Integer(), sa.ForeignKey("discounts.id"), nullable=True),
+    )
+    op.create_index(f"ix_{PRODUCT_TABLE}_id", PRODUCT_TABLE, ["id"])
+    op.create_index(f"ix_{PRODUCT_TABLE}_name", PRODUCT_TABLE, ["name"])
+
+    op.create_table(
+        RESERVATION_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("reserved_at", sa.DateTime(), nullable=True),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=True),
+    )
+    op.create_index(f"ix_{RESERVATION_TABLE}_id", RESERVATION_TABLE, ["id"])
+
+    op.create_table(
+        SALE_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("discount_id", sa.Integer(), sa.ForeignKey("discounts.id"), nullable=True),
+        sa.Column("sold_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(f"ix_{SALE_TABLE}_id", SALE_TABLE, ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table(SALE_TABLE)
+    op.drop_table(RESERVATION_TABLE)
+    op.drop_table(PRODUCT_TABLE)
+    op.drop_table(DISCOUNT_TABLE)
+    op.drop_table(CATEGORY_TABLE)
@@ -0,0 +1,62 @@
+"""Sale unit prices and daily sales rollup
+
+Revision ID: 0001a_sale_rollups
+Revises: 0001_initial_schema
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import SALE_ROLLUP_TABLE, SALE_ROLLUP_WATERMARK_TABLE, SALE_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0001a_sale_rollups"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing sales keep a NULL unit price; reports fall back to the product price for them.
+    op.add_column(SALE_TABLE, sa.Column("unit_price", sa.Float(), nullable=True))
+
+    op.create_table(
+        SALE_ROLLUP_TABLE,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("discount_id", sa.Integer(), nullable=True),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.UniqueConstraint(
+            "day",
+            "product_id",
+            "category_id",
+            "discount_id",
+            name="uq_sale_daily_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index(f"ix_{SALE_ROLLUP_TABLE}_id", SALE_ROLLUP_TABLE, ["id"])
+    op.create_index(f"ix_{SALE_ROLLUP_TABLE}_day", SALE_ROLLUP_TABLE, ["day"])
+    op.create_index(f"ix_{SALE_ROLLUP_TABLE}_product_id", SALE_ROLLUP_TABLE, ["product_id"])
+    op.create_index(f"ix_{SALE_ROLLUP_TABLE}_category_id", SALE_ROLLUP_TABLE, ["category_id"])
+
+    # No watermark row yet: the application backfills the rollup from all sales on its first startup.
+    op.create_table(
+        SALE_ROLLUP_WATERMARK_TABLE,
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("last_sale_id", sa.Integer(), nullable=False),
+        sa.Column("mode", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(SALE_ROLLUP_WATERMARK_TABLE)
+    op.drop_table(SALE_ROLLUP_TABLE)
+    op.drop_column(SALE_TABLE, "unit_price")
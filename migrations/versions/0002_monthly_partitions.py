@@ -0,0 +1,115 @@
+"""Partition sales and reservations by month
+
+Revision ID: 0002_monthly_partitions
+Revises: 0001a_sale_rollups
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import DISCOUNT_TABLE, PARTITION_MONTHS_AHEAD, PRODUCT_TABLE, RESERVATION_TABLE, SALE_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_monthly_partitions"
+down_revision: Union[str, None] = "0001a_sale_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (partition key, other columns DDL, other column names)
+PARTITIONED_TABLES = {
+    SALE_TABLE: (
+        "sold_at",
+        f'product_id integer NOT NULL REFERENCES "{PRODUCT_TABLE}" (id), '
+        "quantity integer NOT NULL, "
+        f'discount_id integer REFERENCES "{DISCOUNT_TABLE}" (id), '
+        "unit_price double precision",
+        "product_id, quantity, discount_id, unit_price",
+    ),
+    RESERVATION_TABLE: (
+        "reserved_at",
+        f'product_id integer NOT NULL REFERENCES "{PRODUCT_TABLE}" (id), '
+        "quantity integer NOT NULL, "
+        "active boolean",
+        "product_id, quantity, active",
+    ),
+}
+
+
+def _shift_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rename_table(table: str, new_name: str) -> None:
+    """Rename a table together with its primary key constraint and ID index."""
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{new_name}"')
+    op.execute(f'ALTER TABLE "{new_name}" RENAME CONSTRAINT "{table}_pkey" TO "{new_name}_pkey"')
+    op.execute(f'ALTER INDEX "ix_{table}_id" RENAME TO "ix_{new_name}_id"')
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY NONE')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    current_month = date(datetime.utcnow().year, datetime.utcnow().month, 1)
+
+    for table, (key, columns, column_names) in PARTITIONED_TABLES.items():
+        legacy = f"{table}_unpartitioned"
+        _rename_table(table, legacy)
+        op.execute(f"UPDATE \"{legacy}\" SET \"{key}\" = now() AT TIME ZONE 'utc' WHERE \"{key}\" IS NULL")
+
+        op.execute(
+            f'CREATE TABLE "{table}" ('
+            f"id integer NOT NULL DEFAULT nextval('\"{table}_id_seq\"'), "
+            f"{columns}, "
+            f'"{key}" timestamp without time zone NOT NULL, '
+            f'CONSTRAINT "{table}_pkey" PRIMARY KEY (id, "{key}")'
+            f') PARTITION BY RANGE ("{key}")'
+        )
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        op.create_index(f"ix_{table}_id", table, ["id"])
+        op.create_index(f"ix_{table}_{key}", table, [key])
+
+        first = bind.execute(sa.text(f'SELECT min("{key}") FROM "{legacy}"')).scalar()
+        month = date(first.year, first.month, 1) if first else current_month
+        month = min(month, current_month)
+        while month <= _shift_months(current_month, PARTITION_MONTHS_AHEAD):
+            op.execute(
+                f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_shift_months(month, 1).isoformat()}')"
+            )
+            month = _shift_months(month, 1)
+        op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        op.execute(
+            f'INSERT INTO "{table}" (id, {column_names}, "{key}") '
+            f'SELECT id, {column_names}, "{key}" FROM "{legacy}"'
+        )
+        op.execute(f'DROP TABLE "{legacy}"')
+
+
+def downgrade() -> None:
+    for table, (key, columns, column_names) in PARTITIONED_TABLES.items():
+        partitioned = f"{table}_partitioned"
+        op.drop_index(f"ix_{table}_{key}", table_name=table)
+        _rename_table(table, partitioned)
+
+        op.execute(
+            f'CREATE TABLE "{table}" ('
+            f"id integer NOT NULL DEFAULT nextval('\"{table}_id_seq\"'), "
+            f"{columns}, "
+            f'"{key}" timestamp without time zone, '
+            f'CONSTRAINT "{table}_pkey" PRIMARY KEY (id)'
+            f")"
+        )
+        op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}".id')
+        op.create_index(f"ix_{table}_id", table, ["id"])
+
+        op.execute(
+            f'INSERT INTO "{table}" (id, {column_names}, "{key}") '
+            f'SELECT id, {column_names}, "{key}" FROM "{partitioned}"'
+        )
+        op.execute(f'DROP TABLE "{partitioned}"')
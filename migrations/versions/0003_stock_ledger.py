@@ -0,0 +1,48 @@
+"""Stock movement ledger
+
+Revision ID: 0003_stock_ledger
+Revises: 0002_monthly_partitions
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import STOCK_BALANCE_TABLE, STOCK_MOVEMENT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_stock_ledger"
+down_revision: Union[str, None] = "0002_monthly_partitions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        STOCK_MOVEMENT_TABLE,
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_stock_movements_product_id_id", STOCK_MOVEMENT_TABLE, ["product_id", "id"])
+
+    op.create_table(
+        STOCK_BALANCE_TABLE,
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("balance", sa.Integer(), nullable=False),
+        sa.Column("last_movement_id", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(STOCK_BALANCE_TABLE)
+    op.drop_table(STOCK_MOVEMENT_TABLE)
@@ -0,0 +1,44 @@
+"""Sharded stock counters
+
+Revision ID: 0004_stock_shards
+Revises: 0003_stock_ledger
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import PRODUCT_STOCK_SHARD_TABLE, PRODUCT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_stock_shards"
+down_revision: Union[str, None] = "0003_stock_ledger"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        PRODUCT_TABLE, sa.Column("stock_shard_count", sa.Integer(), nullable=False, server_default="1")
+    )
+    op.create_table(
+        PRODUCT_STOCK_SHARD_TABLE,
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("slot", sa.Integer(), primary_key=True),
+        sa.Column("stock", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # Merge sharded stock back into the product rows before dropping the slots.
+    op.execute(
+        f'UPDATE "{PRODUCT_TABLE}" SET stock = shards.total FROM '
+        f'(SELECT product_id, sum(stock) AS total FROM "{PRODUCT_STOCK_SHARD_TABLE}" GROUP BY product_id) AS shards '
+        f'WHERE "{PRODUCT_TABLE}".id = shards.product_id AND "{PRODUCT_TABLE}".stock_shard_count > 1'
+    )
+    op.drop_table(PRODUCT_STOCK_SHARD_TABLE)
+    op.drop_column(PRODUCT_TABLE, "stock_shard_count")
@@ -0,0 +1,37 @@
+"""Idempotency keys
+
+Revision ID: 0005_idempotency_keys
+Revises: 0004_stock_shards
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from config import IDEMPOTENCY_KEY_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_idempotency_keys"
+down_revision: Union[str, None] = "0004_stock_shards"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        IDEMPOTENCY_KEY_TABLE,
+        sa.Column("scope", sa.String(64), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("response", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(f"ix_{IDEMPOTENCY_KEY_TABLE}_expires_at", IDEMPOTENCY_KEY_TABLE, ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table(IDEMPOTENCY_KEY_TABLE)
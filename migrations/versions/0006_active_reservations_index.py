@@ -0,0 +1,34 @@
+"""Index active reservations by product
+
+Revision ID: 0006_active_reservations_index
+Revises: 0005_idempotency_keys
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import RESERVATION_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_active_reservations_index"
+down_revision: Union[str, None] = "0005_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the reserved quantity aggregate of the product listings.
+    op.create_index(
+        "ix_reservations_active_product_id",
+        RESERVATION_TABLE,
+        ["product_id"],
+        postgresql_where=sa.text("active"),
+        postgresql_include=["quantity"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reservations_active_product_id", table_name=RESERVATION_TABLE)
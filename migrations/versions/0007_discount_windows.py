@@ -0,0 +1,56 @@
+"""Scheduled, category and stackable discounts with precomputed effective prices
+
+Revision ID: 0007_discount_windows
+Revises: 0006_active_reservations_index
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import DISCOUNT_TABLE, PRODUCT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_discount_windows"
+down_revision: Union[str, None] = "0006_active_reservations_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(DISCOUNT_TABLE, sa.Column("starts_at", sa.DateTime(), nullable=True))
+    op.add_column(DISCOUNT_TABLE, sa.Column("ends_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        DISCOUNT_TABLE,
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id", ondelete="CASCADE"), nullable=True),
+    )
+    op.add_column(
+        DISCOUNT_TABLE, sa.Column("stackable", sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.create_index(f"ix_{DISCOUNT_TABLE}_starts_at", DISCOUNT_TABLE, ["starts_at"])
+    op.create_index(f"ix_{DISCOUNT_TABLE}_ends_at", DISCOUNT_TABLE, ["ends_at"])
+    op.create_index(f"ix_{DISCOUNT_TABLE}_category_id", DISCOUNT_TABLE, ["category_id"])
+
+    # Existing discounts have no window and no category, so the effective price is the former final price.
+    op.add_column(PRODUCT_TABLE, sa.Column("effective_price", sa.Float(), nullable=True))
+    op.execute(
+        f'UPDATE "{PRODUCT_TABLE}" SET effective_price = "{PRODUCT_TABLE}".price * (1 - d.percentage / 100.0) '
+        f'FROM "{DISCOUNT_TABLE}" AS d WHERE d.id = "{PRODUCT_TABLE}".discount_id'
+    )
+    op.execute(f'UPDATE "{PRODUCT_TABLE}" SET effective_price = price WHERE effective_price IS NULL')
+    op.alter_column(PRODUCT_TABLE, "effective_price", nullable=False)
+    op.create_index("ix_products_effective_price_id", PRODUCT_TABLE, ["effective_price", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_effective_price_id", table_name=PRODUCT_TABLE)
+    op.drop_column(PRODUCT_TABLE, "effective_price")
+    op.drop_index(f"ix_{DISCOUNT_TABLE}_category_id", table_name=DISCOUNT_TABLE)
+    op.drop_index(f"ix_{DISCOUNT_TABLE}_ends_at", table_name=DISCOUNT_TABLE)
+    op.drop_index(f"ix_{DISCOUNT_TABLE}_starts_at", table_name=DISCOUNT_TABLE)
+    op.drop_column(DISCOUNT_TABLE, "stackable")
+    op.drop_column(DISCOUNT_TABLE, "category_id")
+    op.drop_column(DISCOUNT_TABLE, "ends_at")
+    op.drop_column(DISCOUNT_TABLE, "starts_at")
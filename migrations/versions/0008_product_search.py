@@ -0,0 +1,42 @@
+"""Full-text search column of products
+
+Revision ID: 0008_product_search
+Revises: 0007_discount_windows
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from config import PRODUCT_SEARCH_CONFIG, PRODUCT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_product_search"
+down_revision: Union[str, None] = "0007_discount_windows"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rewrites the products table to compute the column for the existing rows.
+    op.add_column(
+        PRODUCT_TABLE,
+        sa.Column(
+            "search_vector",
+            TSVECTOR(),
+            sa.Computed(
+                f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+                f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index("ix_products_search_vector", PRODUCT_TABLE, ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_search_vector", table_name=PRODUCT_TABLE)
+    op.drop_column(PRODUCT_TABLE, "search_vector")
@@ -0,0 +1,50 @@
+"""Transactional outbox of domain events
+
+Revision ID: 0009_outbox_events
+Revises: 0008_product_search
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from config import OUTBOX_EVENT_TABLE, OUTBOX_SINK_OFFSET_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_outbox_events"
+down_revision: Union[str, None] = "0008_product_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        OUTBOX_EVENT_TABLE,
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("sequence", sa.BigInteger(), nullable=True, unique=True),
+        sa.Column("topic", sa.String(64), nullable=False),
+        sa.Column("aggregate_id", sa.Integer(), nullable=True),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+    )
+    # The dispatcher only scans the events it has not published yet.
+    op.create_index(
+        "ix_outbox_events_unpublished", OUTBOX_EVENT_TABLE, ["id"], postgresql_where=sa.text("sequence IS NULL")
+    )
+    op.create_index(f"ix_{OUTBOX_EVENT_TABLE}_published_at", OUTBOX_EVENT_TABLE, ["published_at"])
+
+    op.create_table(
+        OUTBOX_SINK_OFFSET_TABLE,
+        sa.Column("sink", sa.String(255), primary_key=True),
+        sa.Column("last_sequence", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(OUTBOX_SINK_OFFSET_TABLE)
+    op.drop_table(OUTBOX_EVENT_TABLE)
@@ -0,0 +1,49 @@
+"""Catalog versions and tombstones for the change feed
+
+Revision ID: 0010_catalog_versions
+Revises: 0009_outbox_events
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import CATALOG_TOMBSTONE_TABLE, CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_catalog_versions"
+down_revision: Union[str, None] = "0009_outbox_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = (CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE)
+NEXT_VERSION = sa.text("nextval('catalog_version_seq')")
+UTC_CLOCK = sa.text("timezone('UTC', clock_timestamp())")
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("catalog_version_seq")))
+    # The volatile defaults rewrite the tables, giving every existing row its own version.
+    for table in CATALOG_TABLES:
+        op.add_column(table, sa.Column("version", sa.BigInteger(), nullable=False, server_default=NEXT_VERSION))
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=UTC_CLOCK))
+        op.create_index(f"ix_{table}_version", table, ["version"])
+
+    op.create_table(
+        CATALOG_TOMBSTONE_TABLE,
+        sa.Column("version", sa.BigInteger(), primary_key=True, server_default=NEXT_VERSION),
+        sa.Column("entity", sa.String(16), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False, server_default=UTC_CLOCK),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(CATALOG_TOMBSTONE_TABLE)
+    for table in CATALOG_TABLES:
+        op.drop_index(f"ix_{table}_version", table_name=table)
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "version")
+    op.execute(sa.schema.DropSequence(sa.Sequence("catalog_version_seq")))
@@ -0,0 +1,48 @@
+"""Background report jobs
+
+Revision ID: 0011_report_jobs
+Revises: 0010_catalog_versions
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from config import REPORT_JOB_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_report_jobs"
+down_revision: Union[str, None] = "0010_catalog_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        REPORT_JOB_TABLE,
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("filter_hash", sa.String(64), nullable=False),
+        sa.Column("filters", postgresql.JSONB(), nullable=False),
+        sa.Column("format", sa.String(16), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("rows", sa.BigInteger(), nullable=True),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(f"ix_{REPORT_JOB_TABLE}_filter_hash", REPORT_JOB_TABLE, ["filter_hash"])
+    op.create_index(f"ix_{REPORT_JOB_TABLE}_expires_at", REPORT_JOB_TABLE, ["expires_at"])
+    # Workers only scan the jobs nobody has claimed yet.
+    op.create_index(
+        "ix_report_jobs_pending", REPORT_JOB_TABLE, ["created_at"], postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(REPORT_JOB_TABLE)
@@ -0,0 +1,29 @@
+"""Outbox sink delivery claims
+
+Revision ID: 0012_outbox_delivery_claims
+Revises: 0011_report_jobs
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import OUTBOX_SINK_OFFSET_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_outbox_delivery_claims"
+down_revision: Union[str, None] = "0011_report_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(OUTBOX_SINK_OFFSET_TABLE, sa.Column("claimed_by", sa.String(32), nullable=True))
+    op.add_column(OUTBOX_SINK_OFFSET_TABLE, sa.Column("claimed_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column(OUTBOX_SINK_OFFSET_TABLE, "claimed_until")
+    op.drop_column(OUTBOX_SINK_OFFSET_TABLE, "claimed_by")
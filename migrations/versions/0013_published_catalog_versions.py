@@ -0,0 +1,54 @@
+"""Catalog versions assigned at publish time
+
+Revision ID: 0013_published_catalog_versions
+Revises: 0012_outbox_delivery_claims
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import CATALOG_TOMBSTONE_TABLE, CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_published_catalog_versions"
+down_revision: Union[str, None] = "0012_outbox_delivery_claims"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = (CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE)
+NEXT_VERSION = sa.text("nextval('catalog_version_seq')")
+
+
+def upgrade() -> None:
+    # Writers clear the version, the publisher numbers the committed rows: pending rows have no version.
+    for table in CATALOG_TABLES:
+        op.alter_column(table, "version", nullable=True, server_default=None)
+        op.create_index(f"ix_{table}_unpublished", table, ["id"], postgresql_where=sa.text("version IS NULL"))
+
+    op.execute(f"ALTER TABLE {CATALOG_TOMBSTONE_TABLE} DROP CONSTRAINT {CATALOG_TOMBSTONE_TABLE}_pkey")
+    op.execute(f"ALTER TABLE {CATALOG_TOMBSTONE_TABLE} ADD COLUMN id BIGSERIAL PRIMARY KEY")
+    op.alter_column(CATALOG_TOMBSTONE_TABLE, "version", nullable=True, server_default=None)
+    op.create_index(f"ix_{CATALOG_TOMBSTONE_TABLE}_version", CATALOG_TOMBSTONE_TABLE, ["version"], unique=True)
+    op.create_index(
+        f"ix_{CATALOG_TOMBSTONE_TABLE}_unpublished",
+        CATALOG_TOMBSTONE_TABLE,
+        ["id"],
+        postgresql_where=sa.text("version IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(f"ix_{CATALOG_TOMBSTONE_TABLE}_unpublished", table_name=CATALOG_TOMBSTONE_TABLE)
+    op.drop_index(f"ix_{CATALOG_TOMBSTONE_TABLE}_version", table_name=CATALOG_TOMBSTONE_TABLE)
+    op.execute(f"UPDATE {CATALOG_TOMBSTONE_TABLE} SET version = nextval('catalog_version_seq') WHERE version IS NULL")
+    op.drop_column(CATALOG_TOMBSTONE_TABLE, "id")
+    op.alter_column(CATALOG_TOMBSTONE_TABLE, "version", nullable=False, server_default=NEXT_VERSION)
+    op.create_primary_key(f"{CATALOG_TOMBSTONE_TABLE}_pkey", CATALOG_TOMBSTONE_TABLE, ["version"])
+
+    for table in CATALOG_TABLES:
+        op.drop_index(f"ix_{table}_unpublished", table_name=table)
+        op.execute(f"UPDATE {table} SET version = nextval('catalog_version_seq') WHERE version IS NULL")
+        op.alter_column(table, "version", nullable=False, server_default=NEXT_VERSION)
@@ -0,0 +1,31 @@
+"""Sale IDs skipped by the rollup refresher
+
+Revision ID: 0014_sale_rollup_gaps
+Revises: 0013_published_catalog_versions
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import SALE_ROLLUP_GAP_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_sale_rollup_gaps"
+down_revision: Union[str, None] = "0013_published_catalog_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        SALE_ROLLUP_GAP_TABLE,
+        sa.Column("sale_id", sa.Integer(), primary_key=True),
+        sa.Column("retire_after", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(SALE_ROLLUP_GAP_TABLE)
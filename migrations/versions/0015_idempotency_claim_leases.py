@@ -0,0 +1,28 @@
+"""Claim leases of idempotency keys
+
+Revision ID: 0015_idempotency_claim_leases
+Revises: 0014_sale_rollup_gaps
+Create Date: 2026-10-21 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config import IDEMPOTENCY_KEY_TABLE
+
+# revision identifiers, used by Alembic.
+revision: str = "0015_idempotency_claim_leases"
+down_revision: Union[str, None] = "0014_sale_rollup_gaps"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Claims made before the upgrade have no lease and are held until their key expires.
+    op.add_column(IDEMPOTENCY_KEY_TABLE, sa.Column("claimed_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column(IDEMPOTENCY_KEY_TABLE, "claimed_until")
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, status
 
 from src.dependencies.service_dependencies import get_category_service
 from src.schemes.category_schemes import CategoryCreateRequest, CategoryResponse, CategoryUpdateRequest
+from src.serializers.json_responses import json_response
 from src.services.category_service import CategoryService
 
 router = APIRouter(prefix="/category", tags=["category"])
@@ -15,7 +16,7 @@ async def get_all_categories(
 ):
     """Retrieve all Categories."""
     categories = await category_service.get_all_categories()
-    return categories
+    return json_response(categories, List[CategoryResponse])
 
 
 @router.post(
@@ -34,8 +35,7 @@ async def get_category_by_id(
     category_id: int, category_service: CategoryService = Depends(get_category_service)
 ):
     """Retrieve a specific Category by its ID."""
-    category = await category_service.get_category_by_id(category_id)
-    return CategoryResponse.from_orm(category)
+    return await category_service.get_category_by_id(category_id)
 
 
 @router.get("/name/{name}", response_model=CategoryResponse)
@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+
+from config import EVENTS_MAX_WAIT
+from src.dependencies.service_dependencies import get_event_service
+from src.schemes.event_schemes import EventBatchResponse
+from src.serializers.json_responses import json_response
+from src.services.event_service import EventService
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("", response_model=EventBatchResponse)
+async def get_events(
+    after: int = Query(0, ge=0, description="Sequence of the last event already received."),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=EVENTS_MAX_WAIT, description="Seconds to wait for an event (long polling)."),
+    topic: Optional[List[str]] = Query(None, description="Only return events of these topics."),
+    event_service: EventService = Depends(get_event_service),
+) -> EventBatchResponse:
+    """
+    Return the product, sale and reservation events published after the `after` sequence.
+
+    With `wait`, the request is held until an event is published or the time is up.
+    """
+    batch = await event_service.get_events(after, limit, wait, topic)
+    return json_response(batch, EventBatchResponse)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_events(
+    after: int = Query(0, ge=0, description="Sequence of the last event already received."),
+    limit: int = Query(100, ge=1, le=1000, description="Events read per poll."),
+    topic: Optional[List[str]] = Query(None, description="Only send events of these topics."),
+    last_event_id: Optional[int] = Header(None, ge=0),
+    event_service: EventService = Depends(get_event_service),
+) -> StreamingResponse:
+    """
+    Stream the events published after the `after` sequence as server-sent events.
+
+    A reconnecting EventSource resumes from its `Last-Event-ID` header, which takes precedence over `after`.
+    """
+    start = last_event_id if last_event_id is not None else after
+    return StreamingResponse(
+        event_service.stream(start, limit, topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,15 +1,26 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 
-from src.dependencies.service_dependencies import get_product_service
-from src.schemes.pagination_schemes import PaginationParams
+from src.dependencies.service_dependencies import get_catalog_change_service, get_product_service
 from src.schemes.product_schemes import (
+    BulkDiscountApplyRequest,
+    BulkDiscountRemoveRequest,
+    BulkDiscountResponse,
+    CatalogChangesParams,
+    CatalogChangesResponse,
+    ProductBatchRequest,
+    ProductBatchResponse,
     ProductCreateRequest,
+    ProductPaginationParams,
     ProductPriceUpdateRequest,
     ProductResponse,
+    ProductSearchParams,
+    ProductSearchResponse,
     ProductUpdateRequest,
 )
+from src.serializers.json_responses import json_response
+from src.services.catalog_change_service import CatalogChangeService
 from src.services.product_service import ProductService
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -17,13 +28,14 @@ router = APIRouter(prefix="/products", tags=["products"])
 
 @router.get("/", response_model=List[ProductResponse])
 async def get_all_products(
-    pagination: PaginationParams = Depends(),
+    pagination: ProductPaginationParams = Depends(),
     product_service: ProductService = Depends(get_product_service),
 ) -> List[ProductResponse]:
-    """Retrieve all products with pagination."""
-    return await product_service.get_all_products(
-        cursor=pagination.cursor, limit=pagination.limit
+    """Retrieve all products with pagination, by ID or by final price (`sort=final_price`)."""
+    products = await product_service.get_all_products(
+        cursor=pagination.cursor, limit=pagination.limit, sort=pagination.sort
     )
+    return json_response(products, List[ProductResponse])
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
@@ -35,6 +47,60 @@ async def add_product(
     return await product_service.add_product(product_data)
 
 
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description="Comma-separated product IDs, e.g. `1,2,3`."),
+    product_service: ProductService = Depends(get_product_service),
+) -> ProductBatchResponse:
+    """
+    Retrieve several products by their IDs with a single query.
+
+    Products are returned in the requested order; IDs without a product are listed in `missing_ids`.
+    """
+    batch = await product_service.get_products_by_ids([int(product_id) for product_id in ids.split(",")])
+    return json_response(batch, ProductBatchResponse)
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+async def post_products_batch(
+    batch_data: ProductBatchRequest,
+    product_service: ProductService = Depends(get_product_service),
+) -> ProductBatchResponse:
+    """Retrieve several products by the IDs in the request body, e.g. when the list is too long for a URL."""
+    batch = await product_service.get_products_by_ids(batch_data.ids)
+    return json_response(batch, ProductBatchResponse)
+
+
+@router.get("/search/text", response_model=List[ProductSearchResponse])
+async def search_products(
+    params: ProductSearchParams = Depends(),
+    product_service: ProductService = Depends(get_product_service),
+) -> List[ProductSearchResponse]:
+    """
+    Full-text search of product names and descriptions, best matches first.
+
+    Optionally limited to a category (including its subcategories) and to products in stock.
+    Pass the ID of the last result as `cursor` to get the next page.
+    """
+    products = await product_service.search_products(params)
+    return json_response(products, List[ProductSearchResponse])
+
+
+@router.get("/changes", response_model=CatalogChangesResponse)
+async def get_catalog_changes(
+    params: CatalogChangesParams = Depends(),
+    change_service: CatalogChangeService = Depends(get_catalog_change_service),
+) -> CatalogChangesResponse:
+    """
+    Return the IDs of the products, categories and discounts changed or deleted since the `since` token.
+
+    Fetch the changed products with `/products/batch`; a category or discount change also affects
+    the `category_name` / `discount_name` of its products.
+    """
+    changes = await change_service.get_changes(params.since, params.limit)
+    return json_response(changes, CatalogChangesResponse)
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product_by_id(
     product_id: int, product_service: ProductService = Depends(get_product_service),
@@ -74,13 +140,14 @@ async def delete_product(
 @router.get("/category/{category_id}", response_model=List[ProductResponse])
 async def get_products_by_category(
     category_id: int,
-    pagination: PaginationParams = Depends(),
+    pagination: ProductPaginationParams = Depends(),
     product_service: ProductService = Depends(get_product_service),
 ):
-    """Retrieve products by category ID with pagination."""
-    return await product_service.get_products_by_category(
-        category_id, cursor=pagination.cursor, limit=pagination.limit
+    """Retrieve products by category ID with pagination, by ID or by final price (`sort=final_price`)."""
+    products = await product_service.get_products_by_category(
+        category_id, cursor=pagination.cursor, limit=pagination.limit, sort=pagination.sort
     )
+    return json_response(products, List[ProductResponse])
 
 
 @router.post("/products/{product_id}/discount", response_model=ProductResponse)
@@ -99,3 +166,29 @@ async def remove_discount_from_product(
 ):
     """Remove a discount from a product."""
     return await product_service.remove_discount_from_product(product_id)
+
+
+@router.post("/discount/bulk", response_model=BulkDiscountResponse)
+async def bulk_apply_discount(
+    request: BulkDiscountApplyRequest,
+    product_service: ProductService = Depends(get_product_service),
+) -> BulkDiscountResponse:
+    """
+    Attach a discount to many products at once: by IDs, by category (including subcategories) or by filter.
+
+    Runs as a single UPDATE in one transaction and returns the number of updated and repriced products.
+    """
+    return await product_service.bulk_apply_discount(request)
+
+
+@router.post("/discount/bulk/remove", response_model=BulkDiscountResponse)
+async def bulk_remove_discount(
+    request: BulkDiscountRemoveRequest,
+    product_service: ProductService = Depends(get_product_service),
+) -> BulkDiscountResponse:
+    """
+    Detach discounts from many products at once; with `discount_id` only that discount is detached.
+
+    Runs as a single UPDATE in one transaction and returns the number of updated and repriced products.
+    """
+    return await product_service.bulk_remove_discount(request)
@@ -1,18 +1,36 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
-from src.dependencies.service_dependencies import get_report_service
-from src.schemes.sale_schemes import SaleFilterRequest, SaleResponse
+from config import REPORT_STATEMENT_TIMEOUT
+from src.dependencies.query_dependencies import DisconnectGuard, statement_timeout
+from src.dependencies.service_dependencies import (
+    get_leaderboard_service,
+    get_report_job_service,
+    get_report_service,
+    get_sales_analytics_service,
+)
+from src.schemes.leaderboard_schemes import TopProductResponse, TopProductsRequest
+from src.schemes.report_job_schemes import ReportJobRequest, ReportJobResponse
+from src.schemes.sale_schemes import SaleFilterRequest, SaleResponse, SaleSummaryFilterRequest, SaleSummaryResponse
+from src.schemes.sales_analytics_schemes import SalesAnalyticsRequest, SalesAnalyticsRow
+from src.serializers.file_responses import ranged_file_response
+from src.serializers.json_responses import json_response
+from src.services.leaderboard_service import LeaderboardService
+from src.services.report_job_service import ReportJobService
 from src.services.report_service import ReportService
+from src.services.sales_analytics_service import SalesAnalyticsService
 
-router = APIRouter(prefix="/reports", tags=["reports"])
+router = APIRouter(
+    prefix="/reports", tags=["reports"], dependencies=[Depends(statement_timeout(REPORT_STATEMENT_TIMEOUT))]
+)
 
 
 @router.get("/sales", response_model=List[SaleResponse])
 async def get_sales_report(
     filters: SaleFilterRequest = Depends(),
     report_service: ReportService = Depends(get_report_service),
+    guard: DisconnectGuard = Depends(),
 ) -> List[SaleResponse]:
     """
     Retrieve Sales report based on the provided filters.
@@ -20,12 +38,135 @@ async def get_sales_report(
     This endpoint allows clients to generate a sales report by filtering sales data
     based on product ID, product name, category, and date range.
     The results are returned in a structured response format that includes product and sales details.
+    The query is cancelled after REPORT_STATEMENT_TIMEOUT seconds (504) or when the client disconnects.
     """
-    return await report_service.generate_sales_report(
-        product_id=filters.product_id,
-        product_name=filters.product_name,
-        category_id=filters.category_id,
-        category_name=filters.category_name,
-        start_date=filters.start_date,
-        end_date=filters.end_date,
+    sales = await guard.run(
+        report_service.generate_sales_report(
+            product_id=filters.product_id,
+            product_name=filters.product_name,
+            category_id=filters.category_id,
+            category_name=filters.category_name,
+            start_date=filters.start_date,
+            end_date=filters.end_date,
+        )
     )
+    return json_response(sales, List[SaleResponse])
+
+
+@router.get("/sales/rollup", response_model=List[SaleSummaryResponse])
+async def get_sales_summary(
+    filters: SaleSummaryFilterRequest = Depends(),
+    report_service: ReportService = Depends(get_report_service),
+    guard: DisconnectGuard = Depends(),
+) -> List[SaleSummaryResponse]:
+    """
+    Retrieve units sold and revenue aggregated per day, week, month or year.
+
+    Whole days are served from the daily sales rollup, so the cost of the report does not grow
+    with the number of sales in the requested range.
+    """
+    return await guard.run(
+        report_service.generate_sales_summary(
+            granularity=filters.granularity,
+            product_id=filters.product_id,
+            product_name=filters.product_name,
+            category_id=filters.category_id,
+            category_name=filters.category_name,
+            start_date=filters.start_date,
+            end_date=filters.end_date,
+        )
+    )
+
+
+@router.get("/sales/summary", response_model=List[SalesAnalyticsRow])
+async def get_sales_analytics(
+    params: SalesAnalyticsRequest = Depends(),
+    analytics_service: SalesAnalyticsService = Depends(get_sales_analytics_service),
+) -> List[SalesAnalyticsRow]:
+    """
+    Aggregate units and revenue per product, category or day, with optional top-N and moving averages.
+
+    Computed in the worker over its in-memory columnar snapshot of the sales (SALES_SNAPSHOT_ENABLED)
+    instead of in Postgres; the snapshot trails the sales table by up to SALES_SNAPSHOT_REFRESH_INTERVAL seconds.
+    Returns 503 while the snapshot is disabled or loading.
+    """
+    rows = await analytics_service.summarize(
+        group_by=params.group_by,
+        order_by=params.order_by,
+        start_date=params.start_date,
+        end_date=params.end_date,
+        product_id=params.product_id,
+        category_id=params.category_id,
+        top=params.top,
+        moving_average=params.moving_average,
+    )
+    return json_response(rows, List[SalesAnalyticsRow])
+
+
+@router.get("/top-products", response_model=List[TopProductResponse])
+async def get_top_products(
+    params: TopProductsRequest = Depends(),
+    leaderboard_service: LeaderboardService = Depends(get_leaderboard_service),
+) -> List[TopProductResponse]:
+    """
+    Retrieve the best-selling products by units or revenue over the last hour, day or week.
+
+    Served from the worker's in-memory leaderboard, which counts sales as they are made, so the cost
+    only depends on `limit`. Sales made through other worker processes show up after the next rebuild
+    (LEADERBOARD_REBUILD_INTERVAL). Returns 503 while the leaderboard is disabled (LEADERBOARD_ENABLED) or loading.
+    """
+    products = leaderboard_service.top_products(
+        window=params.window, order_by=params.order_by, category_id=params.category_id, limit=params.limit
+    )
+    return json_response(products, List[TopProductResponse])
+
+
+@router.post("/sales/jobs", response_model=ReportJobResponse, status_code=202)
+async def create_sales_report_job(
+    job_data: ReportJobRequest,
+    response: Response,
+    job_service: ReportJobService = Depends(get_report_job_service),
+) -> ReportJobResponse:
+    """
+    Start building a sales report in the background, for ranges too large for /reports/sales.
+
+    The report is written as a zstd compressed Parquet or Arrow IPC file. A job with the same filters
+    and format created within REPORT_JOB_TTL seconds is returned instead of starting a new one (200).
+    Poll the job until it is done, then download its `result_url`.
+    """
+    job, created = await job_service.submit(
+        format=job_data.format,
+        product_id=job_data.product_id,
+        product_name=job_data.product_name,
+        category_id=job_data.category_id,
+        category_name=job_data.category_name,
+        start_date=job_data.start_date,
+        end_date=job_data.end_date,
+    )
+    if not created:
+        response.status_code = 200
+    return job
+
+
+@router.get("/sales/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_sales_report_job(
+    job_id: str,
+    job_service: ReportJobService = Depends(get_report_job_service),
+) -> ReportJobResponse:
+    """Retrieve the state of a background sales report job."""
+    return await job_service.get_job(job_id)
+
+
+@router.get("/sales/jobs/{job_id}/result", response_class=Response)
+async def download_sales_report_job(
+    job_id: str,
+    request: Request,
+    job_service: ReportJobService = Depends(get_report_job_service),
+) -> Response:
+    """
+    Download the result file of a done report job.
+
+    Supports single `Range` requests (206), so large files can be fetched in parts or resumed.
+    """
+    path, media_type, filename = await job_service.get_result(job_id)
+    return ranged_file_response(request, path, media_type, filename)
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 
-from src.dependencies.service_dependencies import get_reservation_service
+from src.dependencies.service_dependencies import get_idempotency_service, get_reservation_service
 from src.schemes.pagination_schemes import PaginationParams
 from src.schemes.reservation_schemes import ReservationRequest, ReservationResponse
+from src.services.idempotency_service import IdempotencyService
 from src.services.reservation_service import ReservationService
 
 router = APIRouter(prefix="/reservation", tags=["reservation"])
@@ -13,17 +14,30 @@ router = APIRouter(prefix="/reservation", tags=["reservation"])
 @router.post("/", response_model=ReservationResponse, status_code=201)
 async def reserve_product(
     reservation_data: ReservationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     reservation_service: ReservationService = Depends(get_reservation_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
 ) -> ReservationResponse:
     """
     Reserve a product by specifying the product ID and quantity.
 
     This endpoint allows clients to reserve a specific quantity of a product.
     The stock is checked to ensure that the requested quantity is available.
+    Retries sent with the same `Idempotency-Key` header get the first response back instead of reserving again.
     """
-    return await reservation_service.reserve_product(
-        product_id=reservation_data.product_id, quantity=reservation_data.quantity,
+    reservation, replayed = await idempotency_service.execute(
+        scope="reservations",
+        key=idempotency_key,
+        payload=reservation_data,
+        handler=lambda: reservation_service.reserve_product(
+            product_id=reservation_data.product_id, quantity=reservation_data.quantity,
+        ),
+        response_model=ReservationResponse,
     )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return reservation
 
 
 @router.get("/", response_model=List[ReservationResponse])
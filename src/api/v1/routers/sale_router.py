@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
 
-from src.dependencies.service_dependencies import get_sale_service
-from src.schemes.sale_schemes import SaleRequest, SaleResponse
+from fastapi import APIRouter, Depends, Header, Response
+
+from src.dependencies.service_dependencies import get_idempotency_service, get_sale_service
+from src.schemes.sale_schemes import CheckoutRequest, SaleRequest, SaleResponse
+from src.services.idempotency_service import IdempotencyService
 from src.services.sale_service import SaleService
 
 router = APIRouter(prefix="/sales", tags=["sales"])
@@ -9,14 +12,43 @@ router = APIRouter(prefix="/sales", tags=["sales"])
 
 @router.post("/", response_model=SaleResponse, status_code=201)
 async def buy_product(
-    sale_data: SaleRequest, sale_service: SaleService = Depends(get_sale_service),
+    sale_data: SaleRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    sale_service: SaleService = Depends(get_sale_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
 ) -> SaleResponse:
     """
     Purchase a Product by specifying the product ID and quantity.
 
     This endpoint allows clients to buy a product by decreasing the stock and creating a sale record.
     It checks product availability and ensures that the requested quantity is in stock.
+    Retries sent with the same `Idempotency-Key` header get the first response back instead of buying again.
+    """
+    sale, replayed = await idempotency_service.execute(
+        scope="sales",
+        key=idempotency_key,
+        payload=sale_data,
+        handler=lambda: sale_service.buy_product(
+            product_id=sale_data.product_id, quantity=sale_data.quantity
+        ),
+        response_model=SaleResponse,
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return sale
+
+
+@router.post("/checkout", response_model=List[SaleResponse], status_code=201)
+async def checkout(
+    checkout_data: CheckoutRequest, sale_service: SaleService = Depends(get_sale_service),
+) -> List[SaleResponse]:
+    """
+    Check out a cart of Product lines and active Reservations in a single all-or-nothing operation.
+
+    Stock of all lines is taken and all sale records are created in one transaction; reserved stock
+    is already set aside, so the reservations are just closed and recorded as sales.
     """
-    return await sale_service.buy_product(
-        product_id=sale_data.product_id, quantity=sale_data.quantity
+    return await sale_service.checkout(
+        lines=checkout_data.lines, reservation_ids=checkout_data.reservation_ids
     )
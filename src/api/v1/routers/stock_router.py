@@ -0,0 +1,66 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from src.dependencies.service_dependencies import get_stock_service
+from src.schemes.pagination_schemes import PaginationParams
+from src.schemes.stock_schemes import (
+    RestockRequest,
+    StockMovementResponse,
+    StockResponse,
+    StockShardsRequest,
+    StockShardsResponse,
+)
+from src.services.stock_service import StockService
+
+router = APIRouter(prefix="/stock", tags=["stock"])
+
+
+@router.get("/{product_id}", response_model=StockResponse)
+async def get_available_stock(
+    product_id: int, stock_service: StockService = Depends(get_stock_service)
+) -> StockResponse:
+    """Retrieve the available stock of a Product."""
+    available = await stock_service.get_available_stock(product_id)
+    return StockResponse(product_id=product_id, available=available)
+
+
+@router.post("/{product_id}/restock", response_model=StockResponse)
+async def restock_product(
+    product_id: int,
+    restock_data: RestockRequest,
+    stock_service: StockService = Depends(get_stock_service),
+) -> StockResponse:
+    """Add items to the stock of a Product."""
+    available = await stock_service.restock(product_id, restock_data.quantity)
+    return StockResponse(product_id=product_id, available=available)
+
+
+@router.put("/{product_id}/shards", response_model=StockShardsResponse)
+async def set_stock_shards(
+    product_id: int,
+    shards_data: StockShardsRequest,
+    stock_service: StockService = Depends(get_stock_service),
+) -> StockShardsResponse:
+    """
+    Split the stock of a hot Product across several counter slots, so concurrent purchases
+    do not queue on a single row. A shard count of one merges the slots back.
+    """
+    available = await stock_service.set_shard_count(product_id, shards_data.shards)
+    return StockShardsResponse(product_id=product_id, shards=shards_data.shards, available=available)
+
+
+@router.get("/{product_id}/movements", response_model=List[StockMovementResponse])
+async def get_stock_movements(
+    product_id: int,
+    pagination: PaginationParams = Depends(),
+    stock_service: StockService = Depends(get_stock_service),
+) -> List[StockMovementResponse]:
+    """
+    Retrieve the stock ledger movements of a Product with pagination.
+
+    Movements are only recorded while the stock ledger is enabled.
+    """
+    return await stock_service.get_movements(
+        product_id, cursor=pagination.cursor, limit=pagination.limit
+    )
@@ -0,0 +1,20 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from src.dependencies.service_dependencies import get_suggestion_service
+from src.schemes.suggestion_schemes import SuggestionParams, SuggestionResponse
+from src.serializers.json_responses import json_response
+from src.services.suggestion_service import SuggestionService
+
+router = APIRouter(prefix="/suggest", tags=["suggest"])
+
+
+@router.get("", response_model=List[SuggestionResponse])
+async def suggest_names(
+    params: SuggestionParams = Depends(),
+    suggestion_service: SuggestionService = Depends(get_suggestion_service),
+) -> List[SuggestionResponse]:
+    """Autocomplete product and category names from the start of any of their first words."""
+    suggestions = suggestion_service.suggest(params.q, params.limit)
+    return json_response(suggestions, List[SuggestionResponse])
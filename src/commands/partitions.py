@@ -0,0 +1,45 @@
+"""
+Maintenance command for monthly partitions of the sales and reservations tables.
+
+Usage:
+    python -m src.commands.partitions ensure [--months-ahead N] [--months-behind N]
+    python -m src.commands.partitions archive [--older-than-months N] [--drop]
+"""
+import argparse
+import asyncio
+
+from config import PARTITION_ARCHIVE_SCHEMA, PARTITION_MONTHS_AHEAD, PARTITION_RETENTION_MONTHS
+from src.infrastructure.db.database import engine
+from src.infrastructure.db.partitions import archive_partitions, ensure_partitions
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        if args.command == "ensure":
+            names = await ensure_partitions(conn, args.months_ahead, args.months_behind)
+            print(f"Ensured partitions: {', '.join(names) or 'none'}")
+        else:
+            names = await archive_partitions(conn, args.older_than_months, drop=args.drop, archive_schema=args.schema)
+            action = "Dropped" if args.drop else f"Moved to schema '{args.schema}'"
+            print(f"{action}: {', '.join(names) or 'none'}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of sales and reservations.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = subparsers.add_parser("ensure", help="Create missing monthly partitions.")
+    ensure_parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    ensure_parser.add_argument("--months-behind", type=int, default=0)
+
+    archive_parser = subparsers.add_parser("archive", help="Detach and archive old monthly partitions.")
+    archive_parser.add_argument("--older-than-months", type=int, default=PARTITION_RETENTION_MONTHS)
+    archive_parser.add_argument("--schema", default=PARTITION_ARCHIVE_SCHEMA)
+    archive_parser.add_argument("--drop", action="store_true", help="Drop old partitions instead of archiving them.")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import asyncio
+from typing import AsyncGenerator, Awaitable, Callable, TypeVar
+
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exceptions.exceptions import ClientDisconnectedError, QueryTimeoutError
+from src.infrastructure.db.database import get_db
+from src.infrastructure.metrics.registry import REGISTRY
+
+T = TypeVar("T")
+
+# SQLSTATE of a statement cancelled by statement_timeout (or pg_cancel_backend).
+QUERY_CANCELED = "57014"
+
+QUERY_CANCELLATIONS = REGISTRY.counter(
+    "query_cancellations_total",
+    "Request queries cancelled by a statement timeout or a client disconnect.",
+    ["reason"],
+)
+
+
+def statement_timeout(seconds: float) -> Callable[..., AsyncGenerator[None, None]]:
+    """
+    Build a dependency running every transaction of the request session with `SET LOCAL statement_timeout`.
+
+    A statement cancelled by the timeout is raised as QueryTimeoutError (504). Being `LOCAL`, the
+    setting ends with its transaction, so connections go back to the pool without it.
+
+    :param seconds: Statement timeout; 0 or less disables it.
+    :return: The dependency, e.g. `APIRouter(dependencies=[Depends(statement_timeout(15))])`.
+    """
+    milliseconds = int(seconds * 1000)
+    set_timeout = f"SET LOCAL statement_timeout = {milliseconds}"
+
+    def on_begin(session, transaction, connection) -> None:
+        connection.exec_driver_sql(set_timeout)
+
+    async def apply_statement_timeout(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[None, None]:
+        if milliseconds <= 0:
+            yield
+            return
+
+        event.listen(db.sync_session, "after_begin", on_begin)
+        try:
+            if db.in_transaction():
+                await db.execute(text(set_timeout))
+            yield
+        except DBAPIError as exc:
+            if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED:
+                raise
+            QUERY_CANCELLATIONS.inc(reason="timeout")
+            raise QueryTimeoutError(seconds) from exc
+        finally:
+            event.remove(db.sync_session, "after_begin", on_begin)
+
+    return apply_statement_timeout
+
+
+class DisconnectGuard:
+    """
+    Runs the work of a request in a task that is cancelled as soon as the client disconnects.
+
+    Cancelling the task makes asyncpg cancel the running statement on the server; the request then fails
+    with ClientDisconnectedError and its session is closed as usual, so the connection goes back to the
+    pool right away instead of staying busy until the abandoned query completes. Only the work task is
+    cancelled, never the request task, so the cleanup of the session is not interrupted.
+
+    Only for requests without a body: the guard consumes the request messages while waiting.
+    """
+
+    def __init__(self, request: Request):
+        self.request = request
+
+    async def run(self, work: Awaitable[T]) -> T:
+        """Await `work`, cancelling it and raising ClientDisconnectedError if the client disconnects first."""
+        work_task = asyncio.ensure_future(work)
+        disconnect_task = asyncio.ensure_future(self._wait_for_disconnect())
+        try:
+            await asyncio.wait((work_task, disconnect_task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect_task.cancel()
+            abandoned = not work_task.done()
+            if abandoned:
+                work_task.cancel()
+                # Wait for the statement to be cancelled, so the session is idle when it is closed.
+                await asyncio.wait((work_task,))
+        if abandoned:
+            if not work_task.cancelled():
+                work_task.exception()
+            QUERY_CANCELLATIONS.inc(reason="disconnect")
+            raise ClientDisconnectedError()
+        return work_task.result()
+
+    async def _wait_for_disconnect(self) -> None:
+        while (await self.request.receive())["type"] != "http.disconnect":
+            pass
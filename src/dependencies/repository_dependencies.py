@@ -2,12 +2,19 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.db.database import get_db
+from src.repositories.implementation.catalog_change_repository import CatalogChangeRepository
 from src.repositories.implementation.category_repository import CategoryRepository
 from src.repositories.implementation.discount_repository import DiscountRepository
+from src.repositories.implementation.idempotency_key_repository import IdempotencyKeyRepository
+from src.repositories.implementation.outbox_repository import OutboxRepository
 from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.report_job_repository import ReportJobRepository
 from src.repositories.implementation.report_repository import ReportRepository
 from src.repositories.implementation.reservation_repository import ReservationRepository
 from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
 
 
 def get_category_repository(db: AsyncSession = Depends(get_db)) -> CategoryRepository:
@@ -70,3 +77,73 @@ def get_report_repository(db: AsyncSession = Depends(get_db)) -> ReportRepositor
     :return: An instance of ReportRepository.
     """
     return ReportRepository(db)
+
+
+def get_sale_rollup_repository(db: AsyncSession = Depends(get_db)) -> SaleRollupRepository:
+    """
+    Returns a SaleRollupRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of SaleRollupRepository.
+    """
+    return SaleRollupRepository(db)
+
+
+def get_stock_ledger_repository(db: AsyncSession = Depends(get_db)) -> StockLedgerRepository:
+    """
+    Returns a StockLedgerRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of StockLedgerRepository.
+    """
+    return StockLedgerRepository(db)
+
+
+def get_stock_shard_repository(db: AsyncSession = Depends(get_db)) -> StockShardRepository:
+    """
+    Returns a StockShardRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of StockShardRepository.
+    """
+    return StockShardRepository(db)
+
+
+def get_outbox_repository(db: AsyncSession = Depends(get_db)) -> OutboxRepository:
+    """
+    Returns an OutboxRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of OutboxRepository.
+    """
+    return OutboxRepository(db)
+
+
+def get_idempotency_key_repository(db: AsyncSession = Depends(get_db)) -> IdempotencyKeyRepository:
+    """
+    Returns an IdempotencyKeyRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of IdempotencyKeyRepository.
+    """
+    return IdempotencyKeyRepository(db)
+
+
+def get_catalog_change_repository(db: AsyncSession = Depends(get_db)) -> CatalogChangeRepository:
+    """
+    Returns a CatalogChangeRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of CatalogChangeRepository.
+    """
+    return CatalogChangeRepository(db)
+
+
+def get_report_job_repository(db: AsyncSession = Depends(get_db)) -> ReportJobRepository:
+    """
+    Returns a ReportJobRepository instance, injecting the database session dependency.
+
+    :param db: AsyncSession, the current database session.
+    :return: An instance of ReportJobRepository.
+    """
+    return ReportJobRepository(db)
@@ -1,25 +1,76 @@
 from fastapi import Depends
 
+from config import IDEMPOTENCY_CACHE_SIZE
 from src.dependencies.repository_dependencies import (
+    get_catalog_change_repository,
     get_category_repository,
     get_discount_repository,
+    get_idempotency_key_repository,
+    get_outbox_repository,
     get_product_repository,
+    get_report_job_repository,
     get_report_repository,
     get_reservation_repository,
     get_sale_repository,
+    get_sale_rollup_repository,
+    get_stock_ledger_repository,
+    get_stock_shard_repository,
 )
+from src.infrastructure.analytics.leaderboard import SALES_LEADERBOARD
+from src.infrastructure.analytics.sales_snapshot import SALES_SNAPSHOT
+from src.infrastructure.cache.lru_cache import LRUCache
+from src.infrastructure.cache.prefix_index import NAME_SUGGESTIONS
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.events.notifier import EVENT_NOTIFIER
+from src.repositories.implementation.catalog_change_repository import CatalogChangeRepository
 from src.repositories.implementation.category_repository import CategoryRepository
 from src.repositories.implementation.discount_repository import DiscountRepository
+from src.repositories.implementation.idempotency_key_repository import IdempotencyKeyRepository
+from src.repositories.implementation.outbox_repository import OutboxRepository
 from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.report_job_repository import ReportJobRepository
 from src.repositories.implementation.report_repository import ReportRepository
 from src.repositories.implementation.reservation_repository import ReservationRepository
 from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.catalog_change_service import CatalogChangeService
 from src.services.category_service import CategoryService
 from src.services.discount_service import DiscountService
+from src.services.event_service import EventService
+from src.services.idempotency_service import IdempotencyService
+from src.services.leaderboard_service import LeaderboardService
 from src.services.product_service import ProductService
+from src.services.report_job_service import ReportJobService
 from src.services.report_service import ReportService
 from src.services.reservation_service import ReservationService
 from src.services.sale_service import SaleService
+from src.services.sales_analytics_service import SalesAnalyticsService
+from src.services.stock_service import StockService
+from src.services.suggestion_service import SuggestionService
+
+# Completed idempotent responses, shared by all requests of the process.
+idempotency_cache = LRUCache(IDEMPOTENCY_CACHE_SIZE)
+
+
+def get_stock_service(
+    product_repo: ProductRepository = Depends(get_product_repository),
+    ledger_repo: StockLedgerRepository = Depends(get_stock_ledger_repository),
+    shard_repo: StockShardRepository = Depends(get_stock_shard_repository),
+    outbox_repo: OutboxRepository = Depends(get_outbox_repository),
+) -> StockService:
+    """
+    Returns a StockService instance, injecting the ProductRepository, StockLedgerRepository,
+    StockShardRepository and OutboxRepository dependencies.
+
+    :param product_repo: The ProductRepository instance.
+    :param ledger_repo: The StockLedgerRepository instance.
+    :param shard_repo: The StockShardRepository instance.
+    :param outbox_repo: The OutboxRepository instance.
+    :return: An instance of StockService.
+    """
+    return StockService(product_repo, ledger_repo, shard_repo, outbox_repo)
 
 
 def get_category_service(
@@ -38,66 +89,155 @@ def get_product_service(
     product_repo: ProductRepository = Depends(get_product_repository),
     category_repo: CategoryRepository = Depends(get_category_repository),
     discount_repo: DiscountRepository = Depends(get_discount_repository),
+    stock_service: StockService = Depends(get_stock_service),
 ) -> ProductService:
     """
     Returns a ProductService instance, injecting the ProductRepository, CategoryRepository,
-    and DiscountRepository dependencies.
+    DiscountRepository and StockService dependencies.
 
     :param product_repo: The ProductRepository instance.
     :param category_repo: The CategoryRepository instance.
     :param discount_repo: The DiscountRepository instance.
+    :param stock_service: The StockService instance.
     :return: An instance of ProductService.
     """
-    return ProductService(product_repo, category_repo, discount_repo)
+    return ProductService(product_repo, category_repo, discount_repo, stock_service)
 
 
 def get_discount_service(
     discount_repo: DiscountRepository = Depends(get_discount_repository),
+    category_repo: CategoryRepository = Depends(get_category_repository),
 ) -> DiscountService:
     """
-    Returns a DiscountService instance, injecting the DiscountRepository dependency.
+    Returns a DiscountService instance, injecting the DiscountRepository and CategoryRepository dependencies.
 
     :param discount_repo: The DiscountRepository instance.
+    :param category_repo: The CategoryRepository instance.
     :return: An instance of DiscountService.
     """
-    return DiscountService(discount_repo)
+    return DiscountService(discount_repo, category_repo)
 
 
 def get_reservation_service(
     reservation_repo: ReservationRepository = Depends(get_reservation_repository),
     product_repo: ProductRepository = Depends(get_product_repository),
+    stock_service: StockService = Depends(get_stock_service),
 ) -> ReservationService:
     """
-     Returns a ReservationService instance, injecting the ReservationRepository and ProductRepository dependencies.
+     Returns a ReservationService instance, injecting the ReservationRepository, ProductRepository
+     and StockService dependencies.
 
      :param reservation_repo: The ReservationRepository instance.
      :param product_repo: The ProductRepository instance.
+     :param stock_service: The StockService instance.
      :return: An instance of ReservationService.
      """
-    return ReservationService(reservation_repo, product_repo)
+    return ReservationService(reservation_repo, product_repo, stock_service)
 
 
 def get_sale_service(
     product_repo: ProductRepository = Depends(get_product_repository),
     sale_repo: SaleRepository = Depends(get_sale_repository),
+    reservation_repo: ReservationRepository = Depends(get_reservation_repository),
+    stock_service: StockService = Depends(get_stock_service),
 ) -> SaleService:
     """
-    Returns a SaleService instance, injecting the SaleRepository and ProductRepository dependencies.
+    Returns a SaleService instance, injecting the SaleRepository, ProductRepository,
+    ReservationRepository and StockService dependencies.
 
     :param product_repo: The ProductRepository instance.
     :param sale_repo: The SaleRepository instance.
+    :param reservation_repo: The ReservationRepository instance.
+    :param stock_service: The StockService instance.
     :return: An instance of SaleService.
     """
-    return SaleService(sale_repo, product_repo)
+    return SaleService(sale_repo, product_repo, reservation_repo, stock_service)
 
 
 def get_report_service(
-    report_repo: ReportRepository = Depends(get_report_repository)
+    report_repo: ReportRepository = Depends(get_report_repository),
+    rollup_repo: SaleRollupRepository = Depends(get_sale_rollup_repository),
 ) -> ReportService:
     """
-    Returns a ReportService instance, injecting the ReportRepository dependency.
+    Returns a ReportService instance, injecting the ReportRepository and SaleRollupRepository dependencies.
 
     :param report_repo: The ReportRepository instance.
+    :param rollup_repo: The SaleRollupRepository instance.
     :return: An instance of ReportService.
     """
-    return ReportService(report_repo)
+    return ReportService(report_repo, rollup_repo)
+
+
+def get_idempotency_service(
+    idempotency_repo: IdempotencyKeyRepository = Depends(get_idempotency_key_repository),
+) -> IdempotencyService:
+    """
+    Returns an IdempotencyService instance, injecting the IdempotencyKeyRepository dependency
+    and the process-wide response cache.
+
+    :param idempotency_repo: The IdempotencyKeyRepository instance.
+    :return: An instance of IdempotencyService.
+    """
+    return IdempotencyService(idempotency_repo, idempotency_cache)
+
+
+def get_suggestion_service() -> SuggestionService:
+    """
+    Returns a SuggestionService instance over the process-wide name prefix index.
+
+    :return: An instance of SuggestionService.
+    """
+    return SuggestionService(NAME_SUGGESTIONS)
+
+
+def get_event_service() -> EventService:
+    """
+    Returns an EventService instance reading the events with its own short sessions.
+
+    :return: An instance of EventService.
+    """
+    return EventService(SessionLocal, EVENT_NOTIFIER)
+
+
+def get_catalog_change_service(
+    change_repo: CatalogChangeRepository = Depends(get_catalog_change_repository),
+) -> CatalogChangeService:
+    """
+    Returns a CatalogChangeService instance, injecting the CatalogChangeRepository dependency.
+
+    :param change_repo: The CatalogChangeRepository instance.
+    :return: An instance of CatalogChangeService.
+    """
+    return CatalogChangeService(change_repo)
+
+
+def get_report_job_service(
+    job_repo: ReportJobRepository = Depends(get_report_job_repository),
+    report_repo: ReportRepository = Depends(get_report_repository),
+) -> ReportJobService:
+    """
+    Returns a ReportJobService instance, injecting the ReportJobRepository and ReportRepository dependencies.
+
+    :param job_repo: The ReportJobRepository instance.
+    :param report_repo: The ReportRepository instance.
+    :return: An instance of ReportJobService.
+    """
+    return ReportJobService(job_repo, report_repo)
+
+
+def get_sales_analytics_service() -> SalesAnalyticsService:
+    """
+    Returns a SalesAnalyticsService instance over the sales snapshot of the process.
+
+    :return: An instance of SalesAnalyticsService.
+    """
+    return SalesAnalyticsService(SALES_SNAPSHOT)
+
+
+def get_leaderboard_service() -> LeaderboardService:
+    """
+    Returns a LeaderboardService instance over the sales leaderboard of the process.
+
+    :return: An instance of LeaderboardService.
+    """
+    return LeaderboardService(SALES_LEADERBOARD)
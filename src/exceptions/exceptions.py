@@ -34,6 +34,14 @@ class ProductNotFoundError(BaseAppException):
         super().__init__(message, status_code=404)
 
 
+class ProductBatchTooLargeError(BaseAppException):
+    """Exception raised when a batch request asks for more products than allowed."""
+
+    def __init__(self, max_ids: int):
+        message = f"A batch request can ask for at most {max_ids} products."
+        super().__init__(message, status_code=422)
+
+
 class DiscountNotFoundError(BaseAppException):
     """Exception raised when a requested discount is not found."""
 
@@ -72,3 +80,67 @@ class ReservationNotFoundError(BaseAppException):
     def __init__(self, reservation_id: int):
         message = f"Reservation with ID {reservation_id} not found."
         super().__init__(message, status_code=404)
+
+
+class IdempotencyKeyInProgressError(BaseAppException):
+    """Exception raised when a request with the same idempotency key is still being executed."""
+
+    def __init__(self, key: str):
+        message = "A request with Idempotency-Key '{key}' is still in progress."
+        super().__init__(message, status_code=409, key=key)
+
+
+class IdempotencyKeyMismatchError(BaseAppException):
+    """Exception raised when an idempotency key is reused with a different request."""
+
+    def __init__(self, key: str):
+        message = "Idempotency-Key '{key}' was already used with a different request."
+        super().__init__(message, status_code=422, key=key)
+
+
+class QueryTimeoutError(BaseAppException):
+    """Exception raised when a query is cancelled by its route's statement timeout."""
+
+    def __init__(self, timeout: float):
+        message = f"The query did not complete within {timeout:g} seconds. Narrow the filters and retry."
+        super().__init__(message, status_code=504)
+
+
+class ClientDisconnectedError(BaseAppException):
+    """Exception raised when the work of a request is cancelled because its client disconnected."""
+
+    def __init__(self):
+        # 499 "Client Closed Request" (nginx); only ends up in the logs, nobody is left to receive it.
+        super().__init__("The client disconnected before the response was ready.", status_code=499)
+
+
+class ReportJobNotFoundError(BaseAppException):
+    """Exception raised when a requested report job does not exist or has expired."""
+
+    def __init__(self, job_id: str):
+        message = f"Report job {job_id} not found."
+        super().__init__(message, status_code=404)
+
+
+class ReportJobNotReadyError(BaseAppException):
+    """Exception raised when the result of a report job that is not done is requested."""
+
+    def __init__(self, job_id: str, status: str):
+        message = f"Report job {job_id} is {status}, its result is not available."
+        super().__init__(message, status_code=409)
+
+
+class SalesSnapshotUnavailableError(BaseAppException):
+    """Exception raised when sales analytics are requested while the sales snapshot is disabled or loading."""
+
+    def __init__(self):
+        message = "Sales analytics are unavailable: the sales snapshot is disabled or still loading."
+        super().__init__(message, status_code=503)
+
+
+class LeaderboardUnavailableError(BaseAppException):
+    """Exception raised when best sellers are requested while the sales leaderboard is disabled or not built yet."""
+
+    def __init__(self):
+        message = "Best sellers are unavailable: the sales leaderboard is disabled or still loading."
+        super().__init__(message, status_code=503)
@@ -0,0 +1,293 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from config import LEADERBOARD_BUCKET_SECONDS
+from src.infrastructure.analytics.sales_snapshot import to_microseconds
+from src.infrastructure.metrics.registry import REGISTRY
+
+# Sliding windows of the leaderboard and their length in seconds.
+LEADERBOARD_WINDOWS = {"hour": 3600, "day": 86_400, "week": 7 * 86_400}
+LEADERBOARD_METRICS = ("units", "revenue")
+
+# (-value, product_id) - sorted, so the best sellers come first and ties go to the lowest product ID.
+RankingKey = Tuple[int, int]
+
+SALES_LEADERBOARD_COUNTERS = REGISTRY.gauge(
+    "sales_leaderboard_counters", "Per bucket product counters held by the in-process sales leaderboard."
+)
+
+
+class _Window:
+    """Running totals per product over the last `buckets` buckets, ranked per metric and category."""
+
+    def __init__(self, buckets: int):
+        self.buckets = buckets
+        # Oldest bucket included in the totals.
+        self.start = 0
+        # Product ID -> [units, revenue in cents].
+        self.totals: Dict[int, List[int]] = {}
+        # (metric, category ID or None for all categories) -> sorted ranking keys.
+        self.rankings: Dict[Tuple[str, Optional[int]], List[RankingKey]] = {}
+
+
+class SalesLeaderboard:
+    """
+    In-process best-sellers leaderboard: units and revenue per product over sliding windows.
+
+    Sales are counted per product in time buckets of `bucket_seconds`. Every window (see
+    LEADERBOARD_WINDOWS) keeps running totals of its buckets, updated as sales are recorded and as
+    buckets slide out of it, and a sorted ranking per metric and category, so the top N is the
+    first N keys of a list. Windows are aligned on buckets: "hour" covers the current bucket and
+    the ones before it, up to an hour. Revenue is counted in cents, so sliding a bucket out
+    subtracts exactly what was added.
+
+    Products are ranked under the category they had at their last recorded sale. Not shared
+    between worker processes: sales of the other workers are only seen after a `replace` with a
+    leaderboard rebuilt from the database.
+    """
+
+    def __init__(self, bucket_seconds: int, windows: Dict[str, int] = LEADERBOARD_WINDOWS):
+        """
+        Initialize an empty leaderboard.
+
+        :param bucket_seconds: Length of a bucket, the precision of the window bounds.
+        :param windows: Length of the windows in seconds, by name.
+        """
+        self.bucket_seconds = bucket_seconds
+        self.ready = False
+        self._windows = {name: _Window(-(-seconds // bucket_seconds)) for name, seconds in windows.items()}
+        self._horizon = max(window.buckets for window in self._windows.values())
+        # Bucket -> product ID -> [units, revenue in cents], with the sorted buckets in `_bucket_keys`.
+        self._buckets: Dict[int, Dict[int, List[int]]] = {}
+        self._bucket_keys: List[int] = []
+        self._categories: Dict[int, Optional[int]] = {}
+        self._current = 0
+        self._counters = 0
+        # Sales recorded during a rebuild by sale ID, replayed onto the rebuilt leaderboard unless it counted them.
+        self._pending: Optional[Dict[int, Tuple[int, Optional[int], int, float, datetime]]] = None
+
+    def bucket_of(self, moment: datetime) -> int:
+        """Return the bucket of a naive UTC datetime."""
+        return to_microseconds(moment) // (self.bucket_seconds * 1_000_000)
+
+    def record(
+        self,
+        sale_id: int,
+        product_id: int,
+        category_id: Optional[int],
+        quantity: int,
+        revenue: float,
+        sold_at: datetime,
+    ) -> None:
+        """Count a committed sale; sales older than the longest window are ignored."""
+        if self._pending is not None:
+            self._pending[sale_id] = (product_id, category_id, quantity, revenue, sold_at)
+        self._advance(self.bucket_of(datetime.utcnow()))
+        bucket = self.bucket_of(sold_at)
+        if bucket <= self._current - self._horizon:
+            return
+        self._advance(bucket)
+        self._set_category(product_id, category_id)
+        self._add(bucket, product_id, quantity, round(revenue * 100))
+        SALES_LEADERBOARD_COUNTERS.set(self._counters)
+
+    def top(
+        self, window: str, order_by: str = "units", category_id: Optional[int] = None, limit: int = 10
+    ) -> List[dict]:
+        """
+        Return the `limit` best selling products of a window by `order_by`, as dicts with the
+        TopProductResponse fields. The cost only depends on `limit`.
+        """
+        self._advance(self.bucket_of(datetime.utcnow()))
+        state = self._windows[window]
+        ranking = state.rankings.get((order_by, category_id), [])
+        rows = []
+        for rank, (_, product_id) in enumerate(ranking[:limit], start=1):
+            units, cents = state.totals[product_id]
+            rows.append(
+                {
+                    "rank": rank,
+                    "product_id": product_id,
+                    "category_id": self._categories.get(product_id),
+                    "units": units,
+                    "revenue": cents / 100,
+                }
+            )
+        return rows
+
+    def start_rebuild(self) -> None:
+        """
+        Start buffering recorded sales for a rebuild.
+
+        Sales are recorded once written, so a sale missing from the rebuild (not visible to its
+        snapshot, which is to be taken after this call) is recorded after it, and buffered.
+        """
+        self._pending = {}
+
+    def cancel_rebuild(self) -> None:
+        """Stop buffering recorded sales after a failed rebuild."""
+        self._pending = None
+
+    @property
+    def pending_sale_ids(self) -> List[int]:
+        """IDs of the sales recorded since the rebuild started."""
+        return list(self._pending or ())
+
+    def replace(self, rebuilt: "SalesLeaderboard", counted_sale_ids: Collection[int]) -> None:
+        """
+        Take over the counters of a rebuilt leaderboard, replay the buffered sales it did not count and mark it ready.
+
+        :param counted_sale_ids: IDs of the buffered sales visible to the snapshot the leaderboard was rebuilt from.
+        """
+        pending = self._pending or {}
+        self.cancel_rebuild()
+        self._windows = rebuilt._windows
+        self._buckets = rebuilt._buckets
+        self._bucket_keys = rebuilt._bucket_keys
+        self._categories = rebuilt._categories
+        self._current = rebuilt._current
+        self._counters = rebuilt._counters
+        for sale_id, sale in pending.items():
+            if sale_id not in counted_sale_ids:
+                self.record(sale_id, *sale)
+        self.ready = True
+        SALES_LEADERBOARD_COUNTERS.set(self._counters)
+
+    @classmethod
+    def from_buckets(
+        cls,
+        rows: Iterable[Tuple[int, int, Optional[int], int, float]],
+        bucket_seconds: int,
+        now: datetime,
+        windows: Dict[str, int] = LEADERBOARD_WINDOWS,
+    ) -> "SalesLeaderboard":
+        """
+        Build a leaderboard from (bucket, product_id, category_id, units, revenue) rows as of `now`.
+
+        Rankings are sorted once at the end instead of being maintained row by row.
+        """
+        leaderboard = cls(bucket_seconds, windows)
+        current = leaderboard.bucket_of(now)
+        leaderboard._current = current
+        for window in leaderboard._windows.values():
+            window.start = current - window.buckets + 1
+
+        for bucket, product_id, category_id, units, revenue in rows:
+            if bucket <= current - leaderboard._horizon or bucket > current:
+                continue
+            cents = round(revenue * 100)
+            counters = leaderboard._buckets.setdefault(bucket, {})
+            counter = counters.get(product_id)
+            if counter is None:
+                counters[product_id] = [units, cents]
+                leaderboard._counters += 1
+            else:
+                counter[0] += units
+                counter[1] += cents
+            leaderboard._categories[product_id] = category_id
+            for window in leaderboard._windows.values():
+                if bucket >= window.start:
+                    total = window.totals.setdefault(product_id, [0, 0])
+                    total[0] += units
+                    total[1] += cents
+        leaderboard._bucket_keys = sorted(leaderboard._buckets)
+
+        for window in leaderboard._windows.values():
+            for product_id, total in list(window.totals.items()):
+                if total[0] <= 0:
+                    del window.totals[product_id]
+                    continue
+                category_id = leaderboard._categories[product_id]
+                for index, metric in enumerate(LEADERBOARD_METRICS):
+                    key = (-total[index], product_id)
+                    window.rankings.setdefault((metric, None), []).append(key)
+                    if category_id is not None:
+                        window.rankings.setdefault((metric, category_id), []).append(key)
+            for ranking in window.rankings.values():
+                ranking.sort()
+        return leaderboard
+
+    def _advance(self, bucket: int) -> None:
+        """Slide the windows forward to end at `bucket` and drop the buckets older than all windows."""
+        if bucket <= self._current:
+            return
+        self._current = bucket
+        for window in self._windows.values():
+            start = bucket - window.buckets + 1
+            if start <= window.start:
+                continue
+            first, last = bisect_left(self._bucket_keys, window.start), bisect_left(self._bucket_keys, start)
+            for expired in self._bucket_keys[first:last]:
+                for product_id, (units, cents) in self._buckets[expired].items():
+                    self._update(window, product_id, -units, -cents)
+            window.start = start
+
+        oldest = bucket - self._horizon + 1
+        dropped = bisect_left(self._bucket_keys, oldest)
+        for expired in self._bucket_keys[:dropped]:
+            self._counters -= len(self._buckets.pop(expired))
+        del self._bucket_keys[:dropped]
+
+    def _add(self, bucket: int, product_id: int, units: int, cents: int) -> None:
+        counters = self._buckets.get(bucket)
+        if counters is None:
+            counters = self._buckets[bucket] = {}
+            insort(self._bucket_keys, bucket)
+        counter = counters.get(product_id)
+        if counter is None:
+            counters[product_id] = [units, cents]
+            self._counters += 1
+        else:
+            counter[0] += units
+            counter[1] += cents
+        for window in self._windows.values():
+            if bucket >= window.start:
+                self._update(window, product_id, units, cents)
+
+    def _update(self, window: _Window, product_id: int, units: int, cents: int) -> None:
+        """Add to the totals of a product in a window and move it in the rankings."""
+        category_id = self._categories.get(product_id)
+        old = window.totals.get(product_id)
+        if old is not None:
+            self._unrank(window, product_id, old, category_id)
+        new = [units, cents] if old is None else [old[0] + units, old[1] + cents]
+        if new[0] <= 0:
+            window.totals.pop(product_id, None)
+            return
+        window.totals[product_id] = new
+        self._rank(window, product_id, new, category_id)
+
+    def _set_category(self, product_id: int, category_id: Optional[int]) -> None:
+        """Move a product to its new category in the rankings of every window."""
+        known, old_category = product_id in self._categories, self._categories.get(product_id)
+        self._categories[product_id] = category_id
+        if not known or old_category == category_id:
+            return
+        for window in self._windows.values():
+            total = window.totals.get(product_id)
+            if total is not None:
+                self._unrank(window, product_id, total, old_category)
+                self._rank(window, product_id, total, category_id)
+
+    @staticmethod
+    def _rank(window: _Window, product_id: int, total: List[int], category_id: Optional[int]) -> None:
+        for index, metric in enumerate(LEADERBOARD_METRICS):
+            key = (-total[index], product_id)
+            insort(window.rankings.setdefault((metric, None), []), key)
+            if category_id is not None:
+                insort(window.rankings.setdefault((metric, category_id), []), key)
+
+    @staticmethod
+    def _unrank(window: _Window, product_id: int, total: List[int], category_id: Optional[int]) -> None:
+        for index, metric in enumerate(LEADERBOARD_METRICS):
+            key = (-total[index], product_id)
+            for group in (None, category_id) if category_id is not None else (None,):
+                ranking = window.rankings[(metric, group)]
+                del ranking[bisect_left(ranking, key)]
+                if not ranking:
+                    del window.rankings[(metric, group)]
+
+
+# Best sellers of the process, rebuilt by the LeaderboardRebuilder and fed by the SaleService.
+SALES_LEADERBOARD = SalesLeaderboard(LEADERBOARD_BUCKET_SECONDS)
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from src.infrastructure.metrics.registry import REGISTRY
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# Bytes per sale: product_id (int32), quantity (int32), sold_at (int64), unit_price (float64).
+BYTES_PER_SALE = 24
+
+SALES_SNAPSHOT_ROWS = REGISTRY.gauge("sales_snapshot_rows", "Sales held in the in-process columnar snapshot.")
+SALES_SNAPSHOT_BYTES = REGISTRY.gauge(
+    "sales_snapshot_bytes", "Memory allocated by the columns of the in-process sales snapshot."
+)
+
+
+def to_microseconds(moment: datetime) -> int:
+    """Convert a naive UTC datetime to microseconds since the epoch, the unit of `sold_at`."""
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+@dataclass(frozen=True)
+class SalesColumns:
+    """Read-only views of the first `len(product_id)` sales of the snapshot, safe to use from a thread."""
+
+    product_id: np.ndarray
+    quantity: np.ndarray
+    sold_at: np.ndarray
+    unit_price: np.ndarray
+    # Category ID per product ID, -1 for unknown products.
+    category_by_product: np.ndarray
+
+
+class SalesSnapshot:
+    """
+    Column-oriented in-process copy of the sales table, for vectorized aggregations with NumPy.
+
+    Sales are appended in sale ID order (see `last_sale_id`), late commits with lower IDs as they show
+    up, into arrays grown by doubling, so a sale costs BYTES_PER_SALE bytes, up to twice that right
+    after the arrays grew. Appends only write past the rows handed out by `columns`, so aggregations
+    can run on those views in a thread while the event loop appends. Not shared between worker
+    processes.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize an empty snapshot.
+
+        :param capacity: Number of sales the arrays are first allocated for.
+        """
+        self.size = 0
+        self.last_sale_id = 0
+        self.ready = False
+        self._product_id = np.empty(capacity, dtype=np.int32)
+        self._quantity = np.empty(capacity, dtype=np.int32)
+        self._sold_at = np.empty(capacity, dtype=np.int64)
+        self._unit_price = np.empty(capacity, dtype=np.float64)
+        self._category_by_product = np.full(1, -1, dtype=np.int32)
+
+    def append(self, rows: Iterable[Tuple[int, int, int, int, float]], count: int) -> None:
+        """
+        Append sales given as (id, product_id, quantity, sold_at microseconds, unit_price) in ID order.
+
+        :param count: Number of rows.
+        """
+        if not count:
+            return
+        rows = list(rows)
+        self.append_columns(
+            np.fromiter((row[1] for row in rows), np.int32, count),
+            np.fromiter((row[2] for row in rows), np.int32, count),
+            np.fromiter((row[3] for row in rows), np.int64, count),
+            np.fromiter((row[4] for row in rows), np.float64, count),
+            last_sale_id=rows[-1][0],
+        )
+
+    def append_columns(
+        self,
+        product_id: np.ndarray,
+        quantity: np.ndarray,
+        sold_at: np.ndarray,
+        unit_price: np.ndarray,
+        last_sale_id: int,
+    ) -> None:
+        """Append sales given as equally long columns; `last_sale_id` is the highest of their IDs."""
+        end = self.size + len(product_id)
+        self._reserve(end)
+        self._product_id[self.size:end] = product_id
+        self._quantity[self.size:end] = quantity
+        self._sold_at[self.size:end] = sold_at
+        self._unit_price[self.size:end] = unit_price
+        self.size = end
+        self.last_sale_id = max(self.last_sale_id, last_sale_id)
+        self._update_gauges()
+
+    def set_categories(self, product_categories: Iterable[Tuple[int, int]]) -> None:
+        """Replace the product ID to category ID mapping with the given (product_id, category_id) pairs."""
+        pairs = np.array(list(product_categories), dtype=np.int64).reshape(-1, 2)
+        size = int(pairs[:, 0].max()) + 1 if len(pairs) else 1
+        category_by_product = np.full(size, -1, dtype=np.int32)
+        category_by_product[pairs[:, 0]] = pairs[:, 1]
+        self._category_by_product = category_by_product
+        self._update_gauges()
+
+    def columns(self) -> SalesColumns:
+        """Return views of the sales appended so far."""
+        return SalesColumns(
+            product_id=self._product_id[:self.size],
+            quantity=self._quantity[:self.size],
+            sold_at=self._sold_at[:self.size],
+            unit_price=self._unit_price[:self.size],
+            category_by_product=self._category_by_product,
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes allocated by the columns, including the unused capacity."""
+        columns = (self._product_id, self._quantity, self._sold_at, self._unit_price, self._category_by_product)
+        return sum(column.nbytes for column in columns)
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._product_id)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        # New arrays instead of resizing in place: views handed out by `columns` keep the old ones.
+        for name in ("_product_id", "_quantity", "_sold_at", "_unit_price"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _update_gauges(self) -> None:
+        SALES_SNAPSHOT_ROWS.set(self.size)
+        SALES_SNAPSHOT_BYTES.set(self.memory_bytes)
+
+
+# Sales of the process, loaded by the SalesSnapshotRefresher when SALES_SNAPSHOT_ENABLED.
+SALES_SNAPSHOT = SalesSnapshot()
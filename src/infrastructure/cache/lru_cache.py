@@ -0,0 +1,42 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded in-process mapping evicting the least recently used entry when full.
+
+    Not shared between worker processes; use it only in front of a shared store.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+
+        :param max_size: Maximum number of entries; 0 disables the cache.
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it as recently used, or None if it is not cached."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if the cache is full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove a value from the cache and return it."""
+        return self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,110 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from config import SUGGEST_MAX_ENTRIES, SUGGEST_MAX_WORDS
+from src.infrastructure.metrics.registry import REGISTRY
+
+# (normalized key, kind, id) - sorted, so all keys starting with a prefix are contiguous.
+IndexKey = Tuple[str, str, int]
+
+SUGGEST_INDEX_ENTRIES = REGISTRY.gauge("suggest_index_entries", "Keys held in the in-process name prefix index.")
+SUGGEST_INDEX_SKIPPED = REGISTRY.counter(
+    "suggest_index_skipped_total", "Names left out of the prefix index because it was full."
+)
+
+
+def normalize(name: str) -> str:
+    """Case-fold a name and collapse its whitespace."""
+    return " ".join(name.casefold().split())
+
+
+class PrefixIndex:
+    """
+    In-process index of names searched by prefix, kept as a sorted array searched with bisect.
+
+    Each name is indexed from the start of each of its first `max_words` words, so "red leather
+    shoes" is suggested for "red", "leath" and "shoes". The number of keys is capped at `max_entries`;
+    names that do not fit are skipped (and counted in `suggest_index_skipped_total`).
+    Not shared between worker processes: each worker keeps its own copy.
+    """
+
+    def __init__(self, max_entries: int, max_words: int = SUGGEST_MAX_WORDS):
+        """
+        Initialize the index.
+
+        :param max_entries: Maximum number of keys, bounding the memory of the index.
+        :param max_words: Number of leading words of a name each get a key.
+        """
+        self.max_entries = max_entries
+        self.max_words = max_words
+        self._keys: List[IndexKey] = []
+        self._names: Dict[Tuple[str, int], str] = {}
+
+    def add(self, kind: str, item_id: int, name: str) -> None:
+        """Index a name, replacing the previous name of the same item."""
+        self.remove(kind, item_id)
+        keys = self._keys_for(kind, item_id, name)
+        if len(self._keys) + len(keys) > self.max_entries:
+            SUGGEST_INDEX_SKIPPED.inc()
+            return
+        for key in keys:
+            insort(self._keys, key)
+        self._names[(kind, item_id)] = name
+        SUGGEST_INDEX_ENTRIES.set(len(self._keys))
+
+    def remove(self, kind: str, item_id: int) -> None:
+        """Remove the name of an item from the index, if it is indexed."""
+        name = self._names.pop((kind, item_id), None)
+        if name is None:
+            return
+        for key in self._keys_for(kind, item_id, name):
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        SUGGEST_INDEX_ENTRIES.set(len(self._keys))
+
+    def rebuild(self, items: Iterable[Tuple[str, int, str]]) -> None:
+        """Replace the whole index with the given (kind, id, name) items, in their priority order."""
+        keys: List[IndexKey] = []
+        names: Dict[Tuple[str, int], str] = {}
+        skipped = 0
+        for kind, item_id, name in items:
+            item_keys = self._keys_for(kind, item_id, name)
+            if len(keys) + len(item_keys) > self.max_entries:
+                skipped += 1
+                continue
+            keys.extend(item_keys)
+            names[(kind, item_id)] = name
+        keys.sort()
+        self._keys, self._names = keys, names
+        if skipped:
+            SUGGEST_INDEX_SKIPPED.inc(skipped)
+        SUGGEST_INDEX_ENTRIES.set(len(self._keys))
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[str, int, str]]:
+        """Return up to `limit` (kind, id, name) items with a word starting with `prefix`, in key order."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        suggestions, seen = [], set()
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(suggestions) < limit:
+            key, kind, item_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            if (kind, item_id) not in seen:
+                seen.add((kind, item_id))
+                suggestions.append((kind, item_id, self._names[(kind, item_id)]))
+            position += 1
+        return suggestions
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _keys_for(self, kind: str, item_id: int, name: str) -> List[IndexKey]:
+        words = normalize(name).split(" ")
+        return [(" ".join(words[start:]), kind, item_id) for start in range(min(len(words), self.max_words))]
+
+
+# Product and category names of the process, served by /suggest.
+NAME_SUGGESTIONS = PrefixIndex(SUGGEST_MAX_ENTRIES)
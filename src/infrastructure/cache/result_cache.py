@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Hashable, Optional, Set
+
+from src.infrastructure.metrics.registry import REGISTRY
+
+RESULT_CACHE_REQUESTS = REGISTRY.counter(
+    "result_cache_requests_total", "Result cache lookups, by outcome (hit or miss).", ["cache", "outcome"]
+)
+RESULT_CACHE_EVICTIONS = REGISTRY.counter(
+    "result_cache_evictions_total",
+    "Results dropped from a result cache, by reason (size, expired or invalidated).",
+    ["cache", "reason"],
+)
+RESULT_CACHE_ENTRIES = REGISTRY.gauge("result_cache_entries", "Results held in a result cache.", ["cache"])
+RESULT_CACHE_BYTES = REGISTRY.gauge("result_cache_bytes", "Size of the results held in a result cache.", ["cache"])
+
+
+@dataclass
+class _CachedResult:
+    value: bytes
+    start: Optional[datetime]
+    end: Optional[datetime]
+    # time.monotonic() deadline of results of open ranges, None for closed ranges.
+    expires_at: Optional[float]
+
+
+class ResultCache:
+    """
+    In-process LRU cache of serialized results covering a time range, bounded by entry count and bytes.
+
+    Results of closed ranges, whose data no longer changes, are kept until they are evicted. Results
+    of open ranges (still receiving data) are dropped by `invalidate` when data is added inside their
+    range, and expire after `open_ttl` seconds to bound how long changes made by other worker
+    processes stay unseen. Not shared between worker processes.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, open_ttl: float):
+        """
+        Initialize the cache.
+
+        :param name: Name of the cache, used as the `cache` metric label.
+        :param max_entries: Maximum number of results; 0 disables the cache.
+        :param max_bytes: Maximum total size of the results; larger results are not cached.
+        :param open_ttl: Seconds a result of an open range is served for.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.open_ttl = open_ttl
+        self.generation = 0
+        self._results: "OrderedDict[Hashable, _CachedResult]" = OrderedDict()
+        self._open_keys: Set[Hashable] = set()
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return a cached result and mark it as recently used, or None if it is not cached."""
+        result = self._results.get(key)
+        if result is not None and result.expires_at is not None and result.expires_at <= time.monotonic():
+            self._drop(key, "expired")
+            result = None
+        if result is None:
+            RESULT_CACHE_REQUESTS.inc(cache=self.name, outcome="miss")
+            return None
+        self._results.move_to_end(key)
+        RESULT_CACHE_REQUESTS.inc(cache=self.name, outcome="hit")
+        return result.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: bytes,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        open_range: bool,
+        generation: int,
+    ) -> None:
+        """
+        Cache a result, evicting the least recently used results over the limits.
+
+        :param start: Start of the range of the result, None if unbounded.
+        :param end: End of the range of the result, None if unbounded.
+        :param open_range: Whether data can still be added inside the range.
+        :param generation: `generation` read before the result was computed; a result of an open range
+            is not cached if an invalidation happened since, as it may miss the added data.
+        """
+        if self.max_entries <= 0 or len(value) > self.max_bytes:
+            return
+        if open_range and generation != self.generation:
+            return
+        if key in self._results:
+            self._drop(key, None)
+
+        expires_at = time.monotonic() + self.open_ttl if open_range else None
+        self._results[key] = _CachedResult(value, start, end, expires_at)
+        if open_range:
+            self._open_keys.add(key)
+        self._bytes += len(value)
+        while len(self._results) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._results)), "size")
+        self._update_gauges()
+
+    def invalidate(self, moment: datetime) -> None:
+        """Drop the results of the open ranges containing `moment`, after data was added at that time."""
+        self.generation += 1
+        for key in list(self._open_keys):
+            result = self._results[key]
+            if (result.start is None or result.start <= moment) and (result.end is None or moment <= result.end):
+                self._drop(key, "invalidated")
+        self._update_gauges()
+
+    def clear(self) -> None:
+        """Drop all results."""
+        self.generation += 1
+        self._results.clear()
+        self._open_keys.clear()
+        self._bytes = 0
+        self._update_gauges()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _drop(self, key: Hashable, reason: Optional[str]) -> None:
+        result = self._results.pop(key)
+        self._open_keys.discard(key)
+        self._bytes -= len(result.value)
+        if reason is not None:
+            RESULT_CACHE_EVICTIONS.inc(cache=self.name, reason=reason)
+
+    def _update_gauges(self) -> None:
+        RESULT_CACHE_ENTRIES.set(len(self._results), cache=self.name)
+        RESULT_CACHE_BYTES.set(self._bytes, cache=self.name)
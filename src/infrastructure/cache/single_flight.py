@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.metrics.registry import REGISTRY
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_REQUESTS = REGISTRY.counter(
+    "single_flight_requests_total",
+    "Reads going through a single-flight group: executed ones and ones coalesced into an in-flight read.",
+    ["group", "outcome"],
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads within a worker process.
+
+    The first caller for a key starts the read; callers arriving while it is in flight await the
+    same result (or exception) instead of running the read again. Nothing is cached: once the read
+    completes, the next caller starts a new one.
+
+    The read runs as a separate task, so a cancelled caller does not cancel it for the others, and
+    in a session of its own: it can outlive the request that started it, whose session is closed
+    (or reused by the rest of that request) meanwhile. Results are shared between callers, so the
+    read should return immutable or serialized data rather than ORM objects.
+    """
+
+    def __init__(self, name: str, session_factory: Callable[[], AsyncSession] = SessionLocal):
+        """
+        Initialize the group.
+
+        :param name: Name of the group, used as the `group` metric label.
+        :param session_factory: Factory of the sessions the reads run in.
+        """
+        self.name = name
+        self.session_factory = session_factory
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, read: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Return the result of `read(session)`, sharing it with concurrent callers using the same key."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._read(read))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            SINGLE_FLIGHT_REQUESTS.inc(group=self.name, outcome="executed")
+        else:
+            SINGLE_FLIGHT_REQUESTS.inc(group=self.name, outcome="coalesced")
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """Make the next caller for `key` start a new read, e.g. after the data was changed."""
+        self._calls.pop(key, None)
+
+    def forget_all(self) -> None:
+        """Make the next callers for every key start new reads."""
+        self._calls.clear()
+
+    async def _read(self, read: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with self.session_factory() as session:
+            return await read(session)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller was cancelled before it was raised.
+            task.exception()
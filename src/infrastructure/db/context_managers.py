@@ -1,14 +1,69 @@
 from contextlib import asynccontextmanager
+from typing import Callable
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# `AsyncSession.info` key of the after-commit callbacks of the open unit of work; present only while one is open.
+UNIT_OF_WORK = "unit_of_work_after_commit"
+
 
 @asynccontextmanager
 async def transaction_context(db: AsyncSession):
     try:
         yield db
-        await db.commit()
+        await commit(db)
     except SQLAlchemyError as e:
-        await db.rollback()
+        if UNIT_OF_WORK not in db.info:
+            await db.rollback()
         raise e
+
+
+async def commit(db: AsyncSession) -> None:
+    """
+    Commit the session, or only flush it inside a unit of work, which commits when it exits.
+
+    Repositories commit through this instead of `db.commit()`, so they can take part in a unit of work.
+    """
+    if UNIT_OF_WORK in db.info:
+        await db.flush()
+    else:
+        await db.commit()
+
+
+def after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run `callback` once the writes made through the session are committed.
+
+    Inside a unit of work it runs after the unit of work commits and is dropped if it rolls back;
+    otherwise the writes are already committed and it runs right away.
+    """
+    callbacks = db.info.get(UNIT_OF_WORK)
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession):
+    """
+    Run the block in one transaction: commits made inside it through `commit` only flush,
+    and the transaction is committed when the block exits, or rolled back if it raises.
+    A unit of work opened inside another one joins it.
+    """
+    if UNIT_OF_WORK in db.info:
+        yield db
+        return
+
+    callbacks = db.info[UNIT_OF_WORK] = []
+    try:
+        yield db
+    except BaseException:
+        del db.info[UNIT_OF_WORK]
+        await db.rollback()
+        raise
+    del db.info[UNIT_OF_WORK]
+    await db.commit()
+    for callback in callbacks:
+        callback()
@@ -0,0 +1,18 @@
+"""
+Relationship loading options of the repository queries.
+
+Collections (`Category.subcategories`, `Category.products`, `Discount.products`, `Product.stock_shards`,
+`Product.reservations`, `Product.sales`) and the many-to-one links back from child rows are mapped with
+`lazy="raise_on_sql"`: nothing is loaded unless a query asks for it, and touching an unloaded
+relationship raises instead of silently issuing a query per object. Repository methods that need a
+relationship pass one of the option sets below to their query.
+
+`Product.category` and `Product.discount` stay joined, since every product read needs them for the
+final price and the category and discount names.
+"""
+from sqlalchemy.orm import selectinload
+
+from src.infrastructure.db.models.models import Category
+
+# The whole subcategory tree: one SELECT ... IN per tree level.
+CATEGORY_TREE = (selectinload(Category.subcategories, recursion_depth=-1),)
@@ -1,95 +1,396 @@
+import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    UniqueConstraint,
+    func,
+    literal_column,
+    null,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import backref, deferred, relationship
 
-from config import CATEGORY_TABLE, DISCOUNT_TABLE, PRODUCT_TABLE, RESERVATION_TABLE, SALE_TABLE
+from config import (
+    CATALOG_TOMBSTONE_TABLE,
+    CATEGORY_TABLE,
+    DISCOUNT_TABLE,
+    IDEMPOTENCY_KEY_TABLE,
+    OUTBOX_EVENT_TABLE,
+    OUTBOX_SINK_OFFSET_TABLE,
+    PRODUCT_SEARCH_CONFIG,
+    PRODUCT_STOCK_SHARD_TABLE,
+    PRODUCT_TABLE,
+    REPORT_JOB_TABLE,
+    RESERVATION_TABLE,
+    SALE_ROLLUP_GAP_TABLE,
+    SALE_ROLLUP_TABLE,
+    SALE_ROLLUP_WATERMARK_TABLE,
+    SALE_TABLE,
+    STOCK_BALANCE_TABLE,
+    STOCK_MOVEMENT_TABLE,
+)
 from src.infrastructure.db.database import Base
 
+# Shared by products, categories, discounts and their tombstones: every published change gets the next version,
+# so one number orders all catalog changes (see /products/changes).
+CATALOG_VERSION = Sequence("catalog_version_seq", metadata=Base.metadata)
+
+
+def catalog_clock():
+    """SQL expression of the current UTC time."""
+    return func.timezone(literal_column("'UTC'"), func.clock_timestamp())
+
+
+def catalog_version_column():
+    """
+    Version of a catalog row, cleared by every INSERT and UPDATE issued through SQLAlchemy.
+
+    The catalog version publisher gives the changed rows their next version once committed, so versions
+    follow commit order. Models using it set `eager_defaults`, so flushes read the cleared version back.
+    """
+    return Column(BigInteger, nullable=True, index=True, onupdate=null())
+
+
+def catalog_updated_at_column():
+    """Time of the last change of a catalog row, set together with its version."""
+    return Column(DateTime, nullable=False, server_default=catalog_clock(), onupdate=catalog_clock())
+
 
 class Category(Base):
     __tablename__ = CATEGORY_TABLE
+    __table_args__ = (Index("ix_categories_unpublished", "id", postgresql_where=text("version IS NULL")),)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    version = catalog_version_column()
+    updated_at = catalog_updated_at_column()
 
     subcategories = relationship(
         "Category",
-        backref=backref("parent", remote_side=[id]),
-        lazy="selectin",
+        backref=backref("parent", remote_side=[id], lazy="raise_on_sql"),
+        lazy="raise_on_sql",
         collection_class=list,
         cascade="all, delete-orphan",
     )
     products = relationship(
-        "Product", back_populates="category", cascade="all, delete", lazy="selectin",
+        "Product", back_populates="category", cascade="all, delete", lazy="raise_on_sql",
     )
 
 
 class Product(Base):
     __tablename__ = PRODUCT_TABLE
+    __table_args__ = (
+        # Listings sorted by final price, with the product ID as tie breaker of the cursor.
+        Index("ix_products_effective_price_id", "effective_price", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_unpublished", "id", postgresql_where=text("version IS NULL")),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(String)
     price = Column(Float, nullable=False)
+    # Price after the active product and category discounts, kept up to date by
+    # ProductRepository.refresh_effective_prices.
+    effective_price = Column(Float, nullable=False)
+    # Full-text search document, names weighted above descriptions. Deferred: only search queries read it.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+                f"setweight(to_tsvector('{PRODUCT_SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     category = relationship("Category", back_populates="products", lazy="joined")
     stock = Column(Integer, default=0)
+    stock_shard_count = Column(Integer, nullable=False, default=1, server_default="1")
+    stock_shards = relationship(
+        "ProductStockShard", lazy="raise_on_sql", cascade="all, delete-orphan", passive_deletes=True,
+    )
     reservations = relationship(
-        "Reservation", back_populates="product", lazy="selectin"
+        "Reservation", back_populates="product", lazy="raise_on_sql"
     )
-    sales = relationship("Sale", back_populates="product", lazy="selectin")
+    sales = relationship("Sale", back_populates="product", lazy="raise_on_sql")
     discount_id = Column(Integer, ForeignKey("discounts.id"), nullable=True)
     discount = relationship("Discount", back_populates="products", lazy="joined")
+    version = catalog_version_column()
+    updated_at = catalog_updated_at_column()
 
     @property
     def final_price(self):
-        if self.discount:
-            return self.price * (1 - self.discount.percentage / 100)
-        return self.price
+        return self.effective_price
 
-    @property
-    def reserved_quantity(self):
-        return sum(
-            reservation.quantity
-            for reservation in self.reservations
-            if reservation.active
-        )
+
+class ProductStockShard(Base):
+    """One of the stock counter slots of a product with a stock shard count above one."""
+
+    __tablename__ = PRODUCT_STOCK_SHARD_TABLE
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False, default=0)
 
 
 class Reservation(Base):
     __tablename__ = RESERVATION_TABLE
+    __table_args__ = (
+        Index(
+            "ix_reservations_active_product_id",
+            "product_id",
+            postgresql_where=text("active"),
+            postgresql_include=["quantity"],
+        ),
+        {"postgresql_partition_by": "RANGE (reserved_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
-    reserved_at = Column(DateTime, default=datetime.utcnow)
+    reserved_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     quantity = Column(Integer, nullable=False)
     active = Column(Boolean, default=True)
 
-    product = relationship("Product", back_populates="reservations", lazy="joined")
+    product = relationship("Product", back_populates="reservations", lazy="raise_on_sql")
 
 
 class Sale(Base):
 
     __tablename__ = SALE_TABLE
+    __table_args__ = {"postgresql_partition_by": "RANGE (sold_at)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     discount_id = Column(Integer, ForeignKey("discounts.id"), nullable=True)
-    sold_at = Column(DateTime, default=datetime.utcnow)
+    sold_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
+    unit_price = Column(Float, nullable=True)
 
-    product = relationship("Product", back_populates="sales", lazy="joined")
-    discount = relationship("Discount", lazy="joined")
+    product = relationship("Product", back_populates="sales", lazy="raise_on_sql")
+    discount = relationship("Discount", lazy="raise_on_sql")
 
 
 class Discount(Base):
     __tablename__ = DISCOUNT_TABLE
+    __table_args__ = (Index("ix_discounts_unpublished", "id", postgresql_where=text("version IS NULL")),)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     percentage = Column(Float, nullable=False)
     description = Column(String, nullable=True)
+    # Active from `starts_at` (inclusive) until `ends_at` (exclusive); open ended when not set.
+    starts_at = Column(DateTime, nullable=True, index=True)
+    ends_at = Column(DateTime, nullable=True, index=True)
+    # Category discounts apply to every product of the category and of its subcategories.
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True, index=True)
+    # Stackable discounts combine with each other and with the best non-stackable one.
+    stackable = Column(Boolean, nullable=False, default=False, server_default="false")
+    version = catalog_version_column()
+    updated_at = catalog_updated_at_column()
+
+    products = relationship("Product", back_populates="discount", lazy="raise_on_sql")
+
+
+class CatalogTombstone(Base):
+    """Deleted product, category or discount, kept so the change feed can report the deletion."""
+
+    __tablename__ = CATALOG_TOMBSTONE_TABLE
+    __table_args__ = (Index("ix_catalog_tombstones_unpublished", "id", postgresql_where=text("version IS NULL")),)
+
+    id = Column(BigInteger, primary_key=True)
+    version = Column(BigInteger, nullable=True, unique=True, index=True)
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=catalog_clock())
+
+
+class SaleDailyRollup(Base):
+    """
+    Per-day sales summary maintained from the sales table.
+
+    `category_id` is the category of the product when the sales were folded in; reports group and
+    filter by the current category of the product instead, like the reports over raw sales.
+    """
+
+    __tablename__ = SALE_ROLLUP_TABLE
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "product_id",
+            "category_id",
+            "discount_id",
+            name="uq_sale_daily_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    category_id = Column(Integer, nullable=False, index=True)
+    discount_id = Column(Integer, nullable=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class SaleRollupWatermark(Base):
+    """Highest sale ID already folded into the daily rollup."""
+
+    __tablename__ = SALE_ROLLUP_WATERMARK_TABLE
+
+    name = Column(String, primary_key=True)
+    last_sale_id = Column(Integer, nullable=False, default=0)
+    # SALE_ROLLUP_MODE of the last startup; the watermark only advances in the "refresher" mode.
+    mode = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SaleRollupGap(Base):
+    """Sale ID below the rollup watermark whose sale was not visible yet, folded in if it commits later."""
+
+    __tablename__ = SALE_ROLLUP_GAP_TABLE
+
+    sale_id = Column(Integer, primary_key=True)
+    # Snapshot xmax read at the gap lookup after the one that found it; once the snapshot xmin reaches it,
+    # no transaction can still commit the sale and the gap is dropped.
+    retire_after = Column(BigInteger, nullable=True)
+
+
+class StockMovementKind(str, enum.Enum):
+    """Reason of a stock movement."""
+
+    SALE = "sale"
+    RESERVATION = "reservation"
+    CANCEL = "cancel"
+    RESTOCK = "restock"
+    ADJUSTMENT = "adjustment"
+
+
+class StockMovement(Base):
+    """Append-only stock ledger entry. Negative deltas take stock, positive deltas return it."""
+
+    __tablename__ = STOCK_MOVEMENT_TABLE
+    __table_args__ = (Index("ix_stock_movements_product_id_id", "product_id", "id"),)
+
+    id = Column(BigInteger, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(16), nullable=False)
+    delta = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StockBalance(Base):
+    """Compacted stock of a product: the sum of all its movements up to `last_movement_id`."""
+
+    __tablename__ = STOCK_BALANCE_TABLE
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    balance = Column(Integer, nullable=False, default=0)
+    last_movement_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IdempotencyKey(Base):
+    """
+    Stored response of a POST request sent with an `Idempotency-Key` header.
+
+    A row without a response marks a request that is still being executed. Its claim is leased until
+    `claimed_until` (cleared with the response); after that a retry of the request can claim the key again.
+    """
+
+    __tablename__ = IDEMPOTENCY_KEY_TABLE
+
+    scope = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    claimed_until = Column(DateTime, nullable=True)
+
+
+class OutboxEvent(Base):
+    """
+    Domain event written in the transaction of the change it describes.
+
+    `sequence` is assigned when the outbox dispatcher publishes the event; published events are
+    numbered in commit order, so readers of the stream never skip an event committed late.
+    """
+
+    __tablename__ = OUTBOX_EVENT_TABLE
+    __table_args__ = (Index("ix_outbox_events_unpublished", "id", postgresql_where=text("sequence IS NULL")),)
+
+    id = Column(BigInteger, primary_key=True)
+    sequence = Column(BigInteger, nullable=True, unique=True)
+    topic = Column(String(64), nullable=False)
+    aggregate_id = Column(Integer, nullable=True)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True, index=True)
+
+
+class OutboxSinkOffset(Base):
+    """Sequence of the last published event delivered to an outbox sink, and the worker delivering to it."""
+
+    __tablename__ = OUTBOX_SINK_OFFSET_TABLE
+
+    sink = Column(String(255), primary_key=True)
+    last_sequence = Column(BigInteger, nullable=False, default=0)
+    claimed_by = Column(String(32), nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ReportJobStatus(str, enum.Enum):
+    """State of a background report job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ReportJob(Base):
+    """
+    Report built in the background and stored as a columnar file in REPORT_JOB_DIR.
+
+    `filter_hash` identifies the normalized filters and format of the job: a job with the same hash
+    that has not failed or expired is returned instead of starting a new one.
+    """
+
+    __tablename__ = REPORT_JOB_TABLE
+    __table_args__ = (
+        Index("ix_report_jobs_pending", "created_at", postgresql_where=text("status = 'pending'")),
+    )
 
-    products = relationship("Product", back_populates="discount", lazy="selectin")
+    id = Column(String(32), primary_key=True)
+    filter_hash = Column(String(64), nullable=False, index=True)
+    filters = Column(JSONB, nullable=False)
+    format = Column(String(16), nullable=False)
+    status = Column(String(16), nullable=False, default=ReportJobStatus.PENDING.value)
+    rows = Column(BigInteger, nullable=True)
+    size = Column(BigInteger, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
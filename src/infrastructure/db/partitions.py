@@ -0,0 +1,162 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import PARTITION_ARCHIVE_SCHEMA, RESERVATION_TABLE, SALE_TABLE
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock serializing partition maintenance of concurrently starting workers.
+PARTITION_LOCK_KEY = 260027
+
+# Tables range partitioned by month, mapped to their partition key column.
+PARTITIONED_TABLES = {
+    SALE_TABLE: "sold_at",
+    RESERVATION_TABLE: "reserved_at",
+}
+
+
+def month_start(moment: datetime) -> date:
+    """Return the first day of the month of the given moment."""
+    return date(moment.year, moment.month, 1)
+
+
+def shift_months(month: date, months: int) -> date:
+    """Return the first day of the month `months` months after (or before) the given month."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Return the name of the partition of `table` holding rows of the given month."""
+    return f"{table}_p{month:%Y%m}"
+
+
+async def _table_exists(conn: AsyncConnection, table: str) -> bool:
+    return (await conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table})).scalar()
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    """Check whether the table exists and is a partitioned table."""
+    query = text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))")
+    return (await conn.execute(query, {"table": table})).scalar()
+
+
+async def create_month_partition(conn: AsyncConnection, table: str, month: date) -> str:
+    """
+    Create the partition of `table` for the given month if it does not exist yet.
+
+    Postgres refuses to create a partition for a range the default partition holds rows of, so
+    when it does (e.g. imported history, or sales past the created months), the default partition
+    is detached, the new partition created, the rows moved into it and the default re-attached.
+    Detaching locks the whole table until the transaction commits.
+    """
+    name = partition_name(table, month)
+    if await _table_exists(conn, name):
+        return name
+
+    key = PARTITIONED_TABLES[table]
+    start, end = month.isoformat(), shift_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_range = f"\"{key}\" >= '{start}' AND \"{key}\" < '{end}'"
+    default = f"{table}_default"
+    stranded = await _table_exists(conn, default) and (
+        await conn.execute(text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})'))
+    ).scalar()
+    if not stranded:
+        await conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}'))
+        return name
+
+    await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    await conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}'))
+    moved = await conn.execute(text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_range}'))
+    await conn.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'))
+    await conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.info(f"Moved {moved.rowcount} rows of {table} from its default partition to {name}.")
+    return name
+
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: int, months_behind: int = 0) -> List[str]:
+    """
+    Make sure monthly partitions exist around the current month, plus a default partition.
+
+    The default partition only catches rows outside of the created ranges (e.g. imported history),
+    so inserts never fail because maintenance fell behind. Workers starting together take turns
+    on a transaction-level advisory lock.
+
+    :param months_ahead: Number of future months to create partitions for.
+    :param months_behind: Number of past months to create partitions for.
+    :return: Names of the ensured partitions.
+    """
+    await conn.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+    current = month_start(datetime.utcnow())
+    ensured = []
+    for table in PARTITIONED_TABLES:
+        if not await is_partitioned(conn, table):
+            logger.warning(f"Table {table} is not partitioned, run the database migrations.")
+            continue
+
+        for offset in range(-months_behind, months_ahead + 1):
+            ensured.append(await create_month_partition(conn, table, shift_months(current, offset)))
+        await conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT'))
+    return ensured
+
+
+async def list_month_partitions(conn: AsyncConnection, table: str) -> List[Tuple[str, date]]:
+    """Return the monthly partitions attached to `table` with the month they hold, oldest first."""
+    query = text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    )
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+    partitions = []
+    for (name,) in await conn.execute(query, {"table": table}):
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def archive_partitions(
+    conn: AsyncConnection,
+    older_than_months: int,
+    drop: bool = False,
+    archive_schema: Optional[str] = PARTITION_ARCHIVE_SCHEMA,
+) -> List[str]:
+    """
+    Detach monthly partitions that ended more than `older_than_months` months ago.
+
+    Detached partitions are moved to the archive schema, or dropped when `drop` is set.
+    Their foreign keys are removed, so archived rows never block deleting products or discounts.
+    Daily sales rollup rows are kept, so day-or-coarser reports still cover archived months.
+
+    :return: Names of the archived partitions.
+    """
+    cutoff = shift_months(month_start(datetime.utcnow()), -older_than_months)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        for name, month in await list_month_partitions(conn, table):
+            if shift_months(month, 1) > cutoff:
+                continue
+
+            await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            if drop:
+                await conn.execute(text(f'DROP TABLE "{name}"'))
+            else:
+                await _drop_foreign_keys(conn, name)
+                await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+                await conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+            archived.append(name)
+    return archived
+
+
+async def _drop_foreign_keys(conn: AsyncConnection, table: str) -> None:
+    """Drop all foreign key constraints of a detached partition."""
+    query = text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:table) AND contype = 'f'")
+    for (constraint,) in (await conn.execute(query, {"table": table})).all():
+        await conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{constraint}"'))
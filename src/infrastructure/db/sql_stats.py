@@ -0,0 +1,73 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_STARTED_AT = "sql_stats_started_at"
+
+
+@dataclass
+class SQLStats:
+    """SQL statements executed while handling one request."""
+
+    statements: int = 0
+    duration: float = 0.0
+    rows: int = 0
+    slowest_duration: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        """Add one executed statement."""
+        self.statements += 1
+        self.duration += duration
+        self.rows += rows
+        if duration >= self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = statement
+
+
+# Stats of the request being handled, None when the request is not sampled.
+_current_stats: ContextVar[Optional[SQLStats]] = ContextVar("sql_stats", default=None)
+
+
+def start_sql_stats() -> SQLStats:
+    """Start recording the statements of the current request (and of the tasks it spawns)."""
+    stats = SQLStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def current_sql_stats() -> Optional[SQLStats]:
+    """Return the stats of the current request, or None if it is not recorded."""
+    return _current_stats.get()
+
+
+def install_sql_stats(engine: Union[Engine, AsyncEngine]) -> None:
+    """
+    Hook the statement recording into the cursor execution events of the engine.
+
+    Statements run outside a recorded request only pay for a context variable lookup.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = conn.info.get(_STARTED_AT)
+    if stats is None or not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    # Drivers report the number of selected rows too (`SELECT n`), -1 when it is unknown.
+    stats.record(statement, duration, max(cursor.rowcount, 0))
@@ -0,0 +1,50 @@
+from typing import List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCounter:
+    """
+    Counts the SQL statements executed on an engine while the counter is active.
+
+    Meant as a test fixture guarding the query budget of an endpoint, e.g.:
+
+        with StatementCounter(engine) as counter:
+            client.get("/category/categories/")
+        counter.assert_at_most(2)
+
+    Every statement of the engine is counted, so only use it where the measured code is the only user.
+    """
+
+    def __init__(self, engine: Union[Engine, AsyncEngine]):
+        """
+        Initialize the counter.
+
+        :param engine: Engine to listen on; for an async engine its sync engine is used.
+        """
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        """Number of statements executed so far."""
+        return len(self.statements)
+
+    def __enter__(self) -> "StatementCounter":
+        self.statements.clear()
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def assert_at_most(self, limit: int) -> None:
+        """Raise an AssertionError listing the statements if more than `limit` were executed."""
+        if self.count > limit:
+            statements = "\n".join(f"  {statement}" for statement in self.statements)
+            raise AssertionError(f"Expected at most {limit} SQL statements, got {self.count}:\n{statements}")
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
@@ -0,0 +1,37 @@
+import asyncio
+from typing import Set
+
+
+class EventNotifier:
+    """
+    Wakes up the event readers of the process when new events were published.
+
+    Only the worker running the publishing dispatcher round is notified; readers in other
+    workers find the events on their next poll.
+    """
+
+    def __init__(self):
+        self._waiters: Set[asyncio.Future] = set()
+
+    def notify(self) -> None:
+        """Wake up all current waiters."""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until the next notification, at most `timeout` seconds. Return False on timeout."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+
+# Published events of the process, awaited by the /events readers.
+EVENT_NOTIFIER = EventNotifier()
@@ -0,0 +1,95 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List
+
+import httpx
+import orjson
+
+from config import OUTBOX_WEBHOOK_TIMEOUT
+
+
+class EventSink(ABC):
+    """
+    Destination of the events delivered by the outbox dispatcher.
+
+    Each sink has its own delivery offset, stored under its `name`: a failing sink is retried
+    from where it stopped without holding back the other sinks or the /events stream.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    async def send(self, events: List[dict]) -> None:
+        """Deliver a batch of events, in sequence order. Raise to have the batch sent again later."""
+        pass
+
+    async def close(self) -> None:
+        """Release the resources of the sink."""
+        pass
+
+
+class WebhookSink(EventSink):
+    """POSTs each batch as `{"events": [...]}` JSON to a URL; any non-2xx response fails the batch."""
+
+    def __init__(self, url: str, timeout: float = OUTBOX_WEBHOOK_TIMEOUT):
+        super().__init__(f"webhook:{url}")
+        self.url = url
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, events: List[dict]) -> None:
+        response = await self._client.post(
+            self.url, content=orjson.dumps({"events": events}), headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class FileSink(EventSink):
+    """Appends each event as a JSON line to a file."""
+
+    def __init__(self, path: str):
+        super().__init__(f"file:{path}")
+        self.path = path
+
+    async def send(self, events: List[dict]) -> None:
+        lines = b"".join(orjson.dumps(event) + b"\n" for event in events)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: bytes) -> None:
+        with open(self.path, "ab") as file:
+            file.write(lines)
+
+
+class MemorySink(EventSink):
+    """Keeps the delivered events in an in-process queue, for tests."""
+
+    def __init__(self, name: str = "memory"):
+        super().__init__(name)
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def send(self, events: List[dict]) -> None:
+        for event in events:
+            self.queue.put_nowait(event)
+
+
+def build_sinks(spec: str) -> List[EventSink]:
+    """
+    Create the sinks of a comma separated `webhook:<url>`, `file:<path>` and `memory` list.
+
+    :raises ValueError: For an unknown sink kind.
+    """
+    sinks = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, target = item.partition(":")
+        if kind == "webhook" and target:
+            sinks.append(WebhookSink(target))
+        elif kind == "file" and target:
+            sinks.append(FileSink(target))
+        elif kind == "memory":
+            sinks.append(MemorySink(item))
+        else:
+            raise ValueError(f"Unknown outbox sink: {item}")
+    return sinks
@@ -0,0 +1,197 @@
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """
+    Base class for in-process metrics exposed in the Prometheus text format.
+
+    Samples are kept per label values combination, e.g. `counter.inc(outcome="hit")`.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Initialize the metric.
+
+        :param name: Metric name, e.g. `idempotency_requests_total`.
+        :param documentation: Help text of the metric.
+        :param labelnames: Names of the labels every sample is recorded with.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+        self._lock = threading.Lock()
+
+    def get(self, **labels: str) -> float:
+        """Return the current value of the sample with the given labels."""
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], LabelValues, float]]:
+        """Return (sample name, label names, label values, value) of every recorded sample."""
+        with self._lock:
+            return [(self.name, self.labelnames, label_values, value) for label_values, value in self._values.items()]
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        label_values = self._label_values(labels)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    """Monotonically increasing metric, e.g. the number of handled requests."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter by `amount`."""
+        if amount < 0:
+            raise ValueError("Counters can only be increased.")
+        self._add(amount, labels)
+
+
+class Gauge(Metric):
+    """Metric that can go up and down, e.g. the number of stored keys."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge to `value`."""
+        label_values = self._label_values(labels)
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the gauge by `amount`."""
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """Decrease the gauge by `amount`."""
+        self._add(-amount, labels)
+
+
+class Histogram(Metric):
+    """
+    Metric counting observations into cumulative buckets, e.g. the duration of requests.
+
+    Rendered as the `_bucket`, `_sum` and `_count` samples of the Prometheus histogram type.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float], labelnames: Iterable[str] = (),
+    ):
+        """
+        Initialize the histogram.
+
+        :param buckets: Upper bounds of the buckets, in increasing order; `+Inf` is added.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._observations: Dict[LabelValues, List[float]] = {} if self.labelnames else {(): self._empty()}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation of `value`."""
+        label_values = self._label_values(labels)
+        with self._lock:
+            observation = self._observations.get(label_values)
+            if observation is None:
+                observation = self._observations[label_values] = self._empty()
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    observation[index] += 1
+            observation[-2] += value
+            observation[-1] += 1
+
+    def get(self, **labels: str) -> float:
+        """Return the number of observations with the given labels."""
+        observation = self._observations.get(self._label_values(labels))
+        return observation[-1] if observation else 0.0
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], LabelValues, float]]:
+        bucket_labelnames = self.labelnames + ("le",)
+        samples = []
+        with self._lock:
+            for label_values, observation in self._observations.items():
+                for bound, count in zip(self.buckets, observation):
+                    samples.append(
+                        (f"{self.name}_bucket", bucket_labelnames, label_values + (_format_bound(bound),), count)
+                    )
+                samples.append((f"{self.name}_sum", self.labelnames, label_values, observation[-2]))
+                samples.append((f"{self.name}_count", self.labelnames, label_values, observation[-1]))
+        return samples
+
+    def _empty(self) -> List[float]:
+        # Bucket counts followed by the sum and the count of the observations.
+        return [0.0] * (len(self.buckets) + 2)
+
+
+class MetricsRegistry:
+    """Collection of the metrics of the process, rendered by the `/metrics` endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Register a metric. Registering a second metric with the same name returns the first one."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, buckets: Sequence[float], labelnames: Iterable[str] = (),
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, buckets, labelnames))
+
+    def render(self) -> str:
+        """Render all registered metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample_name, labelnames, label_values, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labelnames, label_values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labelnames: Tuple[str, ...], label_values: LabelValues) -> str:
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, label_values):
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else _format_value(bound)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+# Registry of the API process.
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,87 @@
+import os
+from typing import List, Optional, Union
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Columns of the sales report files, in the order of the SaleResponse fields.
+SALE_REPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("product_id", pa.int64()),
+        ("product_name", pa.string()),
+        ("product_price", pa.float64()),
+        ("discount_name", pa.string()),
+        ("category_id", pa.int64()),
+        ("category_name", pa.string()),
+        ("quantity", pa.int64()),
+        ("sold_at", pa.timestamp("us")),
+    ]
+)
+
+# Supported file formats and their media types.
+REPORT_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+class ColumnarReportWriter:
+    """
+    Writes report rows batch by batch to a zstd compressed Parquet or Arrow IPC file.
+
+    Every batch becomes a Parquet row group / IPC record batch, so memory stays bounded by the
+    batch size. The file is written under a temporary name and only moved to `path` by `close`,
+    so readers never see a partial file. The methods block (compression runs in Arrow without the
+    GIL): call them from a thread when running in the event loop.
+    """
+
+    def __init__(self, path: str, format: str, schema: pa.Schema = SALE_REPORT_SCHEMA):
+        """
+        Initialize the writer; the file is created on the first batch.
+
+        :param path: Path of the finished file.
+        :param format: "parquet" or "arrow".
+        :param schema: Columns of the rows.
+        """
+        if format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {format}")
+        self.path = path
+        self.format = format
+        self.schema = schema
+        self._temporary_path = f"{path}.tmp"
+        self._writer: Optional[Union[pq.ParquetWriter, ipc.RecordBatchFileWriter]] = None
+
+    def write(self, rows: List[dict]) -> None:
+        """Append a batch of rows (dicts keyed by the schema column names)."""
+        if self._writer is None:
+            self._open()
+        self._writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> int:
+        """Finish the file and move it to its final path. Return its size in bytes."""
+        if self._writer is None:
+            self._open()
+        self._writer.close()
+        self._writer = None
+        os.replace(self._temporary_path, self.path)
+        return os.path.getsize(self.path)
+
+    def abort(self) -> None:
+        """Close and delete the unfinished file."""
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            finally:
+                self._writer = None
+        if os.path.exists(self._temporary_path):
+            os.remove(self._temporary_path)
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.format == "parquet":
+            self._writer = pq.ParquetWriter(self._temporary_path, self.schema, compression="zstd")
+        else:
+            options = ipc.IpcWriteOptions(compression="zstd")
+            self._writer = ipc.new_file(self._temporary_path, self.schema, options=options)
@@ -0,0 +1,205 @@
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import (
+    ADMISSION_CONCURRENCY_LIMITS,
+    ADMISSION_MAX_CLIENTS,
+    ADMISSION_RATE_LIMITS,
+    ADMISSION_TRUST_FORWARDED_FOR,
+)
+from src.infrastructure.cache.lru_cache import LRUCache
+from src.infrastructure.metrics.registry import REGISTRY
+
+ADMISSION_DECISIONS = REGISTRY.counter(
+    "admission_decisions_total",
+    "Admission control decisions: admitted, rate_limited (429) or overloaded (503) requests.",
+    ["route_class", "decision"],
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "admission_in_flight_requests", "Admitted requests being handled, per route class.", ["route_class"]
+)
+
+# First matching path prefix decides the route class; other paths are `catalog`.
+ROUTE_CLASS_PREFIXES = (
+    ("/reports", "reports"),
+    ("/sales", "checkout"),
+    ("/reservation", "checkout"),
+    ("/events", "events"),
+)
+DEFAULT_ROUTE_CLASS = "catalog"
+EXEMPT_PATHS = ("/metrics", "/status", "/docs", "/redoc", "/openapi.json")
+
+
+def route_class(path: str) -> Optional[str]:
+    """Return the route class of a request path, or None for paths that are never limited."""
+    if path == "/" or path.startswith(EXEMPT_PATHS):
+        return None
+    for prefix, name in ROUTE_CLASS_PREFIXES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return name
+    return DEFAULT_ROUTE_CLASS
+
+
+def parse_limits(spec: str) -> Dict[str, str]:
+    """Parse a comma separated `class=value` list."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        limits[name.strip()] = value.strip()
+    return limits
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each request takes one token."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """Take a token. Return 0 if one was available, otherwise the seconds until the next one."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Admission decisions of a worker process: a token bucket per (client, route class) and an
+    in-flight request cap per route class. Classes without a configured limit are not limited.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Dict[str, Tuple[float, float]],
+        concurrency_limits: Dict[str, int],
+        max_clients: int = ADMISSION_MAX_CLIENTS,
+    ):
+        """
+        Initialize the controller.
+
+        :param rate_limits: (requests per second, burst) per route class.
+        :param concurrency_limits: Maximum in-flight requests per route class.
+        :param max_clients: Number of token buckets kept; the least recently seen clients are forgotten.
+        """
+        self.rate_limits = rate_limits
+        self.concurrency_limits = concurrency_limits
+        self._buckets = LRUCache(max_clients)
+        self._in_flight: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls) -> "AdmissionController":
+        """Create a controller with the ADMISSION_* limits."""
+        rate_limits = {}
+        for name, value in parse_limits(ADMISSION_RATE_LIMITS).items():
+            rate, _, burst = value.partition("/")
+            rate_limits[name] = (float(rate), float(burst or rate))
+        concurrency_limits = {name: int(value) for name, value in parse_limits(ADMISSION_CONCURRENCY_LIMITS).items()}
+        return cls(rate_limits, concurrency_limits)
+
+    def admit(self, client: str, route_class_name: str, now: float) -> Optional[Tuple[int, int]]:
+        """
+        Decide on a request, counting it as in flight when admitted.
+
+        :return: None when admitted, otherwise the (status code, Retry-After seconds) of the rejection.
+        """
+        rate_limit = self.rate_limits.get(route_class_name)
+        if rate_limit is not None:
+            key = (client, route_class_name)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(*rate_limit, now)
+                self._buckets.set(key, bucket)
+            wait = bucket.take(now)
+            if wait:
+                ADMISSION_DECISIONS.inc(route_class=route_class_name, decision="rate_limited")
+                return 429, max(1, math.ceil(wait))
+
+        in_flight = self._in_flight.get(route_class_name, 0)
+        limit = self.concurrency_limits.get(route_class_name)
+        if limit is not None and in_flight >= limit:
+            ADMISSION_DECISIONS.inc(route_class=route_class_name, decision="overloaded")
+            return 503, 1
+
+        self._in_flight[route_class_name] = in_flight + 1
+        ADMISSION_IN_FLIGHT.set(in_flight + 1, route_class=route_class_name)
+        ADMISSION_DECISIONS.inc(route_class=route_class_name, decision="admitted")
+        return None
+
+    def release(self, route_class_name: str) -> None:
+        """Mark an admitted request of the route class as finished."""
+        in_flight = self._in_flight[route_class_name] - 1
+        self._in_flight[route_class_name] = in_flight
+        ADMISSION_IN_FLIGHT.set(in_flight, route_class=route_class_name)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware rejecting requests over their rate or concurrency budget before they reach the app.
+
+    It is added right inside CORSMiddleware, so it runs before the other middlewares, rejected
+    requests never open a DB session, and rejections still carry the CORS headers. Over the client's
+    rate limit the response is 429, over the route class concurrency cap it is 503; both carry a
+    `Retry-After` header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: Optional[AdmissionController] = None,
+        trust_forwarded_for: bool = ADMISSION_TRUST_FORWARDED_FOR,
+    ):
+        self.app = app
+        self.controller = controller or AdmissionController.from_config()
+        self.trust_forwarded_for = trust_forwarded_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self.controller.admit(self._client(scope), name, time.monotonic())
+        if rejection is not None:
+            await self._reject(send, *rejection)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
+
+    def _client(self, scope: Scope) -> str:
+        if self.trust_forwarded_for:
+            for header, value in scope["headers"]:
+                if header == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, retry_after: int) -> None:
+        detail = "Too many requests." if status_code == 429 else "The server is busy, retry later."
+        body = orjson.dumps({"detail": detail})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,67 @@
+import random
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+
+from config import SQL_STATS_HEADERS, SQL_STATS_SAMPLE_RATE
+from src.infrastructure.db.sql_stats import SQLStats, start_sql_stats
+from src.infrastructure.metrics.registry import REGISTRY
+
+SQL_REQUEST_STATEMENTS = REGISTRY.histogram(
+    "sql_request_statements",
+    "SQL statements executed per sampled request.",
+    [0, 1, 2, 3, 5, 10, 20, 50, 100],
+    ["method", "route"],
+)
+SQL_REQUEST_DURATION = REGISTRY.histogram(
+    "sql_request_duration_seconds",
+    "Time spent executing SQL statements per sampled request.",
+    [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+    ["method", "route"],
+)
+SQL_REQUEST_ROWS = REGISTRY.histogram(
+    "sql_request_rows",
+    "Rows returned or affected by the SQL statements per sampled request.",
+    [0, 1, 10, 100, 1000, 10000],
+    ["method", "route"],
+)
+
+# Slowest statement returned in the debug headers, cut to keep the header small.
+MAX_STATEMENT_HEADER_LENGTH = 300
+
+
+class SQLStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Records the SQL statements of a sample of the requests, per route.
+
+    Sampled requests are observed in the `sql_request_*` histograms labeled with the route
+    template (e.g. `/products/{product_id}`). With SQL_STATS_HEADERS the stats are
+    also returned in `X-SQL-*` response headers.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        if random.random() >= SQL_STATS_SAMPLE_RATE:
+            return await call_next(request)
+
+        stats = start_sql_stats()
+        try:
+            response = await call_next(request)
+        finally:
+            route = request.scope.get("route")
+            labels = {"method": request.method, "route": getattr(route, "path", "unmatched")}
+            SQL_REQUEST_STATEMENTS.observe(stats.statements, **labels)
+            SQL_REQUEST_DURATION.observe(stats.duration, **labels)
+            SQL_REQUEST_ROWS.observe(stats.rows, **labels)
+        if SQL_STATS_HEADERS:
+            self._set_headers(response, stats)
+        return response
+
+    @staticmethod
+    def _set_headers(response, stats: SQLStats) -> None:
+        response.headers["X-SQL-Statements"] = str(stats.statements)
+        response.headers["X-SQL-Duration-Ms"] = f"{stats.duration * 1000:.2f}"
+        response.headers["X-SQL-Rows"] = str(stats.rows)
+        if stats.slowest_statement is not None:
+            response.headers["X-SQL-Slowest-Ms"] = f"{stats.slowest_duration * 1000:.2f}"
+            statement = " ".join(stats.slowest_statement.split())[:MAX_STATEMENT_HEADER_LENGTH]
+            response.headers["X-SQL-Slowest-Statement"] = statement.encode("ascii", "replace").decode()
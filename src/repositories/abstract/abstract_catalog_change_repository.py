@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class AbstractCatalogChangeRepository(ABC):
+    """
+    Abstract repository for the catalog change feed.
+
+    Products, categories and discounts carry the version of their last change; deleted ones leave
+    a tombstone with its own version. All versions come from one sequence, assigned in commit order
+    when the changes are published.
+    """
+
+    @abstractmethod
+    async def publish_pending(self, limit: int) -> int:
+        """Give up to `limit` committed unpublished changes per table their version. Return the number published."""
+        pass
+
+    @abstractmethod
+    async def get_changes(self, since: int, limit: int) -> List[dict]:
+        """
+        Retrieve up to `limit` current rows and tombstones with a version above `since`, in version order.
+
+        Each change is a dict with `kind`, `id`, `version` and `deleted`.
+        """
+        pass
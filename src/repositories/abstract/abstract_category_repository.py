@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from src.infrastructure.db.models.models import Category
 
@@ -38,3 +38,8 @@ class AbstractCategoryRepository(ABC):
     async def delete_category_by_id(self, category_id: int) -> bool:
         """Delete a category by its ID."""
         pass
+
+    @abstractmethod
+    async def get_category_names(self) -> List[Tuple[int, str]]:
+        """Retrieve the (id, name) of all categories, ordered by ID."""
+        pass
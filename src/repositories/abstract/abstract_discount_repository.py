@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Optional
 
 from src.infrastructure.db.models.models import Discount
@@ -36,3 +37,8 @@ class AbstractDiscountRepository(ABC):
     async def delete_discount(self, discount_id: int) -> bool:
         """Delete a discount by its ID."""
         pass
+
+    @abstractmethod
+    async def has_window_boundary(self, since: datetime, until: datetime) -> bool:
+        """Check whether a discount started or ended in the (since, until] interval."""
+        pass
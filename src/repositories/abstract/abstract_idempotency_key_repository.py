@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncContextManager, Optional
+
+from src.infrastructure.db.models.models import IdempotencyKey
+
+
+class AbstractIdempotencyKeyRepository(ABC):
+    """Abstract repository for stored responses of idempotent requests."""
+
+    @abstractmethod
+    async def get_key(self, scope: str, key: str) -> Optional[IdempotencyKey]:
+        """Retrieve a key that has not expired yet."""
+        pass
+
+    @abstractmethod
+    async def claim_key(
+        self, scope: str, key: str, request_hash: str, expires_at: datetime, claimed_until: datetime
+    ) -> bool:
+        """
+        Store a key without a response, leased until `claimed_until`.
+        Return False if an unexpired key already exists, unless it is an expired lease of the same request.
+        """
+        pass
+
+    @abstractmethod
+    def single_transaction(self) -> AsyncContextManager:
+        """Commit everything written through the session within the block in one transaction."""
+        pass
+
+    @abstractmethod
+    async def save_response(self, scope: str, key: str, response: dict) -> None:
+        """Store the response of a claimed key."""
+        pass
+
+    @abstractmethod
+    async def release_key(self, scope: str, key: str) -> None:
+        """Discard the pending changes of the session and delete a claimed key."""
+        pass
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        """Delete expired keys. Return the number of deleted keys."""
+        pass
+
+    @abstractmethod
+    async def count_keys(self) -> int:
+        """Return the number of stored keys."""
+        pass
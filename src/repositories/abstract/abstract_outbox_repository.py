@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+
+class AbstractOutboxRepository(ABC):
+    """
+    Abstract repository for the transactional outbox.
+
+    Events are written by the other repositories in the transaction of the change they describe,
+    then published (numbered in commit order) and delivered to the sinks by the outbox dispatcher.
+    """
+
+    @abstractmethod
+    async def add_events(self, events: List[dict]) -> None:
+        """Write the given outbox event rows in the current transaction, without committing."""
+        pass
+
+    @abstractmethod
+    async def publish_pending(self, limit: int) -> int:
+        """Number up to `limit` unpublished events in commit order. Return the number of published events."""
+        pass
+
+    @abstractmethod
+    async def get_events(self, after: int, limit: int, topics: Optional[Sequence[str]] = None) -> List[dict]:
+        """Retrieve up to `limit` published events with a sequence above `after`, in sequence order."""
+        pass
+
+    @abstractmethod
+    async def deliver(
+        self, sink: str, limit: int, send: Callable[[List[dict]], Awaitable[None]], lease: float
+    ) -> int:
+        """
+        Send the next published events not yet delivered to a sink, claiming it for `lease` seconds.
+        Return the number of sent events.
+        """
+        pass
+
+    @abstractmethod
+    async def purge_published(self, before: datetime, sinks: Sequence[str]) -> int:
+        """Delete events published before `before` and delivered to all `sinks`. Return the number of deleted."""
+        pass
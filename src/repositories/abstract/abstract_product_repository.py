@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from src.infrastructure.db.models.models import Product
 
@@ -9,9 +9,9 @@ class AbstractProductRepository(ABC):
 
     @abstractmethod
     async def get_all_products(
-        self, cursor: Optional[int], limit: int
-    ) -> List[Product]:
-        """Retrieve all products with pagination."""
+        self, cursor: Optional[int], limit: int, sort: str = "id"
+    ) -> List[dict]:
+        """Retrieve all products with pagination, ordered by `sort`, as dicts with the ProductResponse fields."""
         pass
 
     @abstractmethod
@@ -19,11 +19,38 @@ class AbstractProductRepository(ABC):
         """Add a new product to the database."""
         pass
 
+    @abstractmethod
+    async def get_product_names(self) -> List[Tuple[int, str]]:
+        """Retrieve the (id, name) of all products, ordered by ID."""
+        pass
+
     @abstractmethod
     async def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """Retrieve a product by its ID."""
         pass
 
+    @abstractmethod
+    async def get_products_by_ids(self, product_ids: Iterable[int]) -> List[Product]:
+        """Retrieve the products with the given IDs, ordered by ID."""
+        pass
+
+    @abstractmethod
+    async def get_product_rows_by_ids(self, product_ids: Iterable[int]) -> List[dict]:
+        """Retrieve the products with the given IDs as dicts with the ProductResponse fields."""
+        pass
+
+    @abstractmethod
+    async def search_products(
+        self,
+        text: str,
+        cursor: Optional[int],
+        limit: int,
+        category_id: Optional[int] = None,
+        in_stock: bool = False,
+    ) -> List[dict]:
+        """Full-text search of products, best matches first, as dicts with the ProductSearchResponse fields."""
+        pass
+
     @abstractmethod
     async def update_product(self, product_id: int, updated_data: dict) -> Product:
         """Update a product by its ID."""
@@ -41,9 +68,11 @@ class AbstractProductRepository(ABC):
 
     @abstractmethod
     async def get_products_by_category(
-        self, category_id: int, cursor: Optional[int], limit: int
-    ) -> List[Product]:
-        """Retrieve products by category ID with pagination."""
+        self, category_id: int, cursor: Optional[int], limit: int, sort: str = "id"
+    ) -> List[dict]:
+        """
+        Retrieve products by category ID with pagination, ordered by `sort`, as dicts with the ProductResponse fields.
+        """
         pass
 
     @abstractmethod
@@ -62,3 +91,40 @@ class AbstractProductRepository(ABC):
     def update_product_stock(self, product_id: int, param: dict) -> Product:
         """Update the stock of a product."""
         pass
+
+    @abstractmethod
+    async def decrement_stock(self, product_id: int, quantity: int) -> Optional[int]:
+        """Take items from the stock of a product if enough are available."""
+        pass
+
+    @abstractmethod
+    async def increment_stock(self, product_id: int, quantity: int) -> Optional[int]:
+        """Return items to the stock of a product."""
+        pass
+
+    @abstractmethod
+    async def restock(self, product_id: int, quantity: int) -> Optional[int]:
+        """Add items to the stock of a product and commit. Return the new stock."""
+        pass
+
+    @abstractmethod
+    async def bulk_set_discount(
+        self,
+        discount_id: Optional[int],
+        product_ids: Optional[Iterable[int]] = None,
+        category_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        name_contains: Optional[str] = None,
+        current_discount_id: Optional[int] = None,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Set the discount of the selected products in one transaction.
+        Return the IDs of the updated products and of the repriced ones.
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_effective_prices(self, product_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Recompute the effective prices from the active discounts. Return the IDs of the changed products."""
+        pass
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.infrastructure.db.models.models import ReportJob
+
+
+class AbstractReportJobRepository(ABC):
+    """Abstract repository for background report jobs."""
+
+    @abstractmethod
+    async def create_job(
+        self, filter_hash: str, filters: dict, format: str, expires_at: datetime
+    ) -> Tuple[ReportJob, bool]:
+        """
+        Create a pending job, unless a job with the same hash has not failed or expired yet.
+
+        Return the job and whether it was created.
+        """
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[ReportJob]:
+        """Retrieve a job that has not expired yet."""
+        pass
+
+    @abstractmethod
+    async def claim_next(self) -> Optional[ReportJob]:
+        """Mark the oldest pending job as running and return it, None if no job is pending."""
+        pass
+
+    @abstractmethod
+    async def finish_job(self, job_id: str, rows: int, size: int) -> bool:
+        """Mark a running job as done. Return False if the job is no longer running."""
+        pass
+
+    @abstractmethod
+    async def fail_job(self, job_id: str, error: str) -> None:
+        """Mark a running job as failed."""
+        pass
+
+    @abstractmethod
+    async def fail_stale(self, started_before: datetime) -> int:
+        """Mark the jobs running since before `started_before` as failed. Return their number."""
+        pass
+
+    @abstractmethod
+    async def purge_expired(self, now: datetime) -> List[Tuple[str, str]]:
+        """Delete the expired jobs. Return the (id, format) of the deleted jobs."""
+        pass
@@ -2,8 +2,6 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import List, Optional
 
-from src.infrastructure.db.models.models import Sale
-
 
 class AbstractSaleRepository(ABC):
     """
@@ -22,6 +20,6 @@ class AbstractSaleRepository(ABC):
         category_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[Sale]:
-        """Generate a sales report based on the provided filters."""
+    ) -> List[dict]:
+        """Generate a sales report based on the provided filters, as dicts with the SaleResponse fields."""
         pass
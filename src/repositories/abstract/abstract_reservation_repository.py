@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from src.infrastructure.db.models.models import Reservation
 
@@ -56,3 +56,17 @@ class AbstractReservationRepository(ABC):
         Cancel a reservation and update its status.
         """
         pass
+
+    @abstractmethod
+    async def lock_active_reservations(self, reservation_ids: Iterable[int]) -> List[Reservation]:
+        """
+        Fetch and lock the active reservations with the given IDs until the end of the transaction.
+        """
+        pass
+
+    @abstractmethod
+    async def close_reservations(self, reservation_ids: Iterable[int]) -> None:
+        """
+        Mark reservations as inactive without committing.
+        """
+        pass
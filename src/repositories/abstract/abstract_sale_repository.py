@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Callable, List, Tuple
 
 from src.infrastructure.db.models.models import Product, Sale
 
@@ -16,3 +17,13 @@ class AbstractSaleRepository(ABC):
     async def buy_product(self, product: Product, quantity: int) -> Sale:
         """Create a sale for a given product and quantity."""
         pass
+
+    @abstractmethod
+    async def create_sales(self, lines: List[Tuple[Product, int]]) -> List[Sale]:
+        """Create one sale per (product, quantity) line in a single transaction."""
+        pass
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` once the sales written through the repository are committed."""
+        pass
@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.engine import Row
+
+
+class AbstractSaleRollupRepository(ABC):
+    """
+    Abstract repository for the daily sales rollup.
+
+    The rollup keeps `(day, product_id, category_id, discount_id) -> units, revenue` summaries,
+    so that day-or-coarser sales reports do not have to scan the raw sales table.
+    """
+
+    @abstractmethod
+    async def ensure_backfilled(self, mode: str) -> None:
+        """
+        Fold all existing sales into the rollup once, if it was never built, and re-seed the
+        watermark when the rollup mode changed since the last startup.
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_from_watermark(self, batch_size: int) -> int:
+        """
+        Fold the next sales above the stored watermark into the rollup, keeping the skipped IDs as gaps.
+        Return the number of folded sales.
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_gaps(self) -> int:
+        """
+        Fold the sales of the gaps that committed since and drop the gaps that can no longer be filled.
+        Return the number of folded sales.
+        """
+        pass
+
+    @abstractmethod
+    async def get_rollup_summary(
+        self,
+        granularity: str,
+        start_day: Optional[datetime] = None,
+        end_day: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+    ) -> List[Row]:
+        """Aggregate rollup rows for whole days in `[start_day, end_day)`, by the current category of the products."""
+        pass
+
+    @abstractmethod
+    async def get_raw_summary(
+        self,
+        granularity: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        end_inclusive: bool = False,
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+    ) -> List[Row]:
+        """Aggregate raw sales rows in the given range, used for partial days."""
+        pass
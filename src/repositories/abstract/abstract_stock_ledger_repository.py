@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from src.infrastructure.db.models.models import StockMovement, StockMovementKind
+
+
+class AbstractStockLedgerRepository(ABC):
+    """
+    Abstract repository for the append-only stock movement ledger.
+
+    Available stock of a product is its compacted balance plus the sum of the movements
+    appended after the balance was compacted.
+    """
+
+    @abstractmethod
+    async def get_available_stock(self, product_id: int) -> Optional[int]:
+        """Return the available stock of a product, or None if the product does not exist."""
+        pass
+
+    @abstractmethod
+    async def append_movement(self, product_id: int, kind: StockMovementKind, delta: int) -> StockMovement:
+        """Append a movement to the ledger without committing it."""
+        pass
+
+    @abstractmethod
+    async def take_stock(self, product_id: int, kind: StockMovementKind, quantity: int) -> bool:
+        """Append a movement taking `quantity` items if enough stock is available, without committing it."""
+        pass
+
+    @abstractmethod
+    async def adjust_stock(self, product_id: int, new_stock: int) -> None:
+        """Append an adjustment bringing the available stock to `new_stock`, without committing it."""
+        pass
+
+    @abstractmethod
+    async def lock_product(self, product_id: int) -> None:
+        """Serialize the stock changes of a product that check its availability until the end of the transaction."""
+        pass
+
+    @abstractmethod
+    async def get_movements(self, product_id: int, cursor: Optional[int], limit: int) -> List[StockMovement]:
+        """Retrieve movements of a product with pagination."""
+        pass
+
+    @abstractmethod
+    async def compact(self) -> int:
+        """Fold appended movements into the balances. Return the number of updated balances."""
+        pass
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+
+class AbstractStockShardRepository(ABC):
+    """
+    Abstract repository for sharded stock counters.
+
+    A product with a stock shard count above one keeps its stock split across that many
+    counter slots, so concurrent purchases update different rows instead of one product row.
+    """
+
+    @abstractmethod
+    async def get_total_stock(self, product_id: int) -> int:
+        """Return the sum of all stock slots of a product."""
+        pass
+
+    @abstractmethod
+    async def take_stock(self, product_id: int, shard_count: int, quantity: int) -> bool:
+        """Take `quantity` items from the slots of a product without committing."""
+        pass
+
+    @abstractmethod
+    async def return_stock(self, product_id: int, shard_count: int, quantity: int) -> None:
+        """Return `quantity` items to a random slot of a product without committing."""
+        pass
+
+    @abstractmethod
+    async def reshard(self, product_id: int, shard_count: int, unsharded_stock: Optional[int] = None) -> int:
+        """Redistribute the stock of a product across `shard_count` slots. Return the total stock."""
+        pass
+
+    @abstractmethod
+    async def lock_stock(self, product_id: int) -> Optional[Tuple[int, int]]:
+        """Lock the stock of a product until the end of the transaction. Return its shard count and stock."""
+        pass
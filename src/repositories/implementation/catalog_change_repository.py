@@ -0,0 +1,100 @@
+from typing import Iterable, List
+
+from sqlalchemy import false, func, insert, literal, true, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import CATALOG_VERSION, CatalogTombstone, Category, Discount, Product
+from src.repositories.abstract.abstract_catalog_change_repository import AbstractCatalogChangeRepository
+
+CATALOG_ENTITIES = {"product": Product, "category": Category, "discount": Discount}
+CATALOG_PUBLISH_LOCK_KEY = 260044
+
+
+def tombstone_insert_statement(entity: str, entity_ids: Iterable[int]):
+    """Build a single INSERT of the tombstones of deleted catalog rows, published like the other changes."""
+    return insert(CatalogTombstone).values([{"entity": entity, "entity_id": entity_id} for entity_id in entity_ids])
+
+
+class CatalogChangeRepository(AbstractCatalogChangeRepository):
+    """
+    SQLAlchemy implementation of the catalog change feed.
+
+    The feed is a UNION ALL of the version indexes of the catalog tables and of the tombstones,
+    merged in version order, so a page costs the same whatever the size of the catalog.
+
+    Writers clear the version of the rows they change. Publishing gives the committed rows their
+    version, under an advisory lock held until commit, so a version only becomes visible after every
+    lower one: readers paging by version never skip a change, however long its transaction ran.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def publish_pending(self, limit: int) -> int:
+        """
+        Give up to `limit` committed unpublished rows of each catalog table and of the tombstones their version.
+
+        Rows locked by a running transaction are left for a later call. Returns 0 without waiting
+        when another worker is publishing.
+        """
+        async with transaction_context(self.db):
+            locked = (await self.db.execute(select(func.pg_try_advisory_xact_lock(CATALOG_PUBLISH_LOCK_KEY)))).scalar()
+            if not locked:
+                return 0
+
+            published = 0
+            for model in (*CATALOG_ENTITIES.values(), CatalogTombstone):
+                pending = (
+                    select(model.id)
+                    .where(model.version.is_(None))
+                    .order_by(model.id)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+                values = {"version": CATALOG_VERSION.next_value()}
+                if hasattr(model, "updated_at"):
+                    # Publishing is not a change: keep the time of the last change.
+                    values["updated_at"] = model.updated_at
+                query = (
+                    update(model)
+                    .where(model.id.in_(pending))
+                    .values(**values)
+                    .returning(model.id)
+                    .execution_options(synchronize_session=False)
+                )
+                published += len((await self.db.execute(query)).all())
+            await commit(self.db)
+        return published
+
+    async def get_changes(self, since: int, limit: int) -> List[dict]:
+        """Retrieve up to `limit` current rows and tombstones with a version above `since` from DB, in version order."""
+        parts = [
+            select(
+                literal(kind).label("kind"),
+                model.id.label("id"),
+                model.version.label("version"),
+                false().label("deleted"),
+            )
+            .where(model.version > since)
+            .order_by(model.version)
+            .limit(limit)
+            for kind, model in CATALOG_ENTITIES.items()
+        ]
+        parts.append(
+            select(
+                CatalogTombstone.entity,
+                CatalogTombstone.entity_id,
+                CatalogTombstone.version,
+                true(),
+            )
+            .where(CatalogTombstone.version > since)
+            .order_by(CatalogTombstone.version)
+            .limit(limit)
+        )
+        changes = union_all(*(part.subquery().select() for part in parts)).subquery("changes")
+        query = select(changes).order_by(changes.c.version).limit(limit)
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings()]
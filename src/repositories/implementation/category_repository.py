@@ -1,11 +1,21 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
-from src.infrastructure.db.models.models import Category
+from src.infrastructure.cache.prefix_index import NAME_SUGGESTIONS
+from src.infrastructure.db.context_managers import commit
+from src.infrastructure.db.loading import CATEGORY_TREE
+from src.infrastructure.db.models.models import Category, Product
 from src.repositories.abstract.abstract_category_repository import AbstractCategoryRepository
+from src.repositories.implementation.catalog_change_repository import tombstone_insert_statement
+from src.repositories.implementation.outbox_repository import outbox_event, outbox_insert_statement
+from src.repositories.implementation.product_repository import (
+    category_subtree,
+    effective_price_update,
+    product_events_statement,
+)
 
 
 class CategoryRepository(AbstractCategoryRepository):
@@ -16,91 +26,122 @@ class CategoryRepository(AbstractCategoryRepository):
 
     async def get_all_categories(self) -> List[Category]:
         """
-        Retrieve all categories, including subcategories from DB.
+        Retrieve all top-level categories, including their subcategory trees from DB.
         """
-        query = select(Category).options(selectinload(Category.subcategories))
+        query = select(Category).options(*CATEGORY_TREE).where(Category.parent_id.is_(None))
         result = await self.db.execute(query)
-        categories = result.scalars().all()
-        parent_categories = [
-            category for category in categories if category.parent_id is None
-        ]
-        return parent_categories
+        return result.scalars().all()
 
     async def add_category(self, category: Category) -> Category:
         """
         Add a new category to the database in DB.
         """
         self.db.add(category)
-        await self.db.commit()
-        await self.db.refresh(category)
-        return category
+        await commit(self.db)
+        NAME_SUGGESTIONS.add("category", category.id, category.name)
+        return await self.get_category_by_id(category.id)
 
     async def get_category_by_id(self, category_id: int) -> Optional[Category]:
         """
-        Retrieve a category by its ID, including subcategories from DB.
+        Retrieve a category by its ID, including its subcategory tree from DB.
         """
-        query = (
-            select(Category)
-            .options(selectinload(Category.subcategories))
-            .filter(Category.id == category_id)
-        )
-        result = await self.db.execute(query)
-        category = result.scalar_one_or_none()
-        if category:
-            await self._load_all_subcategories(category)
-        return category
+        query = select(Category).options(*CATEGORY_TREE).filter(Category.id == category_id)
+        result = await self.db.execute(query.execution_options(populate_existing=True))
+        return result.scalar_one_or_none()
 
     async def get_category_by_name(self, name: str) -> Optional[Category]:
         """
-        Retrieve a category by its name, including subcategories from DB.
+        Retrieve a category by its name, including its subcategory tree from DB.
         """
-        query = (
-            select(Category)
-            .options(selectinload(Category.subcategories))
-            .where(Category.name == name)
-        )
-        result = await self.db.execute(query)
-        category = result.scalar_one_or_none()
-        if category:
-            await self._load_all_subcategories(category)
-        return category
+        query = select(Category).options(*CATEGORY_TREE).where(Category.name == name)
+        result = await self.db.execute(query.execution_options(populate_existing=True))
+        return result.scalar_one_or_none()
 
     async def update_category_by_id(
         self, category_id: int, updated_data: dict
     ) -> Optional[Category]:
         """
         Update a category's attributes by its ID in DB.
+
+        Moving the category to another parent changes the category discounts its products inherit,
+        so the products of the moved subtree are repriced in the same transaction.
         """
         category = await self.get_category_by_id(category_id)
         if not category:
             return None
 
+        parent_id = category.parent_id
         for key, value in updated_data.items():
             setattr(category, key, value)
 
         self.db.add(category)
-        await self.db.commit()
-        await self.db.refresh(category)
-        await self._load_all_subcategories(category)
+        if category.parent_id != parent_id:
+            await self.db.flush()
+            await self._reprice_subtree(category_id)
+        await commit(self.db)
+        NAME_SUGGESTIONS.add("category", category.id, category.name)
         return category
 
     async def delete_category_by_id(self, category_id: int) -> bool:
         """
         Delete a category by its ID from DB.
+
+        Products and subcategories are deleted with it by the ORM cascades.
         """
         category = await self.get_category_by_id(category_id)
         if not category:
             return False
+        category_ids = self._subtree_ids(category)
+        product_ids = (
+            await self.db.execute(select(Product.id).where(Product.category_id.in_(category_ids)))
+        ).scalars().all()
         await self.db.delete(category)
-        await self.db.commit()
+        await self.db.execute(tombstone_insert_statement("category", category_ids))
+        if product_ids:
+            await self.db.execute(tombstone_insert_statement("product", product_ids))
+            await self.db.execute(
+                outbox_insert_statement(
+                    [outbox_event("product.deleted", product_id, {"id": product_id}) for product_id in product_ids]
+                )
+            )
+        await commit(self.db)
+
+        for deleted_id in category_ids:
+            NAME_SUGGESTIONS.remove("category", deleted_id)
+        for product_id in product_ids:
+            NAME_SUGGESTIONS.remove("product", product_id)
         return True
 
-    async def _load_all_subcategories(self, category: Category) -> None:
+    async def get_category_names(self) -> List[Tuple[int, str]]:
+        """
+        Retrieve the (id, name) of all categories from DB, ordered by ID.
+        """
+        result = await self.db.execute(select(Category.id, Category.name).order_by(Category.id))
+        return result.all()
+
+    async def _reprice_subtree(self, category_id: int) -> None:
+        """
+        Recompute the effective prices of the products of a category and of its subcategories within
+        the current transaction, writing a `product.updated` outbox event for each repriced product.
+        """
+        subtree = category_subtree(category_id)
+        product_ids = (
+            await self.db.execute(select(Product.id).where(Product.category_id.in_(select(subtree.c.id))))
+        ).scalars().all()
+        if not product_ids:
+            return
+        repriced = (await self.db.execute(effective_price_update(datetime.utcnow(), product_ids))).scalars().all()
+        if repriced:
+            await self.db.execute(product_events_statement("product.updated", repriced))
+
+    @staticmethod
+    def _subtree_ids(category: Category) -> List[int]:
         """
-        Recursively load all subcategories of a given category.
+        Collect the IDs of a loaded category and of all its subcategories.
         """
-        queue = [category]
-        while queue:
-            current_category = queue.pop(0)
-            await self.db.refresh(current_category, attribute_names=["subcategories"])
-            queue.extend(current_category.subcategories)
+        ids, pending = [], [category]
+        while pending:
+            current = pending.pop()
+            ids.append(current.id)
+            pending.extend(current.subcategories)
+        return ids
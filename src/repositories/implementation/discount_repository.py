@@ -1,11 +1,19 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence
 
+from sqlalchemy import and_, exists, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from src.infrastructure.db.context_managers import transaction_context
-from src.infrastructure.db.models.models import Discount
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import Discount, Product
 from src.repositories.abstract.abstract_discount_repository import AbstractDiscountRepository
+from src.repositories.implementation.catalog_change_repository import tombstone_insert_statement
+from src.repositories.implementation.product_repository import (
+    category_subtree,
+    effective_price_update,
+    product_events_statement,
+)
 
 
 class DiscountRepository(AbstractDiscountRepository):
@@ -25,10 +33,18 @@ class DiscountRepository(AbstractDiscountRepository):
         self.db = db
 
     async def add_discount(self, discount: Discount) -> Discount:
-        """Add a new Discount to DB."""
+        """
+        Add a new Discount to DB.
+
+        The effective prices of the products of a category discount (and of its subcategories) are refreshed
+        in the same transaction.
+        """
         async with transaction_context(self.db):
             self.db.add(discount)
-            await self.db.commit()
+            if discount.category_id is not None:
+                await self.db.flush()
+                await self._refresh_effective_prices(await self._discounted_product_ids(discount))
+            await commit(self.db)
             await self.db.refresh(discount)
         return discount
 
@@ -51,11 +67,55 @@ class DiscountRepository(AbstractDiscountRepository):
         return result.scalars().fetchmany(limit)
 
     async def delete_discount(self, discount_id: int) -> bool:
-        """Delete a Discount by its ID from DB."""
+        """
+        Delete a Discount by its ID from DB.
+
+        The discount is detached from its products and the effective prices of the products it applied to
+        are refreshed in the same transaction.
+        """
         async with transaction_context(self.db):
             discount = await self.get_discount_by_id(discount_id)
             if discount:
+                product_ids = await self._discounted_product_ids(discount)
                 await self.db.delete(discount)
-                await self.db.commit()
+                await self.db.flush()
+                await self._refresh_effective_prices(product_ids)
+                await self.db.execute(tombstone_insert_statement("discount", [discount_id]))
+                await commit(self.db)
                 return True
             return False
+
+    async def has_window_boundary(self, since: datetime, until: datetime) -> bool:
+        """Check whether a discount started or ended in the (since, until] interval."""
+        query = select(
+            exists().where(
+                or_(
+                    and_(Discount.starts_at > since, Discount.starts_at <= until),
+                    and_(Discount.ends_at > since, Discount.ends_at <= until),
+                )
+            )
+        )
+        result = await self.db.execute(query)
+        return result.scalar()
+
+    async def _discounted_product_ids(self, discount: Discount) -> List[int]:
+        """
+        Retrieve the IDs of the products a discount applies to: the products it is attached to and,
+        for a category discount, the products of the category and of its subcategories.
+        """
+        condition = Product.discount_id == discount.id
+        if discount.category_id is not None:
+            subtree = category_subtree(discount.category_id)
+            condition = or_(condition, Product.category_id.in_(select(subtree.c.id)))
+        return (await self.db.execute(select(Product.id).where(condition))).scalars().all()
+
+    async def _refresh_effective_prices(self, product_ids: Sequence[int]) -> None:
+        """
+        Recompute the effective prices of the given products within the current transaction, writing a
+        `product.updated` outbox event for each repriced product.
+        """
+        if not product_ids:
+            return
+        repriced = (await self.db.execute(effective_price_update(datetime.utcnow(), product_ids))).scalars().all()
+        if repriced:
+            await self.db.execute(product_events_statement("product.updated", repriced))
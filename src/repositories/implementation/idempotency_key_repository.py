@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import AsyncContextManager, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context, unit_of_work
+from src.infrastructure.db.models.models import IdempotencyKey
+from src.repositories.abstract.abstract_idempotency_key_repository import AbstractIdempotencyKeyRepository
+
+
+class IdempotencyKeyRepository(AbstractIdempotencyKeyRepository):
+    """
+    SQLAlchemy implementation of the idempotency key store.
+
+    A key is claimed with an INSERT ... ON CONFLICT before the request is executed, so of two
+    concurrent requests with the same key only one runs. Expired keys can be claimed again
+    before the purge removes them, and so can keys of the same request whose claim lease passed
+    without a response, e.g. as the worker running it crashed.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def get_key(self, scope: str, key: str) -> Optional[IdempotencyKey]:
+        """Retrieve a key that has not expired yet from DB."""
+        query = select(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > datetime.utcnow(),
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def claim_key(
+        self, scope: str, key: str, request_hash: str, expires_at: datetime, claimed_until: datetime
+    ) -> bool:
+        """
+        Store a key without a response in DB, leased until `claimed_until`.
+        Return False if an unexpired key already exists, unless it is an expired lease of the same request.
+        """
+        async with transaction_context(self.db):
+            now = datetime.utcnow()
+            statement = pg_insert(IdempotencyKey).values(
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                response=None,
+                created_at=now,
+                expires_at=expires_at,
+                claimed_until=claimed_until,
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+                set_={
+                    "request_hash": statement.excluded.request_hash,
+                    "response": None,
+                    "created_at": statement.excluded.created_at,
+                    "expires_at": statement.excluded.expires_at,
+                    "claimed_until": statement.excluded.claimed_until,
+                },
+                where=or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(
+                        IdempotencyKey.claimed_until <= now,
+                        IdempotencyKey.request_hash == statement.excluded.request_hash,
+                    ),
+                ),
+            ).returning(IdempotencyKey.key)
+            claimed = (await self.db.execute(statement)).scalar_one_or_none() is not None
+            await commit(self.db)
+            return claimed
+
+    def single_transaction(self) -> AsyncContextManager:
+        """
+        Commit everything written through the session within the block in one unit of work, so
+        the response of a request is stored together with what the request wrote.
+        """
+        return unit_of_work(self.db)
+
+    async def save_response(self, scope: str, key: str, response: dict) -> None:
+        """Store the response of a claimed key in DB and end its claim lease."""
+        async with transaction_context(self.db):
+            await self.db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .values(response=response, claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+
+    async def release_key(self, scope: str, key: str) -> None:
+        """Discard the pending changes of the session and delete a claimed key from DB."""
+        await self.db.rollback()
+        async with transaction_context(self.db):
+            await self.db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+
+    async def purge_expired(self) -> int:
+        """Delete expired keys from DB. Return the number of deleted keys."""
+        async with transaction_context(self.db):
+            result = await self.db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.expires_at <= datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+            return result.rowcount
+
+    async def count_keys(self) -> int:
+        """Return the number of stored keys in DB."""
+        result = await self.db.execute(select(func.count()).select_from(IdempotencyKey))
+        return result.scalar()
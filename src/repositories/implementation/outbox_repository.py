@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Sequence
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import OutboxEvent, OutboxSinkOffset, Sale, StockMovementKind
+from src.repositories.abstract.abstract_outbox_repository import AbstractOutboxRepository
+
+OUTBOX_PUBLISH_LOCK_KEY = 260043
+
+
+def outbox_event(topic: str, aggregate_id: Optional[int], payload: dict) -> dict:
+    """Build the values of an outbox event row."""
+    return {"topic": topic, "aggregate_id": aggregate_id, "payload": payload, "created_at": datetime.utcnow()}
+
+
+def outbox_insert_statement(events: List[dict]):
+    """Build a single INSERT of the given outbox event rows (see `outbox_event`)."""
+    return insert(OutboxEvent).values(events)
+
+
+def sale_event(sale: Sale) -> dict:
+    """Build the `sale.created` event of a sale."""
+    return outbox_event(
+        "sale.created",
+        sale.id,
+        {
+            "id": sale.id,
+            "product_id": sale.product_id,
+            "quantity": sale.quantity,
+            "unit_price": sale.unit_price,
+            "discount_id": sale.discount_id,
+            "sold_at": sale.sold_at.isoformat(),
+        },
+    )
+
+
+def reservation_event(topic: str, reservation_id: int, product_id: int, quantity: int) -> dict:
+    """Build a `reservation.*` event."""
+    return outbox_event(
+        topic, reservation_id, {"id": reservation_id, "product_id": product_id, "quantity": quantity},
+    )
+
+
+def stock_event(
+    product_id: int, kind: StockMovementKind, delta: Optional[int] = None, stock: Optional[int] = None
+) -> dict:
+    """Build the `stock.changed` event of a product: the `delta` of a movement, or the new `stock` of an adjustment."""
+    return outbox_event(
+        "stock.changed", product_id, {"product_id": product_id, "kind": kind.value, "delta": delta, "stock": stock},
+    )
+
+
+class OutboxRepository(AbstractOutboxRepository):
+    """
+    SQLAlchemy implementation of the transactional outbox.
+
+    Event IDs are allocated when the writing transaction inserts the event, so they do not follow
+    commit order: an event can become visible after events with higher IDs. Publishing assigns the
+    stream `sequence` instead, under an advisory lock, to the events committed so far - readers
+    paging by sequence therefore never skip a late event.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def add_events(self, events: List[dict]) -> None:
+        """Write the given outbox event rows in the current transaction, without committing."""
+        await self.db.execute(outbox_insert_statement(events))
+
+    async def publish_pending(self, limit: int) -> int:
+        """
+        Number up to `limit` unpublished events, in ID order, after the last published sequence.
+
+        Returns 0 without waiting when another worker is publishing.
+        """
+        async with transaction_context(self.db):
+            locked = (await self.db.execute(select(func.pg_try_advisory_xact_lock(OUTBOX_PUBLISH_LOCK_KEY)))).scalar()
+            if not locked:
+                return 0
+
+            last_sequence = select(func.coalesce(func.max(OutboxEvent.sequence), 0)).scalar_subquery()
+            pending = (
+                select(OutboxEvent.id)
+                .where(OutboxEvent.sequence.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(limit)
+                .subquery("pending")
+            )
+            numbered = select(
+                pending.c.id, (last_sequence + func.row_number().over(order_by=pending.c.id)).label("sequence")
+            ).subquery("numbered")
+            query = (
+                update(OutboxEvent)
+                .where(OutboxEvent.id == numbered.c.id)
+                .values(sequence=numbered.c.sequence, published_at=datetime.utcnow())
+                .returning(OutboxEvent.id)
+                .execution_options(synchronize_session=False)
+            )
+            published = len((await self.db.execute(query)).all())
+            await commit(self.db)
+        return published
+
+    async def get_events(self, after: int, limit: int, topics: Optional[Sequence[str]] = None) -> List[dict]:
+        """Retrieve up to `limit` published events with a sequence above `after` from DB, in sequence order."""
+        query = select(
+            OutboxEvent.sequence.label("sequence"),
+            OutboxEvent.topic.label("topic"),
+            OutboxEvent.aggregate_id.label("aggregate_id"),
+            OutboxEvent.payload.label("payload"),
+            OutboxEvent.created_at.label("created_at"),
+        ).where(OutboxEvent.sequence > after)
+        if topics:
+            query = query.where(OutboxEvent.topic.in_(list(topics)))
+        query = query.order_by(OutboxEvent.sequence).limit(limit)
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    async def deliver(
+        self, sink: str, limit: int, send: Callable[[List[dict]], Awaitable[None]], lease: float
+    ) -> int:
+        """
+        Send the next published events not yet delivered to a sink and move its offset past them.
+
+        The worker claims the sink for `lease` seconds and commits before sending, so no transaction
+        or row lock is held while `send` runs; when another worker's claim is still running, nothing
+        is sent. If `send` raises, the claim is released with the offset unchanged and the events are
+        sent again on the next call (at-least-once delivery). A claim outliving its lease may be taken
+        over, and the late worker then does not move the offset.
+        """
+        claimed_by = uuid4().hex
+        async with transaction_context(self.db):
+            await self.db.execute(
+                pg_insert(OutboxSinkOffset).values(sink=sink, last_sequence=0).on_conflict_do_nothing()
+            )
+            now = datetime.utcnow()
+            claim = (
+                update(OutboxSinkOffset)
+                .where(
+                    OutboxSinkOffset.sink == sink,
+                    or_(OutboxSinkOffset.claimed_until.is_(None), OutboxSinkOffset.claimed_until < now),
+                )
+                .values(claimed_by=claimed_by, claimed_until=now + timedelta(seconds=lease))
+                .returning(OutboxSinkOffset.last_sequence)
+                .execution_options(synchronize_session=False)
+            )
+            last_sequence = (await self.db.execute(claim)).scalar_one_or_none()
+            events = await self.get_events(last_sequence, limit) if last_sequence is not None else []
+            await commit(self.db)
+        if last_sequence is None:
+            return 0
+
+        released = {"claimed_by": None, "claimed_until": None}
+        try:
+            if events:
+                await send(events)
+                released["last_sequence"] = events[-1]["sequence"]
+        finally:
+            async with transaction_context(self.db):
+                await self.db.execute(
+                    update(OutboxSinkOffset)
+                    .where(OutboxSinkOffset.sink == sink, OutboxSinkOffset.claimed_by == claimed_by)
+                    .values(**released)
+                    .execution_options(synchronize_session=False)
+                )
+                await commit(self.db)
+        return len(events)
+
+    async def purge_published(self, before: datetime, sinks: Sequence[str]) -> int:
+        """Delete events published before `before` and delivered to all `sinks` from DB."""
+        async with transaction_context(self.db):
+            query = delete(OutboxEvent).where(OutboxEvent.published_at < before)
+            if sinks:
+                delivered = (
+                    select(func.min(OutboxSinkOffset.last_sequence))
+                    .where(OutboxSinkOffset.sink.in_(list(sinks)))
+                    .scalar_subquery()
+                )
+                query = query.where(OutboxEvent.sequence <= delivered)
+            result = await self.db.execute(query)
+            await commit(self.db)
+        return result.rowcount
@@ -1,14 +1,207 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    String,
+    and_,
+    any_,
+    bindparam,
+    case,
+    func,
+    insert,
+    literal,
+    or_,
+    tuple_,
+    union,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 
-from src.infrastructure.db.context_managers import transaction_context
-from src.infrastructure.db.models.models import Category, Product
+from config import PRODUCT_SEARCH_CONFIG
+from src.infrastructure.cache.prefix_index import NAME_SUGGESTIONS
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import Category, Discount, OutboxEvent, Product, ProductStockShard, Reservation
 from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
+from src.repositories.implementation.catalog_change_repository import tombstone_insert_statement
+from src.repositories.implementation.outbox_repository import outbox_event, outbox_insert_statement
 from src.schemes.product_schemes import ProductCreateRequest
 
 
+def final_price_column():
+    """SQL expression of `Product.final_price`: the precomputed effective price column."""
+    return Product.effective_price
+
+
+def active_discount_filter(now: datetime):
+    """Condition selecting the discounts whose time window contains `now`."""
+    return and_(
+        or_(Discount.starts_at.is_(None), Discount.starts_at <= now),
+        or_(Discount.ends_at.is_(None), Discount.ends_at > now),
+    )
+
+
+def effective_price_update(now: datetime, product_ids: Optional[Iterable[int]] = None):
+    """
+    Build a set-based UPDATE recomputing `Product.effective_price` from the discounts active at `now`.
+
+    A product gets its own discount (`Product.discount_id`) and the discounts of its category and of
+    the category's ancestors. The best non-stackable discount applies, and stackable discounts
+    are multiplied on top of it. Only rows whose effective price changes are updated; the statement
+    returns their IDs.
+
+    :param product_ids: Limit the refresh to these products, all products when None.
+    """
+    product = aliased(Product)
+    parent = aliased(Category)
+    ancestors = select(
+        Category.id.label("category_id"), Category.id.label("ancestor_id")
+    ).cte("category_ancestors", recursive=True)
+    ancestors = ancestors.union_all(
+        select(ancestors.c.category_id, parent.parent_id)
+        .join(parent, parent.id == ancestors.c.ancestor_id)
+        .where(parent.parent_id.is_not(None))
+    )
+
+    own_discounts = (
+        select(product.id.label("product_id"), Discount.id, Discount.percentage, Discount.stackable)
+        .join(Discount, Discount.id == product.discount_id)
+        .where(active_discount_filter(now))
+    )
+    category_discounts = (
+        select(product.id.label("product_id"), Discount.id, Discount.percentage, Discount.stackable)
+        .join(ancestors, ancestors.c.category_id == product.category_id)
+        .join(Discount, Discount.category_id == ancestors.c.ancestor_id)
+        .where(active_discount_filter(now))
+    )
+    products = select(product.id.label("product_id"))
+    if product_ids is not None:
+        ids = bindparam("product_ids", list(product_ids), type_=ARRAY(Integer))
+        own_discounts = own_discounts.where(product.id == any_(ids))
+        category_discounts = category_discounts.where(product.id == any_(ids))
+        products = products.where(product.id == any_(ids))
+    # UNION (not ALL): a discount reached both ways applies once.
+    applicable = union(own_discounts, category_discounts).subquery("applicable_discounts")
+
+    factor = 1 - applicable.c.percentage / literal(100.0, Float)
+    exclusive = func.min(factor).filter(applicable.c.stackable.is_(False))
+    # Product of the stackable factors, as exp(sum(ln)); a 100% discount is clamped to a tiny factor.
+    stacked = func.exp(func.sum(func.ln(func.greatest(factor, 1e-9))).filter(applicable.c.stackable.is_(True)))
+    multipliers = (
+        select(
+            applicable.c.product_id,
+            (func.coalesce(exclusive, 1.0) * func.coalesce(stacked, 1.0)).label("multiplier"),
+        )
+        .group_by(applicable.c.product_id)
+        .subquery("discount_multipliers")
+    )
+    products = products.subquery("refreshed_products")
+    targets = (
+        select(products.c.product_id, func.coalesce(multipliers.c.multiplier, 1.0).label("multiplier"))
+        .select_from(products)
+        .outerjoin(multipliers, multipliers.c.product_id == products.c.product_id)
+        .subquery("effective_multipliers")
+    )
+
+    effective_price = Product.price * targets.c.multiplier
+    return (
+        update(Product)
+        .where(Product.id == targets.c.product_id, Product.effective_price.is_distinct_from(effective_price))
+        .values(effective_price=effective_price)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def category_subtree(category_id: int):
+    """Recursive CTE of the IDs of a category and of all its subcategories."""
+    child = aliased(Category)
+    subtree = select(Category.id).where(Category.id == category_id).cte("category_subtree", recursive=True)
+    return subtree.union_all(select(child.id).join(subtree, child.parent_id == subtree.c.id))
+
+
+def product_page(query, cursor: Optional[int], limit: int, sort: str = "id"):
+    """
+    Apply keyset pagination to a product query.
+
+    :param cursor: ID of the last product of the previous page.
+    :param sort: "id", or "final_price" for the cheapest products first (ties ordered by ID).
+    """
+    if sort == "final_price":
+        if cursor is not None:
+            after = aliased(Product)
+            cursor_price = select(after.effective_price).where(after.id == cursor).scalar_subquery()
+            query = query.filter(tuple_(Product.effective_price, Product.id) > tuple_(cursor_price, cursor))
+        return query.order_by(Product.effective_price, Product.id).limit(limit)
+
+    if cursor is not None:
+        query = query.filter(Product.id > cursor)
+    return query.order_by(Product.id).limit(limit)
+
+
+def product_response_query():
+    """
+    Build a query selecting exactly the ProductResponse fields, one row per product.
+
+    Category and discount names come from joins and the sharded stock and reserved quantity
+    from correlated aggregates, so a page of products is a single statement that does not
+    hydrate ORM entities or their relationships.
+    """
+    shard_stock = (
+        select(func.coalesce(func.sum(ProductStockShard.stock), 0))
+        .where(ProductStockShard.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    reserved_quantity = (
+        select(func.coalesce(func.sum(Reservation.quantity), 0))
+        .where(Reservation.product_id == Product.id, Reservation.active)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Product.id.label("id"),
+            Product.name.label("name"),
+            Product.description.label("description"),
+            Product.price.label("price"),
+            final_price_column().label("final_price"),
+            Category.id.label("category_id"),
+            Category.name.label("category_name"),
+            Product.discount_id.label("discount_id"),
+            Discount.name.label("discount_name"),
+            case((Product.stock_shard_count > 1, shard_stock), else_=Product.stock).label("stock"),
+            reserved_quantity.label("reserved_quantity"),
+        )
+        .select_from(Product)
+        .join(Category, Product.category_id == Category.id)
+        .outerjoin(Discount, Product.discount_id == Discount.id)
+    )
+
+
+def product_events_statement(topic: str, product_ids: Iterable[int]):
+    """
+    Build an INSERT ... SELECT writing one outbox event per product, with the ProductResponse fields
+    of the product as payload.
+
+    The payload is read in the statement, so it reflects the changes made earlier in the transaction.
+    """
+    rows = (
+        product_response_query()
+        .filter(Product.id == any_(bindparam("event_product_ids", list(product_ids), type_=ARRAY(Integer))))
+        .subquery("product_rows")
+    )
+    events = select(
+        literal(topic, String), rows.c.id, func.to_jsonb(rows.table_valued()), literal(datetime.utcnow(), DateTime)
+    )
+    return insert(OutboxEvent).from_select(["topic", "aggregate_id", "payload", "created_at"], events)
+
+
 class ProductRepository(AbstractProductRepository):
     """Implementation of Product repository using SQLAlchemy DB."""
 
@@ -17,40 +210,110 @@ class ProductRepository(AbstractProductRepository):
         self.db = db
 
     async def get_all_products(
-        self, cursor: Optional[int], limit: int = 10
-    ) -> List[Product]:
-        """Retrieve all Products with pagination form DB."""
-        query = select(Product)
-        if cursor is not None:
-            query = query.filter(Product.id > cursor)
-        query = query.order_by(Product.id).limit(limit)
+        self, cursor: Optional[int], limit: int = 10, sort: str = "id"
+    ) -> List[dict]:
+        """Retrieve all Products with pagination form DB, as dicts with the ProductResponse fields."""
+        query = product_page(product_response_query(), cursor, limit, sort)
         result = await self.db.execute(query)
-        return result.scalars().fetchmany(limit)
+        return [dict(row) for row in result.mappings()]
 
     async def add_product(self, **product_data: ProductCreateRequest) -> Product:
         """Add new Product to DB."""
         async with transaction_context(self.db):
-            product = Product(**product_data)
+            product = Product(**product_data, effective_price=product_data["price"])
 
             self.db.add(product)
-            await self.db.commit()
+            await self.db.flush()
+            await self._refresh_effective_price(product.id)
+            await self._record_product_events("product.created", [product.id])
+            await commit(self.db)
             await self.db.refresh(product)
+        NAME_SUGGESTIONS.add("product", product.id, product.name)
         return product
 
+    async def get_product_names(self) -> List[Tuple[int, str]]:
+        """Retrieve the (id, name) of all products from DB, ordered by ID."""
+        result = await self.db.execute(select(Product.id, Product.name).order_by(Product.id))
+        return result.all()
+
     async def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """Retrieve a Product by its ID from DB."""
         query = select(Product).filter(Product.id == product_id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_products_by_ids(self, product_ids: Iterable[int]) -> List[Product]:
+        """
+        Retrieve the products with the given IDs from DB, ordered by ID.
+
+        The IDs are bound as a single array parameter (`id = ANY(:product_ids)`), so the statement
+        is the same whatever the number of IDs.
+        """
+        ids = bindparam("product_ids", list(product_ids), type_=ARRAY(Integer))
+        query = select(Product).filter(Product.id == any_(ids)).order_by(Product.id)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_product_rows_by_ids(self, product_ids: Iterable[int]) -> List[dict]:
+        """Retrieve the products with the given IDs from DB, as dicts with the ProductResponse fields."""
+        ids = bindparam("product_ids", list(product_ids), type_=ARRAY(Integer))
+        query = product_response_query().filter(Product.id == any_(ids)).order_by(Product.id)
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    async def search_products(
+        self,
+        text: str,
+        cursor: Optional[int],
+        limit: int = 10,
+        category_id: Optional[int] = None,
+        in_stock: bool = False,
+    ) -> List[dict]:
+        """
+        Full-text search of product names and descriptions in DB, best matches first.
+
+        Matches use the GIN-indexed `search_vector` column and are ranked with `ts_rank` (name matches
+        weigh more than description matches), ties ordered by ID. The keyset cursor is the ID of the
+        last product of the previous page, whose rank is recomputed to continue after it.
+
+        :param text: Search query in the web search syntax (`"exact phrase"`, `or`, `-excluded`).
+        :param category_id: Only search in this category and its subcategories.
+        :param in_stock: Only return products with available stock.
+        :return: Dicts with the ProductResponse fields and the `rank` of the match.
+        """
+        ts_query = func.websearch_to_tsquery(PRODUCT_SEARCH_CONFIG, text)
+        rank = func.ts_rank(Product.search_vector, ts_query)
+        query = product_response_query().add_columns(rank.label("rank")).filter(
+            Product.search_vector.op("@@")(ts_query)
+        )
+        if category_id is not None:
+            query = query.filter(Product.category_id.in_(select(category_subtree(category_id))))
+        if in_stock:
+            query = query.filter((Product.stock > 0) | Product.stock_shards.any(ProductStockShard.stock > 0))
+        if cursor is not None:
+            after = aliased(Product)
+            cursor_rank = (
+                select(func.ts_rank(after.search_vector, ts_query)).where(after.id == cursor).scalar_subquery()
+            )
+            query = query.filter(or_(rank < cursor_rank, and_(rank == cursor_rank, Product.id > cursor)))
+        query = query.order_by(rank.desc(), Product.id).limit(limit)
+
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
     async def update_product(self, product_id: int, updated_data: dict) -> Product:
         """Update a Product by its ID in DB."""
         async with transaction_context(self.db):
             product = await self.get_product_by_id(product_id)
             if product:
                 self._update_product_fields(product, updated_data)
-                await self.db.commit()
+                await self.db.flush()
+                await self._refresh_effective_price(product_id)
+                await self._record_product_events("product.updated", [product_id])
+                await commit(self.db)
                 await self.db.refresh(product)
+                if "name" in updated_data:
+                    NAME_SUGGESTIONS.add("product", product.id, product.name)
         return product
 
     async def update_price(self, product_id: int, new_price: float) -> Product:
@@ -59,7 +322,10 @@ class ProductRepository(AbstractProductRepository):
             product = await self.get_product_by_id(product_id)
             if product:
                 product.price = new_price
-                await self.db.commit()
+                await self.db.flush()
+                await self._refresh_effective_price(product_id)
+                await self._record_product_events("product.updated", [product_id])
+                await commit(self.db)
                 await self.db.refresh(product)
             return product
 
@@ -70,26 +336,27 @@ class ProductRepository(AbstractProductRepository):
             if not product:
                 return False
             await self.db.delete(product)
-            await self.db.commit()
-            return True
+            await self.db.execute(
+                outbox_insert_statement([outbox_event("product.deleted", product_id, {"id": product_id})])
+            )
+            await self.db.execute(tombstone_insert_statement("product", [product_id]))
+            await commit(self.db)
+        NAME_SUGGESTIONS.remove("product", product_id)
+        return True
 
     async def get_products_by_category(
-        self, category_id: int, cursor: Optional[int], limit: int = 10
-    ) -> List[Product]:
-        """Retrieve products by category ID with pagination from DB."""
-        query = select(Product).filter(
-            (Product.category_id == category_id)
-            | (Product.category.has(Category.parent_id == category_id)),
-            Product.stock > 0,
+        self, category_id: int, cursor: Optional[int], limit: int = 10, sort: str = "id"
+    ) -> List[dict]:
+        """Retrieve products by category ID with pagination from DB, as dicts with the ProductResponse fields."""
+        query = product_response_query().filter(
+            (Product.category_id == category_id) | (Category.parent_id == category_id),
+            (Product.stock > 0) | Product.stock_shards.any(ProductStockShard.stock > 0),
         )
-
-        if cursor is not None:
-            query = query.filter(Product.id > cursor)
-        query = query.order_by(Product.id).limit(limit)
+        query = product_page(query, cursor, limit, sort)
 
         result = await self.db.execute(query)
 
-        return result.scalars().fetchmany(limit)
+        return [dict(row) for row in result.mappings()]
 
     async def add_discount_to_product(
         self, product_id: int, discount_id: int
@@ -98,7 +365,10 @@ class ProductRepository(AbstractProductRepository):
         async with transaction_context(self.db):
             product = await self.get_product_by_id(product_id)
             product.discount_id = discount_id
-            await self.db.commit()
+            await self.db.flush()
+            await self._refresh_effective_price(product_id)
+            await self._record_product_events("product.updated", [product_id])
+            await commit(self.db)
             await self.db.refresh(product)
         return product
 
@@ -107,7 +377,10 @@ class ProductRepository(AbstractProductRepository):
         async with transaction_context(self.db):
             product = await self.get_product_by_id(product_id)
             product.discount_id = None
-            await self.db.commit()
+            await self.db.flush()
+            await self._refresh_effective_price(product_id)
+            await self._record_product_events("product.updated", [product_id])
+            await commit(self.db)
             await self.db.refresh(product)
         return product
 
@@ -117,10 +390,121 @@ class ProductRepository(AbstractProductRepository):
             product = await self.get_product_by_id(product_id)
             if product:
                 product.stock = new_stock
-                await self.db.commit()
+                await self.db.flush()
+                await self._record_product_events("product.updated", [product_id])
+                await commit(self.db)
                 await self.db.refresh(product)
         return product
 
+    async def decrement_stock(self, product_id: int, quantity: int) -> Optional[int]:
+        """
+        Take `quantity` items from the stock if enough are available, without committing.
+
+        The check and the decrement are a single conditional UPDATE, so concurrent purchases cannot oversell.
+        Return the remaining stock, or None if the product does not exist or has not enough stock.
+        """
+        query = (
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .returning(Product.stock)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def increment_stock(self, product_id: int, quantity: int) -> Optional[int]:
+        """Return `quantity` items to the stock without committing. Return the new stock."""
+        query = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + quantity)
+            .returning(Product.stock)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def restock(self, product_id: int, quantity: int) -> Optional[int]:
+        """Add `quantity` items to the stock and commit. Return the new stock, or None if the product does not exist."""
+        async with transaction_context(self.db):
+            stock = await self.increment_stock(product_id, quantity)
+            if stock is not None:
+                await self._record_product_events("product.updated", [product_id])
+                await commit(self.db)
+        return stock
+
+    async def bulk_set_discount(
+        self,
+        discount_id: Optional[int],
+        product_ids: Optional[Iterable[int]] = None,
+        category_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        name_contains: Optional[str] = None,
+        current_discount_id: Optional[int] = None,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Set the discount of every selected product with one UPDATE and refresh their effective prices,
+        in a single transaction.
+
+        The selection criteria are combined; `category_id` covers the category and its subcategories.
+
+        :param discount_id: Discount to attach, None to detach discounts.
+        :param current_discount_id: Only update products that currently have this discount.
+        :return: IDs of the products whose discount changed, and of those whose effective price changed.
+        """
+        conditions = [Product.discount_id.is_distinct_from(discount_id)]
+        if product_ids is not None:
+            conditions.append(Product.id == any_(bindparam("product_ids", list(product_ids), type_=ARRAY(Integer))))
+        if category_id is not None:
+            conditions.append(Product.category_id.in_(select(category_subtree(category_id))))
+        if min_price is not None:
+            conditions.append(Product.price >= min_price)
+        if max_price is not None:
+            conditions.append(Product.price <= max_price)
+        if name_contains is not None:
+            conditions.append(Product.name.icontains(name_contains, autoescape=True))
+        if current_discount_id is not None:
+            conditions.append(Product.discount_id == current_discount_id)
+
+        query = (
+            update(Product)
+            .where(*conditions)
+            .values(discount_id=discount_id)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with transaction_context(self.db):
+            updated = (await self.db.execute(query)).scalars().all()
+            repriced = []
+            if updated:
+                repriced = (await self.db.execute(effective_price_update(datetime.utcnow(), updated))).scalars().all()
+                await self._record_product_events("product.updated", updated)
+            await commit(self.db)
+        return updated, repriced
+
+    async def refresh_effective_prices(self, product_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Recompute the effective prices from the currently active discounts and commit.
+
+        :param product_ids: Products to refresh, all products when None.
+        :return: IDs of the products whose effective price changed.
+        """
+        async with transaction_context(self.db):
+            result = await self.db.execute(effective_price_update(datetime.utcnow(), product_ids))
+            changed = result.scalars().all()
+            await self._record_product_events("product.updated", changed)
+            await commit(self.db)
+        return changed
+
+    async def _refresh_effective_price(self, product_id: int) -> None:
+        """Recompute the effective price of a product within the current transaction."""
+        await self.db.execute(effective_price_update(datetime.utcnow(), [product_id]))
+
+    async def _record_product_events(self, topic: str, product_ids: List[int]) -> None:
+        """Write a `product.*` outbox event for each product within the current transaction."""
+        if product_ids:
+            await self.db.execute(product_events_statement(topic, product_ids))
+
     @staticmethod
     def _update_product_fields(product: Product, updated_data: dict) -> None:
         """Update product fields for Product."""
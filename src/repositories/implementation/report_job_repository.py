@@ -0,0 +1,147 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import ReportJob, ReportJobStatus
+from src.repositories.abstract.abstract_report_job_repository import AbstractReportJobRepository
+
+# Seed of the advisory lock key derived from a filter hash, serializing the creation of identical jobs.
+REPORT_JOB_LOCK_SEED = 260047
+
+
+class ReportJobRepository(AbstractReportJobRepository):
+    """
+    SQLAlchemy implementation of the report job store.
+
+    Jobs are claimed with `FOR UPDATE SKIP LOCKED`, so the workers of all processes share the
+    queue without running a job twice.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def create_job(
+        self, filter_hash: str, filters: dict, format: str, expires_at: datetime
+    ) -> Tuple[ReportJob, bool]:
+        """
+        Create a pending job, unless a job with the same hash has not failed or expired yet.
+
+        Concurrent requests with the same filters wait for each other on an advisory lock of the
+        hash, so they end up sharing one job.
+        """
+        async with transaction_context(self.db):
+            lock_key = func.hashtextextended(filter_hash, REPORT_JOB_LOCK_SEED)
+            await self.db.execute(select(func.pg_advisory_xact_lock(lock_key)))
+
+            now = datetime.utcnow()
+            query = (
+                select(ReportJob)
+                .where(
+                    ReportJob.filter_hash == filter_hash,
+                    ReportJob.status != ReportJobStatus.FAILED.value,
+                    ReportJob.expires_at > now,
+                )
+                .order_by(ReportJob.created_at.desc())
+                .limit(1)
+            )
+            job = (await self.db.execute(query)).scalar_one_or_none()
+            if job is not None:
+                await commit(self.db)
+                return job, False
+
+            job = ReportJob(
+                id=uuid4().hex,
+                filter_hash=filter_hash,
+                filters=filters,
+                format=format,
+                status=ReportJobStatus.PENDING.value,
+                created_at=now,
+                expires_at=expires_at,
+            )
+            self.db.add(job)
+            await commit(self.db)
+            return job, True
+
+    async def get_job(self, job_id: str) -> Optional[ReportJob]:
+        """Retrieve a job that has not expired yet from DB."""
+        query = select(ReportJob).where(ReportJob.id == job_id, ReportJob.expires_at > datetime.utcnow())
+        return (await self.db.execute(query)).scalar_one_or_none()
+
+    async def claim_next(self) -> Optional[ReportJob]:
+        """Mark the oldest pending job as running and return it, skipping jobs claimed concurrently."""
+        async with transaction_context(self.db):
+            pending = (
+                select(ReportJob.id)
+                .where(ReportJob.status == ReportJobStatus.PENDING.value)
+                .order_by(ReportJob.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            statement = (
+                update(ReportJob)
+                .where(ReportJob.id == pending)
+                .values(status=ReportJobStatus.RUNNING.value, started_at=datetime.utcnow())
+                .returning(ReportJob)
+                .execution_options(synchronize_session=False)
+            )
+            job = (await self.db.execute(statement)).scalar_one_or_none()
+            await commit(self.db)
+            return job
+
+    async def finish_job(self, job_id: str, rows: int, size: int) -> bool:
+        """Mark a running job as done. Return False if it was failed meanwhile (e.g. as stale)."""
+        async with transaction_context(self.db):
+            result = await self.db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING.value)
+                .values(status=ReportJobStatus.DONE.value, rows=rows, size=size, finished_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+            return result.rowcount > 0
+
+    async def fail_job(self, job_id: str, error: str) -> None:
+        """Mark a running job as failed."""
+        async with transaction_context(self.db):
+            await self.db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING.value)
+                .values(status=ReportJobStatus.FAILED.value, error=error, finished_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+
+    async def fail_stale(self, started_before: datetime) -> int:
+        """Mark the jobs running since before `started_before` (e.g. of a stopped worker) as failed."""
+        async with transaction_context(self.db):
+            result = await self.db.execute(
+                update(ReportJob)
+                .where(ReportJob.status == ReportJobStatus.RUNNING.value, ReportJob.started_at < started_before)
+                .values(
+                    status=ReportJobStatus.FAILED.value,
+                    error="The report job did not finish in time.",
+                    finished_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+            return result.rowcount
+
+    async def purge_expired(self, now: datetime) -> List[Tuple[str, str]]:
+        """Delete the expired jobs from DB. Return the (id, format) of the deleted jobs."""
+        async with transaction_context(self.db):
+            result = await self.db.execute(
+                delete(ReportJob)
+                .where(ReportJob.expires_at <= now)
+                .returning(ReportJob.id, ReportJob.format)
+                .execution_options(synchronize_session=False)
+            )
+            purged = [(job_id, format) for job_id, format in result.all()]
+            await commit(self.db)
+            return purged
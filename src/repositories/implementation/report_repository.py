@@ -1,11 +1,22 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import ARRAY, BigInteger, String, any_, bindparam, cast, func, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from src.infrastructure.db.models.models import Category, Product, Sale
+from src.infrastructure.db.models.models import Category, Discount, Product, Sale
+from src.repositories.implementation.product_repository import final_price_column
+
+
+def transaction_bounds_query():
+    """
+    Build a query of the (xmin, xmax) transaction IDs of the current snapshot, as text (xid8 has no driver type).
+
+    Every transaction with an ID below xmin has ended; every transaction running now has an ID below xmax.
+    """
+    snapshot = func.pg_current_snapshot()
+    return select(cast(func.pg_snapshot_xmin(snapshot), String), cast(func.pg_snapshot_xmax(snapshot), String))
 
 
 class ReportRepository:
@@ -13,8 +24,8 @@ class ReportRepository:
     Repository implementation for fetching sales data using SQLAlchemy.
 
     This repository provides methods for generating sales reports by querying
-    sales data based on product, category, and date filters. It retrieves the sales
-    and their associated products, categories, and discounts.
+    sales data based on product, category, and date filters. It selects the sale fields
+    together with the names of their products, categories, and discounts.
     """
 
     def __init__(self, db: AsyncSession):
@@ -33,13 +44,13 @@ class ReportRepository:
         category_name: Optional[str] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[Sale]:
+    ) -> List[dict]:
         """
         Generate a sales report based on the provided filters.
 
         This method constructs a dynamic SQLAlchemy query to retrieve sales that match
-        the provided product, category, and date filters. It also loads related product,
-        category, and discount data for each sale.
+        the provided product, category, and date filters. It selects exactly the SaleResponse
+        fields, joining products, categories, and discounts in the same statement.
 
         :param product_id: The ID of the product to filter sales by.
         :param product_name: The name of the product to filter sales by.
@@ -47,12 +58,155 @@ class ReportRepository:
         :param category_name: The name of the category to filter sales by.
         :param start_date: The start date to filter sales by.
         :param end_date: The end date to filter sales by.
-        :return: A list of Sale objects that match the provided filters.
+        :return: A list of dicts with the SaleResponse fields of the matching sales.
+        """
+
+        query = self._sales_report_query(
+            product_id=product_id,
+            product_name=product_name,
+            category_id=category_id,
+            category_name=category_name,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    async def iter_sales_report(
+        self,
+        batch_size: int,
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Stream the rows of a sales report in batches, for reports too large to hold in memory.
+
+        The rows are read from a server-side cursor in sale ID order, `batch_size` at a time,
+        within one transaction of the session.
+
+        :param batch_size: Number of rows fetched and returned at a time.
+        :return: An async iterator of lists of dicts with the SaleResponse fields.
+        """
+        query = self._sales_report_query(
+            product_id=product_id,
+            product_name=product_name,
+            category_id=category_id,
+            category_name=category_name,
+            start_date=start_date,
+            end_date=end_date,
+        ).order_by(Sale.id)
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.mappings().partitions():
+            yield [dict(row) for row in rows]
+
+    async def get_transaction_bounds(self) -> Tuple[int, int]:
+        """
+        Return the (xmin, xmax) transaction IDs of the current snapshot.
+
+        Every transaction with an ID below xmin has ended; every transaction running now has an ID below xmax.
+        """
+        xmin, xmax = (await self.db.execute(transaction_bounds_query())).one()
+        return int(xmin), int(xmax)
+
+    async def get_sale_columns(
+        self, after_sale_id: int, limit: int, sale_ids: Optional[Sequence[int]] = None
+    ) -> List[Row]:
         """
+        Retrieve the columns of the sales snapshot for up to `limit` sales, in sale ID order.
 
-        query = select(Sale).options(
-            selectinload(Sale.product).selectinload(Product.category),
-            selectinload(Sale.product).selectinload(Product.discount),
+        Only sales with an ID above `after_sale_id`, or among `sale_ids` when given, are returned. Rows are
+        (id, product_id, quantity, sold_at in microseconds since the epoch, unit price); the unit price
+        falls back to the product price for sales recorded without one.
+        """
+        query = (
+            select(
+                Sale.id,
+                Sale.product_id,
+                Sale.quantity,
+                cast(func.extract("epoch", Sale.sold_at) * 1_000_000, BigInteger),
+                func.coalesce(Sale.unit_price, Product.price, 0),
+            )
+            .outerjoin(Product, Product.id == Sale.product_id)
+            .filter(Sale.id > after_sale_id)
+            .order_by(Sale.id)
+            .limit(limit)
+        )
+        if sale_ids is not None:
+            query = query.filter(Sale.id.in_(list(sale_ids)))
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def begin_snapshot(self) -> None:
+        """Start a REPEATABLE READ transaction: the following queries all see the snapshot of the first one."""
+        await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    async def get_visible_sale_ids(self, sale_ids: Sequence[int]) -> Set[int]:
+        """Return the IDs among `sale_ids` of the sales visible to the current transaction."""
+        ids = bindparam("sale_ids", list(sale_ids), type_=ARRAY(Sale.id.type))
+        result = await self.db.execute(select(Sale.id).filter(Sale.id == any_(ids)))
+        return set(result.scalars())
+
+    async def get_sale_buckets(self, since: datetime, until: Optional[datetime], bucket_seconds: int) -> List[Row]:
+        """
+        Retrieve units and revenue per product and time bucket of the sales sold in [since, until),
+        or since `since` when `until` is None.
+
+        Rows are (bucket, product_id, category_id, units, revenue), where bucket is the number of
+        `bucket_seconds` periods since the epoch; the category is the current one of the product.
+        """
+        bucket = cast(func.floor(func.extract("epoch", Sale.sold_at) / bucket_seconds), BigInteger).label("bucket")
+        query = (
+            select(
+                bucket,
+                Sale.product_id,
+                Product.category_id,
+                func.sum(Sale.quantity),
+                func.sum(Sale.quantity * func.coalesce(Sale.unit_price, Product.price, 0)),
+            )
+            .join(Product, Product.id == Sale.product_id)
+            .filter(Sale.sold_at >= since)
+            .group_by(bucket, Sale.product_id, Product.category_id)
+        )
+        if until is not None:
+            query = query.filter(Sale.sold_at < until)
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_product_categories(self) -> List[Row]:
+        """Retrieve the (product ID, category ID) pairs of all products with a category."""
+        result = await self.db.execute(select(Product.id, Product.category_id).filter(Product.category_id.isnot(None)))
+        return result.all()
+
+    @staticmethod
+    def _sales_report_query(
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
+        """Build the SELECT of the SaleResponse fields of the sales matching the filters."""
+        query = (
+            select(
+                Sale.id.label("id"),
+                Product.id.label("product_id"),
+                Product.name.label("product_name"),
+                final_price_column().label("product_price"),
+                Discount.name.label("discount_name"),
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                Sale.quantity.label("quantity"),
+                Sale.sold_at.label("sold_at"),
+            )
+            .select_from(Sale)
+            .join(Product, Sale.product_id == Product.id)
+            .join(Category, Product.category_id == Category.id)
+            .outerjoin(Discount, Product.discount_id == Discount.id)
         )
 
         if product_id:
@@ -65,14 +219,10 @@ class ReportRepository:
             query = query.filter(Product.category_id == category_id)
 
         if category_name:
-            query = query.join(Product.category).filter(
-                Category.name.ilike(f"%{category_name}%")
-            )
+            query = query.filter(Category.name.ilike(f"%{category_name}%"))
 
         if start_date:
             query = query.filter(Sale.sold_at >= start_date)
         if end_date:
             query = query.filter(Sale.sold_at <= end_date)
-
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        return query
@@ -1,11 +1,13 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from src.infrastructure.db.context_managers import transaction_context
+from src.infrastructure.db.context_managers import commit, transaction_context
 from src.infrastructure.db.models.models import Reservation
 from src.repositories.abstract.abstract_reservation_repository import AbstractReservationRepository
+from src.repositories.implementation.outbox_repository import outbox_insert_statement, reservation_event
 
 
 class ReservationRepository(AbstractReservationRepository):
@@ -29,7 +31,9 @@ class ReservationRepository(AbstractReservationRepository):
         async with transaction_context(self.db):
             reservation = Reservation(product_id=product_id, quantity=quantity)
             self.db.add(reservation)
-            await self.db.commit()
+            await self.db.flush()
+            await self._record_events("reservation.created", [reservation])
+            await commit(self.db)
             await self.db.refresh(reservation)
             return reservation
 
@@ -39,7 +43,8 @@ class ReservationRepository(AbstractReservationRepository):
             reservation = await self.get_reservation_by_id(reservation_id)
             if reservation:
                 reservation.active = False
-                await self.db.commit()
+                await self._record_events("reservation.cancelled", [reservation])
+                await commit(self.db)
                 await self.db.refresh(reservation)
                 return True
             return False
@@ -73,3 +78,41 @@ class ReservationRepository(AbstractReservationRepository):
         query = query.order_by(Reservation.id).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().fetchmany(limit)
+
+    async def lock_active_reservations(self, reservation_ids: Iterable[int]) -> List[Reservation]:
+        """
+        Fetch the active reservations with the given IDs from DB and lock them, in ID order,
+        until the end of the transaction.
+        """
+        query = (
+            select(Reservation)
+            .filter(Reservation.id.in_(list(reservation_ids)), Reservation.active.is_(True))
+            .order_by(Reservation.id)
+            .with_for_update()
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def close_reservations(self, reservation_ids: Iterable[int]) -> None:
+        """Mark reservations as inactive in DB without committing, writing their `reservation.closed` events."""
+        query = (
+            update(Reservation)
+            .where(Reservation.id.in_(list(reservation_ids)))
+            .values(active=False)
+            .returning(Reservation.id, Reservation.product_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        closed = (await self.db.execute(query)).all()
+        await self._record_events("reservation.closed", closed)
+
+    async def _record_events(self, topic: str, reservations: Iterable) -> None:
+        """
+        Write a `reservation.*` outbox event for each reservation (or reservation row) within the
+        current transaction.
+        """
+        events = [
+            reservation_event(topic, reservation.id, reservation.product_id, reservation.quantity)
+            for reservation in reservations
+        ]
+        if events:
+            await self.db.execute(outbox_insert_statement(events))
@@ -1,8 +1,21 @@
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.infrastructure.db.context_managers import transaction_context
+from config import SALE_ROLLUP_MODE
+from src.infrastructure.db.context_managers import after_commit, commit, transaction_context
 from src.infrastructure.db.models.models import Product, Sale
 from src.repositories.abstract.abstract_sale_repository import AbstractSaleRepository
+from src.repositories.implementation.outbox_repository import outbox_insert_statement, sale_event
+from src.repositories.implementation.sale_rollup_repository import rollup_upsert_statement
+
+
+def _rollup_sort_key(key: tuple) -> tuple:
+    """Order rollup keys whose category and discount may be None."""
+    day, product_id, category_id, discount_id = key
+    return day, product_id, category_id is not None, category_id or 0, discount_id is not None, discount_id or 0
 
 
 class SaleRepository(AbstractSaleRepository):
@@ -22,13 +35,90 @@ class SaleRepository(AbstractSaleRepository):
     async def buy_product(self, product: Product, quantity: int) -> Sale:
         """
         Create and persist a new sale record for the given product and quantity.
+
+        In the incremental rollup mode the daily sales rollup is updated in the same transaction,
+        as is the `sale.created` outbox event written.
         """
         async with transaction_context(self.db):
-            discount_id = product.discount_id
             sale = Sale(
-                product_id=product.id, quantity=quantity, discount_id=discount_id
+                product_id=product.id,
+                quantity=quantity,
+                discount_id=product.discount_id,
+                unit_price=product.final_price,
             )
             self.db.add(sale)
-            await self.db.commit()
+            await self.db.flush()
+            await self._update_rollup([(product, sale)])
+            await self.db.execute(outbox_insert_statement([sale_event(sale)]))
+            await commit(self.db)
             await self.db.refresh(sale)
             return sale
+
+    async def create_sales(self, lines: List[Tuple[Product, int]]) -> List[Sale]:
+        """
+        Create one sale per (product, quantity) line with a single multi-row INSERT and commit once.
+
+        Pending changes of the session (e.g. taken stock) are committed together with the sales
+        and their `sale.created` outbox events.
+        Sales are returned in the order of the lines.
+        """
+        async with transaction_context(self.db):
+            sold_at = datetime.utcnow()
+            result = await self.db.scalars(
+                insert(Sale).returning(Sale, sort_by_parameter_order=True),
+                [
+                    {
+                        "product_id": product.id,
+                        "quantity": quantity,
+                        "discount_id": product.discount_id,
+                        "unit_price": product.final_price,
+                        "sold_at": sold_at,
+                    }
+                    for product, quantity in lines
+                ],
+            )
+            sales = result.all()
+            await self._update_rollup([(product, sale) for (product, _), sale in zip(lines, sales)])
+            await self.db.execute(outbox_insert_statement([sale_event(sale) for sale in sales]))
+            await commit(self.db)
+            return sales
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run `callback` once the sales are committed: right away, or after the unit of work
+        the session is in (see `single_transaction` of the idempotency keys) commits.
+        """
+        after_commit(self.db, callback)
+
+    async def _update_rollup(self, sales: List[Tuple[Product, Sale]]) -> None:
+        """
+        Add the sales to the daily sales rollup in the incremental rollup mode.
+
+        Sales sharing a rollup key are summed first, as one upsert cannot update the same row twice,
+        and the rows are upserted in key order, so concurrent checkouts lock them in the same order
+        instead of deadlocking on each other.
+
+        The rollup row of a product and day is updated by every sale of it and stays locked until commit,
+        so purchases of one product wait for each other here even when its stock is sharded;
+        hot products need the "refresher" rollup mode (see SALE_ROLLUP_MODE).
+        """
+        if SALE_ROLLUP_MODE != "incremental":
+            return
+
+        rows = {}
+        for product, sale in sales:
+            key = (sale.sold_at.date(), product.id, product.category_id, sale.discount_id)
+            row = rows.setdefault(
+                key,
+                {
+                    "day": key[0],
+                    "product_id": product.id,
+                    "category_id": product.category_id,
+                    "discount_id": sale.discount_id,
+                    "units": 0,
+                    "revenue": 0.0,
+                },
+            )
+            row["units"] += sale.quantity
+            row["revenue"] += sale.quantity * sale.unit_price
+        await self.db.execute(rollup_upsert_statement([rows[key] for key in sorted(rows, key=_rollup_sort_key)]))
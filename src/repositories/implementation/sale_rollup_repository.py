@@ -0,0 +1,317 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import (
+    ARRAY,
+    Date,
+    DateTime,
+    Integer,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import (
+    Category,
+    Product,
+    Sale,
+    SaleDailyRollup,
+    SaleRollupGap,
+    SaleRollupWatermark,
+)
+from src.repositories.abstract.abstract_sale_rollup_repository import AbstractSaleRollupRepository
+from src.repositories.implementation.report_repository import transaction_bounds_query
+
+ROLLUP_WATERMARK_NAME = "sale_daily_rollup"
+ROLLUP_LOCK_KEY = 260026
+ROLLUP_GRANULARITIES = ("day", "week", "month", "year")
+
+
+def rollup_upsert_statement(values: List[dict]):
+    """
+    Build an upsert adding `units` and `revenue` of the given rows to the matching rollup rows.
+
+    Each value is a dict with `day`, `product_id`, `category_id`, `discount_id`, `units` and `revenue` keys.
+    """
+    statement = pg_insert(SaleDailyRollup).values(values)
+    return statement.on_conflict_do_update(
+        constraint="uq_sale_daily_rollup_key",
+        set_={
+            "units": SaleDailyRollup.units + statement.excluded.units,
+            "revenue": SaleDailyRollup.revenue + statement.excluded.revenue,
+        },
+    )
+
+
+def _fold_sales_statement(*conditions):
+    """Build an upsert folding the sales matching `conditions` into the rollup."""
+    day = cast(Sale.sold_at, Date)
+    sales = (
+        select(
+            day,
+            Sale.product_id,
+            Product.category_id,
+            Sale.discount_id,
+            func.sum(Sale.quantity),
+            func.sum(Sale.quantity * func.coalesce(Sale.unit_price, Product.price)),
+        )
+        .join(Product, Product.id == Sale.product_id)
+        .filter(*conditions)
+        .group_by(day, Sale.product_id, Product.category_id, Sale.discount_id)
+    )
+    statement = pg_insert(SaleDailyRollup).from_select(
+        ["day", "product_id", "category_id", "discount_id", "units", "revenue"], sales
+    )
+    return statement.on_conflict_do_update(
+        constraint="uq_sale_daily_rollup_key",
+        set_={
+            "units": SaleDailyRollup.units + statement.excluded.units,
+            "revenue": SaleDailyRollup.revenue + statement.excluded.revenue,
+        },
+    )
+
+
+def _sale_id_in(sale_ids: List[int]):
+    """Condition selecting the sales with the given IDs, bound as one array parameter."""
+    return Sale.id == any_(bindparam("sale_ids", list(sale_ids), type_=ARRAY(Integer)))
+
+
+class SaleRollupRepository(AbstractSaleRollupRepository):
+    """
+    SQLAlchemy implementation of the daily sales rollup.
+
+    Rollup rows are either upserted together with every sale (see `SaleRepository.buy_product`)
+    or folded in batches by `refresh_from_watermark` and `refresh_gaps`, depending on `SALE_ROLLUP_MODE`.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def ensure_backfilled(self, mode: str) -> None:
+        """
+        Fold all existing sales into the rollup once, if it was never built, and re-seed the
+        watermark when `SALE_ROLLUP_MODE` changed since the last startup.
+
+        The watermark only advances in the "refresher" mode. Switching to it moves the watermark
+        past the sales already upserted in the "incremental" mode, so they are not folded twice;
+        switching to "incremental" first folds the sales the refresher had not reached yet,
+        including the committed sales of its gaps. Both assume every worker runs the same mode.
+
+        :param mode: The SALE_ROLLUP_MODE of this process.
+        """
+        async with transaction_context(self.db):
+            await self.db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_KEY)))
+            watermark = await self.db.get(SaleRollupWatermark, ROLLUP_WATERMARK_NAME)
+            if watermark is not None and watermark.mode in (mode, None):
+                watermark.mode = mode
+                await commit(self.db)
+                return
+
+            last_sale_id = (await self.db.execute(select(func.max(Sale.id)))).scalar() or 0
+            if watermark is None:
+                if last_sale_id:
+                    await self.db.execute(_fold_sales_statement(Sale.id <= last_sale_id))
+                self.db.add(SaleRollupWatermark(name=ROLLUP_WATERMARK_NAME, last_sale_id=last_sale_id, mode=mode))
+            else:
+                if mode == "incremental":
+                    await self.db.execute(
+                        _fold_sales_statement(Sale.id > watermark.last_sale_id, Sale.id <= last_sale_id)
+                    )
+                    await self.db.execute(_fold_sales_statement(Sale.id.in_(select(SaleRollupGap.sale_id))))
+                    await self.db.execute(delete(SaleRollupGap))
+                watermark.last_sale_id = last_sale_id
+                watermark.mode = mode
+            await commit(self.db)
+
+    async def refresh_from_watermark(self, batch_size: int) -> int:
+        """
+        Fold the next `batch_size` sales above the stored watermark into the rollup and move the
+        watermark to the last of them.
+
+        Sale IDs are drawn before commit, so the IDs skipped below the new watermark may belong to
+        sales still being committed; they are stored as gaps for `refresh_gaps`.
+
+        :return: Number of folded sales.
+        """
+        async with transaction_context(self.db):
+            watermark = await self._lock_watermark()
+            query = select(Sale.id).filter(Sale.id > watermark.last_sale_id).order_by(Sale.id).limit(batch_size)
+            sale_ids = (await self.db.execute(query)).scalars().all()
+            if not sale_ids:
+                return 0
+
+            # By ID rather than by range: a gap committing meanwhile is left to `refresh_gaps`.
+            await self.db.execute(_fold_sales_statement(_sale_id_in(sale_ids)))
+            gaps = sorted(set(range(watermark.last_sale_id + 1, sale_ids[-1])).difference(sale_ids))
+            if gaps:
+                await self.db.execute(insert(SaleRollupGap), [{"sale_id": sale_id} for sale_id in gaps])
+            watermark.last_sale_id = sale_ids[-1]
+            await commit(self.db)
+            return len(sale_ids)
+
+    async def refresh_gaps(self) -> int:
+        """
+        Fold the sales of the stored gaps that committed since, and drop the gaps no transaction can fill anymore.
+
+        A gap is dropped once the snapshot xmin (oldest running transaction) reaches the snapshot xmax
+        (next transaction ID) read at the call after the one that found it, when the transaction that
+        drew the sale ID has its own transaction ID for sure. Meant to be called once per refresh
+        interval, so gaps of rolled back or deleted sales are looked up two or three times.
+
+        :return: Number of folded sales.
+        """
+        async with transaction_context(self.db):
+            # Read first: transactions that ended before are visible to the statements below.
+            oldest_running, next_transaction = map(int, (await self.db.execute(transaction_bounds_query())).one())
+            await self._lock_watermark()
+            filled = (
+                await self.db.execute(
+                    delete(SaleRollupGap)
+                    .where(exists().where(Sale.id == SaleRollupGap.sale_id))
+                    .returning(SaleRollupGap.sale_id)
+                )
+            ).scalars().all()
+            if filled:
+                await self.db.execute(_fold_sales_statement(_sale_id_in(filled)))
+            await self.db.execute(delete(SaleRollupGap).where(SaleRollupGap.retire_after <= oldest_running))
+            await self.db.execute(
+                update(SaleRollupGap).where(SaleRollupGap.retire_after.is_(None)).values(retire_after=next_transaction)
+            )
+            await commit(self.db)
+            return len(filled)
+
+    async def _lock_watermark(self) -> SaleRollupWatermark:
+        """Lock the watermark row for the current transaction, creating it when missing."""
+        query = (
+            select(SaleRollupWatermark)
+            .filter(SaleRollupWatermark.name == ROLLUP_WATERMARK_NAME)
+            .with_for_update()
+        )
+        watermark = (await self.db.execute(query)).scalar_one_or_none()
+        if watermark is None:
+            watermark = SaleRollupWatermark(name=ROLLUP_WATERMARK_NAME, last_sale_id=0)
+            self.db.add(watermark)
+        return watermark
+
+    async def get_rollup_summary(
+        self,
+        granularity: str,
+        start_day: Optional[datetime] = None,
+        end_day: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Aggregate rollup rows for whole days in `[start_day, end_day)`.
+
+        Rows are grouped and filtered by the current category of the product, like `get_raw_summary`,
+        so a report does not depend on which of the two served a day.
+        """
+        period = self._period(granularity, cast(SaleDailyRollup.day, DateTime))
+        query = (
+            select(
+                period,
+                SaleDailyRollup.product_id,
+                Product.category_id,
+                SaleDailyRollup.discount_id,
+                func.sum(SaleDailyRollup.units).label("units"),
+                func.sum(SaleDailyRollup.revenue).label("revenue"),
+            )
+            .join(Product, Product.id == SaleDailyRollup.product_id)
+            .group_by(period, SaleDailyRollup.product_id, Product.category_id, SaleDailyRollup.discount_id)
+        )
+
+        if product_id:
+            query = query.filter(SaleDailyRollup.product_id == product_id)
+
+        if product_name:
+            query = query.filter(Product.name.ilike(f"%{product_name}%"))
+
+        if category_id:
+            query = query.filter(Product.category_id == category_id)
+
+        if category_name:
+            query = query.join(Category, Category.id == Product.category_id).filter(
+                Category.name.ilike(f"%{category_name}%")
+            )
+
+        if start_day:
+            query = query.filter(SaleDailyRollup.day >= start_day.date())
+        if end_day:
+            query = query.filter(SaleDailyRollup.day < end_day.date())
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_raw_summary(
+        self,
+        granularity: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        end_inclusive: bool = False,
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+    ) -> List[Row]:
+        """Aggregate raw sales rows in the given range, used for partial days."""
+        period = self._period(granularity, Sale.sold_at)
+        query = (
+            select(
+                period,
+                Sale.product_id,
+                Product.category_id,
+                Sale.discount_id,
+                func.sum(Sale.quantity).label("units"),
+                func.sum(Sale.quantity * func.coalesce(Sale.unit_price, Product.price)).label("revenue"),
+            )
+            .join(Product, Product.id == Sale.product_id)
+            .group_by(period, Sale.product_id, Product.category_id, Sale.discount_id)
+        )
+
+        if product_id:
+            query = query.filter(Sale.product_id == product_id)
+
+        if product_name:
+            query = query.filter(Product.name.ilike(f"%{product_name}%"))
+
+        if category_id:
+            query = query.filter(Product.category_id == category_id)
+
+        if category_name:
+            query = query.join(Category, Category.id == Product.category_id).filter(
+                Category.name.ilike(f"%{category_name}%")
+            )
+
+        if start_date:
+            query = query.filter(Sale.sold_at >= start_date)
+        if end_date:
+            query = query.filter(Sale.sold_at <= end_date if end_inclusive else Sale.sold_at < end_date)
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    @staticmethod
+    def _period(granularity: str, column):
+        """
+        Truncate a timestamp column to the start of its report period.
+
+        The granularity is rendered inline, so that the same expression can be used in SELECT and GROUP BY.
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unsupported rollup granularity: {granularity}")
+        return cast(func.date_trunc(literal_column(f"'{granularity}'"), column), Date).label("period")
@@ -0,0 +1,189 @@
+from typing import List, Optional
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import Product, StockBalance, StockMovement, StockMovementKind
+from src.repositories.abstract.abstract_stock_ledger_repository import AbstractStockLedgerRepository
+
+# Advisory lock namespaces. Writers hold the compaction barrier in shared mode, so they never
+# wait for each other; compaction takes it exclusively just long enough to wait out the in-flight
+# appends, and serializes with other compactions on a lock of its own.
+PRODUCT_LOCK_NAMESPACE = 2801
+COMPACTION_BARRIER_NAMESPACE = 2802
+COMPACTION_BARRIER_KEY, COMPACTION_LOCK_KEY = 0, 1
+
+
+class StockLedgerRepository(AbstractStockLedgerRepository):
+    """
+    SQLAlchemy implementation of the append-only stock movement ledger.
+
+    Writers only INSERT movements, so stock changes do not rewrite (and bloat) the product row,
+    and restocks and returns append without waiting for anyone. Taking and setting stock are
+    serialized per product with a transaction-level advisory lock, held until the caller commits:
+    a concurrent take must see the committed movement before checking the availability. Purchases
+    of one product therefore still queue one behind the other, as on the `products.stock` row
+    lock: the ledger does not remove hot-row contention, stock shards do.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def get_available_stock(self, product_id: int) -> Optional[int]:
+        """
+        Return the compacted balance plus the movements appended since the last compaction.
+
+        Products without a balance yet start from their `products.stock` value.
+        """
+        recent_delta = (
+            select(func.sum(StockMovement.delta))
+            .filter(
+                StockMovement.product_id == Product.id,
+                StockMovement.id > func.coalesce(StockBalance.last_movement_id, 0),
+            )
+            .correlate(Product, StockBalance)
+            .scalar_subquery()
+        )
+        query = (
+            select(func.coalesce(StockBalance.balance, Product.stock, 0) + func.coalesce(recent_delta, 0))
+            .select_from(Product)
+            .outerjoin(StockBalance, StockBalance.product_id == Product.id)
+            .filter(Product.id == product_id)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def append_movement(self, product_id: int, kind: StockMovementKind, delta: int) -> StockMovement:
+        """Append a movement to the ledger without committing it."""
+        await self._enter_compaction_barrier()
+        movement = StockMovement(product_id=product_id, kind=kind.value, delta=delta)
+        self.db.add(movement)
+        await self.db.flush()
+        return movement
+
+    async def take_stock(self, product_id: int, kind: StockMovementKind, quantity: int) -> bool:
+        """Append a movement taking `quantity` items if enough stock is available, without committing it."""
+        await self.lock_product(product_id)
+        available = await self.get_available_stock(product_id)
+        if available is None or available < quantity:
+            return False
+        await self.append_movement(product_id, kind, -quantity)
+        return True
+
+    async def adjust_stock(self, product_id: int, new_stock: int) -> None:
+        """
+        Append an adjustment bringing the available stock to `new_stock`, without committing it.
+
+        The product gets a balance first (if it has none), so a later write of `products.stock`
+        (e.g. by resharding) no longer counts in its available stock.
+        """
+        await self.lock_product(product_id)
+        await self.db.execute(
+            pg_insert(StockBalance)
+            .from_select(
+                ["product_id", "balance", "last_movement_id"],
+                select(Product.id, func.coalesce(Product.stock, 0), literal(0)).filter(Product.id == product_id),
+            )
+            .on_conflict_do_nothing(index_elements=["product_id"])
+        )
+        available = await self.get_available_stock(product_id)
+        if available is not None and new_stock != available:
+            await self.append_movement(product_id, StockMovementKind.ADJUSTMENT, new_stock - available)
+
+    async def restock(self, product_id: int, quantity: int) -> StockMovement:
+        """Append and commit a movement returning `quantity` items to the stock."""
+        async with transaction_context(self.db):
+            movement = await self.append_movement(product_id, StockMovementKind.RESTOCK, quantity)
+            await commit(self.db)
+        return movement
+
+    async def lock_product(self, product_id: int) -> None:
+        """Serialize the stock changes of a product that check its availability until the end of the transaction."""
+        await self._enter_compaction_barrier()
+        await self.db.execute(select(func.pg_advisory_xact_lock(PRODUCT_LOCK_NAMESPACE, product_id)))
+
+    async def get_movements(self, product_id: int, cursor: Optional[int], limit: int = 10) -> List[StockMovement]:
+        """Retrieve movements of a product with pagination from DB."""
+        query = select(StockMovement).filter(StockMovement.product_id == product_id)
+        if cursor is not None:
+            query = query.filter(StockMovement.id > cursor)
+        query = query.order_by(StockMovement.id).limit(limit)
+        result = await self.db.execute(query)
+        return result.scalars().fetchmany(limit)
+
+    async def compact(self) -> int:
+        """
+        Fold all movements appended since the previous compaction into the balances.
+
+        `products.stock` of every compacted product is set to its new balance, so listings
+        show the ledger stock without reading the movements.
+        """
+        async with transaction_context(self.db):
+            await self.db.execute(select(func.pg_advisory_xact_lock(COMPACTION_BARRIER_NAMESPACE, COMPACTION_LOCK_KEY)))
+            last_movement_id = await self._wait_for_appends()
+            compacted_movement_id = (
+                await self.db.execute(select(func.coalesce(func.max(StockBalance.last_movement_id), 0)))
+            ).scalar()
+            if last_movement_id is None or last_movement_id <= compacted_movement_id:
+                return 0
+
+            pending = (
+                select(StockMovement.product_id, func.sum(StockMovement.delta).label("delta"))
+                .filter(StockMovement.id > compacted_movement_id, StockMovement.id <= last_movement_id)
+                .group_by(StockMovement.product_id)
+                .subquery()
+            )
+            pending_products = select(pending.c.product_id)
+
+            await self.db.execute(
+                pg_insert(StockBalance)
+                .from_select(
+                    ["product_id", "balance", "last_movement_id"],
+                    select(Product.id, func.coalesce(Product.stock, 0), literal(0)).filter(
+                        Product.id.in_(pending_products)
+                    ),
+                )
+                .on_conflict_do_nothing(index_elements=["product_id"])
+            )
+            result = await self.db.execute(
+                update(StockBalance)
+                .where(StockBalance.product_id == pending.c.product_id)
+                .values(balance=StockBalance.balance + pending.c.delta, last_movement_id=last_movement_id)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.execute(
+                update(Product)
+                .where(
+                    Product.id == StockBalance.product_id,
+                    StockBalance.product_id.in_(pending_products),
+                    Product.stock.is_distinct_from(StockBalance.balance),
+                )
+                .values(stock=StockBalance.balance)
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+            return result.rowcount
+
+    async def _enter_compaction_barrier(self) -> None:
+        """Hold the compaction barrier in shared mode until the end of the transaction."""
+        await self.db.execute(
+            select(func.pg_advisory_xact_lock_shared(COMPACTION_BARRIER_NAMESPACE, COMPACTION_BARRIER_KEY))
+        )
+
+    async def _wait_for_appends(self) -> Optional[int]:
+        """
+        Wait for the in-flight appends to commit and return the last movement ID.
+
+        Appends take their ID after entering the barrier, so every movement up to the returned ID
+        is committed and later ones get higher IDs. The barrier is taken at session level and
+        released right away, so writers only wait for the appends that were already in flight.
+        """
+        barrier = (COMPACTION_BARRIER_NAMESPACE, COMPACTION_BARRIER_KEY)
+        await self.db.execute(select(func.pg_advisory_lock(*barrier)))
+        try:
+            return (await self.db.execute(select(func.max(StockMovement.id)))).scalar()
+        finally:
+            await self.db.execute(select(func.pg_advisory_unlock(*barrier)))
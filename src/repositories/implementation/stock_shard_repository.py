@@ -0,0 +1,144 @@
+import random
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.db.context_managers import commit, transaction_context
+from src.infrastructure.db.models.models import Product, ProductStockShard
+from src.repositories.abstract.abstract_stock_shard_repository import AbstractStockShardRepository
+
+
+class StockShardRepository(AbstractStockShardRepository):
+    """
+    SQLAlchemy implementation of sharded stock counters.
+
+    Purchases start at a random slot and decrement it with a conditional UPDATE, moving on to
+    the next slots when it runs short. Only when no single slot can serve the quantity are all
+    slots locked (in slot order) and drained together.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Init DB session."""
+        self.db = db
+
+    async def get_total_stock(self, product_id: int) -> int:
+        """Return the sum of all stock slots of a product."""
+        query = select(func.coalesce(func.sum(ProductStockShard.stock), 0)).filter(
+            ProductStockShard.product_id == product_id
+        )
+        result = await self.db.execute(query)
+        return result.scalar()
+
+    async def take_stock(self, product_id: int, shard_count: int, quantity: int) -> bool:
+        """Take `quantity` items from the slots of a product without committing."""
+        start = random.randrange(shard_count)
+        for offset in range(shard_count):
+            query = (
+                update(ProductStockShard)
+                .where(
+                    ProductStockShard.product_id == product_id,
+                    ProductStockShard.slot == (start + offset) % shard_count,
+                    ProductStockShard.stock >= quantity,
+                )
+                .values(stock=ProductStockShard.stock - quantity)
+                .returning(ProductStockShard.slot)
+            )
+            if (await self.db.execute(query)).scalar_one_or_none() is not None:
+                return True
+        return await self._take_across_slots(product_id, quantity)
+
+    async def return_stock(self, product_id: int, shard_count: int, quantity: int) -> None:
+        """Return `quantity` items to a random slot of a product without committing."""
+        query = (
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.product_id == product_id,
+                ProductStockShard.slot == random.randrange(shard_count),
+            )
+            .values(stock=ProductStockShard.stock + quantity)
+        )
+        await self.db.execute(query)
+
+    async def reshard(self, product_id: int, shard_count: int, unsharded_stock: Optional[int] = None) -> int:
+        """
+        Redistribute the stock of a product evenly across `shard_count` slots.
+
+        The product row and its slots are locked, so no purchase is lost while the slots are rewritten.
+        A shard count of one moves the stock back to `products.stock`.
+
+        :param unsharded_stock: Stock to distribute when the product is not sharded yet,
+            defaults to `products.stock`.
+        :return: The total stock of the product, or None if the product does not exist.
+        """
+        async with transaction_context(self.db):
+            current = await self.lock_stock(product_id)
+            if current is None:
+                return None
+
+            current_shard_count, total = current
+            if current_shard_count == 1 and unsharded_stock is not None:
+                total = unsharded_stock
+
+            await self.db.execute(
+                delete(ProductStockShard)
+                .where(ProductStockShard.product_id == product_id)
+                .execution_options(synchronize_session=False)
+            )
+            if shard_count > 1:
+                per_slot, remainder = divmod(total, shard_count)
+                await self.db.execute(
+                    insert(ProductStockShard),
+                    [
+                        {"product_id": product_id, "slot": slot, "stock": per_slot + (1 if slot < remainder else 0)}
+                        for slot in range(shard_count)
+                    ],
+                )
+            await self.db.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(stock_shard_count=shard_count, stock=0 if shard_count > 1 else total)
+                .execution_options(synchronize_session=False)
+            )
+            await commit(self.db)
+        return total
+
+    async def lock_stock(self, product_id: int) -> Optional[Tuple[int, int]]:
+        """
+        Lock the product row and its slots until the end of the transaction, without committing.
+
+        :return: The shard count of the product and its stock (the sum of its slots when sharded,
+            `products.stock` otherwise), or None if the product does not exist.
+        """
+        query = select(Product.stock_shard_count, Product.stock).filter(Product.id == product_id).with_for_update()
+        current = (await self.db.execute(query)).one_or_none()
+        if current is None:
+            return None
+        if current.stock_shard_count == 1:
+            return 1, current.stock or 0
+
+        slots = select(ProductStockShard.stock).filter(ProductStockShard.product_id == product_id)
+        return current.stock_shard_count, sum((await self.db.execute(slots.with_for_update())).scalars().all())
+
+    async def _take_across_slots(self, product_id: int, quantity: int) -> bool:
+        """Lock all slots of a product in slot order and drain them until `quantity` items are taken."""
+        query = (
+            select(ProductStockShard)
+            .filter(ProductStockShard.product_id == product_id)
+            .order_by(ProductStockShard.slot)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        shards = (await self.db.execute(query)).scalars().all()
+        if sum(shard.stock for shard in shards) < quantity:
+            return False
+
+        remaining = quantity
+        for shard in shards:
+            taken = min(shard.stock, remaining)
+            shard.stock -= taken
+            remaining -= taken
+            if not remaining:
+                break
+        await self.db.flush()
+        return True
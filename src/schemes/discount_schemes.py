@@ -1,12 +1,32 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, model_validator
 
 
 class DiscountCreateRequest(BaseModel):
-    """Schema for creating a new Discount."""
+    """
+    Schema for creating a new Discount.
+
+    A discount is active between `starts_at` and `ends_at` (either may be left open). With a
+    `category_id` it applies to every product of the category and its subcategories; otherwise it
+    applies to the products it is attached to. Stackable discounts combine with each other and
+    with the best non-stackable discount of a product.
+    """
 
     name: str
     percentage: float
     description: str = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    category_id: Optional[int] = None
+    stackable: bool = False
+
+    @model_validator(mode="after")
+    def check_window(self) -> "DiscountCreateRequest":
+        if self.starts_at is not None and self.ends_at is not None and self.ends_at <= self.starts_at:
+            raise ValueError("ends_at must be after starts_at.")
+        return self
 
 
 class DiscountResponse(BaseModel):
@@ -16,6 +36,10 @@ class DiscountResponse(BaseModel):
     name: str
     percentage: float
     description: str = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    category_id: Optional[int] = None
+    stackable: bool = False
 
     class Config:
         from_attributes = True
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class EventResponse(BaseModel):
+    """
+    Schema for returning a published domain event.
+
+    Topics are `product.created`, `product.updated` (payload with the ProductResponse fields),
+    `product.deleted`, `sale.created`, `reservation.created`, `reservation.cancelled` and
+    `reservation.closed` (reservation converted into a sale).
+    """
+
+    sequence: int
+    topic: str
+    aggregate_id: Optional[int] = None
+    payload: dict
+    created_at: datetime
+
+
+class EventBatchResponse(BaseModel):
+    """
+    Schema for returning a page of the event stream.
+
+    Pass `last_sequence` as `after` of the next request; it is the `after` of the request when
+    no event was returned.
+    """
+
+    events: List[EventResponse]
+    last_sequence: int
@@ -0,0 +1,26 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TopProductsRequest(BaseModel):
+    """
+    Schema for a best-sellers query: the sliding window, the ranking metric, an optional category and the top N.
+    """
+
+    window: Literal["hour", "day", "week"] = "day"
+    order_by: Literal["units", "revenue"] = "units"
+    category_id: Optional[int] = None
+    limit: int = Field(10, ge=1, le=1000)
+
+
+class TopProductResponse(BaseModel):
+    """
+    Schema for a best-selling product: its rank, units sold and revenue within the window.
+    """
+
+    rank: int
+    product_id: int
+    category_id: Optional[int] = None
+    units: int
+    revenue: float
@@ -1,6 +1,9 @@
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+from config import BULK_DISCOUNT_MAX_IDS, CATALOG_CHANGES_MAX_LIMIT
+from src.schemes.pagination_schemes import PaginationParams
 
 
 class ProductBase(BaseModel):
@@ -21,6 +24,20 @@ class ProductCreateRequest(ProductBase):
     category_id: int
 
 
+class ProductPaginationParams(PaginationParams):
+    """Pagination of product listings, by product ID or by final price (cheapest first)."""
+
+    sort: Literal["id", "final_price"] = "id"
+
+
+class ProductSearchParams(PaginationParams):
+    """Full-text product search, in the web search syntax (`"exact phrase"`, `or`, `-excluded`)."""
+
+    q: str = Field(..., min_length=1, max_length=200)
+    category_id: Optional[int] = None
+    in_stock: bool = False
+
+
 class ProductPriceUpdateRequest(BaseModel):
     """Schema for updating the price of a Product."""
 
@@ -59,3 +76,93 @@ class ProductResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProductSearchResponse(ProductResponse):
+    """Schema for returning a product search result with the relevance of the match."""
+
+    rank: float
+
+
+class ProductBatchRequest(BaseModel):
+    """Schema for requesting several products by their IDs."""
+
+    ids: List[int]
+
+
+class ProductBatchResponse(BaseModel):
+    """Schema for returning a batch of products in the requested order, with the IDs that were not found."""
+
+    products: List[ProductResponse]
+    missing_ids: List[int]
+
+
+class ProductSelection(BaseModel):
+    """
+    Schema selecting products for a bulk operation.
+
+    The criteria are combined: e.g. `category_id` with `max_price` selects the products under
+    that price in the category and its subcategories. At least one criterion is required.
+    """
+
+    product_ids: Optional[List[int]] = Field(None, max_length=BULK_DISCOUNT_MAX_IDS)
+    category_id: Optional[int] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    name_contains: Optional[str] = Field(None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "ProductSelection":
+        if self.product_ids is None and all(
+            value is None for value in (self.category_id, self.min_price, self.max_price, self.name_contains)
+        ):
+            raise ValueError("Select products by IDs, category or filter.")
+        return self
+
+
+class BulkDiscountApplyRequest(ProductSelection):
+    """Schema for attaching a discount to every selected product."""
+
+    discount_id: int
+
+
+class BulkDiscountRemoveRequest(ProductSelection):
+    """Schema for detaching discounts from the selected products, only `discount_id` when it is set."""
+
+    discount_id: Optional[int] = None
+
+
+class BulkDiscountResponse(BaseModel):
+    """Schema for returning the outcome of a bulk discount operation."""
+
+    updated: int
+    repriced: int
+
+
+class CatalogChangesParams(BaseModel):
+    """Position in the catalog change feed: the `next_token` of the previous page, 0 for the first sync."""
+
+    since: int = Field(0, ge=0)
+    limit: int = Field(1000, ge=1, le=CATALOG_CHANGES_MAX_LIMIT)
+
+
+class CatalogChange(BaseModel):
+    """A product, category or discount created, modified or (`deleted`) removed since the token."""
+
+    kind: Literal["product", "category", "discount"]
+    id: int
+    version: int
+    deleted: bool
+
+
+class CatalogChangesResponse(BaseModel):
+    """
+    Schema for returning a page of the catalog change feed, in version order.
+
+    Each row appears once, with its latest version. Pass `next_token` as `since` of the next request;
+    `has_more` is true when the next page can be requested right away.
+    """
+
+    changes: List[CatalogChange]
+    next_token: int
+    has_more: bool
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from src.schemes.sale_schemes import SaleFilterRequest
+
+
+class ReportJobRequest(SaleFilterRequest):
+    """
+    Schema for requesting a background sales report, extending the sales filters with the file format.
+    """
+
+    format: Literal["parquet", "arrow"] = "parquet"
+
+
+class ReportJobResponse(BaseModel):
+    """
+    Schema for returning the state of a background report job.
+
+    `filters` are the normalized filters of the job. `result_url` is set once the job is done;
+    the file can be downloaded in parts with `Range` requests until `expires_at`.
+    """
+
+    id: str
+    status: Literal["pending", "running", "done", "failed"]
+    format: str
+    filters: dict
+    rows: Optional[int] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+    result_url: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
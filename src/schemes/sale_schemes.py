@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveInt, model_validator
 
 
 class SaleBase(BaseModel):
@@ -25,6 +25,30 @@ class SaleRequest(BaseModel):
     quantity: int
 
 
+class CheckoutLineRequest(BaseModel):
+    """
+    Schema for one line of a cart checkout, containing product ID and quantity.
+    """
+
+    product_id: int
+    quantity: PositiveInt
+
+
+class CheckoutRequest(BaseModel):
+    """
+    Schema for checking out a cart: product lines to buy and active reservations to convert into sales.
+    """
+
+    lines: List[CheckoutLineRequest] = []
+    reservation_ids: List[int] = []
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "CheckoutRequest":
+        if not self.lines and not self.reservation_ids:
+            raise ValueError("Checkout requires at least one line or reservation.")
+        return self
+
+
 class SaleFilterRequest(BaseModel):
     """
     Schema for filtering sales data based on various criteria, such as product ID, name, category, or date range.
@@ -56,3 +80,24 @@ class SaleResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SaleSummaryFilterRequest(SaleFilterRequest):
+    """
+    Schema for filtering aggregated sales data, extending the sales filters with the report period granularity.
+    """
+
+    granularity: Literal["day", "week", "month", "year"] = "day"
+
+
+class SaleSummaryResponse(BaseModel):
+    """
+    Schema for an aggregated sales row: units sold and revenue per period, product, category and discount.
+    """
+
+    period: date
+    product_id: int
+    category_id: int
+    discount_id: Optional[int] = None
+    units: int
+    revenue: float
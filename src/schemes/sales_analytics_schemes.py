@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SalesAnalyticsRequest(BaseModel):
+    """
+    Schema for an aggregation of the sales snapshot: grouping, ordering, filters and optional top-N.
+
+    `moving_average` is a window in days and only applies when grouping by day.
+    """
+
+    group_by: Literal["product", "category", "day"] = "product"
+    order_by: Literal["units", "revenue"] = "revenue"
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    product_id: Optional[int] = None
+    category_id: Optional[int] = None
+    top: Optional[int] = Field(None, ge=1, le=10000)
+    moving_average: Optional[int] = Field(None, ge=2, le=366)
+
+
+class SalesAnalyticsRow(BaseModel):
+    """
+    Schema for an aggregated sales row: units sold and revenue of a product, category or day.
+
+    Only the field of the requested grouping is set (products also get their current category).
+    Moving averages are set for days with a full window when `moving_average` was requested.
+    """
+
+    product_id: Optional[int] = None
+    category_id: Optional[int] = None
+    day: Optional[date] = None
+    units: int
+    revenue: float
+    units_moving_average: Optional[float] = None
+    revenue_moving_average: Optional[float] = None
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, PositiveInt
+
+from config import MAX_STOCK_SHARDS
+
+
+class RestockRequest(BaseModel):
+    """Schema for adding items to the stock of a Product."""
+
+    quantity: PositiveInt
+
+
+class StockResponse(BaseModel):
+    """Schema for returning the available stock of a Product."""
+
+    product_id: int
+    available: int
+
+
+class StockShardsRequest(BaseModel):
+    """Schema for splitting the stock of a Product across counter slots."""
+
+    shards: int = Field(ge=1, le=MAX_STOCK_SHARDS)
+
+
+class StockShardsResponse(BaseModel):
+    """Schema for returning the stock shard count of a Product."""
+
+    product_id: int
+    shards: int
+    available: int
+
+
+class StockMovementResponse(BaseModel):
+    """Schema for returning a stock ledger movement."""
+
+    id: int
+    product_id: int
+    kind: str
+    delta: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class SuggestionParams(BaseModel):
+    """Name prefix to complete."""
+
+    q: str = Field(..., min_length=1, max_length=100)
+    limit: int = Field(10, ge=1, le=20)
+
+
+class SuggestionResponse(BaseModel):
+    """A product or category whose name has a word starting with the requested prefix."""
+
+    kind: Literal["product", "category"]
+    id: int
+    name: str
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import re
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+# Size of the chunks read from disk and sent to the client.
+FILE_CHUNK_SIZE = 256 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def ranged_file_response(request: Request, path: str, media_type: str, filename: str) -> Response:
+    """
+    Return a file, or the part of it asked for by a single `Range: bytes=...` header (206).
+
+    A range that does not overlap the file is answered with 416; headers with several ranges, or
+    with an `If-Range` not matching the file's ETag, get the whole file, as the spec allows.
+
+    :param request: The request, read for its `Range` and `If-Range` headers.
+    :param path: Path of the file.
+    :param media_type: Content type of the file.
+    :param filename: File name suggested to the client in `Content-Disposition`.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range == (-1, -1):
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    status_code = 200
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = 206
+    return StreamingResponse(
+        _file_chunks(path, start, end - start + 1), status_code=status_code, media_type=media_type, headers=headers
+    )
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range of a `Range` header into inclusive (start, end) offsets.
+
+    Return None when the whole file is to be sent (no header, several ranges or an invalid header)
+    and (-1, -1) when the range is not satisfiable.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last `last` bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            return -1, -1
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return -1, -1
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+async def _file_chunks(path: str, start: int, length: int) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = await asyncio.to_thread(file.read, min(FILE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
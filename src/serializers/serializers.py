@@ -1,27 +1,26 @@
-from src.infrastructure.db.models.models import Product, Sale
-from src.schemes.product_schemes import ProductResponse
+from src.infrastructure.db.models.models import Category, Product, Sale
 from src.schemes.sale_schemes import SaleResponse
 
 
-def serialize_product_response(product: Product) -> ProductResponse:
+def sale_response_dict(sale: Sale, product: Product) -> dict:
     """
-    Serializes a Product model instance into a ProductResponse schema.
+    Builds the fields of a SaleResponse from a Sale model instance as a plain dict.
 
-    :return: A ProductResponse schema containing product details.
+    :param sale: The Sale instance to be serialized.
+    :param product: The Product instance associated with the sale.
+    :return: A dict with the SaleResponse fields.
     """
-    return ProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        final_price=product.final_price,
-        category_id=product.category.id,
-        category_name=product.category.name,
-        discount_id=product.discount_id,
-        discount_name=product.discount.name if product.discount else None,
-        stock=product.stock,
-        reserved_quantity=product.reserved_quantity,
-    )
+    return {
+        "id": sale.id,
+        "product_id": product.id,
+        "product_name": product.name,
+        "product_price": product.final_price,
+        "discount_name": product.discount.name if product.discount else None,
+        "category_id": product.category.id,
+        "category_name": product.category.name,
+        "quantity": sale.quantity,
+        "sold_at": sale.sold_at,
+    }
 
 
 def serialize_sale_response(sale: Sale, product: Product) -> SaleResponse:
@@ -32,14 +31,19 @@ def serialize_sale_response(sale: Sale, product: Product) -> SaleResponse:
     :param product: The Product instance associated with the sale.
     :return: A SaleResponse schema containing sale and product details.
     """
-    return SaleResponse(
-        id=sale.id,
-        product_id=product.id,
-        product_name=product.name,
-        category_id=product.category.id,
-        category_name=product.category.name,
-        product_price=product.final_price,
-        discount_name=product.discount.name if product.discount else None,
-        quantity=sale.quantity,
-        sold_at=sale.sold_at,
-    )
+    return SaleResponse(**sale_response_dict(sale, product))
+
+
+def category_response_dict(category: Category) -> dict:
+    """
+    Builds the fields of a CategoryResponse from a Category model instance as a plain dict,
+    including its subcategories.
+
+    :return: A dict with the CategoryResponse fields.
+    """
+    return {
+        "name": category.name,
+        "id": category.id,
+        "parent_id": category.parent_id,
+        "subcategories": [category_response_dict(subcategory) for subcategory in category.subcategories],
+    }
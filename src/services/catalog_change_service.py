@@ -0,0 +1,35 @@
+from src.repositories.abstract.abstract_catalog_change_repository import AbstractCatalogChangeRepository
+
+
+class CatalogChangeService:
+    """
+    Service layer of the catalog change feed used for incremental catalog syncs.
+
+    A client keeps the `next_token` of its last sync and only downloads what changed since,
+    then fetches the changed products with the batch endpoint.
+    """
+
+    def __init__(self, change_repo: AbstractCatalogChangeRepository):
+        """
+        Initialize the CatalogChangeService.
+
+        :param change_repo: Repository reading the catalog versions and tombstones.
+        """
+        self.change_repo = change_repo
+
+    async def get_changes(self, since: int, limit: int) -> dict:
+        """
+        Return the catalog changes with a version above `since`.
+
+        Versions are only visible once published in commit order, so the token never moves past
+        a change committed later.
+
+        :return: Dict with the `changes`, the `next_token` and `has_more`.
+        """
+        rows = await self.change_repo.get_changes(since, limit + 1)
+        changes = rows[:limit]
+        return {
+            "changes": changes,
+            "next_token": changes[-1]["version"] if changes else since,
+            "has_more": len(rows) > limit,
+        }
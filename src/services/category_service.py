@@ -1,6 +1,15 @@
+from typing import List
+
 from src.exceptions.exceptions import CategoryNotFoundError
+from src.infrastructure.cache.single_flight import SingleFlight
 from src.infrastructure.db.models.models import Category
 from src.repositories.abstract.abstract_category_repository import AbstractCategoryRepository
+from src.repositories.implementation.category_repository import CategoryRepository
+from src.schemes.category_schemes import CategoryResponse
+from src.serializers.serializers import category_response_dict
+
+# Concurrent reads of the same category within the worker share one query.
+CATEGORY_READS = SingleFlight("category")
 
 
 class CategoryService:
@@ -10,32 +19,41 @@ class CategoryService:
         """Initialize the service with a repository instance."""
         self.category_repo = category_repo
 
-    async def get_all_categories(self):
-        """Retrieve all categories from the repository."""
-        return await self.category_repo.get_all_categories()
+    async def get_all_categories(self) -> List[dict]:
+        """Retrieve all top-level categories with their subcategories, as dicts with the CategoryResponse fields."""
+        categories = await self.category_repo.get_all_categories()
+        return [category_response_dict(category) for category in categories]
 
     async def add_category(self, category_data: dict) -> Category:
         """Add a new category. If a parent_id is provided, ensure the parent exists."""
         parent_id = category_data.get("parent_id")
-        if parent_id is not None:
-            await self.get_category_by_id(parent_id)
+        if parent_id is not None and not await self.category_repo.get_category_by_id(parent_id):
+            raise CategoryNotFoundError(category_id=parent_id)
 
         new_category = Category(**category_data)
-        return await self.category_repo.add_category(new_category)
-
-    async def get_category_by_id(self, category_id: int) -> Category:
-        """Retrieve a category by its ID. Raise an error if not found."""
-        category = await self.category_repo.get_category_by_id(category_id)
-        if not category:
-            raise CategoryNotFoundError(category_id=category_id)
+        category = await self.category_repo.add_category(new_category)
+        self._forget_reads()
         return category
 
-    async def get_category_by_name(self, name: str) -> Category:
-        """Retrieve a category by its name. Raise an error if not found."""
-        category = await self.category_repo.get_category_by_name(name)
-        if not category:
-            raise CategoryNotFoundError(name=name)
-        return category
+    async def get_category_by_id(self, category_id: int) -> CategoryResponse:
+        """
+        Retrieve a category by its ID. Raise an error if not found.
+
+        Concurrent calls for the same category are coalesced into a single query.
+        """
+        return await CATEGORY_READS.do(
+            ("id", category_id), lambda session: self._read_category_by_id(category_id, CategoryRepository(session))
+        )
+
+    async def get_category_by_name(self, name: str) -> CategoryResponse:
+        """
+        Retrieve a category by its name. Raise an error if not found.
+
+        Concurrent calls for the same name are coalesced into a single query.
+        """
+        return await CATEGORY_READS.do(
+            ("name", name), lambda session: self._read_category_by_name(name, CategoryRepository(session))
+        )
 
     async def update_category_by_id(
         self, category_id: int, updated_data: dict
@@ -46,6 +64,7 @@ class CategoryService:
         )
         if not category:
             raise CategoryNotFoundError(category_id=category_id)
+        self._forget_reads()
         return category
 
     async def delete_category(self, category_id: int) -> None:
@@ -53,3 +72,31 @@ class CategoryService:
         success = await self.category_repo.delete_category_by_id(category_id)
         if not success:
             raise CategoryNotFoundError(category_id=category_id)
+        self._forget_reads()
+
+    async def _read_category_by_id(
+        self, category_id: int, category_repo: AbstractCategoryRepository
+    ) -> CategoryResponse:
+        """Load and serialize a category, so the result can be shared between coalesced requests."""
+        category = await category_repo.get_category_by_id(category_id)
+        if not category:
+            raise CategoryNotFoundError(category_id=category_id)
+        return CategoryResponse.model_validate(category)
+
+    async def _read_category_by_name(
+        self, name: str, category_repo: AbstractCategoryRepository
+    ) -> CategoryResponse:
+        """Load and serialize a category, so the result can be shared between coalesced requests."""
+        category = await category_repo.get_category_by_name(name)
+        if not category:
+            raise CategoryNotFoundError(name=name)
+        return CategoryResponse.model_validate(category)
+
+    @staticmethod
+    def _forget_reads() -> None:
+        """
+        Restart in-flight category reads after a change.
+
+        Responses embed subcategories, so a change can affect other categories than the updated one.
+        """
+        CATEGORY_READS.forget_all()
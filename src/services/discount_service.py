@@ -1,8 +1,10 @@
 from typing import List, Optional
 
-from src.exceptions.exceptions import DiscountNotFoundError
+from src.exceptions.exceptions import CategoryNotFoundError, DiscountNotFoundError
 from src.infrastructure.db.models.models import Discount
+from src.repositories.abstract.abstract_category_repository import AbstractCategoryRepository
 from src.repositories.abstract.abstract_discount_repository import AbstractDiscountRepository
+from src.services.product_service import PRODUCT_READS
 
 
 class DiscountService:
@@ -15,14 +17,22 @@ class DiscountService:
     and deleting discounts.
     """
 
-    def __init__(self, discount_repo: AbstractDiscountRepository):
-        """Initialize the service with a Discount repository."""
+    def __init__(self, discount_repo: AbstractDiscountRepository, category_repo: AbstractCategoryRepository):
+        """Initialize the service with Discount and Category repositories."""
         self.discount_repo = discount_repo
+        self.category_repo = category_repo
 
     async def add_discount(self, discount_data: dict) -> Discount:
-        """Add a new Discount."""
+        """Add a new Discount. A category discount requires an existing category."""
+        category_id = discount_data.get("category_id")
+        if category_id is not None and not await self.category_repo.get_category_by_id(category_id):
+            raise CategoryNotFoundError(category_id=category_id)
+
         new_discount = Discount(**discount_data)
-        return await self.discount_repo.add_discount(new_discount)
+        discount = await self.discount_repo.add_discount(new_discount)
+        if discount.category_id is not None:
+            PRODUCT_READS.forget_all()
+        return discount
 
     async def get_discount_by_id(self, discount_id: int) -> Discount:
         """Retrieve a Discount by its ID. Raise DiscountNotFoundError if not found."""
@@ -42,3 +52,4 @@ class DiscountService:
         success = await self.discount_repo.delete_discount(discount_id)
         if not success:
             raise DiscountNotFoundError(discount_id=discount_id)
+        PRODUCT_READS.forget_all()
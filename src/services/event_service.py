@@ -0,0 +1,77 @@
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Sequence
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import EVENTS_HEARTBEAT_INTERVAL, EVENTS_POLL_INTERVAL
+from src.infrastructure.events.notifier import EventNotifier
+from src.repositories.implementation.outbox_repository import OutboxRepository
+
+
+class EventService:
+    """
+    Service layer reading the published domain events for /events consumers.
+
+    Waiting readers must not pin a pooled connection, so every poll opens its own short session
+    instead of using the session of the request.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], notifier: EventNotifier):
+        """
+        Initialize the EventService.
+
+        :param session_factory: Factory of the DB sessions of the polls.
+        :param notifier: Notifier woken up when the dispatcher of the process publishes events.
+        """
+        self.session_factory = session_factory
+        self.notifier = notifier
+
+    async def get_events(
+        self, after: int, limit: int, wait: float, topics: Optional[Sequence[str]] = None
+    ) -> dict:
+        """
+        Return the events published after the `after` sequence, waiting up to `wait` seconds for one.
+
+        :return: Dict with the `events` and the `last_sequence` to continue from.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            events = await self._read(after, limit, topics)
+            remaining = deadline - loop.time()
+            if events or remaining <= 0:
+                break
+            await self.notifier.wait(min(EVENTS_POLL_INTERVAL, remaining))
+        return {"events": events, "last_sequence": events[-1]["sequence"] if events else after}
+
+    async def stream(self, after: int, limit: int, topics: Optional[Sequence[str]] = None) -> AsyncIterator[bytes]:
+        """
+        Yield the events published after the `after` sequence as server-sent events, without end.
+
+        The event `id` is the sequence, so a reconnecting client resumes with `Last-Event-ID`.
+        A keep-alive comment is sent after EVENTS_HEARTBEAT_INTERVAL seconds without events.
+        """
+        loop = asyncio.get_running_loop()
+        quiet_since = loop.time()
+        while True:
+            events = await self._read(after, limit, topics)
+            for event in events:
+                yield (
+                    f"id: {event['sequence']}\nevent: {event['topic']}\ndata: ".encode()
+                    + orjson.dumps(event)
+                    + b"\n\n"
+                )
+            if events:
+                after = events[-1]["sequence"]
+                quiet_since = loop.time()
+                if len(events) == limit:
+                    continue
+            elif loop.time() - quiet_since >= EVENTS_HEARTBEAT_INTERVAL:
+                yield b": keep-alive\n\n"
+                quiet_since = loop.time()
+            await self.notifier.wait(EVENTS_POLL_INTERVAL)
+
+    async def _read(self, after: int, limit: int, topics: Optional[Sequence[str]]) -> List[dict]:
+        async with self.session_factory() as session:
+            return await OutboxRepository(session).get_events(after, limit, topics)
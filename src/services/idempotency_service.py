@@ -0,0 +1,150 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from config import IDEMPOTENCY_CLAIM_LEASE, IDEMPOTENCY_KEY_TTL
+from src.exceptions.exceptions import IdempotencyKeyInProgressError, IdempotencyKeyMismatchError
+from src.infrastructure.cache.lru_cache import LRUCache
+from src.infrastructure.metrics.registry import REGISTRY
+from src.repositories.abstract.abstract_idempotency_key_repository import AbstractIdempotencyKeyRepository
+
+IDEMPOTENCY_REQUESTS = REGISTRY.counter(
+    "idempotency_requests_total",
+    "Requests sent with an Idempotency-Key header, by outcome.",
+    ["scope", "outcome"],
+)
+IDEMPOTENCY_CACHE_ENTRIES = REGISTRY.gauge(
+    "idempotency_cache_entries", "Responses held in the in-process idempotency LRU cache."
+)
+IDEMPOTENCY_STORE_KEYS = REGISTRY.gauge(
+    "idempotency_store_keys", "Idempotency keys stored in the database, as of the last purge."
+)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Response of a completed idempotent request, as kept in the in-process cache."""
+
+    request_hash: str
+    response: dict
+    expires_at: datetime
+
+
+class IdempotencyService:
+    """
+    Service executing POST requests at most once per `Idempotency-Key`.
+
+    The first request with a key claims it in the database, runs and stores its response in
+    the transaction of the operation, so a request never completes without its response stored;
+    repeats get the stored response back without running again. A claim is leased for `claim_lease`
+    seconds: a request that neither completed nor failed by then (its worker crashed) no longer
+    blocks its retries, the next retry claims the key and runs. Completed responses are
+    also kept in an in-process LRU cache, so hot retries do not reach the database.
+    """
+
+    def __init__(
+        self,
+        idempotency_repo: AbstractIdempotencyKeyRepository,
+        cache: LRUCache,
+        ttl: float = IDEMPOTENCY_KEY_TTL,
+        claim_lease: float = IDEMPOTENCY_CLAIM_LEASE,
+    ):
+        """
+        Initialize the IdempotencyService.
+
+        :param idempotency_repo: Repository storing idempotency keys and responses.
+        :param cache: In-process cache of completed responses, shared by all requests.
+        :param ttl: Number of seconds a response is kept for.
+        :param claim_lease: Number of seconds a request holds its key before a retry can take it over.
+        """
+        self.idempotency_repo = idempotency_repo
+        self.cache = cache
+        self.ttl = ttl
+        self.claim_lease = claim_lease
+
+    async def execute(
+        self,
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        handler: Callable[[], Awaitable[Any]],
+        response_model: Type[BaseModel],
+    ) -> Tuple[Any, bool]:
+        """
+        Run `handler` unless a request with the same scope, key and payload already completed.
+
+        :param scope: Name of the operation, keys are unique per scope.
+        :param key: Value of the `Idempotency-Key` header; without it the handler always runs.
+        :param payload: Request body, a key reused with a different body is rejected.
+        :param handler: Coroutine function performing the operation.
+        :param response_model: Schema the handler result is serialized with before it is stored.
+        :return: The response and whether it was replayed from the store.
+        """
+        if key is None:
+            return await handler(), False
+
+        request_hash = self._hash_payload(payload)
+        stored = self._get_cached(scope, key)
+        if stored is not None:
+            self._check_request_hash(stored.request_hash, request_hash, key)
+            IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="replayed_memory")
+            return stored.response, True
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        claimed_until = now + timedelta(seconds=self.claim_lease)
+        if not await self.idempotency_repo.claim_key(scope, key, request_hash, expires_at, claimed_until):
+            return await self._replay(scope, key, request_hash), True
+
+        try:
+            async with self.idempotency_repo.single_transaction():
+                result = await handler()
+                response = jsonable_encoder(response_model.model_validate(result))
+                await self.idempotency_repo.save_response(scope, key, response)
+        except BaseException:
+            await self.idempotency_repo.release_key(scope, key)
+            raise
+
+        self._cache(scope, key, StoredResponse(request_hash, response, expires_at))
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="executed")
+        return response, False
+
+    async def _replay(self, scope: str, key: str, request_hash: str) -> dict:
+        """Return the stored response of a key claimed by another request."""
+        stored_key = await self.idempotency_repo.get_key(scope, key)
+        if stored_key is not None:
+            self._check_request_hash(stored_key.request_hash, request_hash, key)
+        if stored_key is None or stored_key.response is None:
+            IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="in_progress")
+            raise IdempotencyKeyInProgressError(key=key)
+
+        self._cache(scope, key, StoredResponse(stored_key.request_hash, stored_key.response, stored_key.expires_at))
+        IDEMPOTENCY_REQUESTS.inc(scope=scope, outcome="replayed_store")
+        return stored_key.response
+
+    def _get_cached(self, scope: str, key: str) -> Optional[StoredResponse]:
+        stored = self.cache.get((scope, key))
+        if stored is not None and stored.expires_at <= datetime.utcnow():
+            self.cache.pop((scope, key))
+            IDEMPOTENCY_CACHE_ENTRIES.set(len(self.cache))
+            return None
+        return stored
+
+    def _cache(self, scope: str, key: str, stored: StoredResponse) -> None:
+        self.cache.set((scope, key), stored)
+        IDEMPOTENCY_CACHE_ENTRIES.set(len(self.cache))
+
+    @staticmethod
+    def _check_request_hash(stored_hash: str, request_hash: str, key: str) -> None:
+        if stored_hash != request_hash:
+            raise IdempotencyKeyMismatchError(key=key)
+
+    @staticmethod
+    def _hash_payload(payload: Any) -> str:
+        encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.exceptions.exceptions import LeaderboardUnavailableError
+from src.infrastructure.analytics.leaderboard import LEADERBOARD_WINDOWS, SalesLeaderboard
+from src.repositories.implementation.report_repository import ReportRepository
+
+
+class LeaderboardService:
+    """
+    Best-selling products over the last hour, day or week, answered from the in-process leaderboard.
+    """
+
+    def __init__(self, leaderboard: SalesLeaderboard):
+        """
+        Initialize the LeaderboardService.
+
+        :param leaderboard: The sales leaderboard of the process.
+        """
+        self.leaderboard = leaderboard
+
+    def top_products(
+        self, window: str, order_by: str = "units", category_id: Optional[int] = None, limit: int = 10
+    ) -> List[dict]:
+        """
+        Return the `limit` best selling products of a window, optionally of one category.
+
+        :raises LeaderboardUnavailableError: If the leaderboard was not built from the database yet.
+        """
+        if not self.leaderboard.ready:
+            raise LeaderboardUnavailableError()
+        return self.leaderboard.top(window, order_by=order_by, category_id=category_id, limit=limit)
+
+    async def rebuild(self, report_repo: ReportRepository) -> int:
+        """
+        Rebuild the leaderboard from the sales of the longest window.
+
+        The sales are read in one snapshot, started after the leaderboard started buffering the sales
+        it records. The rebuilt leaderboard is built in a thread and swapped in at once; the buffered
+        sales the snapshot did not see are replayed onto it.
+
+        :return: Number of (bucket, product) counters loaded.
+        """
+        bucket_seconds = self.leaderboard.bucket_seconds
+        self.leaderboard.start_rebuild()
+        try:
+            await report_repo.begin_snapshot()
+            now = datetime.utcnow()
+            since = now - timedelta(seconds=max(LEADERBOARD_WINDOWS.values()) + bucket_seconds)
+            rows = await report_repo.get_sale_buckets(since, None, bucket_seconds)
+            rebuilt = await asyncio.to_thread(SalesLeaderboard.from_buckets, rows, bucket_seconds, now)
+            # No await between the last check and the swap: every buffered sale is checked.
+            checked, counted = set(), set()
+            while True:
+                unchecked = [sale_id for sale_id in self.leaderboard.pending_sale_ids if sale_id not in checked]
+                if not unchecked:
+                    break
+                counted |= await report_repo.get_visible_sale_ids(unchecked)
+                checked.update(unchecked)
+        except BaseException:
+            self.leaderboard.cancel_rebuild()
+            raise
+        self.leaderboard.replace(rebuilt, counted)
+        return len(rows)
@@ -1,11 +1,30 @@
-from typing import List, Optional
-
-from src.exceptions.exceptions import CategoryNotFoundError, DiscountNotFoundError, ProductNotFoundError
+from typing import Dict, List, Optional
+
+from config import PRODUCT_BATCH_MAX_IDS
+from src.exceptions.exceptions import (
+    CategoryNotFoundError,
+    DiscountNotFoundError,
+    ProductBatchTooLargeError,
+    ProductNotFoundError,
+)
+from src.infrastructure.cache.single_flight import SingleFlight
 from src.repositories.abstract.abstract_category_repository import AbstractCategoryRepository
 from src.repositories.abstract.abstract_discount_repository import AbstractDiscountRepository
 from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
-from src.schemes.product_schemes import ProductCreateRequest, ProductResponse
-from src.serializers.serializers import serialize_product_response
+from src.repositories.implementation.product_repository import ProductRepository
+from src.schemes.product_schemes import (
+    BulkDiscountApplyRequest,
+    BulkDiscountRemoveRequest,
+    BulkDiscountResponse,
+    ProductCreateRequest,
+    ProductResponse,
+    ProductSearchParams,
+    ProductSelection,
+)
+from src.services.stock_service import StockService
+
+# Concurrent reads of the same product within the worker share one query.
+PRODUCT_READS = SingleFlight("product")
 
 
 class ProductService:
@@ -18,19 +37,20 @@ class ProductService:
         product_repo: AbstractProductRepository,
         category_repo: AbstractCategoryRepository,
         discount_repo: AbstractDiscountRepository,
+        stock_service: StockService,
     ):
 
         """Initialize the service with repositories."""
         self.product_repo = product_repo
         self.category_repo = category_repo
         self.discount_repo = discount_repo
+        self.stock_service = stock_service
 
     async def get_all_products(
-        self, cursor: Optional[int], limit: int
-    ) -> List[ProductResponse]:
-        """Retrieve all products with pagination."""
-        products = await self.product_repo.get_all_products(cursor=cursor, limit=limit)
-        return [serialize_product_response(product) for product in products]
+        self, cursor: Optional[int], limit: int, sort: str = "id"
+    ) -> List[dict]:
+        """Retrieve all products with pagination, ordered by `sort`, as dicts with the ProductResponse fields."""
+        return await self.product_repo.get_all_products(cursor=cursor, limit=limit, sort=sort)
 
     async def add_product(self, product_data: ProductCreateRequest) -> ProductResponse:
         """Add a new product to the system. Ensure the category exists."""
@@ -39,50 +59,98 @@ class ProductService:
             raise CategoryNotFoundError(category_id=product_data.category_id)
 
         new_product = await self.product_repo.add_product(**product_data.dict())
-        return serialize_product_response(new_product)
+        return await self._read_product(new_product.id)
 
     async def get_product_by_id(self, product_id: int) -> ProductResponse:
-        """Retrieve Product by its ID. Raise an error if not found."""
-        product = await self.product_repo.get_product_by_id(product_id)
-        if not product:
-            raise ProductNotFoundError(product_id=product_id)
-        return serialize_product_response(product)
+        """
+        Retrieve Product by its ID. Raise an error if not found.
+
+        Concurrent calls for the same product are coalesced into a single query.
+        """
+        return await PRODUCT_READS.do(
+            product_id, lambda session: self._read_product(product_id, ProductRepository(session))
+        )
+
+    async def get_products_by_ids(self, product_ids: List[int]) -> Dict[str, list]:
+        """
+        Retrieve several products with one query, in the requested order, as a dict with the
+        ProductBatchResponse fields.
+
+        Duplicate IDs are returned once; IDs without a product are reported in `missing_ids`.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        if len(product_ids) > PRODUCT_BATCH_MAX_IDS:
+            raise ProductBatchTooLargeError(max_ids=PRODUCT_BATCH_MAX_IDS)
+
+        products = {product["id"]: product for product in await self.product_repo.get_product_rows_by_ids(product_ids)}
+        return {
+            "products": [
+                products[product_id]
+                for product_id in product_ids
+                if product_id in products
+            ],
+            "missing_ids": [product_id for product_id in product_ids if product_id not in products],
+        }
+
+    async def search_products(self, params: ProductSearchParams) -> List[dict]:
+        """
+        Full-text search of products, best matches first, as dicts with the ProductSearchResponse fields.
+        """
+        return await self.product_repo.search_products(
+            params.q,
+            cursor=params.cursor,
+            limit=params.limit,
+            category_id=params.category_id,
+            in_stock=params.in_stock,
+        )
 
     async def update_product(
         self, product_id: int, updated_data: dict
     ) -> ProductResponse:
-        """Update a product by its ID. Raise an error if not found."""
-        product = await self.product_repo.update_product(product_id, updated_data)
+        """
+        Update a product by its ID. Raise an error if not found.
+
+        A new stock value goes through the StockService, so it is recorded in the stock ledger when enabled.
+        """
+        new_stock = updated_data.pop("stock", None)
+        product = await self.product_repo.get_product_by_id(product_id)
         if not product:
             raise ProductNotFoundError(product_id=product_id)
-        return serialize_product_response(product)
+
+        if new_stock is not None:
+            await self.stock_service.set_stock(product, new_stock)
+        product = await self.product_repo.update_product(product_id, updated_data)
+        PRODUCT_READS.forget(product_id)
+        return await self._read_product(product_id)
 
     async def update_price(self, product_id: int, new_price: float) -> ProductResponse:
         """Update the price of a product. Raise an error if not found."""
         product = await self.product_repo.update_price(product_id, new_price)
         if not product:
             raise ProductNotFoundError(product_id=product_id)
-        return serialize_product_response(product)
+        PRODUCT_READS.forget(product_id)
+        return await self._read_product(product_id)
 
     async def delete_product(self, product_id: int) -> None:
         """Delete a product by its ID. Raise an error if not found."""
         success = await self.product_repo.delete_product(product_id)
         if not success:
             raise ProductNotFoundError(product_id=product_id)
+        PRODUCT_READS.forget(product_id)
 
     async def get_products_by_category(
-        self, category_id: int, cursor: Optional[int], limit: int,
-    ) -> List[ProductResponse]:
-        """Retrieve products by category ID with pagination."""
+        self, category_id: int, cursor: Optional[int], limit: int, sort: str = "id",
+    ) -> List[dict]:
+        """
+        Retrieve products by category ID with pagination, ordered by `sort`, as dicts with the ProductResponse fields.
+        """
         category = await self.category_repo.get_category_by_id(category_id)
         if not category:
             raise CategoryNotFoundError(category_id=category_id)
-        products = await self.product_repo.get_products_by_category(
-            category_id, cursor, limit
+        return await self.product_repo.get_products_by_category(
+            category_id, cursor, limit, sort
         )
 
-        return [serialize_product_response(product) for product in products]
-
     async def add_discount_to_product(
         self, product_id: int, discount_id: int
     ) -> ProductResponse:
@@ -97,9 +165,63 @@ class ProductService:
         product = await self.product_repo.add_discount_to_product(
             product_id, discount_id
         )
-        return serialize_product_response(product)
+        PRODUCT_READS.forget(product_id)
+        return await self._read_product(product_id)
 
     async def remove_discount_from_product(self, product_id: int) -> ProductResponse:
         """Remove a discount from a product."""
-        product = await self.product_repo.remove_discount_from_product(product_id)
-        return serialize_product_response(product)
+        await self.product_repo.remove_discount_from_product(product_id)
+        PRODUCT_READS.forget(product_id)
+        return await self._read_product(product_id)
+
+    async def bulk_apply_discount(self, request: BulkDiscountApplyRequest) -> BulkDiscountResponse:
+        """
+        Attach a discount to every selected product with a single set-based UPDATE.
+
+        Ensure the discount and the selected category exist.
+        """
+        discount = await self.discount_repo.get_discount_by_id(request.discount_id)
+        if not discount:
+            raise DiscountNotFoundError(discount_id=request.discount_id)
+        return await self._bulk_set_discount(request, request.discount_id)
+
+    async def bulk_remove_discount(self, request: BulkDiscountRemoveRequest) -> BulkDiscountResponse:
+        """Detach the discount (only `discount_id` when set) from every selected product with a single UPDATE."""
+        return await self._bulk_set_discount(request, None, current_discount_id=request.discount_id)
+
+    async def _bulk_set_discount(
+        self, selection: ProductSelection, discount_id: Optional[int], current_discount_id: Optional[int] = None,
+    ) -> BulkDiscountResponse:
+        if selection.category_id is not None and not await self.category_repo.get_category_by_id(
+            selection.category_id
+        ):
+            raise CategoryNotFoundError(category_id=selection.category_id)
+
+        updated, repriced = await self.product_repo.bulk_set_discount(
+            discount_id,
+            product_ids=selection.product_ids,
+            category_id=selection.category_id,
+            min_price=selection.min_price,
+            max_price=selection.max_price,
+            name_contains=selection.name_contains,
+            current_discount_id=current_discount_id,
+        )
+        if updated:
+            PRODUCT_READS.forget_all()
+        return BulkDiscountResponse(updated=len(updated), repriced=len(repriced))
+
+    async def _read_product(
+        self, product_id: int, product_repo: Optional[AbstractProductRepository] = None
+    ) -> ProductResponse:
+        """
+        Load a product as a ProductResponse, so the result can be shared between coalesced requests.
+
+        The response is built from the projection query rather than the ORM entity, so the stock
+        shards and reservations of the product are aggregated in SQL instead of being loaded.
+
+        :param product_repo: Repository to read with, defaults to the one of the request.
+        """
+        rows = await (product_repo or self.product_repo).get_product_rows_by_ids([product_id])
+        if not rows:
+            raise ProductNotFoundError(product_id=product_id)
+        return ProductResponse(**rows[0])
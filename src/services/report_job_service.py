@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import orjson
+
+from config import REPORT_JOB_BATCH_SIZE, REPORT_JOB_DIR, REPORT_JOB_TIMEOUT, REPORT_JOB_TTL
+from src.exceptions.exceptions import ReportJobNotFoundError, ReportJobNotReadyError
+from src.infrastructure.db.models.models import ReportJob, ReportJobStatus
+from src.infrastructure.reports.columnar import REPORT_FORMATS, ColumnarReportWriter
+from src.repositories.implementation.report_job_repository import ReportJobRepository
+from src.repositories.implementation.report_repository import ReportRepository
+from src.schemes.sale_schemes import SaleFilterRequest
+from src.services.report_service import normalize_sale_filters
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+    """
+    Service layer of the background sales reports.
+
+    Submitted jobs are stored as pending and picked up by the report job workers, which stream the
+    sales into a columnar file in the report directory. Jobs with the same normalized filters and
+    format share one result until it expires.
+    """
+
+    def __init__(
+        self,
+        job_repo: ReportJobRepository,
+        report_repo: ReportRepository,
+        directory: str = REPORT_JOB_DIR,
+        batch_size: int = REPORT_JOB_BATCH_SIZE,
+    ):
+        """
+        Initialize the ReportJobService.
+
+        :param job_repo: The repository of the report jobs.
+        :param report_repo: The repository reading the sales of the reports.
+        :param directory: Directory of the result files.
+        :param batch_size: Number of sales read and written at a time.
+        """
+        self.job_repo = job_repo
+        self.report_repo = report_repo
+        self.directory = directory
+        self.batch_size = batch_size
+
+    async def submit(
+        self,
+        format: str = "parquet",
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Tuple[dict, bool]:
+        """
+        Create a report job, or return the unexpired job with the same filters and format.
+
+        :return: The job as a dict with the ReportJobResponse fields and whether it was created.
+        """
+        filters = normalize_sale_filters(
+            product_id=product_id,
+            product_name=product_name,
+            category_id=category_id,
+            category_name=category_name,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        filters = orjson.loads(orjson.dumps(filters))
+        filter_hash = hashlib.sha256(
+            orjson.dumps({"format": format, "filters": filters}, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        expires_at = datetime.utcnow() + timedelta(seconds=REPORT_JOB_TTL)
+        job, created = await self.job_repo.create_job(filter_hash, filters, format, expires_at)
+        return self._job_dict(job), created
+
+    async def get_job(self, job_id: str) -> dict:
+        """Retrieve a job as a dict with the ReportJobResponse fields."""
+        return self._job_dict(await self._get_job(job_id))
+
+    async def get_result(self, job_id: str) -> Tuple[str, str, str]:
+        """
+        Locate the result file of a done job.
+
+        :return: The path, media type and download file name of the result.
+        :raises ReportJobNotReadyError: If the job is not done.
+        """
+        job = await self._get_job(job_id)
+        if job.status != ReportJobStatus.DONE.value:
+            raise ReportJobNotReadyError(job_id, job.status)
+        path = self.result_path(job.id, job.format)
+        if not os.path.exists(path):
+            raise ReportJobNotFoundError(job_id)
+        return path, REPORT_FORMATS[job.format], f"sales-report-{job.id}.{job.format}"
+
+    async def run_next(self) -> Optional[str]:
+        """
+        Claim the oldest pending job and build its result.
+
+        :return: The final status of the job, None if no job was pending.
+        """
+        job = await self.job_repo.claim_next()
+        if job is None:
+            return None
+
+        writer = ColumnarReportWriter(self.result_path(job.id, job.format), job.format)
+        try:
+            rows = await asyncio.wait_for(self._write_report(job, writer), REPORT_JOB_TIMEOUT)
+            size = await asyncio.to_thread(writer.close)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(writer.abort)
+            await self.job_repo.fail_job(job.id, "The report job was interrupted.")
+            raise
+        except Exception as exc:
+            await asyncio.to_thread(writer.abort)
+            logger.error(f"Report job {job.id} failed: {str(exc)}")
+            if isinstance(exc, asyncio.TimeoutError):
+                error = f"The report job did not finish within {REPORT_JOB_TIMEOUT:g} seconds."
+            else:
+                error = "The report could not be generated."
+            await self.job_repo.fail_job(job.id, error)
+            return ReportJobStatus.FAILED.value
+
+        if not await self.job_repo.finish_job(job.id, rows, size):
+            # Failed as stale or expired meanwhile: nobody will download it.
+            self._remove_result(job.id, job.format)
+            return ReportJobStatus.FAILED.value
+        return ReportJobStatus.DONE.value
+
+    async def purge(self) -> int:
+        """Fail the jobs running for too long and delete the expired jobs with their files."""
+        now = datetime.utcnow()
+        await self.job_repo.fail_stale(now - timedelta(seconds=REPORT_JOB_TIMEOUT * 2))
+        purged = await self.job_repo.purge_expired(now)
+        for job_id, format in purged:
+            self._remove_result(job_id, format)
+        return len(purged)
+
+    def result_path(self, job_id: str, format: str) -> str:
+        """Return the path of the result file of a job."""
+        return os.path.join(self.directory, f"{job_id}.{format}")
+
+    async def _get_job(self, job_id: str) -> ReportJob:
+        job = await self.job_repo.get_job(job_id)
+        if job is None:
+            raise ReportJobNotFoundError(job_id)
+        return job
+
+    async def _write_report(self, job: ReportJob, writer: ColumnarReportWriter) -> int:
+        filters = SaleFilterRequest(**job.filters)
+        rows = 0
+        async for batch in self.report_repo.iter_sales_report(self.batch_size, **filters.model_dump()):
+            # Encoding and compression run in Arrow without the GIL, a thread keeps the event loop free.
+            await asyncio.to_thread(writer.write, batch)
+            rows += len(batch)
+        return rows
+
+    def _remove_result(self, job_id: str, format: str) -> None:
+        try:
+            os.remove(self.result_path(job_id, format))
+        except FileNotFoundError:
+            pass
+
+    def _job_dict(self, job: ReportJob) -> dict:
+        done = job.status == ReportJobStatus.DONE.value
+        return {
+            "id": job.id,
+            "status": job.status,
+            "format": job.format,
+            "filters": job.filters,
+            "rows": job.rows,
+            "size": job.size,
+            "error": job.error,
+            "result_url": f"/reports/sales/jobs/{job.id}/result" if done else None,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "expires_at": job.expires_at,
+        }
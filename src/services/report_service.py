@@ -1,9 +1,48 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
+import orjson
+
+from config import REPORT_CACHE_MAX_BYTES, REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_OPEN_TTL
+from src.infrastructure.cache.result_cache import ResultCache
 from src.repositories.implementation.report_repository import ReportRepository
-from src.schemes.sale_schemes import SaleResponse
-from src.serializers.serializers import serialize_sale_response
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.schemes.sale_schemes import SaleSummaryResponse
+
+# Serialized /reports/sales results of the process, keyed by their normalized filters.
+SALES_REPORT_CACHE = ResultCache(
+    "sales_report", REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_MAX_BYTES, REPORT_CACHE_OPEN_TTL
+)
+
+
+def normalize_sale_filters(
+    product_id: Optional[int] = None,
+    product_name: Optional[str] = None,
+    category_id: Optional[int] = None,
+    category_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> dict:
+    """
+    Return the canonical form of the sales report filters, equal for all filters selecting the same sales.
+
+    Filters the report ignores (empty names, 0 IDs) become None, names are lowercased (they are
+    matched case-insensitively) and dates are converted to naive UTC, like `sales.sold_at`.
+    """
+
+    def to_utc(moment: Optional[datetime]) -> Optional[datetime]:
+        if moment is None or moment.tzinfo is None:
+            return moment
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "product_id": product_id or None,
+        "product_name": product_name.lower() if product_name else None,
+        "category_id": category_id or None,
+        "category_name": category_name.lower() if category_name else None,
+        "start_date": to_utc(start_date),
+        "end_date": to_utc(end_date),
+    }
 
 
 class ReportService:
@@ -15,13 +54,15 @@ class ReportService:
     the appropriate response format.
     """
 
-    def __init__(self, report_repo: ReportRepository):
+    def __init__(self, report_repo: ReportRepository, rollup_repo: SaleRollupRepository):
         """
-        Initialize the ReportService with the necessary repository.
+        Initialize the ReportService with the necessary repositories.
 
         :param report_repo: The repository responsible for fetching sales data.
+        :param rollup_repo: The repository responsible for the daily sales rollup.
         """
         self.report_repo = report_repo
+        self.rollup_repo = rollup_repo
 
     async def generate_sales_report(
         self,
@@ -31,12 +72,13 @@ class ReportService:
         category_name: Optional[str] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[SaleResponse]:
+    ) -> List[dict]:
         """
         Retrieve a sales report based on the provided filters.
 
-        This method coordinates the retrieval of sales data from the repository and
-        processes the results to return a structured list of SaleResponse objects.
+        Results are cached by their normalized filters. A cached result of a range reaching the
+        current day is dropped when a sale is made in it (see `SALES_REPORT_CACHE`); cached results
+        keep the product names and prices of when they were built.
 
         :param product_id: The ID of the product to filter sales by.
         :param product_name: The name of the product to filter sales by.
@@ -44,10 +86,9 @@ class ReportService:
         :param category_name: The name of the category to filter sales by.
         :param start_date: The start date to filter sales by.
         :param end_date: The end date to filter sales by.
-        :return: A list of SaleResponse objects containing the filtered sales data.
+        :return: A list of dicts with the SaleResponse fields of the filtered sales.
         """
-
-        sales = await self.report_repo.generate_sales_report(
+        filters = normalize_sale_filters(
             product_id=product_id,
             product_name=product_name,
             category_id=category_id,
@@ -55,4 +96,106 @@ class ReportService:
             start_date=start_date,
             end_date=end_date,
         )
-        return [serialize_sale_response(sale, sale.product) for sale in sales]
+        key = tuple(filters.values())
+        cached = SALES_REPORT_CACHE.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+
+        generation = SALES_REPORT_CACHE.generation
+        sales = await self.report_repo.generate_sales_report(**filters)
+        start, end = filters["start_date"], filters["end_date"]
+        open_range = end is None or end >= self._floor_day(datetime.utcnow())
+        SALES_REPORT_CACHE.set(key, orjson.dumps(sales), start, end, open_range, generation)
+        return sales
+
+    async def generate_sales_summary(
+        self,
+        granularity: str = "day",
+        product_id: Optional[int] = None,
+        product_name: Optional[str] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[SaleSummaryResponse]:
+        """
+        Retrieve units and revenue aggregated per period, product, category and discount.
+
+        Whole days inside the requested range are answered from the daily rollup. Raw sales are
+        only aggregated for the partial days at the edges of the range, including the current day
+        when no end date is given.
+
+        :param granularity: The report period: day, week, month or year.
+        :param start_date: The start date to filter sales by.
+        :param end_date: The end date (inclusive) to filter sales by.
+        :return: A list of SaleSummaryResponse objects ordered by period and product.
+        """
+        filters = dict(
+            product_id=product_id,
+            product_name=product_name,
+            category_id=category_id,
+            category_name=category_name,
+        )
+        if start_date and end_date and start_date > end_date:
+            return []
+
+        full_days_start = self._ceil_day(start_date) if start_date else None
+        full_days_end = self._floor_day(end_date or datetime.utcnow())
+
+        if full_days_start is not None and full_days_start >= full_days_end:
+            rows = await self.rollup_repo.get_raw_summary(
+                granularity, start_date, end_date, end_inclusive=True, **filters
+            )
+            return self._merge_summary_rows(rows)
+
+        rows = list(
+            await self.rollup_repo.get_rollup_summary(
+                granularity, full_days_start, full_days_end, **filters
+            )
+        )
+        if start_date and start_date < full_days_start:
+            rows.extend(
+                await self.rollup_repo.get_raw_summary(
+                    granularity, start_date, full_days_start, **filters
+                )
+            )
+        rows.extend(
+            await self.rollup_repo.get_raw_summary(
+                granularity, full_days_end, end_date, end_inclusive=True, **filters
+            )
+        )
+        return self._merge_summary_rows(rows)
+
+    @staticmethod
+    def _merge_summary_rows(rows) -> List[SaleSummaryResponse]:
+        """Sum rollup and raw rows sharing the same period, product, category and discount."""
+        totals = {}
+        for row in rows:
+            key = (row.period, row.product_id, row.category_id, row.discount_id)
+            units, revenue = totals.get(key, (0, 0.0))
+            totals[key] = (units + row.units, revenue + row.revenue)
+
+        return [
+            SaleSummaryResponse(
+                period=period,
+                product_id=product_id,
+                category_id=category_id,
+                discount_id=discount_id,
+                units=units,
+                revenue=revenue,
+            )
+            for (period, product_id, category_id, discount_id), (units, revenue) in sorted(
+                totals.items(), key=lambda item: (item[0][0], item[0][1], item[0][3] or 0)
+            )
+        ]
+
+    @staticmethod
+    def _floor_day(moment: datetime) -> datetime:
+        """Return the midnight starting the day of the given moment."""
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def _ceil_day(cls, moment: datetime) -> datetime:
+        """Return the first midnight at or after the given moment."""
+        day_start = cls._floor_day(moment)
+        return day_start if day_start == moment else day_start + timedelta(days=1)
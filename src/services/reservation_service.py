@@ -1,9 +1,10 @@
 from typing import List, Optional
 
-from src.exceptions.exceptions import NotEnoughStockError, ProductNotFoundError, ReservationNotFoundError
-from src.infrastructure.db.models.models import Reservation
+from src.exceptions.exceptions import ProductNotFoundError, ReservationNotFoundError
+from src.infrastructure.db.models.models import Reservation, StockMovementKind
 from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
 from src.repositories.abstract.abstract_reservation_repository import AbstractReservationRepository
+from src.services.stock_service import StockService
 
 
 class ReservationService:
@@ -19,49 +20,48 @@ class ReservationService:
         self,
         order_repo: AbstractReservationRepository,
         product_repo: AbstractProductRepository,
+        stock_service: StockService,
     ):
         """
         Initialize the ReservationService with the necessary repositories.
 
         :param order_repo: Repository for managing reservations.
-        :param product_repo: Repository for managing products and stock.
+        :param product_repo: Repository for managing products.
+        :param stock_service: Service taking and returning product stock.
         """
         self.order_repo = order_repo
         self.product_repo = product_repo
+        self.stock_service = stock_service
 
     async def reserve_product(self, product_id: int, quantity: int) -> Reservation:
         """Reserve a Product by reducing the stock and creating a reservation record."""
         product = await self.product_repo.get_product_by_id(product_id)
         if not product:
             raise ProductNotFoundError(product_id=product_id)
-        if product.stock < quantity:
-            raise NotEnoughStockError(product_id=product_id)
+        await self.stock_service.take_stock(product, quantity, StockMovementKind.RESERVATION)
 
-        reservation = await self.order_repo.reserve_product(
+        return await self.order_repo.reserve_product(
             product_id=product_id, quantity=quantity
         )
 
-        if reservation:
-            reservation_quantity = product.stock - quantity
-            await self.product_repo.update_product_stock(
-                product_id, reservation_quantity
-            )
-
-        return reservation
-
     async def cancel_reservation(self, reservation_id: int) -> None:
-        """Cancel a reservation and restore the product's stock."""
-        reservation = await self.order_repo.get_reservation_by_id(reservation_id)
-        if not reservation or not reservation.active:
+        """
+        Cancel a reservation and restore the product's stock.
+
+        The reservation is locked first, as in a checkout, so a reservation being checked out or
+        cancelled concurrently is not cancelled (and its stock returned) a second time.
+        """
+        reservations = await self.order_repo.lock_active_reservations([reservation_id])
+        if not reservations:
             raise ReservationNotFoundError(reservation_id=reservation_id)
+        reservation = reservations[0]
 
         product = await self.product_repo.get_product_by_id(reservation.product_id)
         if not product:
             raise ProductNotFoundError(product_id=reservation.product_id)
 
-        updated_stock = product.stock + reservation.quantity
+        await self.stock_service.return_stock(product, reservation.quantity, StockMovementKind.CANCEL)
         await self.order_repo.cancel_reservation(reservation_id)
-        await self.product_repo.update_product_stock(product.id, updated_stock)
 
     async def get_all_reservations(
         self, cursor: Optional[int], limit: int
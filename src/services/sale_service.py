@@ -1,8 +1,17 @@
-from src.exceptions.exceptions import NotEnoughStockError, ProductNotFoundError
+from collections import defaultdict
+from typing import List, Tuple
+
+from config import LEADERBOARD_ENABLED
+from src.exceptions.exceptions import ProductNotFoundError, ReservationNotFoundError
+from src.infrastructure.analytics.leaderboard import SALES_LEADERBOARD
+from src.infrastructure.db.models.models import Product, Sale, StockMovementKind
 from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
+from src.repositories.abstract.abstract_reservation_repository import AbstractReservationRepository
 from src.repositories.abstract.abstract_sale_repository import AbstractSaleRepository
-from src.schemes.sale_schemes import SaleResponse
+from src.schemes.sale_schemes import CheckoutLineRequest, SaleResponse
 from src.serializers.serializers import serialize_sale_response
+from src.services.report_service import SALES_REPORT_CACHE
+from src.services.stock_service import StockService
 
 
 class SaleService:
@@ -15,16 +24,24 @@ class SaleService:
     """
 
     def __init__(
-        self, sale_repo: AbstractSaleRepository, product_repo: AbstractProductRepository
+        self,
+        sale_repo: AbstractSaleRepository,
+        product_repo: AbstractProductRepository,
+        reservation_repo: AbstractReservationRepository,
+        stock_service: StockService,
     ):
         """
         Initialize the SaleService with the necessary repositories.
 
         :param sale_repo: Repository for managing sales.
-        :param product_repo: Repository for managing products and stock.
+        :param product_repo: Repository for managing products.
+        :param reservation_repo: Repository for managing reservations.
+        :param stock_service: Service taking and returning product stock.
         """
         self.sale_repo = sale_repo
         self.product_repo = product_repo
+        self.reservation_repo = reservation_repo
+        self.stock_service = stock_service
 
     async def buy_product(self, product_id: int, quantity: int) -> SaleResponse:
         """
@@ -34,12 +51,64 @@ class SaleService:
         if not product:
             raise ProductNotFoundError(product_id=product_id)
 
-        if product.stock < quantity:
-            raise NotEnoughStockError(product_id=product_id)
-
-        product.stock -= quantity
-        await self.product_repo.update_product(product_id, {"stock": product.stock})
+        await self.stock_service.take_stock(product, quantity, StockMovementKind.SALE)
 
         sale = await self.sale_repo.buy_product(product, quantity)
+        self._record_sales([(product, sale)])
 
         return serialize_sale_response(product=product, sale=sale)
+
+    async def checkout(
+        self, lines: List[CheckoutLineRequest], reservation_ids: List[int]
+    ) -> List[SaleResponse]:
+        """
+        Buy all cart lines and convert active reservations into sales in one transaction.
+
+        Reservations and then product stock are locked in ID order, so concurrent checkouts
+        cannot deadlock. Either every line is sold or, on any error, nothing is.
+        """
+        reservations = await self.reservation_repo.lock_active_reservations(reservation_ids)
+        reserved_ids = {reservation.id for reservation in reservations}
+        for reservation_id in sorted(set(reservation_ids) - reserved_ids):
+            raise ReservationNotFoundError(reservation_id=reservation_id)
+
+        quantities = defaultdict(int)
+        for line in lines:
+            quantities[line.product_id] += line.quantity
+        product_ids = set(quantities) | {reservation.product_id for reservation in reservations}
+        products = {product.id: product for product in await self.product_repo.get_products_by_ids(product_ids)}
+        for product_id in sorted(product_ids - set(products)):
+            raise ProductNotFoundError(product_id=product_id)
+
+        for product_id in sorted(quantities):
+            await self.stock_service.take_stock(products[product_id], quantities[product_id], StockMovementKind.SALE)
+        if reserved_ids:
+            await self.reservation_repo.close_reservations(reserved_ids)
+
+        sale_lines = [(products[line.product_id], line.quantity) for line in lines] + [
+            (products[reservation.product_id], reservation.quantity) for reservation in reservations
+        ]
+        sales = await self.sale_repo.create_sales(sale_lines)
+        self._record_sales([(product, sale) for (product, _), sale in zip(sale_lines, sales)])
+
+        return [serialize_sale_response(product=product, sale=sale) for (product, _), sale in zip(sale_lines, sales)]
+
+    def _record_sales(self, sales: List[Tuple[Product, Sale]]) -> None:
+        """
+        Invalidate the cached sales reports of the sale days and record the sales on the leaderboard
+        once the sales are committed, so neither sees sales a rolled back request made.
+        """
+        days = {sale.sold_at for _, sale in sales}
+        records = [
+            (sale.id, product.id, product.category_id, sale.quantity, sale.quantity * sale.unit_price, sale.sold_at)
+            for product, sale in sales
+        ]
+
+        def record() -> None:
+            for sold_at in days:
+                SALES_REPORT_CACHE.invalidate(sold_at)
+            if LEADERBOARD_ENABLED:
+                for record_args in records:
+                    SALES_LEADERBOARD.record(*record_args)
+
+        self.sale_repo.after_commit(record)
@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+from src.exceptions.exceptions import SalesSnapshotUnavailableError
+from src.infrastructure.analytics.sales_snapshot import (
+    EPOCH,
+    MICROSECONDS_PER_DAY,
+    SalesColumns,
+    SalesSnapshot,
+    to_microseconds,
+)
+from src.services.report_service import normalize_sale_filters
+
+
+def summarize_sales(
+    columns: SalesColumns,
+    group_by: str = "product",
+    order_by: str = "revenue",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    top: Optional[int] = None,
+    moving_average: Optional[int] = None,
+) -> List[dict]:
+    """
+    Aggregate units and revenue of the snapshot sales per product, category or day with NumPy.
+
+    Sales are filtered with boolean masks and summed per group with `bincount` over the group key
+    offset by its minimum, so the cost is linear in the number of sales. Days are returned in
+    order, including days without sales between the first and the last one; products and
+    categories by `order_by`, descending. `top` keeps the N groups with the highest `order_by`
+    (selected with `argpartition`); `moving_average` adds trailing averages over that many days
+    (day grouping only, None until the window is full).
+
+    :return: A list of dicts with the SalesAnalyticsRow fields.
+    """
+    product_ids = columns.product_id
+    categories = None
+    if group_by == "category" or category_id:
+        category_by_product = columns.category_by_product
+        known = product_ids < len(category_by_product)
+        categories = np.where(known, category_by_product[np.minimum(product_ids, len(category_by_product) - 1)], -1)
+
+    conditions = []
+    if start_date:
+        conditions.append(columns.sold_at >= to_microseconds(start_date))
+    if end_date:
+        conditions.append(columns.sold_at <= to_microseconds(end_date))
+    if product_id:
+        conditions.append(product_ids == product_id)
+    if category_id:
+        conditions.append(categories == category_id)
+    mask = np.logical_and.reduce(conditions) if conditions else slice(None)
+
+    quantity = columns.quantity[mask]
+    if not len(quantity):
+        return []
+    revenue = quantity * columns.unit_price[mask]
+    if group_by == "product":
+        keys = product_ids[mask]
+    elif group_by == "category":
+        keys = categories[mask]
+    else:
+        keys = columns.sold_at[mask] // MICROSECONDS_PER_DAY
+
+    offset = int(keys.min())
+    positions = keys - offset
+    units_per_group = np.bincount(positions, weights=quantity)
+    revenue_per_group = np.bincount(positions, weights=revenue)
+    if group_by == "day":
+        groups = np.arange(len(units_per_group))
+    else:
+        groups = np.flatnonzero(np.bincount(positions))
+
+    units_average = revenue_average = None
+    if group_by == "day" and moving_average:
+        units_average = _trailing_average(units_per_group, moving_average)
+        revenue_average = _trailing_average(revenue_per_group, moving_average)
+
+    metric = (units_per_group if order_by == "units" else revenue_per_group)[groups]
+    if top is not None and top < len(groups):
+        selected = np.argpartition(-metric, top - 1)[:top]
+        groups = groups[selected[np.argsort(-metric[selected], kind="stable")]]
+    elif group_by != "day":
+        groups = groups[np.argsort(-metric, kind="stable")]
+
+    rows = []
+    for position in groups.tolist():
+        key = position + offset
+        row = {
+            "product_id": None,
+            "category_id": None,
+            "day": None,
+            "units": int(round(units_per_group[position])),
+            "revenue": float(revenue_per_group[position]),
+            "units_moving_average": None,
+            "revenue_moving_average": None,
+        }
+        if group_by == "product":
+            row["product_id"] = key
+            category = int(columns.category_by_product[key]) if key < len(columns.category_by_product) else -1
+            row["category_id"] = category if category >= 0 else None
+        elif group_by == "category":
+            row["category_id"] = key if key >= 0 else None
+        else:
+            row["day"] = (EPOCH + timedelta(days=key)).date()
+            if units_average is not None and not np.isnan(units_average[position]):
+                row["units_moving_average"] = float(units_average[position])
+                row["revenue_moving_average"] = float(revenue_average[position])
+        rows.append(row)
+    return rows
+
+
+def _trailing_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Average of each value and the `window - 1` values before it, NaN where the window is not full."""
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    averages = np.full(len(values), np.nan)
+    if len(values) >= window:
+        averages[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return averages
+
+
+class SalesAnalyticsService:
+    """
+    Service layer answering ad-hoc sales aggregations from the in-process sales snapshot.
+
+    The aggregations run in a thread on views of the snapshot columns (NumPy releases the GIL
+    for most of the work), so the event loop keeps serving requests meanwhile.
+    """
+
+    def __init__(self, snapshot: SalesSnapshot):
+        """
+        Initialize the SalesAnalyticsService.
+
+        :param snapshot: The sales snapshot of the process.
+        """
+        self.snapshot = snapshot
+
+    async def summarize(
+        self,
+        group_by: str = "product",
+        order_by: str = "revenue",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        top: Optional[int] = None,
+        moving_average: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Aggregate the snapshot sales, see `summarize_sales`.
+
+        :raises SalesSnapshotUnavailableError: If the snapshot is disabled or still loading.
+        """
+        if not self.snapshot.ready:
+            raise SalesSnapshotUnavailableError()
+        filters = normalize_sale_filters(start_date=start_date, end_date=end_date)
+        return await asyncio.to_thread(
+            summarize_sales,
+            self.snapshot.columns(),
+            group_by=group_by,
+            order_by=order_by,
+            start_date=filters["start_date"],
+            end_date=filters["end_date"],
+            product_id=product_id,
+            category_id=category_id,
+            top=top,
+            moving_average=moving_average,
+        )
@@ -0,0 +1,145 @@
+from typing import List, Optional
+
+from config import STOCK_LEDGER_ENABLED
+from src.exceptions.exceptions import NotEnoughStockError, ProductNotFoundError
+from src.infrastructure.db.models.models import Product, StockMovement, StockMovementKind
+from src.repositories.abstract.abstract_outbox_repository import AbstractOutboxRepository
+from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
+from src.repositories.abstract.abstract_stock_ledger_repository import AbstractStockLedgerRepository
+from src.repositories.abstract.abstract_stock_shard_repository import AbstractStockShardRepository
+from src.repositories.implementation.outbox_repository import stock_event
+
+
+class StockService:
+    """
+    Service responsible for taking and returning product stock.
+
+    By default stock lives in `products.stock` and is changed with conditional row updates.
+    With `STOCK_LEDGER_ENABLED` every change is appended to the stock movement ledger instead,
+    and `products.stock` is refreshed from the compacted balances in the background. Takes of one
+    product are serialized until commit in both modes; only stock shards spread a hot product.
+    Products with a stock shard count above one keep their stock in sharded counters, whatever the mode.
+
+    Every change of the available stock writes a `stock.changed` outbox event in its transaction.
+    `take_stock` and `return_stock` do not commit: the change is committed together with
+    the sale or reservation record written by the caller.
+    """
+
+    def __init__(
+        self,
+        product_repo: AbstractProductRepository,
+        ledger_repo: AbstractStockLedgerRepository,
+        shard_repo: AbstractStockShardRepository,
+        outbox_repo: AbstractOutboxRepository,
+        ledger_enabled: bool = STOCK_LEDGER_ENABLED,
+    ):
+        """
+        Initialize the StockService with the necessary repositories.
+
+        :param product_repo: Repository for managing products and stock.
+        :param ledger_repo: Repository for the stock movement ledger.
+        :param shard_repo: Repository for sharded stock counters.
+        :param outbox_repo: Repository for the outbox events.
+        :param ledger_enabled: Whether the ledger is the source of truth for stock.
+        """
+        self.product_repo = product_repo
+        self.ledger_repo = ledger_repo
+        self.shard_repo = shard_repo
+        self.outbox_repo = outbox_repo
+        self.ledger_enabled = ledger_enabled
+
+    async def get_available_stock(self, product_id: int) -> int:
+        """Return the available stock of a product. Raise an error if the product does not exist."""
+        product = await self.product_repo.get_product_by_id(product_id)
+        if not product:
+            raise ProductNotFoundError(product_id=product_id)
+        return await self._get_available_stock(product)
+
+    async def take_stock(self, product: Product, quantity: int, kind: StockMovementKind) -> None:
+        """Take `quantity` items of the product. Raise NotEnoughStockError if not enough are available."""
+        if product.stock_shard_count > 1:
+            taken = await self.shard_repo.take_stock(product.id, product.stock_shard_count, quantity)
+        elif self.ledger_enabled:
+            taken = await self.ledger_repo.take_stock(product.id, kind, quantity)
+        else:
+            taken = await self.product_repo.decrement_stock(product.id, quantity) is not None
+        if not taken:
+            raise NotEnoughStockError(product_id=product.id)
+        await self.outbox_repo.add_events([stock_event(product.id, kind, delta=-quantity)])
+
+    async def return_stock(self, product: Product, quantity: int, kind: StockMovementKind) -> None:
+        """Return `quantity` items to the stock of the product."""
+        if product.stock_shard_count > 1:
+            await self.shard_repo.return_stock(product.id, product.stock_shard_count, quantity)
+        elif self.ledger_enabled:
+            await self.ledger_repo.append_movement(product.id, kind, quantity)
+        else:
+            await self.product_repo.increment_stock(product.id, quantity)
+        await self.outbox_repo.add_events([stock_event(product.id, kind, delta=quantity)])
+
+    async def set_stock(self, product: Product, new_stock: int) -> None:
+        """Set the available stock of the product, recording the difference as an adjustment."""
+        await self.outbox_repo.add_events([stock_event(product.id, StockMovementKind.ADJUSTMENT, stock=new_stock)])
+        if product.stock_shard_count > 1:
+            await self.shard_repo.reshard(product.id, product.stock_shard_count, new_stock)
+        elif self.ledger_enabled:
+            await self.ledger_repo.adjust_stock(product.id, new_stock)
+        else:
+            product.stock = new_stock
+
+    async def restock(self, product_id: int, quantity: int) -> int:
+        """Add `quantity` items to the stock of a product and return the new available stock."""
+        product = await self.product_repo.get_product_by_id(product_id)
+        if not product:
+            raise ProductNotFoundError(product_id=product_id)
+
+        # Written first: each branch below commits.
+        await self.outbox_repo.add_events([stock_event(product_id, StockMovementKind.RESTOCK, delta=quantity)])
+        if product.stock_shard_count > 1:
+            await self.shard_repo.return_stock(product_id, product.stock_shard_count, quantity)
+            await self.shard_repo.reshard(product_id, product.stock_shard_count)
+            return await self.shard_repo.get_total_stock(product_id)
+
+        if self.ledger_enabled:
+            await self.ledger_repo.restock(product_id, quantity)
+            return await self.ledger_repo.get_available_stock(product_id)
+
+        return await self.product_repo.restock(product_id, quantity)
+
+    async def get_movements(self, product_id: int, cursor: Optional[int], limit: int) -> List[StockMovement]:
+        """Retrieve the ledger movements of a product with pagination."""
+        return await self.ledger_repo.get_movements(product_id, cursor=cursor, limit=limit)
+
+    async def set_shard_count(self, product_id: int, shard_count: int) -> int:
+        """
+        Split the stock of a product across `shard_count` counter slots, or merge it back with a count of one.
+
+        With the ledger, the stock of an unsharded product is its ledger stock: it is moved into the
+        slots by an adjustment to zero, and back by an adjustment to the total of the slots, in the
+        transaction that rewrites the slots.
+
+        :return: The total available stock of the product.
+        """
+        product = await self.product_repo.get_product_by_id(product_id)
+        if not product:
+            raise ProductNotFoundError(product_id=product_id)
+        if not self.ledger_enabled:
+            return await self.shard_repo.reshard(product_id, shard_count)
+
+        await self.ledger_repo.lock_product(product_id)
+        current = await self.shard_repo.lock_stock(product_id)
+        if current is None:
+            raise ProductNotFoundError(product_id=product_id)
+        current_shard_count, total = current
+        if current_shard_count == 1:
+            total = await self.ledger_repo.get_available_stock(product_id)
+        await self.ledger_repo.adjust_stock(product_id, total if shard_count == 1 else 0)
+        return await self.shard_repo.reshard(product_id, shard_count, total)
+
+    async def _get_available_stock(self, product: Product) -> int:
+        """Return the available stock of a loaded product according to its stock mode."""
+        if product.stock_shard_count > 1:
+            return await self.shard_repo.get_total_stock(product.id)
+        if self.ledger_enabled:
+            return await self.ledger_repo.get_available_stock(product.id)
+        return product.stock
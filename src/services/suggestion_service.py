@@ -0,0 +1,45 @@
+from typing import List
+
+from src.infrastructure.cache.prefix_index import PrefixIndex
+from src.repositories.abstract.abstract_category_repository import AbstractCategoryRepository
+from src.repositories.abstract.abstract_product_repository import AbstractProductRepository
+
+
+class SuggestionService:
+    """
+    Name autocompletion, answered from the in-process prefix index without touching the database.
+    """
+
+    def __init__(self, index: PrefixIndex):
+        self.index = index
+
+    def suggest(self, prefix: str, limit: int) -> List[dict]:
+        """
+        Return up to `limit` products and categories with a name word starting with `prefix`.
+
+        :param prefix: Start of a name word, case-insensitive.
+        :param limit: Maximum number of suggestions.
+        :return: Suggestions as dicts with kind, id and name.
+        """
+        return [
+            {"kind": kind, "id": item_id, "name": name}
+            for kind, item_id, name in self.index.suggest(prefix, limit)
+        ]
+
+    async def rebuild(
+        self, category_repo: AbstractCategoryRepository, product_repo: AbstractProductRepository
+    ) -> int:
+        """
+        Reload the whole index from the database.
+
+        Categories come first, so they stay suggested when the index is too small for all products.
+
+        :return: Number of keys in the rebuilt index.
+        """
+        categories = await category_repo.get_category_names()
+        products = await product_repo.get_product_names()
+        self.index.rebuild(
+            [("category", item_id, name) for item_id, name in categories]
+            + [("product", item_id, name) for item_id, name in products]
+        )
+        return len(self.index)
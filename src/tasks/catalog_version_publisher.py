@@ -0,0 +1,33 @@
+from config import CATALOG_PUBLISH_BATCH_SIZE, CATALOG_PUBLISH_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.metrics.registry import REGISTRY
+from src.repositories.implementation.catalog_change_repository import CatalogChangeRepository
+from src.tasks.periodic_task import PeriodicTask
+
+CATALOG_CHANGES_PUBLISHED = REGISTRY.counter(
+    "catalog_changes_published_total", "Catalog changes given their version in the change feed."
+)
+
+
+class CatalogVersionPublisher(PeriodicTask):
+    """
+    Background task giving the committed catalog changes their version (see /products/changes).
+
+    Every worker runs it; publishing is guarded by an advisory lock, so each round only one worker publishes.
+    """
+
+    name = "catalog-version-publisher"
+
+    def __init__(self, interval: float = CATALOG_PUBLISH_INTERVAL, batch_size: int = CATALOG_PUBLISH_BATCH_SIZE):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    async def run_once(self) -> None:
+        """Publish the pending changes, batch after batch until none are left."""
+        async with SessionLocal() as session:
+            change_repo = CatalogChangeRepository(session)
+            while True:
+                published = await change_repo.publish_pending(self.batch_size)
+                CATALOG_CHANGES_PUBLISHED.inc(published)
+                if published < self.batch_size:
+                    break
@@ -0,0 +1,40 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from config import DISCOUNT_SCHEDULE_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.discount_repository import DiscountRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.services.product_service import PRODUCT_READS
+from src.tasks.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class DiscountScheduler(PeriodicTask):
+    """
+    Background task refreshing the effective prices when scheduled discounts start or end.
+
+    The first round refreshes all prices, which also covers windows passed while the API was down;
+    later rounds only refresh when a discount window boundary was crossed since the previous round.
+    """
+
+    name = "discount-scheduler"
+
+    def __init__(self, interval: float = DISCOUNT_SCHEDULE_INTERVAL):
+        super().__init__(interval)
+        self._checked_until: Optional[datetime] = None
+
+    async def run_once(self) -> None:
+        """Refresh the effective prices if a discount window started or ended."""
+        now = datetime.utcnow()
+        async with SessionLocal() as session:
+            if self._checked_until is None or await DiscountRepository(session).has_window_boundary(
+                self._checked_until, now
+            ):
+                changed = await ProductRepository(session).refresh_effective_prices()
+                if changed:
+                    PRODUCT_READS.forget_all()
+                    logger.info(f"Refreshed the effective price of {len(changed)} products.")
+        self._checked_until = now
@@ -0,0 +1,21 @@
+from config import IDEMPOTENCY_PURGE_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.idempotency_key_repository import IdempotencyKeyRepository
+from src.services.idempotency_service import IDEMPOTENCY_STORE_KEYS
+from src.tasks.periodic_task import PeriodicTask
+
+
+class IdempotencyKeyPurger(PeriodicTask):
+    """Background task deleting expired idempotency keys and reporting the store size."""
+
+    name = "idempotency-key-purger"
+
+    def __init__(self, interval: float = IDEMPOTENCY_PURGE_INTERVAL):
+        super().__init__(interval)
+
+    async def run_once(self) -> None:
+        """Purge expired idempotency keys."""
+        async with SessionLocal() as session:
+            idempotency_repo = IdempotencyKeyRepository(session)
+            await idempotency_repo.purge_expired()
+            IDEMPOTENCY_STORE_KEYS.set(await idempotency_repo.count_keys())
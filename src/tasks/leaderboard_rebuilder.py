@@ -0,0 +1,30 @@
+import logging
+
+from config import LEADERBOARD_REBUILD_INTERVAL
+from src.infrastructure.analytics.leaderboard import SALES_LEADERBOARD
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.report_repository import ReportRepository
+from src.services.leaderboard_service import LeaderboardService
+from src.tasks.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardRebuilder(PeriodicTask):
+    """
+    Background task (re)building the best-sellers leaderboard served by /reports/top-products.
+
+    The first round builds the leaderboard at startup. The SaleService records the sales of this
+    worker as they happen, so later rounds only pick up the sales of the other worker processes.
+    """
+
+    name = "leaderboard-rebuilder"
+
+    def __init__(self, interval: float = LEADERBOARD_REBUILD_INTERVAL):
+        super().__init__(interval)
+
+    async def run_once(self) -> None:
+        """Reload the sales of the last week into the leaderboard."""
+        async with SessionLocal() as session:
+            counters = await LeaderboardService(SALES_LEADERBOARD).rebuild(ReportRepository(session))
+        logger.info(f"Rebuilt the sales leaderboard with {counters} counters.")
@@ -0,0 +1,80 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from config import OUTBOX_BATCH_SIZE, OUTBOX_DELIVERY_LEASE, OUTBOX_DISPATCH_INTERVAL, OUTBOX_RETENTION, OUTBOX_SINKS
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.events.notifier import EVENT_NOTIFIER
+from src.infrastructure.events.sinks import EventSink, build_sinks
+from src.infrastructure.metrics.registry import REGISTRY
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.tasks.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PUBLISHED = REGISTRY.counter("outbox_events_published_total", "Outbox events published to the event stream.")
+OUTBOX_DELIVERED = REGISTRY.counter("outbox_events_delivered_total", "Outbox events delivered to a sink.", ["sink"])
+OUTBOX_SINK_FAILURES = REGISTRY.counter(
+    "outbox_sink_failures_total", "Failed outbox event deliveries, retried on the next round.", ["sink"]
+)
+
+# Seconds between two purges of the published events past their retention.
+PURGE_INTERVAL = 600
+
+
+class OutboxDispatcher(PeriodicTask):
+    """
+    Background task publishing the outbox events and delivering them to the configured sinks.
+
+    Every worker runs it: publishing is guarded by an advisory lock and each sink is claimed for
+    a lease before delivering, so each round only one worker does each of them.
+    """
+
+    name = "outbox-dispatcher"
+
+    def __init__(
+        self,
+        interval: float = OUTBOX_DISPATCH_INTERVAL,
+        sinks: Optional[List[EventSink]] = None,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        delivery_lease: float = OUTBOX_DELIVERY_LEASE,
+    ):
+        super().__init__(interval)
+        self.sinks = build_sinks(OUTBOX_SINKS) if sinks is None else sinks
+        self.batch_size = batch_size
+        self.delivery_lease = delivery_lease
+        self._purged_at = 0.0
+
+    async def run_once(self) -> None:
+        """Publish the pending events, feed the sinks and purge the expired events."""
+        async with SessionLocal() as session:
+            outbox_repo = OutboxRepository(session)
+            published = await outbox_repo.publish_pending(self.batch_size)
+            if published:
+                OUTBOX_PUBLISHED.inc(published)
+                EVENT_NOTIFIER.notify()
+
+            for sink in self.sinks:
+                try:
+                    delivered = await outbox_repo.deliver(
+                        sink.name, self.batch_size, sink.send, self.delivery_lease
+                    )
+                    if delivered:
+                        OUTBOX_DELIVERED.inc(delivered, sink=sink.name)
+                except Exception as exc:
+                    OUTBOX_SINK_FAILURES.inc(sink=sink.name)
+                    logger.error(f"Delivering outbox events to {sink.name} failed: {str(exc)}")
+
+            if time.monotonic() - self._purged_at >= PURGE_INTERVAL:
+                before = datetime.utcnow() - timedelta(seconds=OUTBOX_RETENTION)
+                purged = await outbox_repo.purge_published(before, [sink.name for sink in self.sinks])
+                self._purged_at = time.monotonic()
+                if purged:
+                    logger.info(f"Purged {purged} outbox events.")
+
+    async def stop(self) -> None:
+        """Stop the task and close the sinks."""
+        await super().stop()
+        for sink in self.sinks:
+            await sink.close()
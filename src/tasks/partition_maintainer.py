@@ -0,0 +1,23 @@
+from config import PARTITION_MAINTENANCE_INTERVAL, PARTITION_MONTHS_AHEAD
+from src.infrastructure.db.database import engine
+from src.infrastructure.db.partitions import ensure_partitions
+from src.tasks.periodic_task import PeriodicTask
+
+
+class PartitionMaintainer(PeriodicTask):
+    """Background task creating upcoming monthly partitions of sales and reservations."""
+
+    name = "partition-maintainer"
+
+    def __init__(
+        self,
+        interval: float = PARTITION_MAINTENANCE_INTERVAL,
+        months_ahead: int = PARTITION_MONTHS_AHEAD,
+    ):
+        super().__init__(interval)
+        self.months_ahead = months_ahead
+
+    async def run_once(self) -> None:
+        """Ensure partitions for the current and the next `months_ahead` months."""
+        async with engine.begin() as conn:
+            await ensure_partitions(conn, self.months_ahead)
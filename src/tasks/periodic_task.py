@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(ABC):
+    """
+    Base class for background jobs that run inside the API process.
+
+    `run_once` is awaited every `interval` seconds until the task is stopped. Errors are logged
+    and do not stop the loop, so a temporarily unavailable database only skips a round.
+    """
+
+    name = "periodic-task"
+
+    def __init__(self, interval: float):
+        """
+        Initialize the task.
+
+        :param interval: Pause between two runs, in seconds.
+        """
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def run_once(self) -> None:
+        """Perform one round of work."""
+        pass
+
+    def start(self) -> None:
+        """Schedule the task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error(f"Periodic task {self.name} failed: {str(exc)}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,63 @@
+import logging
+import time
+
+from config import REPORT_JOB_POLL_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.metrics.registry import REGISTRY
+from src.repositories.implementation.report_job_repository import ReportJobRepository
+from src.repositories.implementation.report_repository import ReportRepository
+from src.services.report_job_service import ReportJobService
+from src.tasks.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOBS_FINISHED = REGISTRY.counter("report_jobs_finished_total", "Background report jobs run.", ["status"])
+REPORT_JOB_DURATION = REGISTRY.histogram(
+    "report_job_duration_seconds",
+    "Time spent building the result of a background report job.",
+    [1, 5, 15, 60, 300, 900, 1800],
+)
+
+# Seconds between two purges of the expired report jobs.
+PURGE_INTERVAL = 300
+
+
+class ReportJobWorker(PeriodicTask):
+    """
+    Background task running the pending report jobs, one at a time, until none is left.
+
+    Each process runs REPORT_JOB_WORKERS of them. Jobs are claimed with SKIP LOCKED, so the workers
+    of all processes share the queue; the first worker of a process also purges the expired jobs.
+    """
+
+    name = "report-job-worker"
+
+    def __init__(self, worker: int = 0, interval: float = REPORT_JOB_POLL_INTERVAL):
+        super().__init__(interval)
+        self.name = f"report-job-worker-{worker}"
+        self.purges = worker == 0
+        self._purged_at = 0.0
+
+    async def run_once(self) -> None:
+        """Run the pending jobs and, from time to time, purge the expired ones."""
+        if self.purges and time.monotonic() - self._purged_at >= PURGE_INTERVAL:
+            async with SessionLocal() as session:
+                purged = await ReportJobService(ReportJobRepository(session), ReportRepository(session)).purge()
+            self._purged_at = time.monotonic()
+            if purged:
+                logger.info(f"Purged {purged} expired report jobs.")
+
+        while await self._run_next():
+            pass
+
+    async def _run_next(self) -> bool:
+        # The report is read from a server-side cursor held open by its own session for the whole job.
+        async with SessionLocal() as job_session, SessionLocal() as report_session:
+            service = ReportJobService(ReportJobRepository(job_session), ReportRepository(report_session))
+            started = time.perf_counter()
+            status = await service.run_next()
+        if status is None:
+            return False
+        REPORT_JOBS_FINISHED.inc(status=status)
+        REPORT_JOB_DURATION.observe(time.perf_counter() - started)
+        return True
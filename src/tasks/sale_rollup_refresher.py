@@ -0,0 +1,31 @@
+from config import SALE_ROLLUP_BATCH_SIZE, SALE_ROLLUP_REFRESH_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.tasks.periodic_task import PeriodicTask
+
+
+class SaleRollupRefresher(PeriodicTask):
+    """
+    Background task folding new sales into the daily rollup by sale ID watermark.
+
+    Sale IDs skipped by the watermark, of sales not committed yet, are kept as gaps and folded in
+    once their sales commit (see `SaleRollupRepository.refresh_gaps`).
+    """
+
+    name = "sale-rollup-refresher"
+
+    def __init__(
+        self,
+        interval: float = SALE_ROLLUP_REFRESH_INTERVAL,
+        batch_size: int = SALE_ROLLUP_BATCH_SIZE,
+    ):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    async def run_once(self) -> None:
+        """Fold the committed gaps, then batches of sales until the rollup catches up with the sales table."""
+        async with SessionLocal() as session:
+            rollup_repo = SaleRollupRepository(session)
+            await rollup_repo.refresh_gaps()
+            while await rollup_repo.refresh_from_watermark(self.batch_size) == self.batch_size:
+                pass
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.engine import Row
+
+from config import SALES_SNAPSHOT_BATCH_SIZE, SALES_SNAPSHOT_REFRESH_INTERVAL
+from src.infrastructure.analytics.sales_snapshot import SALES_SNAPSHOT, SalesSnapshot
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.report_repository import ReportRepository
+from src.tasks.periodic_task import PeriodicTask
+
+# Gaps looked up per query (one bind parameter each).
+GAP_LOOKUP_SIZE = 10_000
+# IDs below the oldest sale of the first load tracked as gaps: most IDs further down belong to sales
+# dropped with their partition, and only a nearly empty table has running sales down there.
+FIRST_LOAD_GAP_WINDOW = 1_000
+
+
+class SalesSnapshotRefresher(PeriodicTask):
+    """
+    Background task appending new sales to the in-process sales snapshot by sale ID watermark.
+
+    Sale IDs are drawn before commit, so a sale can become visible after sales with higher IDs. The IDs
+    skipped below the watermark are kept as gaps and looked up again on every refresh until no transaction
+    that could still commit them is running: a gap is retired once the snapshot xmin (oldest running
+    transaction) reaches the snapshot xmax (next transaction ID) read at the refresh after the gap was found,
+    when the transaction drawing the ID has its own transaction ID for sure. Gaps of rolled back or deleted
+    sales are therefore kept for one or two refreshes. The snapshot is marked ready once it caught up with
+    the sales table for the first time.
+    """
+
+    name = "sales-snapshot-refresher"
+
+    def __init__(
+        self,
+        snapshot: SalesSnapshot = SALES_SNAPSHOT,
+        interval: float = SALES_SNAPSHOT_REFRESH_INTERVAL,
+        batch_size: int = SALES_SNAPSHOT_BATCH_SIZE,
+    ):
+        super().__init__(interval)
+        self.snapshot = snapshot
+        self.batch_size = batch_size
+        # Missing sale ID -> xmin to wait for before giving up on it (None until the next refresh).
+        self.gaps: Dict[int, Optional[int]] = {}
+
+    async def run_once(self) -> None:
+        """Refresh the product categories, look the gaps up again and load batches of new sales."""
+        async with SessionLocal() as session:
+            report_repo = ReportRepository(session)
+            categories = await report_repo.get_product_categories()
+            oldest_running, next_transaction = await report_repo.get_transaction_bounds()
+        await asyncio.to_thread(self.snapshot.set_categories, categories)
+
+        if self.gaps:
+            await self._load_gaps()
+            # Transactions that ended before the bounds were read are visible to the lookups above.
+            self.gaps = {
+                sale_id: next_transaction if retire_at is None else retire_at
+                for sale_id, retire_at in self.gaps.items()
+                if retire_at is None or retire_at > oldest_running
+            }
+
+        while True:
+            # A session per batch: the initial load of a large table must not hold one transaction open.
+            after_sale_id = self.snapshot.last_sale_id
+            async with SessionLocal() as session:
+                rows = await ReportRepository(session).get_sale_columns(after_sale_id, self.batch_size)
+            self._add_gaps(after_sale_id, rows)
+            await asyncio.to_thread(self.snapshot.append, rows, len(rows))
+            if len(rows) < self.batch_size:
+                break
+        self.snapshot.ready = True
+
+    async def _load_gaps(self) -> None:
+        """Append the sales of the gaps that became visible and forget their IDs."""
+        gap_ids = sorted(self.gaps)
+        for start in range(0, len(gap_ids), GAP_LOOKUP_SIZE):
+            chunk = gap_ids[start:start + GAP_LOOKUP_SIZE]
+            async with SessionLocal() as session:
+                rows = await ReportRepository(session).get_sale_columns(0, len(chunk), chunk)
+            await asyncio.to_thread(self.snapshot.append, rows, len(rows))
+            for row in rows:
+                del self.gaps[row[0]]
+
+    def _add_gaps(self, after_sale_id: int, rows: List[Row]) -> None:
+        """Record the IDs missing between `after_sale_id` and the last of the sales loaded after it."""
+        if not rows:
+            return
+        ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        first_id = after_sale_id + 1 if after_sale_id else max(1, int(ids[0]) - FIRST_LOAD_GAP_WINDOW)
+        for sale_id in np.setdiff1d(np.arange(first_id, int(ids[-1]) + 1), ids, assume_unique=True):
+            self.gaps[int(sale_id)] = None
@@ -0,0 +1,18 @@
+from config import STOCK_LEDGER_COMPACTION_INTERVAL
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.tasks.periodic_task import PeriodicTask
+
+
+class StockLedgerCompactor(PeriodicTask):
+    """Background task folding appended stock movements into the stock balances."""
+
+    name = "stock-ledger-compactor"
+
+    def __init__(self, interval: float = STOCK_LEDGER_COMPACTION_INTERVAL):
+        super().__init__(interval)
+
+    async def run_once(self) -> None:
+        """Compact the stock ledger."""
+        async with SessionLocal() as session:
+            await StockLedgerRepository(session).compact()
@@ -0,0 +1,33 @@
+import logging
+
+from config import SUGGEST_REBUILD_INTERVAL
+from src.infrastructure.cache.prefix_index import NAME_SUGGESTIONS
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.category_repository import CategoryRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.services.suggestion_service import SuggestionService
+from src.tasks.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestionIndexBuilder(PeriodicTask):
+    """
+    Background task (re)building the name prefix index served by /suggest.
+
+    The first round builds the index at startup. The repositories keep it up to date on writes,
+    so later rounds only pick up the writes of the other worker processes.
+    """
+
+    name = "suggestion-index-builder"
+
+    def __init__(self, interval: float = SUGGEST_REBUILD_INTERVAL):
+        super().__init__(interval)
+
+    async def run_once(self) -> None:
+        """Reload the names of all categories and products into the index."""
+        async with SessionLocal() as session:
+            entries = await SuggestionService(NAME_SUGGESTIONS).rebuild(
+                CategoryRepository(session), ProductRepository(session)
+            )
+        logger.info(f"Rebuilt the suggestion index with {entries} entries.")
@@ -0,0 +1,107 @@
+"""
+Shared fixtures of the test suite.
+
+The tests run against a real Postgres, as the schema relies on partitioned tables, JSONB columns and
+upserts. A scratch database named TEST_DB_NAME (default `online_store_test`) on the DB_* server is
+recreated with the migrations once per run, so never point TEST_DB_NAME at a database you care about.
+Without a reachable server the database tests are skipped.
+
+Run from the project root: `python -m pytest` (or `make test`).
+"""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# The application reads DB_NAME when `config` is first imported, so switch it before any import of the app.
+load_dotenv()
+os.environ["DB_NAME"] = os.getenv("TEST_DB_NAME") or "online_store_test"
+
+import asyncio  # noqa: E402
+
+import asyncpg  # noqa: E402
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER  # noqa: E402
+from src.infrastructure.db.database import Base, SessionLocal, engine  # noqa: E402
+from src.infrastructure.db.models.models import Category, Product  # noqa: E402
+from src.infrastructure.db.statement_counter import StatementCounter  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _recreate_database() -> None:
+    conn = await asyncpg.connect(user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT, database="postgres")
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{DB_NAME}" WITH (FORCE)')
+        await conn.execute(f'CREATE DATABASE "{DB_NAME}"')
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="session")
+def database() -> str:
+    """Recreate the test database and migrate it to the head revision."""
+    try:
+        asyncio.run(_recreate_database())
+    except (OSError, asyncpg.PostgresError) as exc:
+        pytest.skip(f"Postgres is not available at {DB_HOST}:{DB_PORT}: {exc}")
+
+    alembic_config = Config(str(ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(alembic_config, "head")
+    return DB_NAME
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_session(database):
+    """
+    A session on an emptied test database.
+
+    Every test runs in its own event loop, so the pooled connections of the previous one are dropped.
+    """
+    await engine.dispose()
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    async with SessionLocal() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db_session):
+    """An HTTP client calling the app in-process; startup tasks are not run."""
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
+
+
+@pytest.fixture
+def statement_counter(database) -> StatementCounter:
+    """A counter of the SQL statements of the app engine, counting within `with statement_counter:`."""
+    return StatementCounter(engine)
+
+
+@pytest.fixture
+async def product(db_session) -> Product:
+    """A product with 100 in stock, in a category of its own."""
+    category = Category(name="Category")
+    db_session.add(category)
+    await db_session.flush()
+    product = Product(
+        name="Product", description="Description", price=10.0, effective_price=10.0, category_id=category.id, stock=100
+    )
+    db_session.add(product)
+    await db_session.commit()
+    return product
@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.middleware.admission_control import AdmissionController, AdmissionControlMiddleware, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2, burst=2, now=0)
+
+    assert [bucket.take(0), bucket.take(0)] == [0, 0]
+    assert bucket.take(0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+    # Idle for long, the bucket holds `burst` tokens, not more.
+    assert [bucket.take(100), bucket.take(100), bucket.take(100) > 0] == [0, 0, True]
+
+
+def test_concurrency_cap_admits_again_after_a_release():
+    controller = AdmissionController(rate_limits={}, concurrency_limits={"reports": 1})
+
+    assert controller.admit("a", "reports", 0) is None
+    assert controller.admit("b", "reports", 0) == (503, 1)
+    assert controller.admit("b", "catalog", 0) is None
+    controller.release("reports")
+    assert controller.admit("b", "reports", 0) is None
+
+
+async def test_rejections_carry_retry_after():
+    started, finish = asyncio.Event(), asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/reports/slow")
+    async def slow():
+        started.set()
+        await finish.wait()
+        return {}
+
+    @app.get("/products/")
+    async def products():
+        return []
+
+    controller = AdmissionController(rate_limits={"catalog": (1, 1)}, concurrency_limits={"reports": 1})
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/products/")).status_code == 200
+        limited = await client.get("/products/")
+
+        first = asyncio.create_task(client.get("/reports/slow"))
+        await started.wait()
+        overloaded = await client.get("/reports/slow")
+        finish.set()
+        assert (await first).status_code == 200
+
+    assert (limited.status_code, limited.headers["retry-after"]) == (429, "1")
+    assert (overloaded.status_code, overloaded.headers["retry-after"]) == (503, "1")
+
+
+async def test_rejections_carry_cors_headers(client):
+    from main import app
+
+    if AdmissionControlMiddleware not in [middleware.cls for middleware in app.user_middleware]:
+        pytest.skip("ADMISSION_CONTROL_ENABLED is off")
+    headers = {"Origin": "http://localhost:8000"}
+    for _ in range(100):
+        response = await client.get("/reports/missing", headers=headers)
+        if response.status_code == 429:
+            break
+
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "http://localhost:8000"
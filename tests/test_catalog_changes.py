@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import update
+
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import Product
+from src.repositories.implementation.catalog_change_repository import CatalogChangeRepository
+from src.services.catalog_change_service import CatalogChangeService
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_late_commit_is_not_skipped_by_the_token(db_session, product):
+    late = Product(name="Late", description="Description", price=10, effective_price=10, stock=1)
+    late.category_id = product.category_id
+    db_session.add(late)
+    await db_session.commit()
+    product_id, late_id = product.id, late.id
+    change_repo = CatalogChangeRepository(db_session)
+    change_service = CatalogChangeService(change_repo)
+    await change_repo.publish_pending(100)
+    token = (await change_service.get_changes(0, 100))["next_token"]
+
+    async with SessionLocal() as long_session:
+        # A long transaction changes a product first, another one commits a later change meanwhile.
+        await long_session.execute(update(Product).where(Product.id == late_id).values(price=11))
+        async with SessionLocal() as session:
+            await session.execute(update(Product).where(Product.id == product_id).values(price=12))
+            await session.commit()
+        await change_repo.publish_pending(100)
+        page = await change_service.get_changes(token, 100)
+        assert [change["id"] for change in page["changes"]] == [product_id]
+        token = page["next_token"]
+        await long_session.commit()
+
+    await change_repo.publish_pending(100)
+    page = await change_service.get_changes(token, 100)
+    assert [change["id"] for change in page["changes"]] == [late_id]
+    assert not page["has_more"]
@@ -0,0 +1,28 @@
+import pytest
+
+from src.infrastructure.db.models.models import Category, Discount, Product
+from src.repositories.implementation.category_repository import CategoryRepository
+from src.repositories.implementation.product_repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_moving_a_category_reprices_its_subtree(db_session):
+    discounted, plain = Category(name="Discounted"), Category(name="Plain")
+    moved = Category(name="Moved", parent=plain)
+    leaf = Category(name="Leaf", parent=moved)
+    db_session.add_all([discounted, plain, moved, leaf])
+    await db_session.flush()
+    db_session.add(Discount(name="Category sale", percentage=20.0, category_id=discounted.id))
+    product = Product(name="Product", description="Description", price=10.0, effective_price=10.0, category_id=leaf.id)
+    db_session.add(product)
+    await db_session.commit()
+    product_id, moved_id, discounted_id, plain_id = product.id, moved.id, discounted.id, plain.id
+
+    await CategoryRepository(db_session).update_category_by_id(moved_id, {"parent_id": discounted_id})
+    db_session.expire_all()
+    assert (await ProductRepository(db_session).get_product_by_id(product_id)).effective_price == pytest.approx(8.0)
+
+    await CategoryRepository(db_session).update_category_by_id(moved_id, {"parent_id": plain_id})
+    db_session.expire_all()
+    assert (await ProductRepository(db_session).get_product_by_id(product_id)).effective_price == pytest.approx(10.0)
@@ -0,0 +1,47 @@
+import pytest
+
+from src.infrastructure.db.models.models import Category, Discount, Product
+from src.repositories.implementation.discount_repository import DiscountRepository
+from src.repositories.implementation.product_repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_category_discount_only_reprices_its_subtree(db_session):
+    parent, other = Category(name="Parent"), Category(name="Other")
+    child = Category(name="Child", parent=parent)
+    db_session.add_all([parent, other, child])
+    await db_session.flush()
+    inside = Product(name="Inside", description="Description", price=10.0, effective_price=10.0, category_id=child.id)
+    # Out of sync on purpose: a catalog-wide refresh would reprice it.
+    outside = Product(name="Outside", description="Description", price=10.0, effective_price=7.0, category_id=other.id)
+    db_session.add_all([inside, outside])
+    await db_session.commit()
+    inside_id, outside_id, parent_id = inside.id, outside.id, parent.id
+    product_repo, discount_repo = ProductRepository(db_session), DiscountRepository(db_session)
+
+    discount_id = (await discount_repo.add_discount(Discount(name="Sale", percentage=20.0, category_id=parent_id))).id
+    db_session.expire_all()
+    assert (await product_repo.get_product_by_id(inside_id)).effective_price == pytest.approx(8.0)
+    assert (await product_repo.get_product_by_id(outside_id)).effective_price == pytest.approx(7.0)
+
+    assert await discount_repo.delete_discount(discount_id)
+    db_session.expire_all()
+    assert (await product_repo.get_product_by_id(inside_id)).effective_price == pytest.approx(10.0)
+    assert (await product_repo.get_product_by_id(outside_id)).effective_price == pytest.approx(7.0)
+
+
+@pytest.mark.parametrize("path", ["/products/discount/bulk", "/products/discount/bulk/remove"])
+@pytest.mark.parametrize("selection", [{}, {"name_contains": ""}])
+async def test_bulk_discount_rejects_an_empty_selection(client, db_session, product, path, selection):
+    product_id = product.id
+    discount = Discount(name="Sale", percentage=20.0)
+    db_session.add(discount)
+    await db_session.commit()
+    discount_id = discount.id
+
+    response = await client.post(path, json={"discount_id": discount_id, **selection})
+
+    assert response.status_code == 422
+    db_session.expire_all()
+    assert (await ProductRepository(db_session).get_product_by_id(product_id)).discount_id is None
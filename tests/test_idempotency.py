@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, select, update
+
+from src.exceptions.exceptions import IdempotencyKeyInProgressError
+from src.infrastructure.cache.lru_cache import LRUCache
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import IdempotencyKey, Sale
+from src.repositories.implementation.idempotency_key_repository import IdempotencyKeyRepository
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.reservation_repository import ReservationRepository
+from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.schemes.sale_schemes import SaleResponse
+from src.services.idempotency_service import IdempotencyService
+from src.services.report_service import SALES_REPORT_CACHE
+from src.services.sale_service import SaleService
+from src.services.stock_service import StockService
+
+pytestmark = pytest.mark.anyio
+
+
+class UnexpectedResponse(BaseModel):
+    """Schema the sale response does not validate against."""
+
+    receipt_number: str
+
+
+def services(session):
+    stock_service = StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+    )
+    sale_service = SaleService(
+        SaleRepository(session), ProductRepository(session), ReservationRepository(session), stock_service
+    )
+    return sale_service, IdempotencyService(IdempotencyKeyRepository(session), LRUCache(16))
+
+
+async def count(session, model) -> int:
+    return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+async def test_response_is_stored_with_the_sale(db_session, product):
+    product_id = product.id
+    sale_service, idempotency_service = services(db_session)
+
+    response, replayed = await idempotency_service.execute(
+        "sales", "key-1", {"product_id": product_id}, lambda: sale_service.buy_product(product_id, 2), SaleResponse
+    )
+
+    assert not replayed
+    stored = await IdempotencyKeyRepository(db_session).get_key("sales", "key-1")
+    assert stored.response == response
+    assert await count(db_session, Sale) == 1
+
+
+async def test_sale_is_committed_and_reported_when_the_request_completes(db_session, product):
+    product_id = product.id
+    sale_service, idempotency_service = services(db_session)
+    generation = SALES_REPORT_CACHE.generation
+    observed = []
+
+    async def buy():
+        response = await sale_service.buy_product(product_id, 2)
+        async with SessionLocal() as other_session:
+            observed.append((await count(other_session, Sale), SALES_REPORT_CACHE.generation))
+        return response
+
+    await idempotency_service.execute("sales", "key-1", {"product_id": product_id}, buy, SaleResponse)
+
+    assert observed == [(0, generation)]
+    assert SALES_REPORT_CACHE.generation > generation
+
+
+async def test_sale_is_rolled_back_when_its_response_cannot_be_stored(db_session, product):
+    product_id = product.id
+    sale_service, idempotency_service = services(db_session)
+    generation = SALES_REPORT_CACHE.generation
+
+    with pytest.raises(ValidationError):
+        await idempotency_service.execute(
+            "sales",
+            "key-1",
+            {"product_id": product_id},
+            lambda: sale_service.buy_product(product_id, 2),
+            UnexpectedResponse,
+        )
+
+    db_session.expire_all()
+    assert await count(db_session, Sale) == 0
+    assert await count(db_session, IdempotencyKey) == 0
+    assert (await ProductRepository(db_session).get_product_by_id(product_id)).stock == 100
+    assert SALES_REPORT_CACHE.generation == generation
+
+
+async def test_claim_of_a_crashed_request_is_taken_over_once_its_lease_passed(db_session, product):
+    product_id = product.id
+    sale_service, idempotency_service = services(db_session)
+    payload = {"product_id": product_id}
+    request_hash = idempotency_service._hash_payload(payload)
+    now = datetime.utcnow()
+    key_repo = IdempotencyKeyRepository(db_session)
+    # The worker that claimed the key crashed before completing the request.
+    assert await key_repo.claim_key("sales", "key-1", request_hash, now + timedelta(days=1), now + timedelta(hours=1))
+
+    def buy():
+        return sale_service.buy_product(product_id, 2)
+
+    with pytest.raises(IdempotencyKeyInProgressError):
+        await idempotency_service.execute("sales", "key-1", payload, buy, SaleResponse)
+    await db_session.execute(update(IdempotencyKey).values(claimed_until=now - timedelta(seconds=1)))
+    await db_session.commit()
+    response, replayed = await idempotency_service.execute("sales", "key-1", payload, buy, SaleResponse)
+
+    assert not replayed
+    assert (await key_repo.get_key("sales", "key-1")).response == response
+    assert await count(db_session, Sale) == 1
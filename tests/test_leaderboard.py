@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.infrastructure.analytics.leaderboard import SalesLeaderboard
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import Sale
+from src.repositories.implementation.report_repository import ReportRepository
+from src.services.leaderboard_service import LeaderboardService
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_rebuild_counts_sales_committed_during_it_once(db_session, product):
+    product_id, category_id = product.id, product.category_id
+    leaderboard = SalesLeaderboard(bucket_seconds=60)
+    sold_at = datetime.utcnow() - timedelta(minutes=1)
+    committed = Sale(product_id=product_id, quantity=2, unit_price=10.0, sold_at=sold_at)
+    db_session.add(committed)
+    await db_session.commit()
+
+    async with SessionLocal() as late_session:
+        late = Sale(product_id=product_id, quantity=3, unit_price=10.0, sold_at=sold_at)
+        late_session.add(late)
+        await late_session.flush()
+
+        class CommitDuringRebuild(ReportRepository):
+            async def get_sale_buckets(self, *args, **kwargs):
+                rows = await super().get_sale_buckets(*args, **kwargs)
+                # Recorded after the snapshot: one sale it saw, one committed after it.
+                leaderboard.record(committed.id, product_id, category_id, 2, 20.0, sold_at)
+                await late_session.commit()
+                leaderboard.record(late.id, product_id, category_id, 3, 30.0, sold_at)
+                return rows
+
+        async with SessionLocal() as session:
+            await LeaderboardService(leaderboard).rebuild(CommitDuringRebuild(session))
+
+    assert [(row["product_id"], row["units"]) for row in leaderboard.top("hour")] == [(product_id, 5)]
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+
+from config import OUTBOX_SINK_OFFSET_TABLE
+from src.exceptions.exceptions import NotEnoughStockError
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import OutboxEvent, OutboxSinkOffset, StockMovementKind
+from src.repositories.implementation.outbox_repository import OutboxRepository, outbox_event
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.stock_service import StockService
+
+pytestmark = pytest.mark.anyio
+
+
+def stock_service(session, ledger_enabled: bool) -> StockService:
+    return StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+        ledger_enabled=ledger_enabled,
+    )
+
+
+async def stock_events(session) -> list:
+    query = select(OutboxEvent.payload).filter(OutboxEvent.topic == "stock.changed").order_by(OutboxEvent.id)
+    return list((await session.execute(query)).scalars())
+
+
+async def publish(session, count: int) -> None:
+    outbox_repo = OutboxRepository(session)
+    await outbox_repo.add_events([outbox_event("test.event", index, {}) for index in range(count)])
+    await session.commit()
+    await outbox_repo.publish_pending(100)
+
+
+@pytest.mark.parametrize("ledger_enabled", [False, True])
+async def test_stock_changes_write_stock_events(db_session, product, ledger_enabled):
+    product_id = product.id
+    product_repo = ProductRepository(db_session)
+    service = stock_service(db_session, ledger_enabled)
+    await service.take_stock(product, 3, StockMovementKind.SALE)
+    await db_session.commit()
+    with pytest.raises(NotEnoughStockError):
+        await service.take_stock(await product_repo.get_product_by_id(product_id), 1000, StockMovementKind.SALE)
+    await db_session.rollback()
+    await service.return_stock(await product_repo.get_product_by_id(product_id), 1, StockMovementKind.CANCEL)
+    await db_session.commit()
+    await service.restock(product_id, 5)
+    await service.set_shard_count(product_id, 4)
+    db_session.expire_all()
+    await service.set_stock(await product_repo.get_product_by_id(product_id), 50)
+    await db_session.commit()
+
+    assert [(event["kind"], event["delta"], event["stock"]) for event in await stock_events(db_session)] == [
+        ("sale", -3, None),
+        ("cancel", 1, None),
+        ("restock", 5, None),
+        ("adjustment", None, 50),
+    ]
+    assert all(event["product_id"] == product_id for event in await stock_events(db_session))
+
+
+async def test_delivery_holds_no_transaction_while_sending(db_session):
+    await publish(db_session, 3)
+    sending, release = asyncio.Event(), asyncio.Event()
+    sent = []
+
+    async def send(events):
+        sent.extend(events)
+        sending.set()
+        await release.wait()
+
+    async def deliver():
+        async with SessionLocal() as session:
+            return await OutboxRepository(session).deliver("slow", 100, send, lease=60)
+
+    delivery = asyncio.create_task(deliver())
+    await sending.wait()
+    try:
+        async with SessionLocal() as session:
+            # The offset row is not locked, and the claimed sink is skipped by the other workers.
+            locked = text(f"SELECT last_sequence FROM {OUTBOX_SINK_OFFSET_TABLE} WHERE sink = 'slow' FOR UPDATE NOWAIT")
+            assert (await session.execute(locked)).scalar() == 0
+            await session.rollback()
+            assert await OutboxRepository(session).deliver("slow", 100, send, lease=60) == 0
+    finally:
+        release.set()
+
+    assert await delivery == 3
+    offset = await db_session.get(OutboxSinkOffset, "slow")
+    assert (offset.last_sequence, offset.claimed_by) == (sent[-1]["sequence"], None)
+
+
+async def test_failed_delivery_releases_the_claim(db_session):
+    await publish(db_session, 2)
+    outbox_repo = OutboxRepository(db_session)
+
+    async def failing_send(events):
+        raise ConnectionError("sink is down")
+
+    with pytest.raises(ConnectionError):
+        await outbox_repo.deliver("flaky", 100, failing_send, lease=60)
+
+    sent = []
+
+    async def send(events):
+        sent.extend(events)
+
+    assert await outbox_repo.deliver("flaky", 100, send, lease=60) == 2
+    assert [event["aggregate_id"] for event in sent] == [0, 1]
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+
+from config import SALE_TABLE
+from src.infrastructure.db.database import engine
+from src.infrastructure.db.models.models import Sale
+from src.infrastructure.db.partitions import ensure_partitions, month_start, partition_name, shift_months
+from src.repositories.implementation.report_repository import ReportRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def _scanned_relations(plan: dict) -> set:
+    """Collect the relations scanned anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        relations |= _scanned_relations(child)
+    return relations
+
+
+async def test_sales_report_date_filter_prunes_partitions(db_session):
+    month = month_start(datetime.utcnow())
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(shift_months(month, 1), datetime.min.time()) - timedelta(microseconds=1)
+    query = ReportRepository._sales_report_query(start_date=start, end_date=end)
+    sql = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+
+    plan = (await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scanned = {name for name in _scanned_relations(plan[0]["Plan"]) if name.startswith(f"{SALE_TABLE}_")}
+
+    assert scanned == {partition_name(SALE_TABLE, month)}
+
+
+async def test_ensure_partitions_moves_rows_out_of_the_default_partition(db_session, product):
+    future = shift_months(month_start(datetime.utcnow()), 24)
+    sold_at = datetime.combine(future, datetime.min.time())
+    sale = Sale(product_id=product.id, quantity=1, unit_price=10.0, sold_at=sold_at)
+    db_session.add(sale)
+    await db_session.commit()
+    located = select(text("tableoid::regclass::text")).select_from(Sale).filter(Sale.id == sale.id)
+    assert (await db_session.execute(located)).scalar() == f"{SALE_TABLE}_default"
+    # Moving the rows locks the table, end the transaction of the session first.
+    await db_session.rollback()
+
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, months_ahead=24)
+
+    assert (await db_session.execute(located)).scalar() == partition_name(SALE_TABLE, future)
+    attached = text("SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:name))")
+    assert (await db_session.execute(attached, {"name": f"{SALE_TABLE}_default"})).scalar()
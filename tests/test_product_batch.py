@@ -0,0 +1,42 @@
+import pytest
+
+from config import PRODUCT_BATCH_MAX_IDS
+from src.infrastructure.db.models.models import Product
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_keeps_the_requested_order_and_reports_missing_ids(client, db_session, product):
+    other = Product(name="Other", description="Description", price=5.0, effective_price=5.0, stock=3)
+    other.category_id = product.category_id
+    db_session.add(other)
+    await db_session.commit()
+    product_id, other_id = product.id, other.id
+    ids = [other_id, 999, product_id, other_id]
+
+    by_query = await client.get("/products/batch", params={"ids": ",".join(map(str, ids))})
+    by_body = await client.post("/products/batch", json={"ids": ids})
+
+    for response in (by_query, by_body):
+        assert response.status_code == 200
+        batch = response.json()
+        assert [item["id"] for item in batch["products"]] == [other_id, product_id]
+        assert [item["name"] for item in batch["products"]] == ["Other", "Product"]
+        assert batch["products"][1]["category_name"] == "Category"
+        assert batch["missing_ids"] == [999]
+
+
+async def test_batch_is_one_query(client, product, statement_counter):
+    product_id = product.id
+    with statement_counter:
+        response = await client.get("/products/batch", params={"ids": f"{product_id},{product_id + 1}"})
+
+    assert response.status_code == 200
+    statement_counter.assert_at_most(1)
+
+
+async def test_batch_over_the_limit_is_rejected(client, db_session):
+    ids = list(range(1, PRODUCT_BATCH_MAX_IDS + 2))
+
+    assert (await client.post("/products/batch", json={"ids": ids})).status_code == 422
+    assert (await client.get("/products/batch", params={"ids": "1,x"})).status_code == 422
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dependencies.query_dependencies import DisconnectGuard, statement_timeout
+from src.infrastructure.db.database import engine, get_db
+from src.middleware.exception_handling import ExceptionHandlingMiddleware
+
+pytestmark = pytest.mark.anyio
+
+SLEEPING = text("SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND query LIKE 'SELECT pg_sleep%'")
+
+
+def sleep_app(timeout: float) -> FastAPI:
+    """An app with one report-like route running `pg_sleep` under a statement timeout and a disconnect guard."""
+    router = APIRouter(dependencies=[Depends(statement_timeout(timeout))])
+
+    @router.get("/sleep")
+    async def sleep(seconds: float, db: AsyncSession = Depends(get_db), guard: DisconnectGuard = Depends()):
+        await guard.run(db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": seconds}))
+        return {"slept": seconds}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ExceptionHandlingMiddleware)
+    return app
+
+
+async def test_timeout_returns_the_connection_to_the_pool(db_session):
+    transport = httpx.ASGITransport(app=sleep_app(timeout=0.2))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.monotonic()
+        response = await client.get("/sleep", params={"seconds": 5})
+
+    assert response.status_code == 504
+    assert time.monotonic() - started < 2
+    assert engine.pool.checkedout() == 0
+    assert (await db_session.execute(SLEEPING)).scalar() == 0
+
+
+async def test_disconnect_cancels_the_query_and_returns_the_connection(db_session):
+    requested = False
+    sent = []
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(0.2)
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/sleep",
+        "raw_path": b"/sleep",
+        "root_path": "",
+        "query_string": b"seconds=5",
+        "headers": [],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    started = time.monotonic()
+    await sleep_app(timeout=0)(scope, receive, send)
+
+    assert time.monotonic() - started < 2
+    assert sent[0]["status"] == 499
+    assert engine.pool.checkedout() == 0
+    assert (await db_session.execute(SLEEPING)).scalar() == 0
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.exceptions.exceptions import ReservationNotFoundError
+from src.infrastructure.db.database import SessionLocal
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.reservation_repository import ReservationRepository
+from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.reservation_service import ReservationService
+from src.services.sale_service import SaleService
+from src.services.stock_service import StockService
+
+pytestmark = pytest.mark.anyio
+
+
+def stock_service(session) -> StockService:
+    return StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+    )
+
+
+def reservation_service(session) -> ReservationService:
+    return ReservationService(ReservationRepository(session), ProductRepository(session), stock_service(session))
+
+
+def sale_service(session) -> SaleService:
+    return SaleService(
+        SaleRepository(session), ProductRepository(session), ReservationRepository(session), stock_service(session)
+    )
+
+
+async def _cancel(reservation_id: int) -> None:
+    async with SessionLocal() as session:
+        await reservation_service(session).cancel_reservation(reservation_id)
+
+
+async def _checkout(reservation_id: int) -> None:
+    async with SessionLocal() as session:
+        await sale_service(session).checkout([], [reservation_id])
+
+
+@pytest.mark.parametrize("concurrent", [_cancel, _checkout])
+async def test_cancel_races_return_the_stock_once(db_session, product, concurrent):
+    product_id = product.id
+    reservation = await reservation_service(db_session).reserve_product(product_id, 10)
+
+    results = await asyncio.gather(_cancel(reservation.id), concurrent(reservation.id), return_exceptions=True)
+
+    assert sum(isinstance(result, ReservationNotFoundError) for result in results) == 1
+    db_session.expire_all()
+    # Unless the checkout won, the reserved items are back in stock.
+    expected = 90 if concurrent is _checkout and results[0] is not None else 100
+    assert await stock_service(db_session).get_available_stock(product_id) == expected
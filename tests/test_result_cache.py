@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.infrastructure.cache.result_cache import ResultCache
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.report_repository import ReportRepository
+from src.repositories.implementation.reservation_repository import ReservationRepository
+from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.report_service import SALES_REPORT_CACHE, ReportService, normalize_sale_filters
+from src.services.sale_service import SaleService
+from src.services.stock_service import StockService
+
+DAY = datetime(2026, 1, 10)
+
+
+def test_equivalent_filters_normalize_to_the_same_key():
+    moment = datetime(2026, 1, 10, 12, tzinfo=timezone(timedelta(hours=2)))
+
+    assert normalize_sale_filters(product_id=0, product_name="Phone", start_date=moment) == normalize_sale_filters(
+        product_name="phone", category_name="", start_date=datetime(2026, 1, 10, 10)
+    )
+
+
+def test_invalidation_drops_the_open_ranges_containing_the_sale():
+    cache = ResultCache("test", max_entries=10, max_bytes=1000, open_ttl=60)
+    cache.set("closed", b"1", DAY - timedelta(days=7), DAY - timedelta(days=1), False, cache.generation)
+    cache.set("open", b"2", DAY - timedelta(days=1), None, True, cache.generation)
+    cache.set("later", b"3", DAY + timedelta(days=1), None, True, cache.generation)
+
+    cache.invalidate(DAY)
+
+    assert [cache.get("closed"), cache.get("open"), cache.get("later")] == [b"1", None, b"3"]
+
+
+def test_result_computed_before_an_invalidation_is_not_cached():
+    cache = ResultCache("test", max_entries=10, max_bytes=1000, open_ttl=60)
+    generation = cache.generation
+    cache.invalidate(DAY)
+
+    cache.set("open", b"stale", DAY, None, True, generation)
+    cache.set("closed", b"final", DAY - timedelta(days=7), DAY - timedelta(days=1), False, generation)
+
+    assert [cache.get("open"), cache.get("closed")] == [None, b"final"]
+
+
+def test_open_ranges_expire_after_the_ttl():
+    cache = ResultCache("test", max_entries=10, max_bytes=1000, open_ttl=0)
+    cache.set("open", b"1", DAY, None, True, cache.generation)
+    cache.set("closed", b"2", DAY - timedelta(days=7), DAY - timedelta(days=1), False, cache.generation)
+
+    assert [cache.get("open"), cache.get("closed")] == [None, b"2"]
+    assert len(cache) == 1
+
+
+def test_least_recently_used_results_are_evicted_over_the_limits():
+    cache = ResultCache("test", max_entries=2, max_bytes=10, open_ttl=60)
+    for key in ("a", "b"):
+        cache.set(key, b"1234", None, DAY, False, cache.generation)
+    cache.get("a")
+    cache.set("c", b"1234", None, DAY, False, cache.generation)
+    assert [cache.get("a"), cache.get("b"), cache.get("c")] == [b"1234", None, b"1234"]
+
+    cache.set("d", b"123456", None, DAY, False, cache.generation)
+    assert [cache.get("a"), cache.get("c"), cache.get("d")] == [None, b"1234", b"123456"]
+    cache.set("huge", b"12345678901", None, DAY, False, cache.generation)
+    assert cache.get("huge") is None
+
+
+@pytest.mark.anyio
+async def test_sale_invalidates_the_cached_report(db_session, product):
+    product_id = product.id
+    SALES_REPORT_CACHE.clear()
+    report_service = ReportService(ReportRepository(db_session), SaleRollupRepository(db_session))
+    stock_service = StockService(
+        ProductRepository(db_session),
+        StockLedgerRepository(db_session),
+        StockShardRepository(db_session),
+        OutboxRepository(db_session),
+    )
+    sale_service = SaleService(
+        SaleRepository(db_session), ProductRepository(db_session), ReservationRepository(db_session), stock_service
+    )
+
+    assert await report_service.generate_sales_report(product_id=product_id) == []
+    assert len(SALES_REPORT_CACHE) == 1
+    await sale_service.buy_product(product_id, 3)
+
+    sales = await report_service.generate_sales_report(product_id=product_id)
+    assert [sale["quantity"] for sale in sales] == [3]
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, text, update
+
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import Category, Product, Sale, SaleDailyRollup, SaleRollupGap
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.report_repository import ReportRepository
+from src.repositories.implementation.reservation_repository import ReservationRepository
+from src.repositories.implementation.sale_repository import SaleRepository
+from src.repositories.implementation.sale_rollup_repository import SaleRollupRepository, rollup_upsert_statement
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.schemes.sale_schemes import CheckoutLineRequest
+from src.services.report_service import ReportService
+from src.services.sale_service import SaleService
+from src.services.stock_service import StockService
+from src.tasks.sale_rollup_refresher import SaleRollupRefresher
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_sale(session, product_id: int, quantity: int, sold_at: datetime = None) -> None:
+    session.add(Sale(product_id=product_id, quantity=quantity, unit_price=10.0, sold_at=sold_at or datetime.utcnow()))
+    await session.flush()
+
+
+async def rolled_up_units(session) -> int:
+    return (await session.execute(select(func.coalesce(func.sum(SaleDailyRollup.units), 0)))).scalar()
+
+
+async def gap_count(session) -> int:
+    return (await session.execute(select(func.count()).select_from(SaleRollupGap))).scalar()
+
+
+def sale_service(session) -> SaleService:
+    stock_service = StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+    )
+    return SaleService(
+        SaleRepository(session), ProductRepository(session), ReservationRepository(session), stock_service
+    )
+
+
+async def test_sale_committed_after_a_higher_id_is_folded(db_session, product):
+    product_id = product.id
+    refresher = SaleRollupRefresher(batch_size=100)
+
+    async with SessionLocal() as long_session:
+        await add_sale(long_session, product_id, 1)
+        async with SessionLocal() as session:
+            await add_sale(session, product_id, 2)
+            await session.commit()
+        await refresher.run_once()
+        assert await rolled_up_units(db_session) == 2
+        assert await gap_count(db_session) == 1
+        await long_session.commit()
+
+    await refresher.run_once()
+    assert await rolled_up_units(db_session) == 3
+    assert await gap_count(db_session) == 0
+    # Folded once: another refresh changes nothing.
+    await refresher.run_once()
+    assert await rolled_up_units(db_session) == 3
+
+
+async def test_gap_of_a_rolled_back_sale_is_retired(db_session, product):
+    product_id = product.id
+    refresher = SaleRollupRefresher(batch_size=100)
+    async with SessionLocal() as session:
+        await add_sale(session, product_id, 1)
+        await session.rollback()
+    await add_sale(db_session, product_id, 2)
+    await db_session.commit()
+
+    await refresher.run_once()
+    assert await gap_count(db_session) == 1
+    await refresher.run_once()
+    await refresher.run_once()
+
+    assert await gap_count(db_session) == 0
+    assert await rolled_up_units(db_session) == 2
+
+
+async def test_batches_move_the_watermark(db_session, product):
+    product_id = product.id
+    for quantity in range(1, 6):
+        await add_sale(db_session, product_id, quantity)
+    await db_session.commit()
+    rollup_repo = SaleRollupRepository(db_session)
+
+    assert [await rollup_repo.refresh_from_watermark(2) for _ in range(4)] == [2, 2, 1, 0]
+    assert await rolled_up_units(db_session) == 15
+
+
+async def test_rollup_and_raw_days_report_the_current_category(db_session, product):
+    product_id = product.id
+    moved_to = Category(name="Moved to")
+    db_session.add(moved_to)
+    await db_session.flush()
+    moved_to_id = moved_to.id
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    await add_sale(db_session, product_id, 2, sold_at=today - timedelta(hours=12))
+    await add_sale(db_session, product_id, 3, sold_at=datetime.utcnow())
+    await db_session.commit()
+    await SaleRollupRefresher(batch_size=100).run_once()
+
+    await db_session.execute(update(Product).where(Product.id == product_id).values(category_id=moved_to_id))
+    await db_session.commit()
+    report_service = ReportService(ReportRepository(db_session), SaleRollupRepository(db_session))
+    rows = await report_service.generate_sales_summary(
+        granularity="day", category_id=moved_to_id, start_date=today - timedelta(days=1)
+    )
+
+    # Yesterday comes from the rollup, today from the raw sales: both count under the current category.
+    assert [(row.category_id, row.units) for row in rows] == [(moved_to_id, 2), (moved_to_id, 3)]
+
+
+async def test_checkouts_lock_rollup_rows_in_key_order(db_session, product):
+    other = Product(name="Other", description="Description", price=5.0, effective_price=5.0, stock=100)
+    other.category_id = product.category_id
+    db_session.add(other)
+    await db_session.commit()
+    product_id, other_id, category_id = product.id, other.id, product.category_id
+
+    def rollup_row(row_product_id):
+        return {
+            "day": datetime.utcnow().date(),
+            "product_id": row_product_id,
+            "category_id": category_id,
+            "discount_id": None,
+            "units": 0,
+            "revenue": 0.0,
+        }
+
+    async def checkout_in_reverse_order():
+        async with SessionLocal() as session:
+            lines = [CheckoutLineRequest(product_id=line_id, quantity=1) for line_id in (other_id, product_id)]
+            await sale_service(session).checkout(lines, [])
+
+    # Another checkout holds the first rollup row; the reversed cart has to wait for it before taking the second.
+    async with SessionLocal() as holder:
+        await holder.execute(rollup_upsert_statement([rollup_row(product_id)]))
+        checkout = asyncio.create_task(checkout_in_reverse_order())
+        while not (await db_session.execute(text("SELECT count(*) FROM pg_locks WHERE NOT granted"))).scalar():
+            await asyncio.sleep(0.01)
+        await holder.execute(rollup_upsert_statement([rollup_row(other_id)]))
+        await holder.commit()
+    await checkout
+
+    assert await rolled_up_units(db_session) == 2
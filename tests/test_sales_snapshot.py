@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+from src.infrastructure.analytics.sales_snapshot import SalesSnapshot
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import Sale
+from src.tasks.sales_snapshot_refresher import SalesSnapshotRefresher
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_sale(session, product_id: int, quantity: int) -> None:
+    session.add(Sale(product_id=product_id, quantity=quantity, unit_price=10.0, sold_at=datetime.utcnow()))
+    await session.flush()
+
+
+async def test_sale_committed_after_a_higher_id_is_loaded(db_session, product):
+    product_id = product.id
+    refresher = SalesSnapshotRefresher(SalesSnapshot(), batch_size=100)
+
+    async with SessionLocal() as long_session:
+        await add_sale(long_session, product_id, 1)
+        async with SessionLocal() as session:
+            await add_sale(session, product_id, 2)
+            await session.commit()
+        await refresher.run_once()
+        assert list(refresher.snapshot.columns().quantity) == [2]
+        assert len(refresher.gaps) == 1
+        await long_session.commit()
+
+    await refresher.run_once()
+    assert sorted(refresher.snapshot.columns().quantity) == [1, 2]
+    assert refresher.gaps == {}
+
+
+async def test_gap_of_a_rolled_back_sale_is_retired(db_session, product):
+    product_id = product.id
+    refresher = SalesSnapshotRefresher(SalesSnapshot(), batch_size=100)
+    async with SessionLocal() as session:
+        await add_sale(session, product_id, 1)
+        await session.rollback()
+    await add_sale(db_session, product_id, 2)
+    await db_session.commit()
+
+    await refresher.run_once()
+    assert len(refresher.gaps) == 1
+    await refresher.run_once()
+    await refresher.run_once()
+
+    assert refresher.gaps == {}
+    assert list(refresher.snapshot.columns().quantity) == [2]
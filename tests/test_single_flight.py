@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from src.repositories.implementation.category_repository import CategoryRepository
+from src.repositories.implementation.discount_repository import DiscountRepository
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.product_service import ProductService
+from src.services.stock_service import StockService
+
+pytestmark = pytest.mark.anyio
+
+
+def product_service(session) -> ProductService:
+    stock_service = StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+    )
+    return ProductService(
+        ProductRepository(session), CategoryRepository(session), DiscountRepository(session), stock_service
+    )
+
+
+async def test_coalesced_reads_run_in_a_session_of_their_own(db_session, product):
+    product_id = product.id
+    await db_session.close()
+
+    responses = await asyncio.gather(*(product_service(db_session).get_product_by_id(product_id) for _ in range(5)))
+
+    assert {response.id for response in responses} == {product_id}
+    # The read did not run on the session of the request that started it.
+    assert not db_session.in_transaction()
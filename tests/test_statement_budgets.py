@@ -0,0 +1,65 @@
+import pytest
+
+from src.infrastructure.db.models.models import Category, Discount, Product, ProductStockShard, Reservation
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed_catalog(session, width: int) -> None:
+    """A three level category tree `width` categories wide per level, with products, discounts and reservations."""
+    discount = Discount(name="Discount", percentage=10.0)
+    session.add(discount)
+    leaves = []
+    for root_index in range(width):
+        root = Category(name=f"Root {root_index}")
+        for child_index in range(width):
+            child = Category(name=f"Child {root_index}.{child_index}", parent=root)
+            leaves += [
+                Category(name=f"Leaf {root_index}.{child_index}.{index}", parent=child) for index in range(width)
+            ]
+        session.add(root)
+    await session.flush()
+
+    for index, leaf in enumerate(leaves):
+        product = Product(
+            name=f"Product {index}",
+            description="Description",
+            price=10.0,
+            effective_price=9.0 if index % 2 else 10.0,
+            discount_id=discount.id if index % 2 else None,
+            category_id=leaf.id,
+            stock=100,
+        )
+        session.add(product)
+        await session.flush()
+        session.add(Reservation(product_id=product.id, quantity=1))
+        if index % 3 == 0:
+            product.stock_shard_count = 2
+            session.add_all([ProductStockShard(product_id=product.id, slot=slot, stock=50) for slot in range(2)])
+    await session.commit()
+
+
+@pytest.mark.parametrize("width", [2, 4])
+async def test_product_listing_statement_budget(db_session, client, statement_counter, width):
+    await seed_catalog(db_session, width)
+
+    with statement_counter:
+        response = await client.get("/products/", params={"limit": 50})
+
+    assert response.status_code == 200
+    assert len(response.json()) == min(50, width**3)
+    # Discounts, stock shards and reservations are aggregated in the listing query.
+    statement_counter.assert_at_most(1)
+
+
+@pytest.mark.parametrize("width", [2, 4])
+async def test_category_tree_statement_budget(db_session, client, statement_counter, width):
+    await seed_catalog(db_session, width)
+
+    with statement_counter:
+        response = await client.get("/category/categories/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == width
+    # One statement per level of the tree, plus the one finding that the leaves have no children.
+    statement_counter.assert_at_most(4)
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.db.database import SessionLocal
+from src.infrastructure.db.models.models import StockMovementKind
+from src.repositories.implementation.outbox_repository import OutboxRepository
+from src.repositories.implementation.product_repository import ProductRepository
+from src.repositories.implementation.stock_ledger_repository import StockLedgerRepository
+from src.repositories.implementation.stock_shard_repository import StockShardRepository
+from src.services.stock_service import StockService
+
+pytestmark = pytest.mark.anyio
+
+
+def stock_service(session, ledger_enabled: bool) -> StockService:
+    return StockService(
+        ProductRepository(session),
+        StockLedgerRepository(session),
+        StockShardRepository(session),
+        OutboxRepository(session),
+        ledger_enabled=ledger_enabled,
+    )
+
+
+async def _restock(product_id: int, quantity: int, ledger_enabled: bool) -> None:
+    async with SessionLocal() as session:
+        await stock_service(session, ledger_enabled).restock(product_id, quantity)
+
+
+@pytest.mark.parametrize("ledger_enabled", [False, True])
+async def test_concurrent_restocks_are_all_counted(db_session, product, ledger_enabled):
+    product_id = product.id
+    await asyncio.gather(*(_restock(product_id, 5, ledger_enabled) for _ in range(10)))
+    db_session.expire_all()
+
+    assert await stock_service(db_session, ledger_enabled).get_available_stock(product_id) == 150
+
+
+async def test_ledger_adjustment_and_compaction(db_session, product):
+    service = stock_service(db_session, ledger_enabled=True)
+    await service.set_stock(product, 40)
+    await db_session.commit()
+    await service.restock(product.id, 2)
+
+    assert await StockLedgerRepository(db_session).compact() == 1
+    assert await service.get_available_stock(product.id) == 42
+
+
+@pytest.mark.parametrize("ledger_enabled", [False, True])
+async def test_split_and_merge_keep_the_stock(db_session, product, ledger_enabled):
+    product_id = product.id
+    service = stock_service(db_session, ledger_enabled)
+    assert await service.set_shard_count(product_id, 4) == 100
+    db_session.expire_all()
+    sharded = await ProductRepository(db_session).get_product_by_id(product_id)
+    await service.take_stock(sharded, 10, StockMovementKind.SALE)
+    await db_session.commit()
+
+    assert await service.set_shard_count(product_id, 1) == 90
+    db_session.expire_all()
+    assert await service.get_available_stock(product_id) == 90
+    await StockLedgerRepository(db_session).compact()
+    db_session.expire_all()
+    assert await service.get_available_stock(product_id) == 90